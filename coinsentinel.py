@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+CoinSentinel - Command-line batch tool for predictions, training and backtests
+
+    python coinsentinel.py predict  --coins bitcoin,ethereum --workers 4
+    python coinsentinel.py train    --coins top:100 --workers 4 --days 180
+    python coinsentinel.py backtest --coins @coins.txt --output backtest.parquet
+
+--coins takes comma-separated IDs, "top:N" (top N by market cap) or
+"@file" (one ID per line). Results go to stdout as JSON unless --output is
+given (.json or .parquet); progress goes to stderr. Exit status: 0 when
+every coin succeeded, 1 when some failed, 2 on usage errors, 3 when another
+run is still holding the lock (so overlapping cron runs skip).
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to path
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from batch_jobs import COMMANDS, default_workers, flatten, run_batch
+
+EXIT_OK, EXIT_FAILURES, EXIT_USAGE, EXIT_LOCKED = 0, 1, 2, 3
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="coinsentinel", description="Bulk predictions, training and backtests with the CoinSentinel predictor"
+    )
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--coins", required=True, help='coin IDs ("bitcoin,ethereum"), "top:N" or "@file"')
+    parser.add_argument("--workers", type=int, default=default_workers(), help="worker processes (default: CPUs - 1)")
+    parser.add_argument("--days", type=int, default=90, help="days of history for training and backtests")
+    parser.add_argument("--splits", type=int, default=5, help="walk-forward folds for backtests")
+    parser.add_argument("--time-frame", type=int, default=1, help="prediction horizon in days")
+    parser.add_argument("--output", help="result file (.json or .parquet); default: JSON on stdout")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    parser.add_argument("--verbose", action="store_true", help="show the predictor's own output")
+    parser.add_argument(
+        "--lock-file", help="lock preventing overlapping runs (default: data/coinsentinel_cli.lock in the app directory)"
+    )
+    return parser.parse_args(argv)
+
+
+def resolve_coins(spec: str, api):
+    """Coin IDs from a comma-separated list, top:N or @file"""
+    if spec.startswith("top:"):
+        coins = api.get_top_coins(limit=int(spec[4:]))
+        return [coin["id"] for coin in coins]
+    if spec.startswith("@"):
+        with open(spec[1:], "r") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return [coin_id.strip() for coin_id in spec.split(",") if coin_id.strip()]
+
+
+def acquire_lock(path: str):
+    """
+    Hold an exclusive lock for the lifetime of the process.
+
+    Returns:
+        The open lock file, or None if another run holds the lock
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    lock = open(path, "a+")
+    try:
+        try:
+            import fcntl
+
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:
+            import msvcrt
+
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock.close()
+        return None
+    lock.seek(0)
+    lock.truncate()
+    lock.write(f"{os.getpid()}\n")
+    lock.flush()
+    return lock
+
+
+def parquet_available() -> bool:
+    for engine in ("pyarrow", "fastparquet"):
+        try:
+            __import__(engine)
+            return True
+        except ImportError:
+            pass
+    return False
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # NumPy scalars
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def write_results(rows, output: str, meta):
+    """Write rows as JSON (with run metadata) or Parquet (one flat row per coin)"""
+    if output and output.endswith(".parquet"):
+        import pandas as pd
+
+        tmp_file = output + ".tmp"
+        pd.DataFrame([flatten(row) for row in rows]).to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, output)
+        return
+    text = json.dumps(dict(meta, results=rows), indent=2, default=_json_default)
+    if output:
+        tmp_file = output + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.write(text)
+        os.replace(tmp_file, output)
+    else:
+        print(text)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.workers < 1:
+        print("--workers must be at least 1", file=sys.stderr)
+        return EXIT_USAGE
+    # Paths given on the command line are relative to where we were started
+    output = os.path.abspath(args.output) if args.output else None
+    if output and output.endswith(".parquet") and not parquet_available():
+        print("Parquet output needs pyarrow or fastparquet (pip install pyarrow)", file=sys.stderr)
+        return EXIT_USAGE
+    coins_spec = "@" + os.path.abspath(args.coins[1:]) if args.coins.startswith("@") else args.coins
+    lock_file = os.path.abspath(args.lock_file) if args.lock_file else str(ROOT / "data" / "coinsentinel_cli.lock")
+
+    # data/ and models/ are shared with the GUI; cron starts jobs in $HOME
+    os.chdir(ROOT)
+    lock = acquire_lock(lock_file)
+    if lock is None:
+        print(f"Another coinsentinel run holds {lock_file}; exiting", file=sys.stderr)
+        return EXIT_LOCKED
+
+    # stdout carries only the JSON result; the API handler's logging goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        from api_handler import EnhancedCryptoAPIHandler
+
+        api = EnhancedCryptoAPIHandler()
+        try:
+            coin_ids = resolve_coins(coins_spec, api)
+        except (OSError, ValueError) as e:
+            print(f"Invalid --coins: {e}", file=sys.stderr)
+            return EXIT_USAGE
+        if not coin_ids:
+            print("No coins to process", file=sys.stderr)
+            return EXIT_USAGE
+
+        options = {"days": args.days, "splits": args.splits, "time_frame": args.time_frame}
+        if args.command == "predict":
+            # One request for all current prices instead of one per coin
+            quotes = api.get_price(coin_ids) or {}
+            options["prices"] = {coin_id: quote.get("usd") for coin_id, quote in quotes.items()}
+
+        # Update the Fear & Greed history once; the workers only read it
+        from fgi_store import FGIStore
+
+        FGIStore().refresh()
+
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+
+    def progress(done, total, row):
+        if args.quiet:
+            return
+        detail = row.get("error") or f"{row.get('elapsed', 0):.1f}s"
+        print(f"[{done}/{total}] {row['coin_id']}: {row['status']} ({detail})", file=sys.stderr, flush=True)
+
+    workers = min(args.workers, len(coin_ids))
+    rows = run_batch(args.command, coin_ids, options, workers=workers, progress=progress, verbose=args.verbose)
+    failed = sum(1 for row in rows if row["status"] != "ok")
+    elapsed = time.perf_counter() - started
+
+    meta = {
+        "command": args.command,
+        "started_at": started_at,
+        "coins": len(coin_ids),
+        "failed": failed,
+        "workers": workers,
+        "elapsed": round(elapsed, 3),
+        "options": {key: value for key, value in options.items() if key != "prices"},
+    }
+    write_results(rows, output, meta)
+    if not args.quiet:
+        print(
+            f"{args.command}: {len(coin_ids) - failed}/{len(coin_ids)} coins ok in {elapsed:.1f}s with {workers} worker(s)",
+            file=sys.stderr,
+        )
+    return EXIT_FAILURES if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+CoinSentinel - Headless service entry point (no GUI)
+
+Runs market refresh, portfolio revaluation, predictions, model training and
+price alerts on a schedule. Settings come from an optional JSON config file
+(see DEFAULT_CONFIG in src/headless_service.py); command-line options
+override it.
+
+    python daemon.py --config data/daemon_config.json
+    python daemon.py --market-interval 30 --coins bitcoin,ethereum
+    python daemon.py --once
+    curl http://127.0.0.1:8765/api/market
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src directory to path
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from headless_service import CoinSentinelService, load_config
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run CoinSentinel without the GUI")
+    parser.add_argument("--config", help="JSON file with service settings")
+    parser.add_argument("--once", action="store_true", help="run every job once and exit")
+    parser.add_argument("--coins", help="comma-separated coin IDs to predict and train (default: top coins)")
+    parser.add_argument("--market-interval", type=float, help="seconds between market refreshes")
+    parser.add_argument("--portfolio-interval", type=float, help="seconds between portfolio revaluations")
+    parser.add_argument("--prediction-interval", type=float, help="seconds between prediction runs")
+    parser.add_argument("--training-interval", type=float, help="seconds between model retraining runs")
+    parser.add_argument("--max-requests", type=int, help="concurrent API requests")
+    parser.add_argument("--max-predictions", type=int, help="concurrent predictions")
+    parser.add_argument("--training-workers", type=int, help="processes used for model training")
+    parser.add_argument("--api-port", type=int, help="port of the local HTTP/JSON API (0 disables it)")
+    parser.add_argument(
+        "--stream", action="store_true", default=None, help="apply live prices from the exchange WebSocket feeds"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = load_config(
+        args.config,
+        {
+            "coins": args.coins.split(",") if args.coins else None,
+            "market_interval": args.market_interval,
+            "portfolio_interval": args.portfolio_interval,
+            "prediction_interval": args.prediction_interval,
+            "training_interval": args.training_interval,
+            "max_concurrent_requests": args.max_requests,
+            "max_concurrent_predictions": args.max_predictions,
+            "training_workers": args.training_workers,
+            "api_port": args.api_port,
+            "stream_prices": args.stream,
+        },
+    )
+
+    # Create data directory if it doesn't exist
+    data_dir = Path(__file__).parent / "data"
+    data_dir.mkdir(exist_ok=True)
+
+    service = CoinSentinelService(config)
+    asyncio.run(service.run(once=args.once))
+
+
+if __name__ == "__main__":
+    main()
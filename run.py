@@ -12,6 +12,9 @@ from pathlib import Path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
+# Starts the startup clock before the heavy imports
+import startup
+
 try:
     from main_app_pyqt import main
     
@@ -0,0 +1,257 @@
+# src/alert_engine.py - Streaming price-alert engine with sorted threshold books
+
+import bisect
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class AlertEngine:
+    """
+    Price alerts kept per coin in two sorted threshold books.
+
+    'above' alerts fire when price >= level and 'below' alerts when
+    price <= level. Each book is a sorted list of levels with a parallel list
+    of alert ids, so a tick finds every crossed level with one bisect and a
+    slice: O(log n + k) for k triggered alerts. Alerts are one-shot; fired
+    alerts are removed from the books and routed through the notification
+    manager, which applies its per-alert cooldowns.
+
+    Alerts set by the user have source 'manual'; the support/resistance
+    levels of the latest prediction of a coin are kept as source 'levels'
+    and replaced whenever the coin is predicted again.
+    """
+
+    def __init__(self, notification_manager=None, alerts_file: str = "data/price_alerts.json"):
+        """
+        Args:
+            notification_manager: Optional ImprovedNotificationManager used to
+                deliver triggered alerts
+            alerts_file: JSON file used by save_alerts/load_alerts
+        """
+        self.notification_manager = notification_manager
+        self.alerts_file = alerts_file
+        self._alerts = {}
+        self._books = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._alerts)
+
+    # ==================== BOOK MAINTENANCE ====================
+    def _book(self, coin_id: str, alert_type: str):
+        books = self._books.setdefault(coin_id, {"above": ([], []), "below": ([], [])})
+        return books[alert_type]
+
+    def _insert(self, alert: Dict):
+        levels, ids = self._book(alert["coin_id"], alert["type"])
+        # Equal levels keep insertion order, so ids stay parallel to levels
+        pos = bisect.bisect_right(levels, alert["level"])
+        levels.insert(pos, alert["level"])
+        ids.insert(pos, alert["id"])
+
+    def add_alert(
+        self, coin_id: str, alert_type: str, level: float, symbol: Optional[str] = None, source: str = "manual"
+    ) -> int:
+        """
+        Register a one-shot price alert.
+
+        Args:
+            coin_id: CoinGecko coin id
+            alert_type: 'above' or 'below'
+            level: Threshold price
+            symbol: Display symbol for notifications (defaults to coin_id)
+            source: 'manual' or 'levels' (prediction support/resistance)
+
+        Returns:
+            Alert id
+        """
+        if alert_type not in ("above", "below"):
+            raise ValueError(f"Unknown alert type: {alert_type}")
+
+        with self._lock:
+            alert = {
+                "id": self._next_id,
+                "coin_id": coin_id,
+                "symbol": (symbol or coin_id).upper(),
+                "type": alert_type,
+                "level": float(level),
+                "source": source,
+                "created_at": datetime.now().isoformat(),
+            }
+            self._next_id += 1
+            self._alerts[alert["id"]] = alert
+            self._insert(alert)
+        return alert["id"]
+
+    def add_alert_levels(self, coin_id: str, alert_levels: Dict[float, str], symbol: Optional[str] = None) -> List[int]:
+        """
+        Watch a prediction's support/resistance levels ({level: 'above'/'below'}).
+
+        The coin's previous level alerts are replaced; manual alerts are kept.
+
+        Returns:
+            Ids of the new alerts
+        """
+        for alert in self.get_alerts(coin_id):
+            if alert.get("source") == "levels":
+                self.remove_alert(alert["id"])
+        return [
+            self.add_alert(coin_id, alert_type, level, symbol, source="levels")
+            for level, alert_type in alert_levels.items()
+        ]
+
+    def remove_alert(self, alert_id: int) -> bool:
+        """Remove an alert by id; returns False if it does not exist"""
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                return False
+            levels, ids = self._book(alert["coin_id"], alert["type"])
+            pos = bisect.bisect_left(levels, alert["level"])
+            while pos < len(ids) and ids[pos] != alert_id:
+                pos += 1
+            if pos < len(ids):
+                del levels[pos]
+                del ids[pos]
+        return True
+
+    def clear_coin(self, coin_id: str):
+        """Remove every alert for one coin"""
+        with self._lock:
+            books = self._books.pop(coin_id, None)
+            if books:
+                for _, ids in books.values():
+                    for alert_id in ids:
+                        self._alerts.pop(alert_id, None)
+
+    def get_alerts(self, coin_id: Optional[str] = None) -> List[Dict]:
+        """List active alerts, optionally for one coin"""
+        with self._lock:
+            return [
+                dict(alert)
+                for alert in self._alerts.values()
+                if coin_id is None or alert["coin_id"] == coin_id
+            ]
+
+    # ==================== TICKS ====================
+    def _pop_crossed(self, coin_id: str, price: float) -> List[Dict]:
+        books = self._books.get(coin_id)
+        if not books:
+            return []
+
+        fired_ids = []
+        levels, ids = books["above"]
+        pos = bisect.bisect_right(levels, price)
+        if pos:
+            fired_ids.extend(ids[:pos])
+            del levels[:pos]
+            del ids[:pos]
+
+        levels, ids = books["below"]
+        pos = bisect.bisect_left(levels, price)
+        if pos < len(levels):
+            fired_ids.extend(ids[pos:])
+            del levels[pos:]
+            del ids[pos:]
+
+        return [self._alerts.pop(alert_id) for alert_id in fired_ids]
+
+    def on_price(self, coin_id: str, price: float) -> List[Dict]:
+        """
+        Process one price tick.
+
+        Returns:
+            List of triggered alerts (already removed from the books)
+        """
+        if price is None:
+            return []
+        with self._lock:
+            triggered = self._pop_crossed(coin_id, price)
+        self._dispatch(triggered, price)
+        return triggered
+
+    def on_prices(self, prices: Dict[str, float]) -> List[Dict]:
+        """Process a batch of ticks, e.g. one market refresh ({coin_id: price})"""
+        fired = []
+        with self._lock:
+            for coin_id, price in prices.items():
+                if price is not None and coin_id in self._books:
+                    crossed = self._pop_crossed(coin_id, price)
+                    if crossed:
+                        fired.append((crossed, price))
+        triggered = []
+        for crossed, price in fired:
+            self._dispatch(crossed, price)
+            triggered.extend(crossed)
+        return triggered
+
+    def _dispatch(self, triggered: List[Dict], price: float):
+        """Send triggered alerts through the notification manager (cooldowns apply)"""
+        if not self.notification_manager:
+            return
+        for alert in triggered:
+            try:
+                self.notification_manager.send_price_alert(
+                    alert["symbol"],
+                    price,
+                    alert["type"],
+                    alert["level"],
+                    "level_alert" if alert.get("source") == "levels" else "price_alert",
+                )
+            except Exception as e:
+                print(f"Error sending alert {alert['id']}: {e}")
+
+    # ==================== PERSISTENCE ====================
+    def save_alerts(self):
+        """Save active alerts to file."""
+        try:
+            with self._lock:
+                data = {"next_id": self._next_id, "alerts": list(self._alerts.values())}
+            os.makedirs(os.path.dirname(self.alerts_file) or ".", exist_ok=True)
+            tmp_file = self.alerts_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_file, self.alerts_file)
+        except Exception as e:
+            print(f"Error saving price alerts: {e}")
+
+    def load_alerts(self):
+        """Load alerts from file and rebuild the books."""
+        try:
+            if not os.path.exists(self.alerts_file):
+                return
+            with open(self.alerts_file, "r") as f:
+                data = json.load(f)
+            with self._lock:
+                self._alerts = {}
+                self._books = {}
+                for alert in sorted(data.get("alerts", []), key=lambda a: a["id"]):
+                    self._alerts[alert["id"]] = alert
+                    self._insert(alert)
+                self._next_id = max(data.get("next_id", 1), max(self._alerts, default=0) + 1)
+        except Exception as e:
+            print(f"Error loading price alerts: {e}")
+
+
+# Example usage
+if __name__ == "__main__":
+    import random
+    import time
+
+    engine = AlertEngine()
+
+    coins = [f"coin-{i}" for i in range(500)]
+    for coin_id in coins:
+        for _ in range(100):
+            level = random.uniform(50, 150)
+            engine.add_alert(coin_id, "above" if level > 100 else "below", level)
+    print(f"Active alerts: {len(engine)}")
+
+    start = time.perf_counter()
+    fired = engine.on_prices({coin_id: random.uniform(95, 105) for coin_id in coins})
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Triggered {len(fired)} alerts in {elapsed:.2f} ms, {len(engine)} remaining")
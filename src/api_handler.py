@@ -3,16 +3,29 @@
 import time
 from typing import Dict, List, Optional
 from pycoingecko import CoinGeckoAPI
-import pandas as pd
 from datetime import datetime, timedelta
 
+from coin_sentiment import NEUTRAL_SENTIMENT, CoinHistoryCache, CoinSentimentAnalyzer
+from market_providers import build_router
+
 
 class EnhancedCryptoAPIHandler:
-    def __init__(self):
+    def __init__(self, providers: Optional[List[Dict]] = None):
+        """
+        Args:
+            providers: Market-data provider settings for quotes and the market
+                listing (see market_providers.build_router); default:
+                data/market_providers.json, else CoinGecko only
+        """
         self.cg = CoinGeckoAPI()
         self.coin_cache = {}
         self.last_request_time = 0
         self.rate_limit_delay = 0.3
+        # The one hourly-history cache over data/coin_history; sentiment
+        # trackers and the prediction tab reuse it instead of opening their own
+        self.history_cache = CoinHistoryCache(self)
+        self.coin_sentiment = CoinSentimentAnalyzer(self, self.history_cache)
+        self.market_data = build_router(providers, rate_limit=self._rate_limit)
 
     def _rate_limit(self):
         """Rate limiting to avoid API throttling"""
@@ -104,45 +117,17 @@ class EnhancedCryptoAPIHandler:
             
             print(f"✓ Received {len(market_chart['prices'])} price points")
 
-            # Create DataFrame
-            prices_df = pd.DataFrame(
+            # Hourly candles aggregated straight from the [ts, value] pairs into
+            # contiguous arrays; the DataFrame wraps the price columns without copying
+            # (numpy/pandas are only needed here, so they load on first use)
+            from candles import CandleRing
+
+            candles = CandleRing.from_market_chart(
                 market_chart['prices'],
-                columns=['timestamp', 'close']
+                market_chart.get('total_volumes'),
+                interval=3600
             )
-            prices_df['timestamp'] = pd.to_datetime(prices_df['timestamp'], unit='ms')
-            
-            # Add volume
-            if 'total_volumes' in market_chart:
-                volumes_df = pd.DataFrame(
-                    market_chart['total_volumes'],
-                    columns=['timestamp', 'volume']
-                )
-                volumes_df['timestamp'] = pd.to_datetime(volumes_df['timestamp'], unit='ms')
-                
-                df = pd.merge_asof(
-                    prices_df.sort_values('timestamp'),
-                    volumes_df.sort_values('timestamp'),
-                    on='timestamp',
-                    direction='nearest'
-                )
-            else:
-                df = prices_df
-                df['volume'] = 0
-            
-            print(f"✓ Created base DataFrame with {len(df)} rows")
-
-            # Create OHLC from close prices
-            # Group by hour for more data points
-            df['hour'] = df['timestamp'].dt.floor('H')
-            
-            hourly = df.groupby('hour').agg({
-                'close': ['first', 'max', 'min', 'last'],
-                'volume': 'sum',
-                'timestamp': 'first'
-            }).reset_index()
-            
-            hourly.columns = ['hour', 'open', 'high', 'low', 'close', 'volume', 'timestamp']
-            result = hourly[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+            result = candles.to_dataframe()
             
             print(f"✓ Created OHLC data with {len(result)} rows")
             print(f"✓ Columns: {list(result.columns)}")
@@ -158,22 +143,67 @@ class EnhancedCryptoAPIHandler:
             traceback.print_exc()
             return None
 
-    def get_top_coins(self, limit=100, vs_currency="usd"):
-        """Get top cryptocurrencies with ALL percentage changes"""
+    def get_ohlc_history(self, coin_id: str, vs_currency: str = "usd"):
+        """
+        Real OHLC candles over a coin's whole history for charting.
+
+        CoinGecko's /ohlc endpoint returns 4-day candles for the full history,
+        4-hour candles for the last 30 days and 30-minute candles for the last
+        day; the finest resolution available is kept for each period.
+
+        Returns:
+            DataFrame with timestamp, open, high, low and close (oldest
+            first), or None if no candles are available
+        """
         try:
-            self._rate_limit()
-            
-            print(f"API: Requesting {limit} coins in {vs_currency}...")
-
-            # CRITICAL: Request percentage changes for 1h, 24h, and 7d
-            coins = self.cg.get_coins_markets(
-                vs_currency=vs_currency,
-                order="market_cap_desc",
-                per_page=limit,
-                page=1,
-                sparkline=False,
-                price_change_percentage="1h,24h,7d"  # THIS IS KEY!
+            import numpy as np
+            import pandas as pd
+            from candles import CandleRing
+
+            times, values = [], []
+            cutoff = None
+            for days in (1, 30, "max"):
+                if hasattr(self, '_rate_limit'):
+                    self._rate_limit()
+                rows = self.cg.get_coin_ohlc_by_id(id=coin_id, vs_currency=vs_currency, days=days)
+                if not rows:
+                    continue
+                ring = CandleRing.from_ohlc(rows)
+                starts, block = ring.arrays()
+                if cutoff is not None:
+                    # Only candles that end before the finer ones begin
+                    keep = starts + ring.interval <= cutoff
+                    starts, block = starts[keep], block[:, keep]
+                if len(starts):
+                    times.insert(0, starts)
+                    values.insert(0, block)
+                    cutoff = int(starts[0])
+            if not times:
+                return None
+
+            times = np.concatenate(times)
+            values = np.concatenate(values, axis=1)
+            return pd.DataFrame(
+                {
+                    "timestamp": times.astype("datetime64[s]").astype("datetime64[ns]"),
+                    "open": values[0],
+                    "high": values[1],
+                    "low": values[2],
+                    "close": values[3],
+                }
             )
+        except Exception as e:
+            print(f"Error fetching OHLC history for {coin_id}: {e}")
+            return None
+
+    def get_top_coins(self, limit=100, vs_currency="usd", page=1):
+        """Get top cryptocurrencies with ALL percentage changes (page of `limit` coins)"""
+        try:
+            print(f"API: Requesting {limit} coins in {vs_currency} (page {page})...")
+
+            # Fastest healthy listing source (with 1h/24h/7d changes), newer
+            # exchange quotes merged in; throttled inside the CoinGecko provider
+            coins = self.market_data.get_top_coins(limit=limit, vs_currency=vs_currency, page=page)
 
             print(f"API: Received {len(coins) if coins else 0} coins")
 
@@ -194,21 +224,23 @@ class EnhancedCryptoAPIHandler:
             return []
 
     def get_price(self, coin_ids: List[str], vs_currency: str = "usd") -> Dict:
-        """Get current prices for multiple coins"""
+        """
+        Get current prices for multiple coins
+
+        Quotes are merged from the configured providers (fastest healthy
+        source first). The result keeps CoinGecko's simple/price format,
+        plus 'last_updated_at', 'source' and 'stale' per coin.
+        """
         try:
-            self._rate_limit()
-            
-            # Convert list to comma-separated string
-            ids_str = ",".join(coin_ids)
-            
-            result = self.cg.get_price(
-                ids=ids_str,
-                vs_currencies=vs_currency,
-                include_market_cap=True,
-                include_24hr_vol=True,
-                include_24hr_change=True
-            )
-            
+            quotes = self.market_data.get_price(coin_ids, vs_currency)
+            result = {}
+            for coin_id, quote in quotes.items():
+                data = {vs_currency: quote["price"]}
+                for key, field in (("market_cap", "market_cap"), ("24h_vol", "volume_24h"), ("24h_change", "change_24h")):
+                    if quote.get(field) is not None:
+                        data[f"{vs_currency}_{key}"] = quote[field]
+                data.update(last_updated_at=quote["updated_at"], source=quote["source"], stale=quote["stale"])
+                result[coin_id] = data
             return result
             
         except Exception as e:
@@ -259,33 +291,12 @@ class EnhancedCryptoAPIHandler:
             }
 
     def get_coin_sentiment(self, coin_id: str) -> Dict:
-        """Get sentiment data for a specific coin (simplified)"""
+        """Get sentiment data for a specific coin from its cached hourly history"""
         try:
-            # Get recent price data as proxy for sentiment
-            data = self.get_comprehensive_coin_data(coin_id, days=7)
-            
-            if data and 'prices' in data and len(data['prices']) > 0:
-                # Calculate price change
-                first_price = data['prices'][0][1]
-                last_price = data['prices'][-1][1]
-                price_change = ((last_price / first_price) - 1) * 100
-                
-                # Simple sentiment based on price action
-                if price_change > 5:
-                    return {"positive": 70.0, "negative": 10.0, "neutral": 20.0}
-                elif price_change > 0:
-                    return {"positive": 55.0, "negative": 20.0, "neutral": 25.0}
-                elif price_change > -5:
-                    return {"positive": 25.0, "negative": 35.0, "neutral": 40.0}
-                else:
-                    return {"positive": 15.0, "negative": 65.0, "neutral": 20.0}
-            
-            # Default neutral sentiment
-            return {"positive": 33.0, "negative": 33.0, "neutral": 34.0}
-            
+            return self.coin_sentiment.analyze([coin_id])[coin_id]
         except Exception as e:
             print(f"Error getting coin sentiment: {e}")
-            return {"positive": 33.0, "negative": 33.0, "neutral": 34.0}
+            return dict(NEUTRAL_SENTIMENT)
 
 
 # Example usage and testing
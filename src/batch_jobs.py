@@ -0,0 +1,158 @@
+# src/batch_jobs.py - Per-coin predict/train/backtest jobs run on a process pool
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from api_handler import EnhancedCryptoAPIHandler
+
+COMMANDS = ("predict", "train", "backtest")
+
+# One predictor per worker process, created on its first job
+_worker_predictor = None
+
+
+def worker_predictor():
+    """This process's predictor (one core per process, since coins run in parallel)"""
+    global _worker_predictor
+    if _worker_predictor is None:
+        from improved_price_predictor import AdvancedPricePredictor
+
+        _worker_predictor = AdvancedPricePredictor(EnhancedCryptoAPIHandler(), n_jobs=1)
+    return _worker_predictor
+
+
+def train_coin(coin_id: str, days: int):
+    """Train and save one coin's model; returns (coin_id, success, message)"""
+    success, message = worker_predictor().train_ensemble_model(coin_id, days=days)
+    return coin_id, success, message
+
+
+def run_job(command: str, coin_id: str, options: Dict, verbose: bool = False) -> Dict:
+    """
+    Run one command for one coin inside a worker process.
+
+    The predictor's progress printing is captured unless ``verbose``, which
+    sends it to stderr so stdout stays machine-readable.
+
+    Returns:
+        Dict with 'coin_id', 'command', 'status' ('ok' or 'error'),
+        'elapsed' and either 'result' or 'error'
+    """
+    start = time.perf_counter()
+    row = {"coin_id": coin_id, "command": command}
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(sys.stderr if verbose else output):
+            predictor = worker_predictor()
+            if command == "train":
+                success, message = predictor.train_ensemble_model(coin_id, days=options["days"])
+                if not success:
+                    raise RuntimeError(message)
+                result = dict(predictor.get_model_performance(coin_id) or {}, message=message)
+                result.pop("model", None)
+            elif command == "backtest":
+                result = predictor.backtest_model(coin_id, days=options["days"], n_splits=options["splits"])
+                if result is None:
+                    raise RuntimeError("insufficient history")
+            else:
+                price = options.get("prices", {}).get(coin_id)
+                if not price:
+                    raise RuntimeError("no current price")
+                result = predictor.predict_price(coin_id, price, time_frame=options["time_frame"])
+                if result.get("is_fallback"):
+                    raise RuntimeError("model unavailable, fallback prediction only")
+        row.update(status="ok", result=result)
+    except Exception as e:
+        row.update(status="error", error=str(e))
+    row["elapsed"] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def run_batch(
+    command: str,
+    coin_ids: List[str],
+    options: Dict,
+    workers: int = 1,
+    progress: Optional[Callable[[int, int, Dict], None]] = None,
+    verbose: bool = False,
+) -> List[Dict]:
+    """
+    Run a command for many coins, ``workers`` processes at a time.
+
+    With one worker the jobs run in this process.
+
+    Args:
+        command: 'predict', 'train' or 'backtest'
+        coin_ids: Coins to process
+        options: days, splits, time_frame and (for predict) prices
+        workers: Number of worker processes
+        progress: Called as progress(done, total, row) after each coin
+
+    Returns:
+        One row per coin, in the order of ``coin_ids``
+    """
+    rows = {}
+    total = len(coin_ids)
+    if workers <= 1:
+        for coin_id in coin_ids:
+            rows[coin_id] = run_job(command, coin_id, options, verbose)
+            if progress:
+                progress(len(rows), total, rows[coin_id])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(run_job, command, coin_id, options, verbose): coin_id for coin_id in coin_ids
+            }
+            for future in as_completed(futures):
+                coin_id = futures[future]
+                try:
+                    rows[coin_id] = future.result()
+                except Exception as e:
+                    # The worker process died (e.g. out of memory)
+                    rows[coin_id] = {"coin_id": coin_id, "command": command, "status": "error", "error": str(e)}
+                if progress:
+                    progress(len(rows), total, rows[coin_id])
+    return [rows[coin_id] for coin_id in coin_ids]
+
+
+def flatten(row: Dict) -> Dict:
+    """
+    One flat record per row for tabular output (Parquet/CSV).
+
+    Nested dicts with string keys become dotted columns, other dicts are
+    stored as JSON and lists are joined with ' | '.
+    """
+    flat = {}
+
+    def add(prefix, value):
+        if isinstance(value, dict) and not all(isinstance(key, str) for key in value):
+            flat[prefix] = json.dumps({str(key): item for key, item in value.items()}, default=str)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                add(f"{prefix}.{key}" if prefix else str(key), item)
+        elif isinstance(value, (list, tuple)):
+            flat[prefix] = " | ".join(str(item) for item in value)
+        elif isinstance(value, datetime):
+            flat[prefix] = value.isoformat()
+        elif hasattr(value, "item"):
+            flat[prefix] = value.item()
+        else:
+            flat[prefix] = value
+
+    for key, value in row.items():
+        if key == "result":
+            add("", value or {})
+        else:
+            add(key, value)
+    return flat
+
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 2) - 1)
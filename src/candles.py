@@ -0,0 +1,381 @@
+# src/candles.py - Compact fixed-capacity OHLCV candle rings backed by contiguous NumPy arrays
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Candle interval name -> seconds
+INTERVALS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# Rows of the values block
+FIELDS = ("open", "high", "low", "close", "volume")
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+# int64 start time + five float64 values
+BYTES_PER_CANDLE = 8 + 8 * len(FIELDS)
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def align_nearest(source_times: np.ndarray, source_values: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Values of the source points nearest to ``times`` (both sorted, same units)"""
+    if len(source_times) == len(times) and np.array_equal(source_times, times):
+        return source_values
+    if len(source_times) == 1:
+        return np.full(len(times), source_values[0])
+    right = np.clip(np.searchsorted(source_times, times), 1, len(source_times) - 1)
+    left = right - 1
+    pick_left = times - source_times[left] <= source_times[right] - times
+    return source_values[np.where(pick_left, left, right)]
+
+
+def market_points(pairs) -> Tuple[np.ndarray, np.ndarray]:
+    """CoinGecko ``[[ts_ms, value], ...]`` as sorted (int64 ms, float64) arrays"""
+    points = np.asarray(pairs if pairs is not None else [], dtype=np.float64).reshape(-1, 2)
+    times, values = points[:, 0].astype(np.int64), points[:, 1]
+    if len(times) > 1 and np.any(times[1:] < times[:-1]):
+        order = np.argsort(times, kind="stable")
+        times, values = times[order], values[order]
+    return times, values
+
+
+class CandleRing:
+    """
+    The last ``capacity`` candles of one coin at one interval.
+
+    Storage is allocated once: candle start times (epoch seconds) in an
+    int64 array and open/high/low/close/volume as the rows of a
+    (5, capacity) float64 block, so every field is contiguous. A full ring
+    overwrites its oldest candle. Memory is ``capacity * BYTES_PER_CANDLE``
+    whatever the contents: a year of hourly candles is 411 KiB per coin,
+    about 400 MiB for 1000 coins, several times less than the same history
+    as Python lists of ``[ts, price]`` pairs.
+
+    ``timestamps``, ``open`` ... ``volume`` and ``arrays()`` return
+    read-only zero-copy views, oldest first. Once the ring has wrapped, the
+    first read rotates the buffer in place so the window is contiguous
+    again; views taken earlier see later writes, so copy them to keep a
+    snapshot. Ticks update the current candle in place (``add_tick``), and
+    ticks older than it are counted in ``late`` and dropped.
+    """
+
+    def __init__(self, interval: int, capacity: int):
+        """
+        Args:
+            interval: Candle length in seconds
+            capacity: Candles kept
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.interval = interval
+        self.capacity = capacity
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._values = np.zeros((len(FIELDS), capacity), dtype=np.float64)
+        # Index of the oldest candle; non-zero only once the ring has wrapped
+        self._start = 0
+        self.count = 0
+        self.late = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return self._times.nbytes + self._values.nbytes
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.capacity
+
+    def _last(self) -> int:
+        return (self._start + self.count - 1) % self.capacity
+
+    # ==================== WRITING ====================
+    def append(self, ts: int, open_: float, high: float, low: float, close: float, volume: float = 0.0):
+        """Add a candle after the newest one (overwriting the oldest when full)"""
+        index = (self._start + self.count) % self.capacity
+        self._times[index] = ts
+        self._values[:, index] = (open_, high, low, close, volume)
+        if self.count == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self.count += 1
+
+    def extend(self, times, values):
+        """
+        Add candles in bulk (oldest first).
+
+        Args:
+            times: Candle start times (epoch seconds)
+            values: (5, n) array of open, high, low, close, volume rows
+        """
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        n, capacity = len(times), self.capacity
+        if n >= capacity:
+            self._times[:] = times[-capacity:]
+            self._values[:] = values[:, -capacity:]
+            self._start, self.count = 0, capacity
+            return
+        end = (self._start + self.count) % capacity
+        first = min(n, capacity - end)
+        self._times[end:end + first] = times[:first]
+        self._values[:, end:end + first] = values[:, :first]
+        if n > first:
+            self._times[: n - first] = times[first:]
+            self._values[:, : n - first] = values[:, first:]
+        overflow = max(0, self.count + n - capacity)
+        self.count = min(capacity, self.count + n)
+        self._start = (self._start + overflow) % capacity
+
+    def add_tick(self, ts: float, price: float, volume: float = 0.0) -> bool:
+        """
+        Fold one tick into its candle.
+
+        Args:
+            ts: Tick time (epoch seconds)
+            price: Trade or last price
+            volume: Quote volume traded since the previous tick
+
+        Returns:
+            True if the tick opened a new candle
+        """
+        start = int(ts) // self.interval * self.interval
+        if self.count:
+            last = self._last()
+            last_start = self._times[last]
+            if start < last_start:
+                self.late += 1
+                return False
+            if start == last_start:
+                values = self._values
+                if price > values[HIGH, last]:
+                    values[HIGH, last] = price
+                elif price < values[LOW, last]:
+                    values[LOW, last] = price
+                values[CLOSE, last] = price
+                values[VOLUME, last] += volume
+                return False
+        self.append(start, price, price, price, price, volume)
+        return True
+
+    # ==================== VIEWS ====================
+    def _linearize(self):
+        """Rotate a wrapped ring so the oldest candle is at index 0"""
+        if self._start:
+            self._times[:] = np.roll(self._times, -self._start)
+            self._values[:] = np.roll(self._values, -self._start, axis=1)
+            self._start = 0
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Start times and the (5, n) values block, oldest first (read-only views)"""
+        self._linearize()
+        return _readonly(self._times[: self.count]), _readonly(self._values[:, : self.count])
+
+    def field(self, name: str) -> np.ndarray:
+        self._linearize()
+        return _readonly(self._values[FIELDS.index(name), : self.count])
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Candle start times in epoch seconds"""
+        self._linearize()
+        return _readonly(self._times[: self.count])
+
+    @property
+    def datetimes(self) -> np.ndarray:
+        """Candle start times as datetime64[s] (a view of the same memory)"""
+        return self.timestamps.view("datetime64[s]")
+
+    open = property(lambda self: self.field("open"))
+    high = property(lambda self: self.field("high"))
+    low = property(lambda self: self.field("low"))
+    close = property(lambda self: self.field("close"))
+    volume = property(lambda self: self.field("volume"))
+
+    def latest(self) -> Optional[Dict]:
+        """The newest (possibly still open) candle"""
+        if not self.count:
+            return None
+        last = self._last()
+        candle = {"timestamp": int(self._times[last])}
+        candle.update(zip(FIELDS, self._values[:, last].tolist()))
+        return candle
+
+    def to_dataframe(self):
+        """
+        Candles as a DataFrame in the get_coin_history format.
+
+        The value columns share the ring's memory (timestamps are converted
+        to datetime64[ns]); copy the frame if the ring keeps receiving ticks.
+        """
+        import pandas as pd
+
+        self._linearize()
+        values = self._values[:, : self.count]
+        frame = pd.DataFrame({name: values[row] for row, name in enumerate(FIELDS)}, copy=False)
+        frame.insert(0, "timestamp", self._times[: self.count].view("datetime64[s]").astype("datetime64[ns]"))
+        return frame
+
+    # ==================== CONSTRUCTION ====================
+    @classmethod
+    def from_market_chart(
+        cls,
+        prices,
+        volumes=None,
+        interval: int = 3600,
+        capacity: Optional[int] = None,
+        rolling_volume: bool = True,
+    ) -> "CandleRing":
+        """
+        Aggregate CoinGecko market-chart points into candles.
+
+        Each candle opens at the first price in its interval and closes at
+        the last. Volumes are matched to the nearest price point.
+
+        CoinGecko's ``total_volumes`` are rolling 24h totals, not the volume
+        traded since the previous point, so summing them would count the
+        same trades once per point (12x for 5-minute data, double for a
+        partial day). With ``rolling_volume`` a candle keeps the value at
+        its close; per-interval volumes are summed.
+
+        Args:
+            prices: ``[[ts_ms, price], ...]``
+            volumes: ``[[ts_ms, volume], ...]`` (optional)
+            interval: Candle length in seconds
+            capacity: Ring capacity (default: exactly the candles produced)
+            rolling_volume: Volumes are rolling 24h totals (CoinGecko)
+                rather than per-point volumes
+        """
+        times, price_values = market_points(prices)
+        volume_values = np.zeros(len(times))
+        if volumes is not None and len(volumes) and len(times):
+            volume_times, raw_volumes = market_points(volumes)
+            volume_values = np.nan_to_num(align_nearest(volume_times, raw_volumes, times))
+
+        starts = times // 1000 // interval * interval
+        if not len(starts):
+            return cls(interval, capacity or 1)
+        boundaries = np.flatnonzero(starts[1:] != starts[:-1]) + 1
+        firsts = np.concatenate(([0], boundaries))
+        lasts = np.concatenate((boundaries - 1, [len(starts) - 1]))
+        values = np.vstack(
+            (
+                price_values[firsts],
+                np.maximum.reduceat(price_values, firsts),
+                np.minimum.reduceat(price_values, firsts),
+                price_values[lasts],
+                volume_values[lasts] if rolling_volume else np.add.reduceat(volume_values, firsts),
+            )
+        )
+        ring = cls(interval, capacity or len(firsts))
+        ring.extend(starts[firsts], values)
+        return ring
+
+    @classmethod
+    def from_ohlc(cls, ohlc, volumes=None, capacity: Optional[int] = None) -> "CandleRing":
+        """
+        Candles from CoinGecko ``/ohlc`` rows ``[[ts_ms, open, high, low, close], ...]``.
+
+        CoinGecko stamps each row with its close time; the interval is the
+        spacing of the rows.
+        """
+        rows = np.asarray(ohlc if ohlc is not None else [], dtype=np.float64).reshape(-1, 5)
+        times = rows[:, 0].astype(np.int64)
+        interval = int(np.median(np.diff(times)) // 1000) if len(times) > 1 else 86400
+        volume_values = np.zeros(len(times))
+        if volumes is not None and len(volumes) and len(times):
+            volume_times, raw_volumes = market_points(volumes)
+            volume_values = np.nan_to_num(align_nearest(volume_times, raw_volumes, times))
+        ring = cls(interval, capacity or max(1, len(times)))
+        ring.extend(times // 1000 - interval, np.vstack((rows[:, 1:].T, volume_values)))
+        return ring
+
+
+class CandleStore:
+    """
+    Candle rings of many coins at one interval, all of the same capacity.
+
+    A coin's ring is allocated on first use, so memory is exactly
+    ``len(store) * capacity * BYTES_PER_CANDLE`` (see ``footprint``).
+    """
+
+    def __init__(self, interval: int, capacity: int):
+        """
+        Args:
+            interval: Candle length in seconds
+            capacity: Candles kept per coin
+        """
+        self.interval = interval
+        self.capacity = capacity
+        self._rings: Dict[str, CandleRing] = {}
+
+    def __len__(self):
+        return len(self._rings)
+
+    def __contains__(self, coin_id: str) -> bool:
+        return coin_id in self._rings
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rings)
+
+    def ring(self, coin_id: str) -> CandleRing:
+        """The coin's ring, created empty on first use"""
+        ring = self._rings.get(coin_id)
+        if ring is None:
+            ring = self._rings[coin_id] = CandleRing(self.interval, self.capacity)
+        return ring
+
+    def get(self, coin_id: str) -> Optional[CandleRing]:
+        return self._rings.get(coin_id)
+
+    def coins(self) -> List[str]:
+        return list(self._rings)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ring.nbytes for ring in self._rings.values())
+
+    @staticmethod
+    def footprint(coins: int, capacity: int) -> int:
+        """Bytes needed for ``coins`` rings of ``capacity`` candles"""
+        return coins * capacity * BYTES_PER_CANDLE
+
+
+# Example usage: a year of hourly candles
+if __name__ == "__main__":
+    import sys
+    import time
+
+    HOURS = 365 * 24
+    rng = np.random.default_rng(0)
+    now_ms = int(time.time() * 1000)
+    ts = now_ms - (HOURS - np.arange(HOURS)) * 3600_000
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, HOURS)))
+    volume = rng.uniform(1e6, 2e6, HOURS)
+    prices = [[int(t), float(p)] for t, p in zip(ts, price)]
+    volumes = [[int(t), float(v)] for t, v in zip(ts, volume)]
+
+    def list_bytes(pairs):
+        return sys.getsizeof(pairs) + sum(
+            sys.getsizeof(pair) + sys.getsizeof(pair[0]) + sys.getsizeof(pair[1]) for pair in pairs
+        )
+
+    start = time.perf_counter()
+    ring = CandleRing.from_market_chart(prices, volumes, interval=3600, capacity=HOURS)
+    built = (time.perf_counter() - start) * 1000
+    lists = list_bytes(prices) + list_bytes(volumes)
+    print(f"{len(ring)} hourly candles built in {built:.1f} ms")
+    print(f"Per coin: {ring.nbytes / 1024:,.0f} KiB as candles vs {lists / 1024:,.0f} KiB as [ts, value] lists")
+    print(
+        f"1000 coins: {CandleStore.footprint(1000, HOURS) / 2**20:,.0f} MiB as candles "
+        f"vs {lists * 1000 / 2**20:,.0f} MiB as lists"
+    )
+
+    ring.add_tick(time.time() + 3600, float(price[-1]) * 1.01, 5e5)
+    close = ring.close
+    print(f"Views share the buffer: {np.shares_memory(close, ring._values)}, newest {ring.latest()}")
+    print(ring.to_dataframe().tail(3))
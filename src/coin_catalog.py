@@ -0,0 +1,385 @@
+# src/coin_catalog.py - Persisted coin catalog with in-memory lookup and search indexes
+
+import bisect
+import heapq
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+COINS_LIST_URL = "https://api.coingecko.com/api/v3/coins/list"
+
+# Seconds before a failed refresh is attempted again (searches stay offline)
+CATALOG_RETRY_INTERVAL = 300
+
+# Rank changes are written to the ranks file at most this often
+RANKS_SAVE_INTERVAL = 300
+
+# Rank used for coins without a known market-cap rank
+UNRANKED = 10**9
+
+# Short prefixes match thousands of keys; their best-ranked rows are precomputed
+SHORT_PREFIX = 3
+SHORT_PREFIX_ROWS = 100
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CoinCatalog:
+    """
+    Local copy of the CoinGecko coin list (id, symbol, name) with indexes.
+
+    The list is stored in ``catalog_file`` and re-validated with its ETag once
+    it is older than ``max_age``, so an unchanged list costs a 304 and no
+    download. Market-cap ranks change with every listing and live in the
+    small ``ranks_file`` instead. In memory it keeps:
+
+    - hash maps from id and lowercase symbol to coins (symbol collisions
+      are ordered by market-cap rank),
+    - sorted symbol and name keys for prefix (typeahead) lookups,
+    - a trigram index over names and ids for substring search.
+
+    Lookups and searches run offline. refresh() may run on a background
+    thread; the catalog is swapped in under a lock.
+    """
+
+    def __init__(
+        self,
+        catalog_file: str = "data/coin_catalog.json",
+        max_age: float = 24 * 3600,
+        ranks_file: Optional[str] = None,
+    ):
+        """
+        Args:
+            catalog_file: JSON file holding the catalog and its ETag
+            max_age: Seconds before the list is re-validated with the server
+            ranks_file: JSON file holding market-cap ranks (default: next to
+                catalog_file)
+        """
+        self.catalog_file = catalog_file
+        self.ranks_file = ranks_file or os.path.splitext(catalog_file)[0] + "_ranks.json"
+        self.max_age = max_age
+        self.coins: List[Dict] = []
+        self.ranks: Dict[str, int] = {}
+        self.etag = None
+        self.fetched_at = 0.0
+        self._retry_at = 0.0
+        self._ranks_dirty = False
+        self._ranks_saved_at = 0.0
+        self._indexed = False
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(catalog_file) or ".", exist_ok=True)
+        self.load()
+
+    def __len__(self):
+        return len(self.coins)
+
+    # ==================== PERSISTENCE ====================
+    def load(self):
+        """Load the stored catalog"""
+        try:
+            if not os.path.exists(self.catalog_file):
+                return
+            with open(self.catalog_file, "r") as f:
+                data = json.load(f)
+            self.coins = [
+                {"id": coin_id, "symbol": symbol, "name": name}
+                for coin_id, symbol, name in data.get("coins", [])
+            ]
+            # Older catalogs stored the ranks inline
+            self.ranks = data.get("ranks", {})
+            self.etag = data.get("etag")
+            self.fetched_at = data.get("fetched_at", 0.0)
+            self._indexed = False
+        except Exception as e:
+            print(f"Error loading coin catalog: {e}")
+        try:
+            if os.path.exists(self.ranks_file):
+                with open(self.ranks_file, "r") as f:
+                    self.ranks.update(json.load(f))
+        except Exception as e:
+            print(f"Error loading coin ranks: {e}")
+
+    def save(self):
+        """Save the catalog atomically"""
+        try:
+            data = {
+                "etag": self.etag,
+                "fetched_at": self.fetched_at,
+                "coins": [[c["id"], c["symbol"], c["name"]] for c in self.coins],
+            }
+            tmp_file = self.catalog_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_file, self.catalog_file)
+        except Exception as e:
+            print(f"Error saving coin catalog: {e}")
+        self._ranks_dirty = True
+        self.save_ranks()
+
+    def save_ranks(self):
+        """Write the ranks file if ranks changed since the last write"""
+        if not self._ranks_dirty:
+            return
+        tmp_file = None
+        try:
+            fd, tmp_file = tempfile.mkstemp(
+                dir=os.path.dirname(self.ranks_file) or ".", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.ranks, f, separators=(",", ":"))
+            os.replace(tmp_file, self.ranks_file)
+            self._ranks_dirty = False
+            self._ranks_saved_at = time.time()
+        except Exception as e:
+            print(f"Error saving coin ranks: {e}")
+            if tmp_file and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Download the coin list if the stored copy is missing or stale.
+
+        Returns:
+            True if the catalog changed
+        """
+        if not force and self.coins and time.time() - self.fetched_at < self.max_age:
+            return False
+        # Back off after a failure instead of retrying on every search
+        if not force and time.time() < self._retry_at:
+            return False
+        headers = {"If-None-Match": self.etag} if self.etag and self.coins else {}
+        try:
+            response = requests.get(COINS_LIST_URL, headers=headers, timeout=30)
+            if response.status_code == 304:
+                with self._lock:
+                    self.fetched_at = time.time()
+                    self.save()
+                return False
+            if response.status_code != 200:
+                print(f"Coin catalog refresh failed: HTTP {response.status_code}")
+                self._retry_at = time.time() + CATALOG_RETRY_INTERVAL
+                return False
+            coins = [
+                {"id": c["id"], "symbol": (c.get("symbol") or "").lower(), "name": c.get("name") or c["id"]}
+                for c in response.json()
+            ]
+            with self._lock:
+                self.fetched_at = time.time()
+                self.coins = coins
+                self.etag = response.headers.get("ETag")
+                self._indexed = False
+                self.save()
+            return True
+        except Exception as e:
+            print(f"Error refreshing coin catalog: {e}")
+            self._retry_at = time.time() + CATALOG_RETRY_INTERVAL
+            return False
+
+    def update_ranks(self, coins: List[Dict]):
+        """
+        Record market-cap ranks from a markets listing (used to rank collisions).
+
+        Built indexes are re-ordered only for the coins whose rank changed, and
+        the ranks file is written at most every RANKS_SAVE_INTERVAL seconds.
+        """
+        with self._lock:
+            changed = []
+            for coin in coins or []:
+                rank = coin.get("market_cap_rank")
+                if rank and self.ranks.get(coin.get("id")) != rank:
+                    self.ranks[coin["id"]] = rank
+                    changed.append(coin["id"])
+            if not changed:
+                return
+            if self._indexed:
+                self._apply_rank_changes(changed)
+            self._ranks_dirty = True
+            if time.time() - self._ranks_saved_at >= RANKS_SAVE_INTERVAL:
+                self.save_ranks()
+
+    # ==================== INDEXES ====================
+    def _rank(self, coin: Dict) -> int:
+        return self.ranks.get(coin["id"], UNRANKED)
+
+    def _order_key(self, i: int):
+        return self._rank(self.coins[i]), len(self.coins[i]["id"])
+
+    @staticmethod
+    def _prefix_keys(symbol: str, name: str):
+        return {symbol[:n] for n in range(1, SHORT_PREFIX + 1)} | {name[:n] for n in range(1, SHORT_PREFIX + 1)}
+
+    def _build_indexes(self):
+        order = sorted(range(len(self.coins)), key=self._order_key)
+        self._by_id = {}
+        self._by_symbol = {}
+        self._trigram_index = {}
+        self._short_prefix = {}
+        symbol_keys, name_keys = [], []
+        self._names = [""] * len(self.coins)
+
+        for i in order:
+            coin = self.coins[i]
+            name = coin["name"].lower()
+            self._names[i] = name
+            self._by_id[coin["id"]] = i
+            # Rank order is kept because rows are visited best-ranked first
+            self._by_symbol.setdefault(coin["symbol"], []).append(i)
+            symbol_keys.append((coin["symbol"], i))
+            name_keys.append((name, i))
+            for gram in _trigrams(name) | _trigrams(coin["id"]):
+                self._trigram_index.setdefault(gram, []).append(i)
+            for key in self._prefix_keys(coin["symbol"], name):
+                rows = self._short_prefix.setdefault(key, [])
+                if len(rows) < SHORT_PREFIX_ROWS:
+                    rows.append(i)
+
+        symbol_keys.sort()
+        name_keys.sort()
+        self._symbol_keys = [k for k, _ in symbol_keys]
+        self._symbol_rows = [i for _, i in symbol_keys]
+        self._name_keys = [k for k, _ in name_keys]
+        self._name_rows = [i for _, i in name_keys]
+        self._position = {i: p for p, i in enumerate(order)}
+        self._indexed = True
+
+    def _apply_rank_changes(self, coin_ids: List[str]):
+        """Re-order the rank-ordered indexes for coins whose rank changed"""
+        rows = [self._by_id[c] for c in coin_ids if c in self._by_id]
+        if not rows:
+            return
+        order = sorted(range(len(self.coins)), key=self._order_key)
+        self._position = {i: p for p, i in enumerate(order)}
+        position = self._position.__getitem__
+        for i in rows:
+            self._by_symbol[self.coins[i]["symbol"]].sort(key=position)
+            for key in self._prefix_keys(self.coins[i]["symbol"], self._names[i]):
+                prefix_rows = self._short_prefix.setdefault(key, [])
+                if i not in prefix_rows:
+                    prefix_rows.append(i)
+                prefix_rows.sort(key=position)
+                del prefix_rows[SHORT_PREFIX_ROWS:]
+
+    def _ensure_indexes(self):
+        if not self._indexed:
+            self._build_indexes()
+
+    def _prefix_rows(self, prefix: str, limit: int) -> List[int]:
+        """Best-ranked coins whose symbol or name starts with prefix"""
+        if len(prefix) <= SHORT_PREFIX:
+            return self._short_prefix.get(prefix, [])[:limit]
+        matches = []
+        for keys, rows in ((self._symbol_keys, self._symbol_rows), (self._name_keys, self._name_rows)):
+            start = bisect.bisect_left(keys, prefix)
+            end = bisect.bisect_left(keys, prefix + "\uffff", start)
+            matches.extend(rows[start:end])
+        return heapq.nsmallest(limit, set(matches), key=self._position.__getitem__)
+
+    # ==================== LOOKUPS ====================
+    def get(self, coin_id: str) -> Optional[Dict]:
+        """Coin by CoinGecko ID"""
+        with self._lock:
+            self._ensure_indexes()
+            i = self._by_id.get(coin_id)
+            return self._result(i) if i is not None else None
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        """
+        CoinGecko ID for a ticker symbol.
+
+        When several coins share a ticker, the one with the best market-cap
+        rank wins. IDs are accepted as well.
+        """
+        with self._lock:
+            self._ensure_indexes()
+            key = symbol.strip().lower()
+            rows = self._by_symbol.get(key)
+            if rows:
+                return self.coins[rows[0]]["id"]
+            if key in self._by_id:
+                return key
+            return None
+
+    def candidates(self, symbol: str) -> List[Dict]:
+        """All coins using a ticker, best-ranked first"""
+        with self._lock:
+            self._ensure_indexes()
+            return [self._result(i) for i in self._by_symbol.get(symbol.strip().lower(), [])]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Typeahead search by symbol, name or ID.
+
+        Exact symbol matches come first, then symbol and name prefixes, then
+        names/IDs containing the query; each group is ordered by rank.
+
+        Returns:
+            List of dicts with 'id', 'symbol', 'name' and 'market_cap_rank'
+        """
+        with self._lock:
+            self._ensure_indexes()
+            query = query.strip().lower()
+            if not query:
+                return []
+
+            seen = set()
+            groups = []
+
+            def add(rows, tier):
+                for i in rows:
+                    if i not in seen:
+                        seen.add(i)
+                        groups.append((tier, self._position[i], i))
+
+            add(self._by_symbol.get(query, []), 0)
+            if query in self._by_id:
+                add([self._by_id[query]], 0)
+            add(self._prefix_rows(query, limit), 1)
+
+            if len(groups) < limit and len(query) >= 3:
+                # Postings are in rank order, so the rarest trigram's list can be
+                # scanned and cut off once enough coins contain the query
+                rarest = min((self._trigram_index.get(gram, []) for gram in _trigrams(query)), key=len)
+                matches = []
+                for i in rarest:
+                    if i not in seen and (query in self._names[i] or query in self.coins[i]["id"]):
+                        matches.append(i)
+                        if len(groups) + len(matches) >= limit:
+                            break
+                add(matches, 2)
+
+            groups.sort()
+            return [self._result(i) for _, _, i in groups[:limit]]
+
+    def _result(self, i: int) -> Dict:
+        coin = self.coins[i]
+        return {
+            "id": coin["id"],
+            "symbol": coin["symbol"].upper(),
+            "name": coin["name"],
+            "market_cap_rank": self.ranks.get(coin["id"]),
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    catalog = CoinCatalog()
+    catalog.refresh()
+    print(f"Catalog: {len(catalog)} coins (ETag {catalog.etag})")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        catalog.resolve("eth")
+    print(f"resolve('eth') -> {catalog.resolve('eth')} in {(time.perf_counter() - start) * 100:.1f} µs")
+
+    for query in ("bit", "doge", "swap"):
+        start = time.perf_counter()
+        results = catalog.search(query, limit=5)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"search('{query}') in {elapsed:.0f} µs: {[r['symbol'] for r in results]}")
@@ -0,0 +1,175 @@
+# src/coin_filter.py - Indexed, debounced text filtering for coin tables and lists
+
+from typing import Sequence
+
+from PyQt5.QtCore import QSortFilterProxyModel, Qt, QTimer
+
+# Delay between the last keystroke and applying the filter
+SEARCH_DEBOUNCE_MS = 150
+
+# Item role for searchable text when the displayed text should not be matched
+SEARCH_ROLE = Qt.UserRole + 1
+
+
+def debounced(signal, slot, delay_ms: int = SEARCH_DEBOUNCE_MS, parent=None) -> QTimer:
+    """
+    Call ``slot`` once ``signal`` has been quiet for ``delay_ms``.
+
+    Returns:
+        The single-shot timer (keep a reference or pass a parent)
+    """
+    timer = QTimer(parent)
+    timer.setSingleShot(True)
+    timer.setInterval(delay_ms)
+    signal.connect(lambda *args: timer.start())
+    timer.timeout.connect(slot)
+    return timer
+
+
+class CoinFilterProxyModel(QSortFilterProxyModel):
+    """
+    Sort/filter proxy matching a query against a lowercase search index.
+
+    The index holds one lowercase string per source row, joined from the
+    ``key_role`` data of ``key_columns`` (e.g. name and symbol). It is built once after the
+    source data changes, not on every keystroke; a query is then a
+    substring test per index entry and ``filterAcceptsRow`` is a list
+    lookup. A query that extends the previous one only re-tests the rows
+    that already matched.
+
+    Bulk loads should be wrapped in ``begin_update``/``end_update``: they
+    run as one model reset of the source with its change signals blocked,
+    because otherwise the proxy re-filters every row on each changed cell,
+    which makes filling a table quadratic. The source stays attached, so
+    views keep their header sections and per-column resize modes.
+    """
+
+    def __init__(self, key_columns: Sequence[int] = (0,), key_role: int = Qt.DisplayRole, parent=None):
+        """
+        Args:
+            key_columns: Source columns that are searchable
+            key_role: Item role holding the searchable text (e.g. SEARCH_ROLE)
+            parent: Optional QObject parent
+        """
+        super().__init__(parent)
+        self.key_columns = tuple(key_columns)
+        self.key_role = key_role
+        self._query = ""
+        self._keys = []
+        self._matches = []
+        self._stale = True
+        self._updating = None
+
+    def setSourceModel(self, model):
+        old = self.sourceModel()
+        if old is not None:
+            for signal in (old.modelReset, old.rowsInserted, old.rowsRemoved, old.dataChanged):
+                signal.disconnect(self._mark_stale)
+        super().setSourceModel(model)
+        if model is not None:
+            for signal in (model.modelReset, model.rowsInserted, model.rowsRemoved, model.dataChanged):
+                signal.connect(self._mark_stale)
+        self._stale = True
+
+    def _mark_stale(self, *args):
+        self._stale = True
+
+    # ==================== INDEX ====================
+    def _row_key(self, row: int) -> str:
+        model = self.sourceModel()
+        return "\x1f".join(
+            str(model.index(row, column).data(self.key_role) or "") for column in self.key_columns
+        ).lower()
+
+    def rebuild_index(self):
+        """Re-read the search keys from the source and re-apply the filter"""
+        model = self.sourceModel()
+        rows = model.rowCount() if model is not None else 0
+        self._keys = [self._row_key(row) for row in range(rows)]
+        self._stale = False
+        self._matches = [self._query in key for key in self._keys] if self._query else []
+        self.invalidateFilter()
+
+    def begin_update(self):
+        """Start a reset of the source and silence its per-cell signals while it is refilled"""
+        model = self.sourceModel()
+        if self._updating is None and model is not None:
+            self._updating = model
+            model.beginResetModel()
+            model.blockSignals(True)
+
+    def end_update(self):
+        """Finish the reset, index the refilled source, then filter and sort once"""
+        if self._updating is not None:
+            model, self._updating = self._updating, None
+            model.blockSignals(False)
+            model.endResetModel()
+        self.rebuild_index()
+
+    # ==================== FILTERING ====================
+    def set_query(self, text: str):
+        """Show only rows whose key columns contain ``text`` (case-insensitive)"""
+        query = text.strip().lower()
+        if query == self._query and not self._stale:
+            return
+        previous, self._query = self._query, query
+
+        if self._stale:
+            self.rebuild_index()
+            return
+        if not query:
+            self._matches = []
+        elif previous and previous in query:
+            # Narrowing: only rows matching the shorter query can match
+            self._matches = [
+                matched and query in key for matched, key in zip(self._matches, self._keys)
+            ]
+        else:
+            self._matches = [query in key for key in self._keys]
+        self.invalidateFilter()
+
+    def query(self) -> str:
+        return self._query
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._query:
+            return True
+        if self._stale or source_row >= len(self._matches):
+            # Source changed since the last index build; test this row directly
+            return self._query in self._row_key(source_row)
+        return self._matches[source_row]
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from PyQt5.QtGui import QStandardItem, QStandardItemModel
+    from PyQt5.QtWidgets import QApplication, QTableView
+
+    app = QApplication(sys.argv)
+    model = QStandardItemModel()
+    model.setHorizontalHeaderLabels(["Rank", "Coin", "Symbol"])
+    proxy = CoinFilterProxyModel(key_columns=(1, 2))
+    proxy.setSourceModel(model)
+    view = QTableView()
+    view.setModel(proxy)
+    view.setSortingEnabled(True)
+
+    n = 5000
+    start = time.perf_counter()
+    proxy.begin_update()
+    model.setRowCount(n)
+    for row in range(n):
+        model.setItem(row, 0, QStandardItem(str(row + 1)))
+        model.setItem(row, 1, QStandardItem(f"Coin {row}"))
+        model.setItem(row, 2, QStandardItem(f"C{row}"))
+    proxy.end_update()
+    print(f"Loaded {n} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for text in ("c", "co", "coin 12", "coin 123", ""):
+        start = time.perf_counter()
+        proxy.set_query(text)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"query {text!r:>11}: {proxy.rowCount()} rows in {elapsed:.1f} ms")
@@ -0,0 +1,329 @@
+# src/coin_sentiment.py - Per-coin sentiment from locally cached price history
+
+import math
+import os
+import threading
+import time
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from indicators import rsi
+
+# Hourly candles kept per coin in data/coin_history/<coin_id>.npz
+COIN_HISTORY_DTYPE = np.dtype([("timestamp", "<i8"), ("close", "<f8"), ("volume", "<f8")])
+
+# Bumped when the meaning of stored columns changes; older files are
+# downloaded again (2: volume is the rolling 24h volume, no longer a sum)
+COIN_HISTORY_VERSION = 2
+
+# CoinGecko returns hourly points from 2 up to 90 days (5-minute points for
+# a single day)
+MIN_HOURLY_DAYS = 2
+MAX_HOURLY_DAYS = 90
+
+NEUTRAL_SENTIMENT = {"positive": 33.0, "negative": 33.0, "neutral": 34.0}
+
+HOUR_NS = 3600 * 10**9
+
+
+class CoinHistoryCache:
+    """
+    Hourly close/volume history per coin, kept in memory and on disk.
+
+    A coin is downloaded in full once; when its data is older than
+    ``max_age`` only the days since the last stored candle are fetched and
+    merged, so repeated sentiment checks cost no network calls.
+    """
+
+    def __init__(self, api_handler, cache_dir: str = "data/coin_history", max_age: float = 3600):
+        """
+        Args:
+            api_handler: Handler providing get_coin_history(coin_id, days)
+            cache_dir: Directory for the per-coin history files
+            max_age: Seconds before a coin's history is topped up
+        """
+        self.api = api_handler
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self._memory = {}
+        # Shared by the GUI thread, background loaders and the daemon's workers
+        self._lock = threading.RLock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, coin_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{coin_id}.npz")
+
+    def _load(self, coin_id: str):
+        """(history, fetched_at, days_covered) from memory or disk"""
+        if coin_id in self._memory:
+            return self._memory[coin_id]
+        entry = None
+        try:
+            path = self._path(coin_id)
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    if "version" not in data or int(data["version"]) != COIN_HISTORY_VERSION:
+                        return None
+                    entry = (data["history"], float(data["fetched_at"]), int(data["days"]))
+                self._memory[coin_id] = entry
+        except Exception as e:
+            print(f"Error loading cached history for {coin_id}: {e}")
+        return entry
+
+    def _save(self, coin_id: str, history: np.ndarray, fetched_at: float, days: int):
+        self._memory[coin_id] = (history, fetched_at, days)
+        try:
+            tmp_file = self._path(coin_id) + ".tmp"
+            with open(tmp_file, "wb") as f:
+                np.savez(f, history=history, fetched_at=fetched_at, days=days, version=COIN_HISTORY_VERSION)
+            os.replace(tmp_file, self._path(coin_id))
+        except Exception as e:
+            print(f"Error saving cached history for {coin_id}: {e}")
+
+    def get(self, coin_id: str, days: int = 30) -> Optional[np.ndarray]:
+        """
+        Hourly history of the last ``days`` days (oldest first).
+
+        Returns:
+            Structured array with timestamp (hour start, ns), close and volume,
+            or None if no data is available
+        """
+        with self._lock:
+            days = min(days, MAX_HOURLY_DAYS)
+            entry = self._load(coin_id)
+            now = time.time()
+
+            if entry is None or entry[2] < days:
+                fetch_days = days
+            elif now - entry[1] >= self.max_age:
+                # Only the gap since the last stored candle
+                last = entry[0]["timestamp"][-1] / 1e9 if len(entry[0]) else now - days * 86400
+                fetch_days = min(days, max(1, math.ceil((now - last) / 86400)))
+            else:
+                fetch_days = 0
+
+            if fetch_days:
+                fresh = self._fetch(coin_id, max(fetch_days, MIN_HOURLY_DAYS))
+                if fresh is not None:
+                    history = fresh if entry is None else self._merge(entry[0], fresh)
+                    covered = max(days, entry[2] if entry else 0)
+                    self._save(coin_id, history, now, covered)
+                    entry = self._memory[coin_id]
+
+            if entry is None or len(entry[0]) == 0:
+                return None
+            cutoff = int((now - days * 86400) * 1e9)
+            history = entry[0]
+            return history[np.searchsorted(history["timestamp"], cutoff):]
+
+    def _fetch(self, coin_id: str, days: int) -> Optional[np.ndarray]:
+        df = self.api.get_coin_history(coin_id, days=days)
+        if df is None or len(df) == 0:
+            return None
+        history = np.zeros(len(df), dtype=COIN_HISTORY_DTYPE)
+        ts = df["timestamp"].values.astype("datetime64[ns]").view(np.int64)
+        history["timestamp"] = ts - ts % HOUR_NS
+        history["close"] = df["close"].values
+        history["volume"] = df["volume"].values if "volume" in df.columns else np.nan
+        return history
+
+    @staticmethod
+    def _merge(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+        """Union of two histories; the newer fetch wins for the same hour"""
+        merged = np.concatenate([old, new])
+        order = np.argsort(merged["timestamp"], kind="stable")
+        merged = merged[order]
+        keep = np.ones(len(merged), dtype=bool)
+        keep[:-1] = merged["timestamp"][1:] != merged["timestamp"][:-1]
+        merged = merged[keep]
+        # Keep a bounded window on disk
+        cutoff = merged["timestamp"][-1] - MAX_HOURLY_DAYS * 86400 * 10**9
+        return merged[merged["timestamp"] >= cutoff]
+
+
+def compute_coin_signals(close, volume) -> Dict[str, np.ndarray]:
+    """
+    Sentiment signals for a (coins x hours) panel, computed for all coins at once.
+
+    Rows are right-aligned on the latest candle; coins with shorter history
+    are padded with NaN on the left.
+
+    Args:
+        close: Hourly closes, shape (coins, hours)
+        volume: Hourly volumes, same shape
+
+    Returns:
+        Dictionary of per-coin arrays: momentum_24h, momentum_7d (percent),
+        trend_7d (percent above the 7-day mean), rsi, volatility (annualized
+        percent), volatility_ratio (24h vs full window), volume_surge
+        (last 24h vs earlier average) and score in [-1, 1]
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    n_coins, length = close.shape
+    rows = np.arange(n_coins)
+    first = np.argmax(~np.isnan(close), axis=1)
+    last = close[:, -1]
+
+    def change_over(hours):
+        ref = close[rows, np.maximum(length - 1 - hours, first)]
+        return (last / ref - 1) * 100
+
+    with warnings.catch_warnings():
+        # Coins with too little history yield all-NaN slices
+        warnings.simplefilter("ignore", RuntimeWarning)
+        momentum_24h = change_over(24)
+        momentum_7d = change_over(168)
+        trend_7d = (last / np.nanmean(close[:, -168:], axis=1) - 1) * 100
+
+        returns = np.diff(np.log(close), axis=1)
+        vol_long = np.nanstd(returns, axis=1)
+        vol_short = np.nanstd(returns[:, -24:], axis=1)
+        volatility_ratio = np.where(vol_long > 0, vol_short / vol_long, 1.0)
+
+        volume_surge = np.nanmean(volume[:, -24:], axis=1) / np.nanmean(volume[:, :-24], axis=1)
+
+    rsi_last = rsi(close, 14)[:, -1]
+
+    momentum_24h = np.nan_to_num(momentum_24h)
+    momentum_7d = np.nan_to_num(momentum_7d)
+    rsi_last = np.nan_to_num(rsi_last, nan=50.0)
+    volatility_ratio = np.nan_to_num(volatility_ratio, nan=1.0)
+    volume_surge = np.nan_to_num(volume_surge, nan=1.0, posinf=1.0)
+
+    score = (
+        0.4 * np.tanh(momentum_7d / 10)
+        + 0.3 * np.tanh(momentum_24h / 5)
+        + 0.3 * (rsi_last - 50) / 50
+    )
+    return {
+        "momentum_24h": momentum_24h,
+        "momentum_7d": momentum_7d,
+        "trend_7d": np.nan_to_num(trend_7d),
+        "rsi": rsi_last,
+        "volatility": np.nan_to_num(vol_long) * math.sqrt(24 * 365) * 100,
+        "volatility_ratio": volatility_ratio,
+        "volume_surge": volume_surge,
+        "score": np.clip(score, -1.0, 1.0),
+    }
+
+
+def signals_to_sentiment(signals: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Positive/negative/neutral percentages from signal scores"""
+    score = signals["score"]
+    # Volume surges add conviction, quiet volume takes it away
+    conviction = np.clip(np.abs(score) * np.sqrt(np.clip(signals["volume_surge"], 0.5, 2.0)), 0, 1)
+    neutral = 20 + 40 * (1 - conviction)
+    directional = 100 - neutral
+    positive = directional * (1 + score) / 2
+    return {"positive": positive, "negative": directional - positive, "neutral": neutral}
+
+
+def volatility_regime(ratio: float) -> str:
+    """Label for the short/long volatility ratio"""
+    if ratio > 1.5:
+        return "high"
+    if ratio < 0.67:
+        return "low"
+    return "normal"
+
+
+class CoinSentimentAnalyzer:
+    """Batch per-coin sentiment over cached hourly histories"""
+
+    def __init__(self, api_handler, history_cache: Optional[CoinHistoryCache] = None):
+        self.history = history_cache if history_cache is not None else CoinHistoryCache(api_handler)
+
+    def analyze(self, coin_ids: List[str], days: int = 30) -> Dict[str, Dict]:
+        """
+        Sentiment for many coins in one pass.
+
+        Args:
+            coin_ids: CoinGecko coin IDs
+            days: History window used for the signals
+
+        Returns:
+            Mapping of coin ID to positive/negative/neutral percentages plus
+            the underlying signals; coins without data get neutral sentiment
+        """
+        results = {coin_id: dict(NEUTRAL_SENTIMENT) for coin_id in coin_ids}
+        histories = {}
+        for coin_id in coin_ids:
+            try:
+                history = self.history.get(coin_id, days)
+            except Exception as e:
+                print(f"Error getting history for {coin_id}: {e}")
+                history = None
+            if history is not None and len(history) >= 2:
+                histories[coin_id] = history
+        if not histories:
+            return results
+
+        # Right-aligned (coins x hours) panel
+        length = max(len(h) for h in histories.values())
+        close = np.full((len(histories), length), np.nan)
+        volume = np.full((len(histories), length), np.nan)
+        for i, history in enumerate(histories.values()):
+            close[i, length - len(history):] = history["close"]
+            volume[i, length - len(history):] = history["volume"]
+
+        signals = compute_coin_signals(close, volume)
+        sentiment = signals_to_sentiment(signals)
+        for i, coin_id in enumerate(histories):
+            result = {name: round(float(values[i]), 1) for name, values in sentiment.items()}
+            result.update({name: float(values[i]) for name, values in signals.items()})
+            result["volatility_regime"] = volatility_regime(result["volatility_ratio"])
+            results[coin_id] = result
+        return results
+
+
+# Example usage
+if __name__ == "__main__":
+    import pandas as pd
+
+    class SyntheticAPI:
+        """Offline stand-in returning random-walk hourly candles"""
+
+        def __init__(self):
+            self.calls = 0
+
+        def get_coin_history(self, coin_id, days=30):
+            self.calls += 1
+            rng = np.random.default_rng(sum(map(ord, coin_id)))
+            n = days * 24
+            close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, n)))
+            end = pd.Timestamp.now().floor("h")
+            # Like CoinGecko: rolling 24h volume, whatever the point spacing
+            return pd.DataFrame({
+                "timestamp": pd.date_range(end=end, periods=n, freq="h"),
+                "close": close,
+                "volume": rng.uniform(1e6, 2e6, n),
+            })
+
+    api = SyntheticAPI()
+    analyzer = CoinSentimentAnalyzer(api, CoinHistoryCache(api, cache_dir="data/coin_history_example"))
+    coins = [f"coin-{i}" for i in range(200)]
+
+    start = time.perf_counter()
+    analyzer.analyze(coins)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    results = analyzer.analyze(coins)
+    warm = time.perf_counter() - start
+    print(f"200 coins: first pass {cold:.2f}s ({api.calls} downloads), cached pass {warm * 1000:.0f} ms")
+    sample = results["coin-0"]
+    print(f"coin-0: +{sample['positive']}% / -{sample['negative']}% / ={sample['neutral']}%, "
+          f"7d {sample['momentum_7d']:+.1f}%, RSI {sample['rsi']:.0f}, volatility {sample['volatility_regime']}")
+
+    # A top-up must keep the volume scale of a full download
+    cache = analyzer.history
+    cache.max_age = 0
+    cache.get("coin-0", days=30)
+    topped_up = np.median(cache.get("coin-0", days=1)["volume"])
+    full = np.median(api.get_coin_history("coin-0", days=30)["volume"].values[-24:])
+    print(f"Volume scale after top-up: {topped_up / full:.2f}x a full download")
+
+    import shutil
+    shutil.rmtree("data/coin_history_example", ignore_errors=True)
@@ -0,0 +1,190 @@
+# src/cooldown_store.py - Bounded, expiring cooldown/deduplication store
+
+import heapq
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# Cooldown (seconds) per key class
+DEFAULT_COOLDOWN_POLICIES = {
+    "price_alert": 300,
+    "level_alert": 900,
+}
+
+
+class CooldownStore:
+    """
+    Tracks which alert keys are cooling down.
+
+    Keys are grouped into classes with their own cooldown period. Every
+    armed key goes into one expiry queue shared by all classes, a heap
+    ordered by deadline (ties in insertion order), so expiry stays in order
+    whatever the periods are and however often ``set_policy`` changes them.
+    Expired keys are popped from its front; re-armed or reset keys leave a
+    stale entry behind that is skipped when reached and compacted away once
+    stale entries outnumber live ones. Checks and inserts are O(log n),
+    expired keys never accumulate, and ``max_keys`` bounds memory by
+    evicting the keys closest to expiry. Deadlines use the monotonic clock;
+    remaining times are persisted as wall-clock expiries so cooldowns
+    survive restarts.
+    """
+
+    def __init__(
+        self,
+        default_period: float = 300,
+        policies: Optional[Dict[str, float]] = None,
+        max_keys: int = 100000,
+        persist_file: str = "data/cooldowns.json",
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            default_period: Cooldown for classes without a policy (seconds)
+            policies: Cooldown per key class (seconds)
+            max_keys: Maximum number of keys tracked at once
+            persist_file: JSON file used by save/load
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.default_period = default_period
+        self.policies = dict(DEFAULT_COOLDOWN_POLICIES if policies is None else policies)
+        self.max_keys = max_keys
+        self.persist_file = persist_file
+        self.clock = clock
+        # key -> (deadline, key class) of the keys cooling down
+        self._active = {}
+        # (deadline, insertion number, key); entries no longer in _active are stale
+        self._expiry = []
+        self._inserted = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._active)
+
+    def period(self, key_class: str) -> float:
+        """Cooldown period for a key class"""
+        return self.policies.get(key_class, self.default_period)
+
+    def set_policy(self, key_class: str, seconds: float):
+        """Set the cooldown period of one key class (running cooldowns keep their deadline)"""
+        self.policies[key_class] = seconds
+
+    # ==================== CHECKS ====================
+    def _live(self, entry) -> bool:
+        active = self._active.get(entry[2])
+        return active is not None and active[0] == entry[0]
+
+    def _expire(self, now: float):
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            entry = heapq.heappop(expiry)
+            if self._live(entry):
+                del self._active[entry[2]]
+
+    def _evict(self):
+        """Drop the key closest to expiry when the store is full"""
+        while self._expiry:
+            entry = heapq.heappop(self._expiry)
+            if self._live(entry):
+                del self._active[entry[2]]
+                return
+
+    def _arm(self, key: str, key_class: str, deadline: float):
+        self._active[key] = (deadline, key_class)
+        self._inserted += 1
+        heapq.heappush(self._expiry, (deadline, self._inserted, key))
+        if len(self._expiry) > 2 * len(self._active) + 64:
+            # Mostly stale entries from re-armed or reset keys
+            self._expiry = [entry for entry in self._expiry if self._live(entry)]
+            heapq.heapify(self._expiry)
+
+    def allow(self, key: str, key_class: str = "price_alert") -> bool:
+        """
+        Check a key and start its cooldown if it is not cooling down.
+
+        Returns:
+            True if the alert may be sent
+        """
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            if key in self._active:
+                return False
+
+            if len(self._active) >= self.max_keys:
+                self._evict()
+
+            self._arm(key, key_class, now + self.period(key_class))
+        return True
+
+    def remaining(self, key: str) -> float:
+        """Seconds left on a key's cooldown (0 if not cooling down)"""
+        with self._lock:
+            deadline = self._active.get(key, (0.0, None))[0]
+        return max(0.0, deadline - self.clock())
+
+    def reset(self, key: Optional[str] = None):
+        """Clear one key's cooldown, or all cooldowns"""
+        with self._lock:
+            if key is None:
+                self._active = {}
+                self._expiry = []
+                return
+            self._active.pop(key, None)
+
+    # ==================== PERSISTENCE ====================
+    def save(self):
+        """Save active cooldowns to file."""
+        try:
+            now, wall = self.clock(), time.time()
+            with self._lock:
+                active = [
+                    [key, key_class, wall + deadline - now]
+                    for key, (deadline, key_class) in self._active.items()
+                    if deadline > now
+                ]
+            os.makedirs(os.path.dirname(self.persist_file) or ".", exist_ok=True)
+            tmp_file = self.persist_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(active, f)
+            os.replace(tmp_file, self.persist_file)
+        except Exception as e:
+            print(f"Error saving cooldowns: {e}")
+
+    def load(self):
+        """Load cooldowns saved by a previous run."""
+        try:
+            if not os.path.exists(self.persist_file):
+                return
+            with open(self.persist_file, "r") as f:
+                active = json.load(f)
+            now, wall = self.clock(), time.time()
+            with self._lock:
+                for key, key_class, expires_at in sorted(active, key=lambda entry: entry[2]):
+                    if expires_at <= wall or key in self._active or len(self._active) >= self.max_keys:
+                        continue
+                    self._arm(key, key_class, now + expires_at - wall)
+        except Exception as e:
+            print(f"Error loading cooldowns: {e}")
+
+
+# Example usage
+if __name__ == "__main__":
+    store = CooldownStore(max_keys=20000, persist_file="data/cooldowns_example.json")
+
+    start = time.perf_counter()
+    allowed = sum(store.allow(f"coin{i % 10000}_above") for i in range(200000))
+    elapsed = time.perf_counter() - start
+    print(f"200k checks in {elapsed * 1000:.0f} ms, {allowed} allowed, {len(store)} keys tracked")
+
+    store.set_policy("level_alert", 60)
+    print(f"Level alert allowed: {store.allow('BTC_below_40000', 'level_alert')}")
+    print(f"Repeat allowed: {store.allow('BTC_below_40000', 'level_alert')}")
+    print(f"Remaining: {store.remaining('BTC_below_40000'):.0f}s")
+
+    store.save()
+    restored = CooldownStore(persist_file="data/cooldowns_example.json")
+    restored.load()
+    print(f"Restored {len(restored)} cooldowns")
+    os.remove("data/cooldowns_example.json")
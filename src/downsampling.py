@@ -0,0 +1,135 @@
+# src/downsampling.py - Level-of-detail decimation for long price series
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+def minmax_decimate(x, y, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the minimum and maximum of each of ``n_buckets`` equal-count buckets.
+
+    Spikes survive decimation, so a line drawn through the result looks the
+    same as the full series at about one bucket per pixel.
+
+    Returns:
+        (x, y) with at most 2 * n_buckets points, in time order
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets or n_buckets < 1:
+        return x, y
+
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(buckets).all(axis=1)
+    buckets = buckets[valid]
+    offsets = np.flatnonzero(valid) * size
+
+    lo = np.nanargmin(buckets, axis=1) + offsets
+    hi = np.nanargmax(buckets, axis=1) + offsets
+    idx = np.sort(np.stack([lo, hi], axis=1), axis=1).ravel()
+    return x[idx], y[idx]
+
+
+class ResolutionPyramid:
+    """
+    OHLC aggregates of one series at successively coarser resolutions.
+
+    Level 0 is the raw series; each further level merges ``factor``
+    neighbouring bars (first open, max high, min low, last close). Levels are
+    built once, so zooming out only picks a level and slices it.
+    """
+
+    def __init__(
+        self,
+        x,
+        close,
+        open_: Optional[np.ndarray] = None,
+        high: Optional[np.ndarray] = None,
+        low: Optional[np.ndarray] = None,
+        factor: int = 4,
+        min_points: int = 64,
+    ):
+        """
+        Args:
+            x: Increasing x values (e.g. matplotlib date numbers)
+            close: Closing prices
+            open_, high, low: Optional OHLC columns (default: close)
+            factor: Bars merged per level
+            min_points: Stop building levels below this many bars
+        """
+        close = np.asarray(close, dtype=np.float64)
+        level = {
+            "x": np.asarray(x, dtype=np.float64),
+            "open": close if open_ is None else np.asarray(open_, dtype=np.float64),
+            "high": close if high is None else np.asarray(high, dtype=np.float64),
+            "low": close if low is None else np.asarray(low, dtype=np.float64),
+            "close": close,
+        }
+        self.factor = factor
+        self.levels = [level]
+        while len(level["x"]) > min_points * factor:
+            level = self._aggregate(level, factor)
+            self.levels.append(level)
+
+    @staticmethod
+    def _aggregate(level: Dict[str, np.ndarray], factor: int) -> Dict[str, np.ndarray]:
+        n = len(level["x"])
+        starts = np.arange(0, n, factor)
+        ends = np.minimum(starts + factor, n) - 1
+        return {
+            "x": level["x"][starts],
+            "open": level["open"][starts],
+            "high": np.fmax.reduceat(level["high"], starts),
+            "low": np.fmin.reduceat(level["low"], starts),
+            "close": level["close"][ends],
+        }
+
+    def __len__(self):
+        return len(self.levels[0]["x"])
+
+    @property
+    def x_range(self) -> Tuple[float, float]:
+        x = self.levels[0]["x"]
+        return float(x[0]), float(x[-1])
+
+    def select(self, x0: float, x1: float, max_points: int) -> Tuple[int, Dict[str, np.ndarray]]:
+        """
+        Finest level showing the visible range with at most ``max_points`` bars.
+
+        Returns:
+            (level index, dict of column slices) including one bar beyond
+            each edge so lines run off the axes instead of stopping short
+        """
+        for index, level in enumerate(self.levels):
+            x = level["x"]
+            i0 = max(0, int(np.searchsorted(x, x0, side="right")) - 1)
+            i1 = min(len(x), int(np.searchsorted(x, x1, side="left")) + 1)
+            if i1 - i0 <= max_points or index == len(self.levels) - 1:
+                return index, {name: column[i0:i1] for name, column in level.items()}
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 5 * 365 * 24  # five years of hourly closes
+    x = np.arange(n) / 24.0
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+    start = time.perf_counter()
+    pyramid = ResolutionPyramid(x, close)
+    built = time.perf_counter()
+    print(f"{n} points, {len(pyramid.levels)} levels built in {(built - start) * 1000:.1f} ms")
+
+    for span_days in (5 * 365, 365, 30, 2):
+        start = time.perf_counter()
+        level, view = pyramid.select(x[-1] - span_days, x[-1], max_points=8000)
+        dx, dy = minmax_decimate(view["x"], view["close"], 1000)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{span_days:>5}d view: level {level}, {len(view['x'])} bars -> {len(dx)} points in {elapsed:.2f} ms")
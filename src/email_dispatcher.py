@@ -0,0 +1,290 @@
+# src/email_dispatcher.py - Background email delivery with SMTP session reuse, digests and retries
+
+import html
+import queue
+import smtplib
+import threading
+import time
+from datetime import datetime
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import Callable, List, Optional
+
+
+class EmailDispatcher:
+    """
+    Delivers emails from a background thread so callers never block on SMTP.
+
+    One authenticated SMTP session is kept open and reused across messages
+    (closed after ``idle_timeout`` seconds without mail). Messages arriving
+    within ``batch_window`` seconds of each other are collected; digestable
+    messages (price alerts) for the same recipient are merged into a single
+    digest email. Failed sends are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        email_config: dict,
+        batch_window: float = 5.0,
+        max_batch: int = 50,
+        max_retries: int = 5,
+        backoff_base: float = 2.0,
+        max_backoff: float = 300.0,
+        idle_timeout: float = 120.0,
+        on_sent: Optional[Callable] = None,
+    ):
+        """
+        Args:
+            email_config: SMTP settings (see ImprovedNotificationManager)
+            batch_window: Seconds to wait for more messages after the first
+            max_batch: Maximum messages collected into one batch
+            max_retries: Delivery attempts per email before giving up
+            backoff_base: Base of the exponential retry delay in seconds
+            max_backoff: Upper bound of the retry delay in seconds
+            idle_timeout: Close the SMTP session after this many idle seconds
+            on_sent: Callback(recipient, subject, body) after a successful send
+        """
+        self.email_config = email_config
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self.on_sent = on_sent
+
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._server = None
+        self._start_lock = threading.Lock()
+        # Submitted emails whose batch has not been handled yet
+        self._undelivered = 0
+        self._count_lock = threading.Lock()
+        self.sent_count = 0
+        self.failed_count = 0
+
+    # ==================== PUBLIC API ====================
+    def submit(self, recipient, subject: str, body: str, html_body: Optional[str] = None, digest: bool = False):
+        """
+        Queue an email for delivery and return immediately.
+
+        Args:
+            recipient: Recipient email address or list of addresses
+            subject: Email subject
+            body: Plain text email body
+            html_body: Optional HTML email body
+            digest: Whether the message may be merged with others in a burst
+        """
+        self.start()
+        with self._count_lock:
+            self._undelivered += 1
+        self._queue.put({
+            "recipient": recipient,
+            "subject": subject,
+            "body": body,
+            "html_body": html_body,
+            "digest": digest,
+        })
+
+    def start(self):
+        """Start the worker thread if it is not running"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="EmailDispatcher", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Flush queued emails (best effort within timeout) and stop the worker.
+
+        The worker is a daemon thread: whatever it has not delivered when the
+        timeout expires is lost once the process exits, and is logged here.
+        """
+        with self._start_lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return
+            if not self._stop_event.is_set():
+                self._stop_event.set()
+                self._queue.put(None)
+        thread.join(timeout)
+        # The reference is kept: a still-busy worker must finish before
+        # start() may launch another one on the same queue and session
+        if thread.is_alive() and self._undelivered:
+            print(
+                f"Email dispatcher still busy after {timeout:g}s; "
+                f"dropping {self._undelivered} undelivered email(s)"
+            )
+
+    def pending(self) -> int:
+        """Number of emails waiting in the queue"""
+        return self._queue.qsize()
+
+    # ==================== WORKER ====================
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self._disconnect()
+                continue
+
+            if first is None:
+                batch = self._drain()
+                if batch:
+                    self._deliver(batch)
+                break
+
+            batch = [first] + self._collect(time.monotonic() + self.batch_window)
+            stop_requested = any(item is None for item in batch)
+            self._deliver([item for item in batch if item is not None])
+            if stop_requested:
+                self._deliver(self._drain())
+                break
+
+        self._disconnect()
+
+    def _collect(self, deadline: float) -> List[dict]:
+        """Gather more messages until the batch window closes or the batch is full"""
+        items = []
+        while len(items) < self.max_batch - 1:
+            # When stopping, take what is already queued without waiting
+            remaining = 0 if self._stop_event.is_set() else deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            items.append(item)
+            if item is None:
+                break
+        return items
+
+    def _drain(self) -> List[dict]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not None:
+                items.append(item)
+
+    def _deliver(self, batch: List[dict]):
+        for recipient, subject, body, html_body in self._group(batch):
+            self._send_with_retry(recipient, subject, body, html_body)
+        with self._count_lock:
+            self._undelivered -= len(batch)
+
+    def _group(self, batch: List[dict]):
+        """Merge digestable messages per recipient; keep the others as they are"""
+        digests = {}
+        for item in batch:
+            if not item["digest"]:
+                yield item["recipient"], item["subject"], item["body"], item["html_body"]
+                continue
+            key = item["recipient"] if isinstance(item["recipient"], str) else tuple(item["recipient"])
+            digests.setdefault(key, []).append(item)
+
+        for items in digests.values():
+            if len(items) == 1:
+                item = items[0]
+                yield item["recipient"], item["subject"], item["body"], item["html_body"]
+                continue
+            subject = f"CoinSentinel: {len(items)} alerts"
+            body = "\n\n---\n\n".join(f"{i['subject']}\n{i['body']}" for i in items)
+            html_parts = [i["html_body"] or f"<pre>{html.escape(i['body'])}</pre>" for i in items]
+            html_body = "<hr>".join(html_parts)
+            yield items[0]["recipient"], subject, body, html_body
+
+    # ==================== SMTP SESSION ====================
+    def _connect(self):
+        server = smtplib.SMTP(
+            self.email_config.get('smtp_server', 'smtp.gmail.com'),
+            self.email_config.get('port', 587),
+            timeout=30,
+        )
+        if self.email_config.get('use_tls', True):
+            server.starttls()
+        try:
+            server.login(
+                self.email_config['sender_email'],
+                self.email_config['password']
+            )
+        except smtplib.SMTPNotSupportedError:
+            # Local relays and test stand-ins often do not offer AUTH
+            pass
+        self._server = server
+
+    def _disconnect(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def _build_message(self, recipient, subject, body, html_body):
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.email_config.get('sender_email')
+        msg['To'] = recipient if isinstance(recipient, str) else ', '.join(recipient)
+        msg['Subject'] = subject
+        msg['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
+        msg.attach(MIMEText(body, 'plain'))
+        if html_body:
+            msg.attach(MIMEText(html_body, 'html'))
+        return msg
+
+    def _send_with_retry(self, recipient, subject, body, html_body):
+        msg = self._build_message(recipient, subject, body, html_body)
+        for attempt in range(self.max_retries):
+            try:
+                if self._server is None:
+                    self._connect()
+                self._server.send_message(msg)
+                self.sent_count += 1
+                if self.on_sent:
+                    self.on_sent(recipient, subject, body)
+                return True
+            except smtplib.SMTPAuthenticationError as e:
+                # Retrying will not fix bad credentials
+                print(f"Email authentication error: {e}")
+                self._disconnect()
+                break
+            except Exception as e:
+                print(f"Email delivery error (attempt {attempt + 1}/{self.max_retries}): {e}")
+                # Drop the session; it is re-established on the next attempt
+                self._disconnect()
+                if attempt == self.max_retries - 1:
+                    break
+                delay = min(self.max_backoff, self.backoff_base ** attempt)
+                if self._stop_event.wait(delay) and attempt > 0:
+                    break
+
+        self.failed_count += 1
+        print(f"Email delivery failed: {subject}")
+        return False
+
+
+# Example usage
+if __name__ == "__main__":
+    # Local SMTP stand-in: python -m aiosmtpd -n -l localhost:1025
+    config = {
+        'smtp_server': 'localhost',
+        'port': 1025,
+        'sender_email': 'alerts@example.com',
+        'password': 'unused',
+        'use_tls': False,
+    }
+
+    dispatcher = EmailDispatcher(config, batch_window=1.0, max_retries=2, backoff_base=0.5)
+    for i in range(5):
+        dispatcher.submit('me@example.com', f"BTC alert {i}", f"Level {i} crossed", digest=True)
+    dispatcher.submit('me@example.com', "Portfolio summary", "Total value: $50,000")
+    print(f"Queued without blocking; pending: {dispatcher.pending()}")
+
+    dispatcher.stop(timeout=15)
+    print(f"Sent: {dispatcher.sent_count}, failed: {dispatcher.failed_count}")
@@ -11,6 +11,7 @@ from PyQt5.QtWidgets import (
     QWidget,
     QTableWidget,
     QTableWidgetItem,
+    QTableView,
     QVBoxLayout,
     QPushButton,
     QComboBox,
@@ -37,7 +38,7 @@ from PyQt5.QtWidgets import (
     QListWidgetItem,
 )
 from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QObject
-from PyQt5.QtGui import QBrush, QColor, QFont, QPalette, QPixmap
+from PyQt5.QtGui import QBrush, QColor, QFont, QPalette, QPixmap, QStandardItem, QStandardItemModel
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
@@ -49,6 +50,7 @@ from api_handler import EnhancedCryptoAPIHandler
 from improved_price_predictor import AdvancedPricePredictor
 from improved_portfolio_tracker import PortfolioTracker
 from improved_sentiment_tracker import SentimentTracker
+from coin_filter import CoinFilterProxyModel, debounced
 
 
 # ==================== HELPER CLASSES ====================
@@ -204,7 +206,7 @@ class ImprovedMarketTab(QWidget):
         self.search_input.setToolTip("Filter the list by coin name or symbol")
         self.search_input.setAccessibleName("Search Input")
         self.search_input.setAccessibleDescription("Enter text to filter the cryptocurrency list by name or symbol")
-        self.search_input.textChanged.connect(self.filter_coins)
+        self.search_timer = debounced(self.search_input.textChanged, self.filter_coins, parent=self)
         self.search_input.setMinimumWidth(200)
         controls_layout.addWidget(self.search_input)
 
@@ -252,9 +254,13 @@ class ImprovedMarketTab(QWidget):
         layout.addWidget(self.status_label)
 
         # Table - FULL VERSION WITH ALL COLUMNS
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)  # Increased from 6 to 10!
-        self.table.setHorizontalHeaderLabels([
+        # Rows live in a model; the proxy filters (name, symbol) and sorts them
+        self.model = QStandardItemModel(0, 10, self)  # Increased from 6 to 10!
+        self.proxy = CoinFilterProxyModel(key_columns=(1, 2), parent=self)
+        self.proxy.setSourceModel(self.model)
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.model.setHorizontalHeaderLabels([
             "Rank",
             "Coin",
             "Symbol",
@@ -324,7 +330,8 @@ class ImprovedMarketTab(QWidget):
             print("No coins data to display")
             return
 
-        self.table.setRowCount(len(self.coins_data))
+        self.proxy.begin_update()
+        self.model.setRowCount(len(self.coins_data))
         print(f"Updating table with {len(self.coins_data)} rows...")
 
         for row, coin in enumerate(self.coins_data):
@@ -345,17 +352,17 @@ class ImprovedMarketTab(QWidget):
                 circulating_supply = coin.get("circulating_supply", 0)
 
                 # Column 0: Rank
-                rank_item = QTableWidgetItem(str(rank))
+                rank_item = QStandardItem(str(rank))
                 rank_item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row, 0, rank_item)
+                self.model.setItem(row, 0, rank_item)
 
                 # Column 1: Coin Name
-                self.table.setItem(row, 1, QTableWidgetItem(name))
+                self.model.setItem(row, 1, QStandardItem(name))
 
                 # Column 2: Symbol
-                symbol_item = QTableWidgetItem(symbol)
+                symbol_item = QStandardItem(symbol)
                 symbol_item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row, 2, symbol_item)
+                self.model.setItem(row, 2, symbol_item)
 
                 # Column 3: Price
                 if price >= 1:
@@ -364,36 +371,36 @@ class ImprovedMarketTab(QWidget):
                     price_text = f"${price:.4f}"
                 else:
                     price_text = f"${price:.8f}"
-                price_item = QTableWidgetItem(price_text)
+                price_item = QStandardItem(price_text)
                 price_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 3, price_item)
+                self.model.setItem(row, 3, price_item)
 
                 # Column 4: 1h Change
-                change_1h_item = QTableWidgetItem(f"{change_1h:+.2f}%")
+                change_1h_item = QStandardItem(f"{change_1h:+.2f}%")
                 change_1h_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
                 if change_1h > 0:
                     change_1h_item.setForeground(QBrush(QColor("#10b981")))
                 elif change_1h < 0:
                     change_1h_item.setForeground(QBrush(QColor("#ef4444")))
-                self.table.setItem(row, 4, change_1h_item)
+                self.model.setItem(row, 4, change_1h_item)
 
                 # Column 5: 24h Change
-                change_24h_item = QTableWidgetItem(f"{change_24h:+.2f}%")
+                change_24h_item = QStandardItem(f"{change_24h:+.2f}%")
                 change_24h_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
                 if change_24h > 0:
                     change_24h_item.setForeground(QBrush(QColor("#10b981")))
                 elif change_24h < 0:
                     change_24h_item.setForeground(QBrush(QColor("#ef4444")))
-                self.table.setItem(row, 5, change_24h_item)
+                self.model.setItem(row, 5, change_24h_item)
 
                 # Column 6: 7d Change
-                change_7d_item = QTableWidgetItem(f"{change_7d:+.2f}%")
+                change_7d_item = QStandardItem(f"{change_7d:+.2f}%")
                 change_7d_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
                 if change_7d > 0:
                     change_7d_item.setForeground(QBrush(QColor("#10b981")))
                 elif change_7d < 0:
                     change_7d_item.setForeground(QBrush(QColor("#ef4444")))
-                self.table.setItem(row, 6, change_7d_item)
+                self.model.setItem(row, 6, change_7d_item)
 
                 # Column 7: 24h Volume
                 if volume_24h >= 1e9:
@@ -402,9 +409,9 @@ class ImprovedMarketTab(QWidget):
                     volume_text = f"${volume_24h/1e6:.2f}M"
                 else:
                     volume_text = f"${volume_24h:,.0f}"
-                volume_item = QTableWidgetItem(volume_text)
+                volume_item = QStandardItem(volume_text)
                 volume_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 7, volume_item)
+                self.model.setItem(row, 7, volume_item)
 
                 # Column 8: Market Cap
                 if market_cap >= 1e12:
@@ -415,9 +422,9 @@ class ImprovedMarketTab(QWidget):
                     mcap_text = f"${market_cap/1e6:.2f}M"
                 else:
                     mcap_text = f"${market_cap:,.0f}"
-                mcap_item = QTableWidgetItem(mcap_text)
+                mcap_item = QStandardItem(mcap_text)
                 mcap_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 8, mcap_item)
+                self.model.setItem(row, 8, mcap_item)
 
                 # Column 9: Circulating Supply
                 if circulating_supply > 0:
@@ -429,36 +436,20 @@ class ImprovedMarketTab(QWidget):
                         supply_text = f"{circulating_supply:,.0f} {symbol}"
                 else:
                     supply_text = "N/A"
-                supply_item = QTableWidgetItem(supply_text)
+                supply_item = QStandardItem(supply_text)
                 supply_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.table.setItem(row, 9, supply_item)
+                self.model.setItem(row, 9, supply_item)
 
             except Exception as e:
                 print(f"Error processing row {row}: {e}")
                 continue
 
-        print(f"✓ Table updated with {self.table.rowCount()} rows")
+        self.proxy.end_update()
+        print(f"✓ Table updated with {self.model.rowCount()} rows")
 
     def filter_coins(self):
         """Filter coins by search text"""
-        search_text = self.search_input.text().lower()
-
-        if not search_text:
-            for row in range(self.table.rowCount()):
-                self.table.setRowHidden(row, False)
-            return
-
-        for row in range(self.table.rowCount()):
-            name_item = self.table.item(row, 1)
-            symbol_item = self.table.item(row, 2)
-
-            show_row = False
-            if name_item and search_text in name_item.text().lower():
-                show_row = True
-            elif symbol_item and search_text in symbol_item.text().lower():
-                show_row = True
-
-            self.table.setRowHidden(row, not show_row)
+        self.proxy.set_query(self.search_input.text())
 
     def toggle_auto_refresh(self):
         """Toggle auto-refresh"""
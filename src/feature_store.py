@@ -0,0 +1,222 @@
+# src/feature_store.py - Versioned, memory-mapped feature matrices per coin and interval
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+def infer_interval(timestamps: np.ndarray) -> str:
+    """Infer the candle interval label from int64 nanosecond timestamps"""
+    if len(timestamps) < 2:
+        return "1h"
+    step = np.median(np.diff(timestamps[-50:])) / 1e9
+    if step <= 90:
+        return "1m"
+    if step <= 5400:
+        return "1h"
+    return "1d"
+
+
+class FeatureStore:
+    """
+    On-disk store of precomputed feature matrices.
+
+    Each (coin, interval, feature-set version) has three raw files: float32
+    features (rows x columns), float32 targets and int64 candle timestamps,
+    plus a small JSON meta file. Reads are zero-copy ``np.memmap`` views.
+    Writes only append new rows; the meta row count is updated last, so a
+    crash mid-append leaves the previous state readable. Writers of the same
+    key (the GUI, the daemon and the CLI may share the store) take an
+    exclusive lock on a per-key ``.lock`` file.
+    """
+
+    def __init__(self, base_dir: str = "data/features"):
+        self.base_dir = base_dir
+        os.makedirs(base_dir, exist_ok=True)
+
+    def _paths(self, coin_id: str, interval: str, version: int) -> Dict[str, str]:
+        stem = os.path.join(self.base_dir, f"{coin_id}_{interval}_v{version}")
+        return {
+            "features": stem + ".features.f32",
+            "target": stem + ".target.f32",
+            "timestamps": stem + ".ts.i8",
+            "meta": stem + ".json",
+            "lock": stem + ".lock",
+        }
+
+    @contextmanager
+    def _locked(self, paths: Dict[str, str]):
+        """Hold an exclusive lock on one key across processes and threads"""
+        with open(paths["lock"], "a+") as lock:
+            try:
+                import fcntl
+
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            except ImportError:
+                import msvcrt
+
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            # Closing the file releases the lock
+            yield
+
+    def _load_meta(self, paths: Dict[str, str]) -> Optional[Dict]:
+        try:
+            if os.path.exists(paths["meta"]):
+                with open(paths["meta"], "r") as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error loading feature store meta: {e}")
+        return None
+
+    def _save_meta(self, paths: Dict[str, str], meta: Dict):
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".json.tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, paths["meta"])
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def last_timestamp(self, coin_id: str, interval: str, version: int) -> Optional[int]:
+        """Timestamp (ns) of the newest stored row, or None if nothing is stored"""
+        meta = self._load_meta(self._paths(coin_id, interval, version))
+        if not meta or not meta.get("rows"):
+            return None
+        return meta["last_timestamp"]
+
+    def load(
+        self, coin_id: str, interval: str, version: int
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Get stored features as read-only memory-mapped views.
+
+        Returns:
+            Tuple of (X, y, timestamps) or None if nothing is stored
+        """
+        paths = self._paths(coin_id, interval, version)
+        meta = self._load_meta(paths)
+        if not meta or not meta.get("rows"):
+            return None
+
+        rows, cols = meta["rows"], meta["columns"]
+        try:
+            X = np.memmap(paths["features"], dtype=np.float32, mode="r", shape=(rows, cols))
+            y = np.memmap(paths["target"], dtype=np.float32, mode="r", shape=(rows,))
+            ts = np.memmap(paths["timestamps"], dtype=np.int64, mode="r", shape=(rows,))
+        except Exception as e:
+            print(f"Error opening feature store for {coin_id}: {e}")
+            return None
+        return X, y, ts
+
+    def upsert_tail(
+        self,
+        coin_id: str,
+        interval: str,
+        version: int,
+        X: np.ndarray,
+        y: np.ndarray,
+        timestamps: np.ndarray,
+        column_names=None,
+    ) -> int:
+        """
+        Merge freshly computed rows into the store.
+
+        Rows older than the newest stored row are ignored, a row with the same
+        timestamp as the newest stored row overwrites it (its target may have
+        come from a then-incomplete candle) and newer rows are appended.
+
+        Returns:
+            Number of rows written
+        """
+        paths = self._paths(coin_id, interval, version)
+        with self._locked(paths):
+            return self._upsert_tail(paths, coin_id, interval, version, X, y, timestamps, column_names)
+
+    def _upsert_tail(self, paths, coin_id, interval, version, X, y, timestamps, column_names) -> int:
+        meta = self._load_meta(paths)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.ascontiguousarray(y, dtype=np.float32)
+        timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+
+        if meta and meta.get("rows") and meta["columns"] != X.shape[1]:
+            print(f"Feature store: column count changed for {coin_id}, rebuilding")
+            meta = None
+
+        if not meta or not meta.get("rows"):
+            rows = 0
+            start = 0
+            mode = "wb"
+        else:
+            rows = meta["rows"]
+            last_ts = meta["last_timestamp"]
+            start = int(np.searchsorted(timestamps, last_ts, side="left"))
+            if start < len(timestamps) and timestamps[start] == last_ts:
+                # Overwrite the newest stored row, then append after it
+                rows -= 1
+            mode = "r+b"
+
+        new_rows = len(timestamps) - start
+        if new_rows <= 0:
+            return 0
+
+        row_bytes = X.shape[1] * 4
+        for key, data, width in (
+            ("features", X[start:], row_bytes),
+            ("target", y[start:], 4),
+            ("timestamps", timestamps[start:], 8),
+        ):
+            if mode == "r+b" and not os.path.exists(paths[key]):
+                mode = "wb"
+            with open(paths[key], mode) as f:
+                # Drop any bytes past the committed row count (interrupted append)
+                f.truncate(rows * width)
+                f.seek(rows * width)
+                f.write(data.tobytes())
+
+        total_rows = rows + new_rows
+        self._save_meta(
+            paths,
+            {
+                "coin_id": coin_id,
+                "interval": interval,
+                "version": version,
+                "rows": total_rows,
+                "columns": int(X.shape[1]),
+                "column_names": list(column_names) if column_names is not None else None,
+                "first_timestamp": int(meta["first_timestamp"]) if meta and meta.get("rows") else int(timestamps[0]),
+                "last_timestamp": int(timestamps[-1]),
+            },
+        )
+        return new_rows
+
+    def clear(self, coin_id: str, interval: str, version: int):
+        """Delete the stored matrix for one key"""
+        paths = self._paths(coin_id, interval, version)
+        with self._locked(paths):
+            for key, path in paths.items():
+                # The lock file is held right now and shared with other writers
+                if key != "lock" and os.path.exists(path):
+                    os.remove(path)
+
+
+# Example usage
+if __name__ == "__main__":
+    store = FeatureStore("data/features_example")
+
+    ts = (np.arange(100, dtype=np.int64) * 3600) * 10**9
+    X = np.random.rand(100, 4)
+    y = np.random.rand(100)
+
+    store.upsert_tail("bitcoin", "1h", 1, X[:80], y[:80], ts[:80])
+    written = store.upsert_tail("bitcoin", "1h", 1, X[70:], y[70:], ts[70:])
+    X_view, y_view, ts_view = store.load("bitcoin", "1h", 1)
+
+    print(f"Rows written on second call: {written}")
+    print(f"Stored shape: {X_view.shape}, memory-mapped: {isinstance(X_view, np.memmap)}")
+    store.clear("bitcoin", "1h", 1)
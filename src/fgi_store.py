@@ -0,0 +1,184 @@
+# src/fgi_store.py - Local Fear & Greed Index history aligned to price candles
+
+import os
+import tempfile
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import requests
+
+FGI_API_URL = "https://api.alternative.me/fng/"
+
+# Daily FGI history: unix seconds and index value
+FGI_HISTORY_DTYPE = np.dtype([("timestamp", "<i8"), ("value", "<f4")])
+
+# Days of FGI history used for the z-score
+FGI_ZSCORE_WINDOW = 30
+
+# Seconds between backfill attempts while no history is stored
+FGI_RETRY_INTERVAL = 300
+
+
+class FGIStore:
+    """
+    Full Crypto Fear & Greed Index history in a local array file.
+
+    The whole history is downloaded once (alternative.me ``limit=0``), later
+    refreshes only fetch the days since the newest stored value, at most once
+    per ``refresh_interval``. Feature lookups never hit the network: callers
+    (the daemon scheduler, the GUI, the CLI) run refresh() themselves.
+    """
+
+    def __init__(self, history_file: str = "data/fgi_history.npy", refresh_interval: float = 6 * 3600):
+        self.history_file = history_file
+        self.refresh_interval = refresh_interval
+        self._history = None
+        self._derived = None
+        self._last_refresh = 0.0
+        os.makedirs(os.path.dirname(history_file) or ".", exist_ok=True)
+
+    def load(self) -> np.ndarray:
+        """Stored history as a structured array (oldest first)"""
+        if self._history is None:
+            try:
+                if os.path.exists(self.history_file):
+                    self._history = np.load(self.history_file)
+                    self._last_refresh = os.path.getmtime(self.history_file)
+            except Exception as e:
+                print(f"Error loading FGI history: {e}")
+            if self._history is None:
+                self._history = np.zeros(0, dtype=FGI_HISTORY_DTYPE)
+        return self._history
+
+    def merge(self, timestamps, values):
+        """Merge (timestamp, value) points into the stored history and save it"""
+        new = np.zeros(len(timestamps), dtype=FGI_HISTORY_DTYPE)
+        new["timestamp"] = timestamps
+        new["value"] = values
+        merged = np.concatenate([self.load(), new])
+        # Keep the newest value for each timestamp
+        order = np.argsort(merged["timestamp"], kind="stable")
+        merged = merged[order]
+        keep = np.ones(len(merged), dtype=bool)
+        keep[:-1] = merged["timestamp"][1:] != merged["timestamp"][:-1]
+        self._history = merged[keep]
+        self._derived = None
+        # Unique temp file: several processes (daemon, GUI, CLI workers) may
+        # save at once, and each must replace the history with a whole file
+        tmp_file = None
+        try:
+            fd, tmp_file = tempfile.mkstemp(
+                dir=os.path.dirname(self.history_file) or ".", suffix=".tmp.npy"
+            )
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, self._history)
+            os.replace(tmp_file, self.history_file)
+        except Exception as e:
+            print(f"Error saving FGI history: {e}")
+            if tmp_file and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Backfill the full history or fetch the days since the last stored value.
+
+        Returns:
+            True if new data was fetched
+        """
+        history = self.load()
+        # An empty history means the backfill has not succeeded yet: retry sooner
+        interval = self.refresh_interval if len(history) else FGI_RETRY_INTERVAL
+        if not force and time.time() - self._last_refresh < interval:
+            return False
+        self._last_refresh = time.time()
+
+        if len(history):
+            missing_days = int((time.time() - history["timestamp"][-1]) // 86400) + 1
+            limit = max(2, missing_days + 1)
+        else:
+            limit = 0  # full history
+
+        try:
+            response = requests.get(
+                FGI_API_URL, params={"limit": limit, "format": "json"}, timeout=15
+            )
+            if response.status_code != 200:
+                return False
+            points = response.json().get("data") or []
+            if not points:
+                return False
+            self.merge(
+                [int(p["timestamp"]) for p in points],
+                [float(p["value"]) for p in points],
+            )
+            return True
+        except Exception as e:
+            print(f"Error backfilling FGI history: {e}")
+            return False
+
+    def _derived_series(self, history: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Daily FGI level, delta and trailing z-score of history (cached per history)"""
+        # Keyed on the history array: refresh() may merge from another thread
+        if self._derived is None or self._derived[0] is not history:
+            values = history["value"].astype(np.float64)
+            delta = np.zeros_like(values)
+            delta[1:] = np.diff(values)
+
+            # Trailing z-score over the daily series (cumsum windows)
+            window = FGI_ZSCORE_WINDOW
+            csum = np.concatenate([[0.0], np.cumsum(values)])
+            csq = np.concatenate([[0.0], np.cumsum(values * values)])
+            idx = np.arange(1, len(values) + 1)
+            lo = np.maximum(0, idx - window)
+            count = idx - lo
+            mean = (csum[idx] - csum[lo]) / count
+            var = np.maximum((csq[idx] - csq[lo]) / count - mean * mean, 0.0)
+            std = np.sqrt(var)
+            zscore = np.divide(values - mean, std, out=np.zeros_like(values), where=std > 0)
+            self._derived = (history, values, delta, zscore)
+        return self._derived[1:]
+
+    def features(self, timestamps_ns: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        FGI level, day-over-day delta and 30-day z-score for each candle.
+
+        Each candle gets the latest FGI published at or before its timestamp
+        (no look-ahead). Candles before the stored history get neutral values.
+
+        Args:
+            timestamps_ns: int64 nanosecond timestamps of any shape
+
+        Returns:
+            Dictionary with 'fgi', 'fgi_delta' and 'fgi_zscore' arrays
+        """
+        timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+        history = self.load()
+        if len(history) == 0:
+            return {
+                "fgi": np.full(timestamps_ns.shape, 50.0),
+                "fgi_delta": np.zeros(timestamps_ns.shape),
+                "fgi_zscore": np.zeros(timestamps_ns.shape),
+            }
+
+        values, delta, zscore = self._derived_series(history)
+        pos = np.searchsorted(history["timestamp"], timestamps_ns // 10**9, side="right") - 1
+        before = pos < 0
+        pos = np.clip(pos, 0, None)
+        return {
+            "fgi": np.where(before, 50.0, values[pos]),
+            "fgi_delta": np.where(before, 0.0, delta[pos]),
+            "fgi_zscore": np.where(before, 0.0, zscore[pos]),
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    store = FGIStore()
+    store.refresh(force=True)
+    history = store.load()
+    print(f"Stored FGI points: {len(history)}")
+
+    hourly = (np.arange(time.time() - 7 * 86400, time.time(), 3600) * 10**9).astype(np.int64)
+    feats = store.features(hourly)
+    print(f"Latest FGI {feats['fgi'][-1]:.0f}, delta {feats['fgi_delta'][-1]:+.0f}, z {feats['fgi_zscore'][-1]:+.2f}")
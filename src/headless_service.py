@@ -0,0 +1,492 @@
+# src/headless_service.py - Headless CoinSentinel service running the refresh, prediction and alert loops
+
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from api_handler import EnhancedCryptoAPIHandler
+from alert_engine import AlertEngine
+from batch_jobs import train_coin
+from improved_notification_manager import ImprovedNotificationManager
+from improved_portfolio_tracker import PortfolioTracker
+from improved_sentiment_tracker import SentimentTracker
+from tick_stream import TickPipeline, apply_deltas
+from warm_snapshot import WarmSnapshot
+
+# Most (coin_id, time_frame) predictions kept; the oldest are dropped first
+MAX_CACHED_PREDICTIONS = 1000
+
+# Intervals are in seconds
+DEFAULT_CONFIG = {
+    "market_interval": 60,
+    "sentiment_interval": 300,
+    "portfolio_interval": 300,
+    "prediction_interval": 900,
+    "training_interval": 6 * 3600,
+    "snapshot_interval": 300,
+    "market_limit": 100,
+    "currency": "usd",
+    # Coins predicted and trained; empty means the top ``model_coins`` by market cap
+    "coins": [],
+    "model_coins": 10,
+    "training_days": 90,
+    # Concurrency limits
+    "max_concurrent_requests": 4,
+    "max_concurrent_predictions": 2,
+    "training_workers": 2,
+    # SMTP settings for ImprovedNotificationManager
+    "email": {},
+    # Local HTTP/JSON API (port 0 disables it)
+    "api_host": "127.0.0.1",
+    "api_port": 8765,
+    # Market-data providers (see market_providers.build_router); None uses
+    # data/market_providers.json, else CoinGecko only
+    "providers": None,
+    # Live prices from the exchange WebSocket feeds, applied every stream_interval
+    "stream_prices": False,
+    "stream_interval": 1,
+}
+
+def load_config(config_file: Optional[str] = None, overrides: Optional[Dict] = None) -> Dict:
+    """
+    Service configuration: defaults, then the JSON file, then overrides.
+
+    Args:
+        config_file: Optional JSON file with any DEFAULT_CONFIG keys
+        overrides: Values taking precedence over the file (None values are ignored)
+    """
+    config = dict(DEFAULT_CONFIG)
+    if config_file:
+        with open(config_file, "r") as f:
+            config.update(json.load(f))
+    config.update({key: value for key, value in (overrides or {}).items() if value is not None})
+    return config
+
+
+def _log(message: str):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}", flush=True)
+
+
+class CoinSentinelService:
+    """
+    CoinSentinel without the GUI.
+
+    Runs the same components as ``EnhancedCryptoTrackerApp`` on an asyncio
+    loop instead of QTimers:
+
+    - market refresh (top coins) every ``market_interval``,
+    - sentiment every ``sentiment_interval``,
+    - portfolio revaluation at the latest prices every ``portfolio_interval``,
+    - price predictions for the model coins every ``prediction_interval``,
+    - model retraining every ``training_interval`` on a process pool of
+      ``training_workers`` (coins without a model are trained at startup),
+    - alert evaluation whenever new prices arrive,
+    - with ``stream_prices``, live exchange prices applied to the listing,
+      portfolio and alerts every ``stream_interval``,
+    - the warm-start snapshot every ``snapshot_interval`` and on shutdown.
+
+    Blocking calls (HTTP, model inference) run in threads, bounded by
+    ``max_concurrent_requests`` and ``max_concurrent_predictions``. A coin
+    is never predicted while it is being retrained. Each loop's runs,
+    errors and durations are kept in ``status``.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        Args:
+            config: Settings (see DEFAULT_CONFIG); missing keys use the defaults
+        """
+        self.config = dict(DEFAULT_CONFIG)
+        self.config.update(config or {})
+
+        self.api = EnhancedCryptoAPIHandler(self.config["providers"])
+        self.portfolio = PortfolioTracker()
+        self.sentiment = SentimentTracker(self.api)
+        self.notifier = ImprovedNotificationManager(self.config.get("email") or None)
+        self.alert_engine = AlertEngine(self.notifier)
+        self.alert_engine.load_alerts()
+        self.snapshot = WarmSnapshot()
+        self._predictor = None
+
+        self.top_coins: List[Dict] = []
+        self.latest_prices: Dict[str, float] = {}
+        self.market_updated_at: Optional[float] = None
+        self.portfolio_summary: Optional[Dict] = None
+        self.market_sentiment: Optional[Dict] = None
+        # Keyed by (coin_id, time_frame)
+        self.predictions: Dict[Tuple[str, int], Dict] = {}
+        # Bumped whenever a resource changes (used for API ETags)
+        self.revisions: Dict[str, int] = {}
+        self.status: Dict[str, Dict] = {}
+        self.started_at = time.time()
+        self._coin_locks: Dict[str, asyncio.Lock] = {}
+        self._training_pool = None
+        self._catch_up_training = None
+        self.api_server = None
+        self.tick_pipeline = None
+
+    @property
+    def predictor(self):
+        """Price predictor, created (with the ML stack) on first use"""
+        if self._predictor is None:
+            from improved_price_predictor import AdvancedPricePredictor
+
+            self._predictor = AdvancedPricePredictor(self.api)
+        return self._predictor
+
+    # ==================== LIFECYCLE ====================
+    async def run(self, once: bool = False):
+        """
+        Run all loops until stop() is called or SIGINT/SIGTERM is received.
+
+        Args:
+            once: Run every job a single time, in dependency order, then exit
+        """
+        self._stop = asyncio.Event()
+        self._market_ready = asyncio.Event()
+        self._prices_updated = asyncio.Event()
+        self._requests = asyncio.Semaphore(self.config["max_concurrent_requests"])
+        self._predictions = asyncio.Semaphore(self.config["max_concurrent_predictions"])
+        # Spawned, not forked: the service already runs threads
+        self._training_pool = ProcessPoolExecutor(
+            max_workers=self.config["training_workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not available on Windows or outside the main thread
+
+        _log(f"CoinSentinel service started (pid {os.getpid()})")
+        try:
+            if once:
+                await self._run_once()
+            else:
+                if self.config["api_port"]:
+                    from http_api import ApiServer
+
+                    self.api_server = ApiServer(self, self.config["api_host"], self.config["api_port"])
+                    await self.api_server.start()
+                    _log(f"HTTP API listening on http://{self.config['api_host']}:{self.api_server.port}")
+                await self._run_forever()
+        finally:
+            if self.api_server is not None:
+                await self.api_server.stop()
+            self._training_pool.shutdown(wait=False, cancel_futures=True)
+            self.shutdown()
+
+    async def _run_forever(self):
+        config = self.config
+        tasks = [
+            asyncio.create_task(self._every("market", config["market_interval"], self.refresh_market)),
+            asyncio.create_task(self._every("sentiment", config["sentiment_interval"], self.refresh_sentiment)),
+            asyncio.create_task(self._every("portfolio", config["portfolio_interval"], self.revalue_portfolio)),
+            asyncio.create_task(self._every("predictions", config["prediction_interval"], self.update_predictions)),
+            asyncio.create_task(self._training_loop()),
+            asyncio.create_task(self._every("snapshot", config["snapshot_interval"], self.save_snapshot)),
+            asyncio.create_task(self._alert_loop()),
+        ]
+        if config["stream_prices"]:
+            self.tick_pipeline = TickPipeline.from_router(self.api.market_data).start()
+            tasks.append(asyncio.create_task(self._every("stream", config["stream_interval"], self.apply_price_deltas)))
+        await self._stop.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_once(self):
+        await self._run_job("market", self.refresh_market)
+        await asyncio.gather(
+            self._run_job("sentiment", self.refresh_sentiment),
+            self._run_job("portfolio", self.revalue_portfolio),
+            self._run_job("alerts", self.evaluate_alerts),
+        )
+        await self._run_job("training", self.train_models, True)
+        await self._run_job("predictions", self.update_predictions)
+        await self._run_job("snapshot", self.save_snapshot)
+
+    def stop(self):
+        """Ask all loops to finish"""
+        _log("Stopping...")
+        self._stop.set()
+
+    def shutdown(self):
+        """Persist state and flush notifications"""
+        self.write_snapshot()
+        self.alert_engine.save_alerts()
+        self.notifier.close()
+        self.api.market_data.close()
+        _log("CoinSentinel service stopped")
+
+    # ==================== SCHEDULING ====================
+    async def _sleep(self, seconds: float) -> bool:
+        """Wait, returning True early if the service is stopping"""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=max(0.0, seconds))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _run_job(self, name: str, job, *args):
+        status = self.status.setdefault(
+            name, {"runs": 0, "errors": 0, "last_run": None, "last_duration": None, "last_error": None}
+        )
+        start = time.perf_counter()
+        try:
+            await job(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            status["errors"] += 1
+            status["last_error"] = str(e)
+            _log(f"Error in {name}: {e}")
+        status["runs"] += 1
+        status["last_run"] = time.time()
+        status["last_duration"] = time.perf_counter() - start
+
+    async def _every(self, name: str, interval: float, job):
+        """Run a job at a fixed rate (a slow run delays, but does not stack, the next)"""
+        if name != "market":
+            # Everything else works on the market listing
+            await self._market_ready.wait()
+        while not self._stop.is_set():
+            start = time.monotonic()
+            await self._run_job(name, job)
+            if await self._sleep(interval - (time.monotonic() - start)):
+                break
+
+    async def _training_loop(self):
+        await self._market_ready.wait()
+        only_missing = True
+        while not self._stop.is_set():
+            start = time.monotonic()
+            await self._run_job("training", self.train_models, only_missing)
+            only_missing = False
+            if await self._sleep(self.config["training_interval"] - (time.monotonic() - start)):
+                break
+
+    async def _alert_loop(self):
+        while not self._stop.is_set():
+            await self._prices_updated.wait()
+            self._prices_updated.clear()
+            await self._run_job("alerts", self.evaluate_alerts)
+
+    async def _blocking(self, func, *args, **kwargs):
+        """Run a blocking network call in a thread, within the request limit"""
+        async with self._requests:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    def _coin_lock(self, coin_id: str) -> asyncio.Lock:
+        return self._coin_locks.setdefault(coin_id, asyncio.Lock())
+
+    def _touch(self, name: str):
+        self.revisions[name] = self.revisions.get(name, 0) + 1
+
+    # ==================== JOBS ====================
+    async def refresh_market(self):
+        coins = await self._blocking(
+            self.api.get_top_coins, limit=self.config["market_limit"], vs_currency=self.config["currency"]
+        )
+        if not coins:
+            raise RuntimeError("no market data returned")
+        self.top_coins = coins
+        self.market_updated_at = time.time()
+        self._touch("market")
+        if self.config["currency"] == "usd":
+            self.latest_prices = {coin.get("id"): coin.get("current_price") for coin in coins}
+            self.sentiment.set_market_snapshot(coins)
+            self._prices_updated.set()
+        self._market_ready.set()
+        _log(f"Market refreshed: {len(coins)} coins")
+        self._train_new_model_coins()
+
+    def _train_new_model_coins(self):
+        """Train coins that entered the model set since the last training run, on the pool"""
+        # The training loop's first run covers the coins missing at start-up
+        if "training" not in self.status or self._stop.is_set():
+            return
+        if self._catch_up_training is not None and not self._catch_up_training.done():
+            return
+        if any(not self.predictor.has_model(coin_id) for coin_id in self.model_coins()):
+            self._catch_up_training = asyncio.create_task(self._run_job("training", self.train_models, True))
+
+    async def refresh_sentiment(self):
+        self.market_sentiment = await self._blocking(self.sentiment.get_market_sentiment)
+        self._touch("sentiment")
+        # Feature lookups never fetch; keep the FGI history behind them current
+        await self._blocking(self.predictor.fgi_store.refresh)
+        fear_greed = (self.market_sentiment or {}).get("fear_greed", {})
+        _log(f"Sentiment refreshed: Fear & Greed {fear_greed.get('value', 'N/A')}")
+
+    async def revalue_portfolio(self):
+        # Transactions may have been added from the GUI since the last run
+        self.portfolio.transactions = self.portfolio.load_transactions()
+        self.portfolio.holdings = self.portfolio.calculate_holdings()
+        self.portfolio_summary = self.portfolio.get_portfolio_summary(self.latest_prices)
+        self._touch("portfolio")
+        _log(
+            f"Portfolio revalued: ${self.portfolio_summary['total_value']:,.2f} "
+            f"({self.portfolio_summary['total_pnl_percent']:+.2f}%)"
+        )
+
+    async def evaluate_alerts(self):
+        if not self.latest_prices:
+            return
+        triggered = await asyncio.to_thread(self.alert_engine.on_prices, dict(self.latest_prices))
+        if triggered:
+            self.alert_engine.save_alerts()
+            _log(f"{len(triggered)} price alert(s) triggered")
+
+    async def apply_price_deltas(self):
+        """Fold streamed prices into the listing, portfolio and alerts"""
+        deltas = self.tick_pipeline.drain()
+        if not deltas:
+            return
+        # Streamed prices are USD
+        self.latest_prices.update({coin_id: delta["price"] for coin_id, delta in deltas.items()})
+        if self.config["currency"] == "usd" and apply_deltas(self.top_coins, deltas):
+            self.market_updated_at = time.time()
+            self._touch("market")
+        if self.portfolio.holdings.keys() & deltas.keys():
+            self.portfolio_summary = self.portfolio.get_portfolio_summary(self.latest_prices)
+            self._touch("portfolio")
+        self._prices_updated.set()
+
+    def model_coins(self) -> List[str]:
+        """Coins that are predicted and trained"""
+        if self.config["coins"]:
+            return list(self.config["coins"])
+        return [coin["id"] for coin in self.top_coins[: self.config["model_coins"]]]
+
+    async def current_price(self, coin_id: str) -> Optional[float]:
+        """USD price from the market listing, or fetched for coins outside it"""
+        price = self.latest_prices.get(coin_id)
+        if price:
+            return price
+        quote = await self._blocking(self.api.get_price, [coin_id])
+        return (quote or {}).get(coin_id, {}).get("usd")
+
+    async def predict(self, coin_id: str, time_frame: int = 1) -> Optional[Dict]:
+        """
+        Predict one coin now and cache the result in ``predictions``.
+
+        Coins are never trained here: training runs on the process pool
+        (``train_models``), so a coin without a saved model is skipped.
+
+        Returns:
+            predict_price result plus 'coin_id' and 'updated_at', or None if
+            the coin has no price or no trained model
+        """
+        if not self.predictor.has_model(coin_id):
+            return None
+        price = await self.current_price(coin_id)
+        if not price:
+            return None
+        async with self._predictions, self._coin_lock(coin_id):
+            prediction = await asyncio.to_thread(
+                self.predictor.predict_price, coin_id, price, time_frame, train_if_missing=False
+            )
+        if not prediction:
+            return None
+        prediction = dict(prediction, coin_id=coin_id, updated_at=time.time())
+        # Re-inserted so the dict stays ordered oldest first
+        self.predictions.pop((coin_id, time_frame), None)
+        self.predictions[(coin_id, time_frame)] = prediction
+        while len(self.predictions) > MAX_CACHED_PREDICTIONS:
+            del self.predictions[next(iter(self.predictions))]
+        if prediction.get("alert_levels") and not prediction.get("is_fallback"):
+            # Alert when the price crosses the predicted support/resistance
+            self.alert_engine.add_alert_levels(coin_id, prediction["alert_levels"])
+            self.alert_engine.save_alerts()
+        self._touch("predictions")
+        return prediction
+
+    async def update_predictions(self):
+        coins = self.model_coins()
+        results = await asyncio.gather(*(self.predict(coin_id) for coin_id in coins))
+        _log(f"Predictions updated: {sum(1 for result in results if result)}/{len(coins)} coins")
+
+    async def train_models(self, only_missing: bool = False):
+        """
+        Retrain the model coins on the process pool.
+
+        Args:
+            only_missing: Train only coins that have no saved model yet
+        """
+        loop = asyncio.get_running_loop()
+        model_dir = self.predictor.model_dir
+        coins = [
+            coin_id
+            for coin_id in self.model_coins()
+            if not only_missing or not os.path.exists(os.path.join(model_dir, f"{coin_id}_model.joblib"))
+        ]
+
+        async def train(coin_id):
+            async with self._coin_lock(coin_id):
+                if only_missing and self.predictor.has_model(coin_id):
+                    # Trained by another run while we waited
+                    return coin_id, True, "already trained"
+                # The worker saves the model to the shared model directory
+                result = await loop.run_in_executor(
+                    self._training_pool, train_coin, coin_id, self.config["training_days"]
+                )
+                # Reload the new model from disk on the next prediction
+                self.predictor.models.pop(coin_id, None)
+            return result
+
+        results = await asyncio.gather(*(train(coin_id) for coin_id in coins))
+        trained = sum(1 for _, success, _ in results if success)
+        for coin_id, success, message in results:
+            if not success:
+                _log(f"Training {coin_id} failed: {message}")
+        if coins:
+            _log(f"Models trained: {trained}/{len(coins)}")
+
+    async def save_snapshot(self):
+        self.write_snapshot()
+
+    def write_snapshot(self):
+        """Write the warm-start snapshot the GUI shows on launch"""
+        if self.top_coins:
+            self.snapshot.save(
+                self.top_coins,
+                portfolio=self.portfolio_summary,
+                sentiment=self.market_sentiment,
+                currency=self.config["currency"],
+                saved_at=self.market_updated_at,
+            )
+
+    def get_status(self) -> Dict:
+        """Uptime, data ages and per-loop run statistics"""
+        return {
+            "uptime": time.time() - self.started_at,
+            "market_updated_at": self.market_updated_at,
+            "coins": len(self.top_coins),
+            "predictions": len(self.predictions),
+            "alerts": len(self.alert_engine),
+            "providers": self.api.market_data.status(),
+            "stream": {
+                "live": self.tick_pipeline.live,
+                "ticks": self.tick_pipeline.ticks,
+                "coins": len(self.tick_pipeline.prices),
+            }
+            if self.tick_pipeline is not None
+            else None,
+            "jobs": self.status,
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    service = CoinSentinelService({"model_coins": 3, "training_workers": 1})
+    asyncio.run(service.run(once=True))
+    print(json.dumps(service.get_status(), indent=2, default=str))
@@ -0,0 +1,447 @@
+# src/http_api.py - Embedded asyncio HTTP/JSON API over the headless service's caches
+
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT = 15
+
+# Largest accepted request body (batch prediction requests)
+MAX_BODY = 64 * 1024
+
+# Most coins in one batch prediction request
+MAX_BATCH = 100
+
+# Browser origins allowed to change state (alerts); other sites' pages
+# must not be able to set alerts through a user's browser
+LOCAL_ORIGIN_HOSTS = ("localhost", "127.0.0.1", "[::1]")
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    403: "Forbidden",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # NumPy scalars and arrays
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+class ApiServer:
+    """
+    Read-mostly HTTP/JSON API for dashboards and scripts.
+
+    Served by ``asyncio.start_server`` on the service's event loop (no web
+    framework). Responses come from the service's in-process state:
+
+    - ``GET /api/market``: top-coins listing
+    - ``GET /api/portfolio``: portfolio summary at the latest prices
+    - ``GET /api/sentiment``: market sentiment
+    - ``GET /api/predictions/<coin_id>[?time_frame=N]``: one prediction
+    - ``GET /api/predictions?coins=a,b[&time_frame=N]`` or ``POST
+      /api/predictions`` with ``{"coins": [...], "time_frame": N}``: batch
+    - ``GET /api/candles/<coin_id>[?interval=1m|1h]``: streamed candles
+      (when the service streams prices)
+    - ``GET /api/alerts[?coin=<coin_id>]``: active price alerts; ``POST
+      /api/alerts`` with ``{"coin_id", "type": "above"|"below", "level"}``
+      sets one, ``DELETE /api/alerts/<id>`` removes one (requests from a
+      browser page on another origin are refused, and POST bodies must be
+      sent as ``application/json``)
+    - ``GET /api/status``: loop statistics
+
+    Market, portfolio and sentiment bodies are serialized once per
+    revision of the underlying data; their ETag is a hash of the body, so
+    a client sending ``If-None-Match`` gets a 304 without a body until the
+    data changes. Predictions are served from the cache while younger
+    than ``prediction_max_age`` and computed on a miss; only coins with a
+    trained model are predicted (models are trained by the service's
+    training loop, never on a request).
+    HTTP/1.1 keep-alive is supported.
+    """
+
+    def __init__(self, service, host: str = "127.0.0.1", port: int = 8765, prediction_max_age: Optional[float] = None):
+        """
+        Args:
+            service: CoinSentinelService whose state is served
+            host: Interface to bind (keep 127.0.0.1 unless a proxy fronts it)
+            port: TCP port (0 picks a free one, see ``port`` after start)
+            prediction_max_age: Seconds a cached prediction is served
+                (default: the service's prediction interval)
+        """
+        self.service = service
+        self.host = host
+        self.port = port
+        self.prediction_max_age = (
+            prediction_max_age if prediction_max_age is not None else service.config["prediction_interval"]
+        )
+        self.requests_served = 0
+        self._server = None
+        # name -> (revision, body, etag)
+        self._bodies: Dict[str, Tuple[int, bytes, str]] = {}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    # ==================== HTTP ====================
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    self._write(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                status, payload, etag = await self._respond(method, target, headers, body)
+                self._write(writer, status, payload, etag, keep_alive, head_only=method == "HEAD")
+                await writer.drain()
+                self.requests_served += 1
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _write(
+        self, writer, status: int, payload, etag: Optional[str] = None, keep_alive: bool = True, head_only: bool = False
+    ):
+        if isinstance(payload, dict):
+            payload = json.dumps(payload, default=_json_default).encode("utf-8")
+        payload = b"" if status == 304 else payload
+        head = [
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+            f"Date: {formatdate(usegmt=True)}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(payload)}",
+            "Cache-Control: no-cache",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if etag:
+            head.append(f"ETag: {etag}")
+        # HEAD gets the GET headers (including Content-Length) but no body
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + (b"" if head_only else payload))
+
+    async def _respond(self, method: str, target: str, headers: Dict, body: bytes):
+        """Route a request; returns (status, body bytes or dict, etag)"""
+        try:
+            url = urlsplit(target)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            parts = [unquote(part) for part in url.path.strip("/").split("/")]
+            if parts[0] != "api" or len(parts) < 2:
+                raise HttpError(404, "not found")
+
+            resource = parts[1]
+            if resource == "alerts":
+                return self._alert_request(method, parts, query, body, headers)
+            if resource == "predictions" and method == "POST" and len(parts) == 2:
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict):
+                    raise HttpError(400, "request body must be a JSON object")
+                result = await self._batch(request.get("coins") or [], request.get("time_frame", 1))
+                return self._fresh(result, headers)
+            if method not in ("GET", "HEAD"):
+                raise HttpError(405, "method not allowed")
+
+            if resource == "predictions":
+                time_frame = query.get("time_frame", 1)
+                if len(parts) == 3:
+                    result = await self._prediction(parts[2], time_frame)
+                elif "coins" in query:
+                    result = await self._batch(query["coins"].split(","), time_frame)
+                else:
+                    raise HttpError(400, "coin id or coins parameter required")
+                return self._fresh(result, headers)
+            if resource == "candles" and len(parts) == 3:
+                return self._fresh(self._candles(parts[2], query.get("interval", "1m")), headers)
+            if resource == "status" and len(parts) == 2:
+                return self._fresh(self.service.get_status(), headers)
+            if len(parts) == 2 and resource in ("market", "portfolio", "sentiment"):
+                return self._cached(resource, headers)
+            raise HttpError(404, "not found")
+        except HttpError as e:
+            return e.status, {"error": str(e)}, None
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            return 400, {"error": f"bad request: {e}"}, None
+        except Exception as e:
+            print(f"Error handling API request {target}: {e}")
+            return 500, {"error": "internal error"}, None
+
+    @staticmethod
+    def _not_modified(headers: Dict, etag: str) -> bool:
+        tags = [tag.strip() for tag in headers.get("if-none-match", "").split(",")]
+        return etag in tags or "*" in tags
+
+    def _cached(self, name: str, headers: Dict):
+        """Body serialized once per revision of the resource"""
+        revision = self.service.revisions.get(name, 0)
+        cached = self._bodies.get(name)
+        if cached is None or cached[0] != revision:
+            payload = self._payload(name)
+            body = json.dumps(payload, default=_json_default).encode("utf-8")
+            cached = (revision, body, _etag(body))
+            self._bodies[name] = cached
+        _, body, etag = cached
+        return (304 if self._not_modified(headers, etag) else 200), body, etag
+
+    def _fresh(self, payload: Dict, headers: Dict):
+        body = json.dumps(payload, default=_json_default).encode("utf-8")
+        etag = _etag(body)
+        return (304 if self._not_modified(headers, etag) else 200), body, etag
+
+    def _payload(self, name: str) -> Dict:
+        service = self.service
+        if name == "market":
+            if not service.top_coins:
+                raise HttpError(503, "market data not loaded yet")
+            return {
+                "updated_at": service.market_updated_at,
+                "currency": service.config["currency"],
+                "coins": service.top_coins,
+            }
+        if name == "portfolio":
+            if service.portfolio_summary is None:
+                raise HttpError(503, "portfolio not valued yet")
+            return service.portfolio_summary
+        if service.market_sentiment is None:
+            raise HttpError(503, "sentiment not loaded yet")
+        return service.market_sentiment
+
+    def _candles(self, coin_id: str, interval: str) -> Dict:
+        pipeline = self.service.tick_pipeline
+        if pipeline is None:
+            raise HttpError(404, "price streaming is disabled")
+        if interval not in pipeline.capacities:
+            raise HttpError(400, f"interval must be one of {', '.join(pipeline.capacities)}")
+        arrays = pipeline.candle_arrays(coin_id, interval)
+        if arrays is None:
+            raise HttpError(404, f"no streamed prices for {coin_id}")
+        times, values = arrays
+        return {
+            "coin_id": coin_id,
+            "interval": interval,
+            "columns": ["timestamp", "open", "high", "low", "close", "volume"],
+            "candles": [[ts, *row] for ts, row in zip(times.tolist(), values.T.tolist())],
+        }
+
+    # ==================== ALERTS ====================
+    @staticmethod
+    def _check_write(method: str, headers: Dict):
+        """
+        Refuse cross-site writes.
+
+        A page on another site can make the browser send a "simple" POST
+        (form or text/plain body) without a CORS preflight, so writes need a
+        JSON content type and, when the browser names one, a local Origin.
+        """
+        origin = headers.get("origin")
+        if origin is not None:
+            host = urlsplit(origin).netloc.rsplit("@", 1)[-1]
+            if host.startswith("["):
+                host = host[: host.find("]") + 1]
+            else:
+                host = host.split(":", 1)[0]
+            if host.lower() not in LOCAL_ORIGIN_HOSTS:
+                raise HttpError(403, f"origin {origin} not allowed")
+        if method == "POST":
+            content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+            if content_type != "application/json":
+                raise HttpError(415, "Content-Type must be application/json")
+
+    def _alert_request(self, method: str, parts: List[str], query: Dict, body: bytes, headers: Dict):
+        engine = self.service.alert_engine
+        if method in ("GET", "HEAD") and len(parts) == 2:
+            return self._fresh({"alerts": engine.get_alerts(query.get("coin"))}, headers)
+        if method in ("POST", "DELETE"):
+            self._check_write(method, headers)
+        if method == "POST" and len(parts) == 2:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise HttpError(400, "request body must be a JSON object")
+            coin_id, alert_type, level = request.get("coin_id"), request.get("type"), request.get("level")
+            if not isinstance(coin_id, str) or not coin_id.strip():
+                raise HttpError(400, "coin_id required")
+            if alert_type not in ("above", "below"):
+                raise HttpError(400, "type must be 'above' or 'below'")
+            if isinstance(level, bool) or not isinstance(level, (int, float)) or not level > 0:
+                raise HttpError(400, "level must be a positive number")
+            coin_id = coin_id.strip()
+            symbol = request.get("symbol") if isinstance(request.get("symbol"), str) else None
+            if symbol is None:
+                symbol = next((coin.get("symbol") for coin in self.service.top_coins if coin.get("id") == coin_id), None)
+            alert_id = engine.add_alert(coin_id, alert_type, level, symbol)
+            engine.save_alerts()
+            # Checked against the latest prices right away
+            self.service._prices_updated.set()
+            alert = next(alert for alert in engine.get_alerts(coin_id) if alert["id"] == alert_id)
+            return self._fresh({"alert": alert}, headers)
+        if method == "DELETE" and len(parts) == 3:
+            try:
+                alert_id = int(parts[2])
+            except ValueError:
+                raise HttpError(400, "alert id must be an integer")
+            if not engine.remove_alert(alert_id):
+                raise HttpError(404, f"no alert {alert_id}")
+            engine.save_alerts()
+            return self._fresh({"deleted": alert_id}, headers)
+        if len(parts) in (2, 3):
+            raise HttpError(405, "method not allowed")
+        raise HttpError(404, "not found")
+
+    # ==================== PREDICTIONS ====================
+    async def _prediction(self, coin_id: str, time_frame) -> Dict:
+        time_frame = int(time_frame)
+        if not 1 <= time_frame <= 30:
+            raise HttpError(400, "time_frame must be between 1 and 30 days")
+        cached = self.service.predictions.get((coin_id, time_frame))
+        if cached and time.time() - cached["updated_at"] < self.prediction_max_age:
+            return cached
+        if not self.service.predictor.has_model(coin_id):
+            if coin_id in self.service.model_coins():
+                raise HttpError(503, f"model for {coin_id} is not trained yet")
+            raise HttpError(404, f"no trained model for {coin_id}")
+        prediction = await self.service.predict(coin_id, time_frame)
+        if prediction is None:
+            raise HttpError(404, f"no price for {coin_id}")
+        return prediction
+
+    async def _batch(self, coins: List[str], time_frame) -> Dict:
+        if not isinstance(coins, list) or not all(isinstance(coin_id, str) for coin_id in coins):
+            raise HttpError(400, "coins must be a list of coin ids")
+        coins = [coin_id.strip() for coin_id in coins if coin_id and coin_id.strip()]
+        if not coins:
+            raise HttpError(400, "no coins given")
+        if len(coins) > MAX_BATCH:
+            raise HttpError(400, f"at most {MAX_BATCH} coins per request")
+
+        async def one(coin_id):
+            try:
+                return coin_id, await self._prediction(coin_id, time_frame)
+            except HttpError as e:
+                if e.status == 400:
+                    raise
+                return coin_id, {"error": str(e)}
+
+        # Misses run concurrently, bounded by the service's prediction limit
+        results = await asyncio.gather(*(one(coin_id) for coin_id in coins))
+        return {"predictions": dict(results)}
+
+
+# Example usage: load test against synthetic state
+if __name__ == "__main__":
+    import statistics
+    import sys
+
+    from headless_service import CoinSentinelService
+
+    CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    REQUESTS = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    async def client(port, path, conditional, latencies):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        etag = None
+        for _ in range(REQUESTS):
+            extra = f"If-None-Match: {etag}\r\n" if conditional and etag else ""
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{extra}\r\n".encode())
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line == b"\r\n":
+                    break
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+                elif name.lower() == "etag":
+                    etag = value.strip()
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    async def main():
+        service = CoinSentinelService({"api_port": 0})
+        service.top_coins = [
+            {
+                "id": f"coin-{i}",
+                "symbol": f"c{i}",
+                "name": f"Coin {i}",
+                "market_cap_rank": i + 1,
+                "current_price": 100.0 + i,
+                "market_cap": 1e9 / (i + 1),
+                "total_volume": 1e6,
+                "price_change_percentage_24h": 1.5,
+            }
+            for i in range(100)
+        ]
+        service.market_updated_at = time.time()
+        service.revisions["market"] = 1
+        server = ApiServer(service, port=0)
+        await server.start()
+
+        for conditional in (False, True):
+            latencies = []
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(client(server.port, "/api/market", conditional, latencies) for _ in range(CLIENTS))
+            )
+            elapsed = time.perf_counter() - start
+            latencies.sort()
+            print(
+                f"{'If-None-Match' if conditional else 'full body    '}: {CLIENTS} clients x {REQUESTS} requests, "
+                f"{len(latencies) / elapsed:,.0f} req/s, "
+                f"p50 {statistics.median(latencies) * 1000:.2f} ms, "
+                f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms"
+            )
+        await server.stop()
+
+    asyncio.run(main())
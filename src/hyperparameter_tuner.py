@@ -0,0 +1,384 @@
+# src/hyperparameter_tuner.py - Time-series CV hyperparameter search for the ensemble
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import joblib
+from sklearn.model_selection import TimeSeriesSplit, ParameterSampler
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import mean_absolute_error
+
+from improved_price_predictor import build_stacking_ensemble, TUNED_PARAMS_FILE
+
+# Search space over the stacking ensemble (keys follow StackingRegressor.set_params)
+DEFAULT_PARAM_SPACE = {
+    "rf__n_estimators": [50, 100, 200, 300],
+    "rf__max_depth": [None, 5, 10, 20],
+    "rf__min_samples_split": [2, 5, 10],
+    "gb__n_estimators": [50, 100, 200],
+    "gb__learning_rate": [0.01, 0.05, 0.1, 0.2],
+    "gb__max_depth": [2, 3, 5],
+    "hgb__max_iter": [100, 200, 400],
+    "hgb__learning_rate": [0.03, 0.1, 0.2],
+    "hgb__max_leaf_nodes": [15, 31, 63],
+}
+
+# Market-cap rank buckets used for pooled tuning
+MARKET_CAP_BUCKETS = {
+    "large": (1, 10),
+    "mid": (11, 50),
+    "small": (51, None),
+}
+
+
+def market_cap_bucket(rank: Optional[int]) -> str:
+    """Map a market-cap rank to its tuning bucket name"""
+    if not rank:
+        return "small"
+    for name, (low, high) in MARKET_CAP_BUCKETS.items():
+        if rank >= low and (high is None or rank <= high):
+            return name
+    return "small"
+
+
+def _evaluate_fold(fold_path: str, params: Dict) -> float:
+    """
+    Fit one candidate on one cached fold and return its MAE.
+
+    Runs inside a worker process. Fold matrices are memory-mapped, so every
+    candidate reads the same cached features without copying or rebuilding them.
+    """
+    fold = joblib.load(fold_path, mmap_mode="r")
+    model = build_stacking_ensemble(params, n_jobs=1)
+    model.fit(fold["X_train"], fold["y_train"])
+    y_pred = model.predict(fold["X_test"])
+    return float(mean_absolute_error(fold["y_test"], y_pred))
+
+
+class HyperparameterTuner:
+    """
+    Random or successive-halving search over the stacking ensemble using
+    walk-forward (TimeSeriesSplit) cross-validation.
+
+    Fold feature matrices are built once per coin/bucket, cached on disk and
+    shared by all candidates. Candidates are evaluated on a bounded process
+    pool and the winners are saved to ``models/tuned_params.json``, which
+    ``AdvancedPricePredictor.train_ensemble_model`` picks up automatically.
+    """
+
+    def __init__(
+        self,
+        predictor,
+        n_splits: int = 5,
+        max_workers: Optional[int] = None,
+        param_space: Optional[Dict] = None,
+        random_state: int = 42,
+    ):
+        self.predictor = predictor
+        self.n_splits = n_splits
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.param_space = param_space or DEFAULT_PARAM_SPACE
+        self.random_state = random_state
+        self.model_dir = predictor.model_dir
+        self.cache_dir = os.path.join(self.model_dir, "tuning_cache")
+        self.tuned_file = os.path.join(self.model_dir, TUNED_PARAMS_FILE)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ==================== FOLD CACHE ====================
+    def _load_universe(self, coin_ids: List[str], days: int) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Fetch history for all coins and build their feature matrices (feature store backed)"""
+        histories = {}
+        for coin_id in coin_ids:
+            df = self.predictor.api.get_coin_history(coin_id, days=days)
+            if df is not None and len(df) >= 30:
+                histories[coin_id] = df
+        return {
+            coin_id: (X, y)
+            for coin_id, (X, y) in self.predictor.prepare_universe_features(histories).items()
+            if len(X) >= self.n_splits * 10
+        }
+
+    def build_fold_cache(self, key: str, coin_ids: List[str], days: int = 90) -> List[str]:
+        """
+        Build scaled walk-forward folds for one or more coins and cache them.
+
+        For a bucket, fold ``i`` concatenates fold ``i`` of every member coin so
+        the time ordering inside each coin is preserved.
+
+        Returns:
+            List of fold file paths (oldest fold first)
+        """
+        fold_dir = os.path.join(self.cache_dir, key)
+        fold_paths = [
+            os.path.join(fold_dir, f"fold_{i}.joblib") for i in range(self.n_splits)
+        ]
+        if all(os.path.exists(p) for p in fold_paths):
+            return fold_paths
+
+        splitter = TimeSeriesSplit(n_splits=self.n_splits)
+        parts = [
+            {"X_train": [], "y_train": [], "X_test": [], "y_test": []}
+            for _ in range(self.n_splits)
+        ]
+
+        universe = self._load_universe(coin_ids, days)
+        for coin_id in coin_ids:
+            if coin_id not in universe:
+                print(f"Tuning: skipping {coin_id} (insufficient data)")
+                continue
+            X, y = universe[coin_id]
+            for i, (train_idx, test_idx) in enumerate(splitter.split(X)):
+                parts[i]["X_train"].append(X[train_idx])
+                parts[i]["y_train"].append(y[train_idx])
+                parts[i]["X_test"].append(X[test_idx])
+                parts[i]["y_test"].append(y[test_idx])
+
+        if not parts[0]["X_train"]:
+            return []
+
+        self._write_folds(fold_paths, parts)
+        return fold_paths
+
+    def build_window_folds(self, key: str, X: np.ndarray, y: np.ndarray) -> List[str]:
+        """
+        Build scaled walk-forward folds from one feature window and cache them.
+
+        Used for nested backtests: the window is an outer fold's training
+        data, so the search never sees the block that fold is scored on.
+
+        Returns:
+            List of fold file paths (oldest fold first), empty if the window
+            is too short to split
+        """
+        if len(X) < self.n_splits * 10:
+            return []
+        fold_paths = [
+            os.path.join(self.cache_dir, key, f"fold_{i}.joblib") for i in range(self.n_splits)
+        ]
+        parts = [
+            {"X_train": [X[train_idx]], "y_train": [y[train_idx]], "X_test": [X[test_idx]], "y_test": [y[test_idx]]}
+            for train_idx, test_idx in TimeSeriesSplit(n_splits=self.n_splits).split(X)
+        ]
+        self._write_folds(fold_paths, parts)
+        return fold_paths
+
+    def _write_folds(self, fold_paths: List[str], parts: List[Dict]):
+        """Concatenate, scale (on the training rows only) and save each fold"""
+        os.makedirs(os.path.dirname(fold_paths[0]), exist_ok=True)
+        for i, part in enumerate(parts):
+            X_train = np.concatenate(part["X_train"])
+            X_test = np.concatenate(part["X_test"])
+            scaler = StandardScaler()
+            fold = {
+                "X_train": scaler.fit_transform(X_train),
+                "y_train": np.concatenate(part["y_train"]),
+                "X_test": scaler.transform(X_test),
+                "y_test": np.concatenate(part["y_test"]),
+            }
+            joblib.dump(fold, fold_paths[i])
+
+    def clear_cache(self, key: Optional[str] = None):
+        """Drop cached folds for one key (or all keys)"""
+        path = os.path.join(self.cache_dir, key) if key else self.cache_dir
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ==================== SEARCH ====================
+    def _score_candidates(
+        self,
+        executor: ProcessPoolExecutor,
+        fold_paths: List[str],
+        candidates: List[Dict],
+        candidate_ids: List[int],
+        fold_ids: List[int],
+        fold_scores: Dict[Tuple[int, int], float],
+    ) -> Dict[int, float]:
+        """Score candidates on the given folds, reusing fold scores already computed"""
+        futures = {}
+        for c_idx in candidate_ids:
+            for f_idx in fold_ids:
+                if (c_idx, f_idx) in fold_scores:
+                    continue
+                future = executor.submit(
+                    _evaluate_fold, fold_paths[f_idx], candidates[c_idx]
+                )
+                futures[future] = (c_idx, f_idx)
+
+        for future in as_completed(futures):
+            c_idx, f_idx = futures[future]
+            try:
+                fold_scores[(c_idx, f_idx)] = future.result()
+            except Exception as e:
+                print(f"Tuning: candidate {c_idx} failed on fold {f_idx}: {e}")
+                fold_scores[(c_idx, f_idx)] = float("inf")
+
+        return {
+            c_idx: float(np.mean([fold_scores[(c_idx, f)] for f in fold_ids]))
+            for c_idx in candidate_ids
+        }
+
+    def search(
+        self,
+        fold_paths: List[str],
+        method: str = "halving",
+        n_candidates: int = 20,
+        eta: int = 3,
+    ) -> Optional[Dict]:
+        """
+        Run a random or successive-halving search over cached folds.
+
+        Successive halving uses the number of walk-forward folds as the
+        resource: every candidate starts on the most recent fold, and only
+        the best ``1/eta`` advance to be scored on more folds. Fold scores
+        from earlier rounds are reused, so survivors only fit the new folds.
+
+        Returns:
+            Dictionary with best params, CV MAE and search metadata
+        """
+        if not fold_paths:
+            return None
+        if method not in ("random", "halving"):
+            raise ValueError(f"Unknown search method: {method}")
+
+        candidates = list(
+            ParameterSampler(
+                self.param_space, n_iter=n_candidates, random_state=self.random_state
+            )
+        )
+        n_folds = len(fold_paths)
+        fold_scores = {}
+        survivors = list(range(len(candidates)))
+        resource = n_folds if method == "random" else 1
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                # Most recent folds first: they have the longest training windows
+                fold_ids = list(range(n_folds - resource, n_folds))
+                scores = self._score_candidates(
+                    executor, fold_paths, candidates, survivors, fold_ids, fold_scores
+                )
+                if resource >= n_folds or len(survivors) <= 1:
+                    break
+                keep = max(1, len(survivors) // eta)
+                survivors = sorted(survivors, key=lambda c: scores[c])[:keep]
+                resource = min(n_folds, resource * eta)
+
+        best = min(survivors, key=lambda c: scores[c])
+        return {
+            "params": candidates[best],
+            "cv_mae": scores[best],
+            "method": method,
+            "n_candidates": len(candidates),
+            "n_folds": n_folds,
+            "fits": len(fold_scores),
+            "tuned_at": datetime.now().isoformat(),
+        }
+
+    # ==================== PUBLIC ENTRY POINTS ====================
+    def _cache_key(self, kind: str, name: str, days: int) -> str:
+        """Fold cache key; includes the date so folds are rebuilt on fresh data daily"""
+        self.prune_cache()
+        return f"{kind}_{name}_{days}d_{datetime.now().strftime('%Y%m%d')}"
+
+    def prune_cache(self) -> int:
+        """Delete fold caches built on earlier days (their keys are never reused); returns keys removed"""
+        today = datetime.now().strftime("%Y%m%d")
+        removed = 0
+        try:
+            for key in os.listdir(self.cache_dir):
+                day = key.rsplit("_", 1)[-1]
+                if day.isdigit() and len(day) == 8 and day != today:
+                    shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+                    removed += 1
+        except OSError as e:
+            print(f"Error pruning tuning cache: {e}")
+        return removed
+
+    def tune_coin(self, coin_id: str, days: int = 90, method: str = "halving", n_candidates: int = 20) -> Optional[Dict]:
+        """Tune the ensemble for a single coin and save the winner"""
+        fold_paths = self.build_fold_cache(self._cache_key("coin", coin_id, days), [coin_id], days)
+        result = self.search(fold_paths, method=method, n_candidates=n_candidates)
+        if result:
+            self.save_result("coins", coin_id, result)
+            print(f"Tuning: {coin_id} best CV MAE {result['cv_mae']:.4f}")
+        return result
+
+    def tune_window(self, key: str, X: np.ndarray, y: np.ndarray, method: str = "halving", n_candidates: int = 20) -> Optional[Dict]:
+        """
+        Tune on one feature window without saving the winner.
+
+        The window's folds are cached under ``key`` only for the search and
+        dropped afterwards.
+        """
+        try:
+            fold_paths = self.build_window_folds(key, X, y)
+            return self.search(fold_paths, method=method, n_candidates=n_candidates)
+        finally:
+            self.clear_cache(key)
+
+    def tune_bucket(self, bucket: str, coin_ids: List[str], days: int = 90, method: str = "halving", n_candidates: int = 20) -> Optional[Dict]:
+        """Tune one shared configuration for all coins of a market-cap bucket"""
+        fold_paths = self.build_fold_cache(self._cache_key("bucket", bucket, days), coin_ids, days)
+        result = self.search(fold_paths, method=method, n_candidates=n_candidates)
+        if result:
+            result["coins"] = list(coin_ids)
+            self.save_result("buckets", bucket, result)
+            print(f"Tuning: bucket '{bucket}' best CV MAE {result['cv_mae']:.4f}")
+        return result
+
+    def tune_market_buckets(self, coins: List[Dict], days: int = 90, method: str = "halving", n_candidates: int = 20) -> Dict:
+        """
+        Tune one configuration per market-cap bucket.
+
+        Args:
+            coins: Coin dicts as returned by ``get_top_coins`` (need 'id' and
+                'market_cap_rank')
+        """
+        buckets = {}
+        for coin in coins:
+            bucket = market_cap_bucket(coin.get("market_cap_rank"))
+            buckets.setdefault(bucket, []).append(coin["id"])
+
+        results = {}
+        for bucket, coin_ids in buckets.items():
+            results[bucket] = self.tune_bucket(bucket, coin_ids, days, method, n_candidates)
+        return results
+
+    def save_result(self, section: str, key: str, result: Dict):
+        """Merge one search result into the tuned params file"""
+        try:
+            tuned = {}
+            if os.path.exists(self.tuned_file):
+                with open(self.tuned_file, "r") as f:
+                    tuned = json.load(f)
+            tuned.setdefault(section, {})[key] = result
+            tmp_file = self.tuned_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(tuned, f, indent=2)
+            os.replace(tmp_file, self.tuned_file)
+        except Exception as e:
+            print(f"Error saving tuned params: {e}")
+
+
+# Example usage
+if __name__ == "__main__":
+    from api_handler import EnhancedCryptoAPIHandler
+    from improved_price_predictor import AdvancedPricePredictor
+
+    api = EnhancedCryptoAPIHandler()
+    predictor = AdvancedPricePredictor(api)
+    predictor.fgi_store.refresh()
+    tuner = HyperparameterTuner(predictor, max_workers=2)
+
+    result = tuner.tune_coin("bitcoin", days=90, n_candidates=9)
+    if result:
+        print(f"Best params: {result['params']}")
+        print(f"CV MAE: {result['cv_mae']:.4f}")
+
+        success, message = predictor.train_ensemble_model("bitcoin")
+        print(message)
@@ -1,13 +1,16 @@
 from pycoingecko import CoinGeckoAPI
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
 
+from candles import CandleRing, align_nearest, market_points
+from coin_catalog import CoinCatalog
+
 class ImprovedCryptoDataFetcher:
     def __init__(self):
         self.cg = CoinGeckoAPI()
         self.coin_id_cache = {}
+        self.catalog = CoinCatalog()
         
     def get_coin_id(self, symbol):
         """
@@ -48,13 +51,13 @@ class ImprovedCryptoDataFetcher:
             self.coin_id_cache[symbol] = coin_id
             return coin_id
         
-        # If not in common mappings, search
+        # If not in common mappings, look it up in the local catalog
         try:
-            coins_list = self.cg.get_coins_list()
-            for coin in coins_list:
-                if coin['symbol'].lower() == symbol:
-                    self.coin_id_cache[symbol] = coin['id']
-                    return coin['id']
+            self.catalog.refresh()
+            coin_id = self.catalog.resolve(symbol)
+            if coin_id:
+                self.coin_id_cache[symbol] = coin_id
+                return coin_id
         except Exception as e:
             print(f"Error finding coin ID for {symbol}: {e}")
         
@@ -96,7 +99,9 @@ class ImprovedCryptoDataFetcher:
             interval: 'daily' or 'hourly' (hourly limited to 90 days)
             
         Returns:
-            Dictionary with prices, volumes, market_caps, and timestamps
+            Dictionary with timestamps and open/high/low/close/volume (OHLC,
+            up to 90 days) or prices/volumes/market_caps (market chart) as
+            NumPy views of the 'candles' CandleRing holding them
         """
         coin_id = self.get_coin_id(symbol)
         if not coin_id:
@@ -113,12 +118,6 @@ class ImprovedCryptoDataFetcher:
                 )
                 
                 if ohlc_data:
-                    df = pd.DataFrame(
-                        ohlc_data,
-                        columns=['timestamp', 'open', 'high', 'low', 'close']
-                    )
-                    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                    
                     # Also get volume data
                     market_chart = self.cg.get_coin_market_chart_by_id(
                         id=coin_id,
@@ -126,27 +125,17 @@ class ImprovedCryptoDataFetcher:
                         days=days
                     )
                     
-                    volumes = pd.DataFrame(
-                        market_chart['total_volumes'],
-                        columns=['timestamp', 'volume']
-                    )
-                    volumes['timestamp'] = pd.to_datetime(volumes['timestamp'], unit='ms')
-                    
-                    # Merge OHLC with volumes
-                    df = pd.merge_asof(
-                        df.sort_values('timestamp'),
-                        volumes.sort_values('timestamp'),
-                        on='timestamp',
-                        direction='nearest'
-                    )
+                    # OHLC rows with the nearest volume point, in contiguous arrays
+                    candles = CandleRing.from_ohlc(ohlc_data, market_chart.get('total_volumes'))
                     
                     return {
-                        'timestamps': df['timestamp'].tolist(),
-                        'open': df['open'].tolist(),
-                        'high': df['high'].tolist(),
-                        'low': df['low'].tolist(),
-                        'close': df['close'].tolist(),
-                        'volume': df['volume'].fillna(0).tolist()
+                        'candles': candles,
+                        'timestamps': candles.datetimes,
+                        'open': candles.open,
+                        'high': candles.high,
+                        'low': candles.low,
+                        'close': candles.close,
+                        'volume': candles.volume
                     }
             
             # Fallback to market chart data
@@ -156,33 +145,24 @@ class ImprovedCryptoDataFetcher:
                 days=days
             )
             
-            prices_df = pd.DataFrame(
+            # CoinGecko returns hourly points up to 90 days, daily beyond
+            candles = CandleRing.from_market_chart(
                 market_chart['prices'],
-                columns=['timestamp', 'price']
-            )
-            volumes_df = pd.DataFrame(
-                market_chart['total_volumes'],
-                columns=['timestamp', 'volume']
+                market_chart.get('total_volumes'),
+                interval=3600 if days <= 90 else 86400
             )
-            market_caps_df = pd.DataFrame(
-                market_chart['market_caps'],
-                columns=['timestamp', 'market_cap']
+            cap_times, caps = market_points(market_chart.get('market_caps'))
+            market_caps = (
+                np.nan_to_num(align_nearest(cap_times // 1000, caps, candles.timestamps))
+                if len(caps) and len(candles) else np.zeros(len(candles))
             )
             
-            # Convert timestamps
-            prices_df['timestamp'] = pd.to_datetime(prices_df['timestamp'], unit='ms')
-            volumes_df['timestamp'] = pd.to_datetime(volumes_df['timestamp'], unit='ms')
-            market_caps_df['timestamp'] = pd.to_datetime(market_caps_df['timestamp'], unit='ms')
-            
-            # Merge all data
-            df = prices_df.merge(volumes_df, on='timestamp', how='left')
-            df = df.merge(market_caps_df, on='timestamp', how='left')
-            
             return {
-                'timestamps': df['timestamp'].tolist(),
-                'prices': df['price'].tolist(),
-                'volumes': df['volume'].fillna(0).tolist(),
-                'market_caps': df['market_cap'].fillna(0).tolist()
+                'candles': candles,
+                'timestamps': candles.datetimes,
+                'prices': candles.close,
+                'volumes': candles.volume,
+                'market_caps': market_caps
             }
             
         except Exception as e:
@@ -324,8 +304,9 @@ if __name__ == "__main__":
     print("\nFetching Bitcoin historical data...")
     btc_data = fetcher.get_historical_data('BTC', days=90)
     if btc_data:
-        print(f"Retrieved {len(btc_data['prices'])} data points")
-        print(f"Latest price: ${btc_data['prices'][-1]:,.2f}")
+        candles = btc_data['candles']
+        print(f"Retrieved {len(candles)} candles ({candles.nbytes:,} bytes)")
+        print(f"Latest price: ${candles.close[-1]:,.2f}")
     
     # Get detailed info
     print("\nFetching detailed Bitcoin info...")
@@ -6,12 +6,13 @@ from PyQt5.QtWidgets import (
     QLineEdit,
     QComboBox,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QHeaderView,
 )
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QBrush, QColor
+from PyQt5.QtGui import QBrush, QColor, QStandardItem, QStandardItemModel
+
+from coin_filter import CoinFilterProxyModel, debounced
 
 
 class ImprovedMarketTab(QWidget):
@@ -37,7 +38,7 @@ class ImprovedMarketTab(QWidget):
         controls_layout.addWidget(QLabel("🔍 Search:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Type coin name or symbol...")
-        self.search_input.textChanged.connect(self.filter_coins)
+        self.search_timer = debounced(self.search_input.textChanged, self.filter_coins, parent=self)
         self.search_input.setMinimumWidth(200)
         controls_layout.addWidget(self.search_input)
 
@@ -87,10 +88,13 @@ class ImprovedMarketTab(QWidget):
         )
         layout.addWidget(self.status_label)
 
-        # Create table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(
+        # Create table; the proxy filters by name/symbol and sorts
+        self.model = QStandardItemModel(0, 6, self)
+        self.proxy = CoinFilterProxyModel(key_columns=(1, 2), parent=self)
+        self.proxy.setSourceModel(self.model)
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.model.setHorizontalHeaderLabels(
             ["Rank", "Coin", "Symbol", "Price", "24h Change", "Market Cap"]
         )
         self.table.setMinimumSize(600, 400)
@@ -136,7 +140,8 @@ class ImprovedMarketTab(QWidget):
             print("No coins data to update table")
             return
 
-        self.table.setRowCount(len(self.coins_data))
+        self.proxy.begin_update()
+        self.model.setRowCount(len(self.coins_data))
 
         for row, coin in enumerate(self.coins_data):
             rank = coin.get("market_cap_rank", row + 1)
@@ -146,9 +151,9 @@ class ImprovedMarketTab(QWidget):
             change_24h = coin.get("price_change_percentage_24h_in_currency", 0)
             market_cap = coin.get("market_cap", 0)
 
-            self.table.setItem(row, 0, QTableWidgetItem(str(rank)))
-            self.table.setItem(row, 1, QTableWidgetItem(name))
-            self.table.setItem(row, 2, QTableWidgetItem(symbol))
+            self.model.setItem(row, 0, QStandardItem(str(rank)))
+            self.model.setItem(row, 1, QStandardItem(name))
+            self.model.setItem(row, 2, QStandardItem(symbol))
 
             if price >= 1:
                 price_text = f"${price:,.2f}"
@@ -156,14 +161,14 @@ class ImprovedMarketTab(QWidget):
                 price_text = f"${price:.4f}"
             else:
                 price_text = f"${price:.8f}"
-            self.table.setItem(row, 3, QTableWidgetItem(price_text))
+            self.model.setItem(row, 3, QStandardItem(price_text))
 
-            change_item = QTableWidgetItem(f"{change_24h:+.2f}%")
+            change_item = QStandardItem(f"{change_24h:+.2f}%")
             if change_24h > 0:
                 change_item.setForeground(QBrush(QColor("#27ae60")))
             elif change_24h < 0:
                 change_item.setForeground(QBrush(QColor("#e74c3c")))
-            self.table.setItem(row, 4, change_item)
+            self.model.setItem(row, 4, change_item)
 
             if market_cap >= 1e12:
                 mcap_text = f"${market_cap/1e12:.2f}T"
@@ -173,8 +178,9 @@ class ImprovedMarketTab(QWidget):
                 mcap_text = f"${market_cap/1e6:.2f}M"
             else:
                 mcap_text = f"${market_cap:,.0f}"
-            self.table.setItem(row, 5, QTableWidgetItem(mcap_text))
+            self.model.setItem(row, 5, QStandardItem(mcap_text))
 
+        self.proxy.end_update()
         self.table.resizeColumnsToContents()
         print("Table updated")
 
@@ -206,50 +212,35 @@ class ImprovedMarketTab(QWidget):
             },
         ]
 
-        self.table.setRowCount(len(sample_coins))
+        self.proxy.begin_update()
+        self.model.setRowCount(len(sample_coins))
 
         for row, coin in enumerate(sample_coins):
-            self.table.setItem(row, 0, QTableWidgetItem(str(coin["rank"])))
-            self.table.setItem(row, 1, QTableWidgetItem(coin["name"]))
-            self.table.setItem(row, 2, QTableWidgetItem(coin["symbol"].upper()))
+            self.model.setItem(row, 0, QStandardItem(str(coin["rank"])))
+            self.model.setItem(row, 1, QStandardItem(coin["name"]))
+            self.model.setItem(row, 2, QStandardItem(coin["symbol"].upper()))
 
             price_text = (
                 f"${coin['price']:,.2f}"
                 if coin["price"] >= 1
                 else f"${coin['price']:.4f}"
             )
-            self.table.setItem(row, 3, QTableWidgetItem(price_text))
+            self.model.setItem(row, 3, QStandardItem(price_text))
 
-            change_item = QTableWidgetItem(f"{coin['change']:+.2f}%")
+            change_item = QStandardItem(f"{coin['change']:+.2f}%")
             if coin["change"] > 0:
                 change_item.setForeground(QBrush(QColor("#27ae60")))
             elif coin["change"] < 0:
                 change_item.setForeground(QBrush(QColor("#e74c3c")))
-            self.table.setItem(row, 4, change_item)
+            self.model.setItem(row, 4, change_item)
 
             mcap = coin["market_cap"]
             mcap_text = f"${mcap/1e9:.1f}B" if mcap >= 1e9 else f"${mcap/1e6:.1f}M"
-            self.table.setItem(row, 5, QTableWidgetItem(mcap_text))
+            self.model.setItem(row, 5, QStandardItem(mcap_text))
 
+        self.proxy.end_update()
         self.table.resizeColumnsToContents()
         print("Sample data loaded")
 
     def filter_coins(self):
-        search_text = self.search_input.text().lower()
-
-        if not search_text:
-            for row in range(self.table.rowCount()):
-                self.table.setRowHidden(row, False)
-            return
-
-        for row in range(self.table.rowCount()):
-            name_item = self.table.item(row, 1)
-            symbol_item = self.table.item(row, 2)
-
-            show_row = False
-            if name_item and search_text in name_item.text().lower():
-                show_row = True
-            elif symbol_item and search_text in symbol_item.text().lower():
-                show_row = True
-
-            self.table.setRowHidden(row, not show_row)
+        self.proxy.set_query(self.search_input.text())
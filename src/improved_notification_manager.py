@@ -1,12 +1,12 @@
 import plyer
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-import json
 import os
 from pathlib import Path
 
+from email_dispatcher import EmailDispatcher
+from notification_history import NotificationHistory
+from cooldown_store import CooldownStore
+
 class ImprovedNotificationManager:
     def __init__(self, email_config=None):
         """
@@ -21,16 +21,18 @@ class ImprovedNotificationManager:
                 - use_tls: Whether to use TLS (default True)
         """
         self.email_config = email_config or {}
-        self.notification_history = []
-        self.max_history = 100
-        self.history_file = "notification_history.json"
+        self.history = NotificationHistory()
+        self.history_file = "notification_history.json"  # legacy, migrated on load
         self.load_history()
         
-        # Alert cooldown to prevent spam (in seconds)
-        self.alert_cooldowns = {}
-        self.cooldown_period = 300  # 5 minutes default
+        # Alert cooldowns to prevent spam (per key class, persisted)
+        self.cooldowns = CooldownStore()
+        self.cooldowns.load()
+        
+        # Background email delivery (created on first email)
+        self.dispatcher = None
     
-    def send_desktop_notification(self, title, message, app_name="CoinSentinel", timeout=10):
+    def send_desktop_notification(self, title, message, app_name="CoinSentinel", timeout=10, coin=None):
         """
         Send desktop notification with better error handling.
         
@@ -39,6 +41,7 @@ class ImprovedNotificationManager:
             message: Notification message
             app_name: Application name to display
             timeout: How long to show notification (seconds)
+            coin: Optional coin symbol recorded in the history
         """
         try:
             plyer.notification.notify(
@@ -48,68 +51,65 @@ class ImprovedNotificationManager:
                 timeout=timeout
             )
             
-            self._log_notification('desktop', title, message)
+            self._log_notification('desktop', title, message, coin=coin)
             return True
             
         except Exception as e:
             print(f"Desktop notification error: {e}")
             return False
     
-    def send_email_alert(self, recipient, subject, body, html_body=None):
+    def send_email_alert(self, recipient, subject, body, html_body=None, digest=False):
         """
-        Send email alert with HTML support and better formatting.
+        Queue an email alert for background delivery.
+        
+        Delivery happens on the dispatcher thread over a reused SMTP session,
+        so this never blocks the caller. Bursts of digestable alerts for the
+        same recipient are merged into one digest email.
         
         Args:
             recipient: Recipient email address or list of addresses
             subject: Email subject
             body: Plain text email body
             html_body: Optional HTML email body
+            digest: Whether this email may be merged into a digest
             
         Returns:
-            Boolean indicating success
+            Boolean indicating the email was queued
         """
         if not self._validate_email_config():
             print("Email configuration is incomplete. Please configure SMTP settings.")
             return False
         
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.email_config.get('sender_email')
-            msg['To'] = recipient if isinstance(recipient, str) else ', '.join(recipient)
-            msg['Subject'] = subject
-            msg['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
-            
-            # Attach plain text
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Attach HTML if provided
-            if html_body:
-                msg.attach(MIMEText(html_body, 'html'))
-            
-            # Send email
-            with smtplib.SMTP(
-                self.email_config.get('smtp_server', 'smtp.gmail.com'),
-                self.email_config.get('port', 587)
-            ) as server:
-                if self.email_config.get('use_tls', True):
-                    server.starttls()
-                
-                server.login(
-                    self.email_config['sender_email'],
-                    self.email_config['password']
+            if self.dispatcher is None:
+                self.dispatcher = EmailDispatcher(
+                    self.email_config, on_sent=self._on_email_sent
                 )
-                
-                server.send_message(msg)
-            
-            self._log_notification('email', subject, body, recipient)
+            self.dispatcher.submit(recipient, subject, body, html_body, digest=digest)
             return True
             
         except Exception as e:
             print(f"Email notification error: {e}")
             return False
     
-    def send_price_alert(self, coin_symbol, current_price, alert_type, threshold_price):
+    def _on_email_sent(self, recipient, subject, body):
+        """Record an email once the dispatcher has delivered it."""
+        self._log_notification('email', subject, body, recipient)
+    
+    def close(self, timeout=10.0):
+        """
+        Flush queued emails, write the history and persist cooldowns.
+        
+        Args:
+            timeout: Seconds to wait for queued emails (those still unsent
+                afterwards are dropped and logged)
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.stop(timeout)
+        self.history.flush()
+        self.cooldowns.save()
+    
+    def send_price_alert(self, coin_symbol, current_price, alert_type, threshold_price, cooldown_class='price_alert'):
         """
         Send price alert notification (desktop + optional email).
         
@@ -118,10 +118,11 @@ class ImprovedNotificationManager:
             current_price: Current price
             alert_type: 'above' or 'below'
             threshold_price: Alert threshold price
+            cooldown_class: Cooldown policy applied to this alert
         """
         # Check cooldown
         cooldown_key = f"{coin_symbol}_{alert_type}_{threshold_price}"
-        if not self._check_cooldown(cooldown_key):
+        if not self._check_cooldown(cooldown_key, cooldown_class):
             return False
         
         # Create notification message
@@ -133,7 +134,7 @@ class ImprovedNotificationManager:
             message = f"{coin_symbol} has fallen below ${threshold_price:,.2f}\nCurrent price: ${current_price:,.2f}"
         
         # Send desktop notification
-        self.send_desktop_notification(title, message)
+        self.send_desktop_notification(title, message, coin=coin_symbol)
         
         # Send email if configured
         if self._validate_email_config() and self.email_config.get('send_alerts', False):
@@ -141,7 +142,7 @@ class ImprovedNotificationManager:
                 coin_symbol, current_price, alert_type, threshold_price
             )
             recipient = self.email_config.get('alert_recipient', self.email_config.get('sender_email'))
-            self.send_email_alert(recipient, title, message, html_body)
+            self.send_email_alert(recipient, title, message, html_body, digest=True)
         
         return True
     
@@ -196,43 +197,28 @@ class ImprovedNotificationManager:
         required_fields = ['smtp_server', 'port', 'sender_email', 'password']
         return all(self.email_config.get(field) for field in required_fields)
     
-    def _check_cooldown(self, key):
+    def _check_cooldown(self, key, key_class='price_alert'):
         """
         Check if enough time has passed since last alert.
         
         Args:
             key: Unique identifier for the alert
+            key_class: Cooldown policy the key belongs to
             
         Returns:
             Boolean indicating if alert can be sent
         """
-        now = datetime.now().timestamp()
-        
-        if key in self.alert_cooldowns:
-            elapsed = now - self.alert_cooldowns[key]
-            if elapsed < self.cooldown_period:
-                return False
-        
-        self.alert_cooldowns[key] = now
-        return True
+        return self.cooldowns.allow(key, key_class)
     
-    def _log_notification(self, notification_type, title, message, recipient=None):
-        """Log notification to history."""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'type': notification_type,
-            'title': title,
-            'message': message[:100],  # Truncate long messages
-            'recipient': recipient
-        }
-        
-        self.notification_history.append(log_entry)
-        
-        # Keep only recent notifications
-        if len(self.notification_history) > self.max_history:
-            self.notification_history = self.notification_history[-self.max_history:]
-        
-        self.save_history()
+    def _log_notification(self, notification_type, title, message, recipient=None, coin=None):
+        """Append notification to history (written in batches)."""
+        self.history.append(
+            notification_type,
+            title,
+            message[:100],  # Truncate long messages
+            recipient,
+            coin=coin,
+        )
     
     def _create_price_alert_html(self, coin_symbol, current_price, alert_type, threshold_price):
         """Create HTML email for price alerts."""
@@ -379,43 +365,42 @@ class ImprovedNotificationManager:
         return html
     
     def save_history(self):
-        """Save notification history to file."""
-        try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.notification_history, f, indent=2)
-        except Exception as e:
-            print(f"Error saving notification history: {e}")
+        """Write any buffered notifications to the history database."""
+        self.history.flush()
     
     def load_history(self):
-        """Load notification history from file."""
+        """Migrate the legacy JSON history file into the history database."""
         try:
             if os.path.exists(self.history_file):
-                with open(self.history_file, 'r') as f:
-                    self.notification_history = json.load(f)
+                imported = self.history.import_json(self.history_file)
+                os.replace(self.history_file, self.history_file + ".migrated")
+                print(f"Migrated {imported} notifications to {self.history.db_path}")
         except Exception as e:
             print(f"Error loading notification history: {e}")
-            self.notification_history = []
     
-    def get_notification_history(self, limit=20):
+    def get_notification_history(self, limit=20, notification_type=None, coin=None, start=None, end=None):
         """
         Get recent notification history.
         
         Args:
             limit: Number of recent notifications to return
+            notification_type: Optional type filter ('desktop', 'email')
+            coin: Optional coin symbol filter
+            start: Optional datetime lower bound
+            end: Optional datetime upper bound
             
         Returns:
-            List of recent notifications
+            List of recent notifications (oldest first)
         """
-        return self.notification_history[-limit:]
+        return self.history.query(notification_type, coin, start, end, limit)
     
     def clear_history(self):
         """Clear notification history."""
-        self.notification_history = []
-        self.save_history()
+        self.history.clear()
     
-    def set_cooldown_period(self, seconds):
-        """Set alert cooldown period in seconds."""
-        self.cooldown_period = seconds
+    def set_cooldown_period(self, seconds, key_class='price_alert'):
+        """Set alert cooldown period in seconds for one key class."""
+        self.cooldowns.set_policy(key_class, seconds)
 
 
 # Example usage
@@ -455,6 +440,9 @@ if __name__ == "__main__":
     }
     # nm.send_portfolio_summary(portfolio_data)
     
+    # Wait for queued emails to be delivered
+    nm.close()
+    
     print("Notifications sent! Check notification history:")
     for notification in nm.get_notification_history():
         print(f"  {notification['timestamp']}: {notification['title']}")
\ No newline at end of file
@@ -4,8 +4,6 @@ import json
 import os
 from datetime import datetime
 from typing import Dict, List, Optional
-import pandas as pd
-import numpy as np
 
 
 class PortfolioTracker:
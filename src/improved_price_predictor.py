@@ -11,183 +11,345 @@ from sklearn.ensemble import (
 )
 from sklearn.linear_model import Ridge
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import TimeSeriesSplit, train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import warnings
 
 warnings.filterwarnings("ignore")
 
-# Try to import technical analysis library
-try:
-    import ta
-
-    HAS_TA = True
-except ImportError:
-    HAS_TA = False
-    print("Warning: 'ta' library not installed. Technical indicators will be limited.")
-
 import joblib
+import json
 import os
 from typing import Dict, Tuple, Optional
 
+from feature_store import FeatureStore, infer_interval
+from fgi_store import FGIStore
+from indicators import compute_feature_panel
+from utils import detect_support_resistance, support_resistance_alert_levels
+
+TUNED_PARAMS_FILE = "tuned_params.json"
+
+# Prediction band percentiles (P10/P50/P90) from conformal residuals
+INTERVAL_PERCENTILES = (10, 50, 90)
+
+# Feature columns (all technical indicators). Bump FEATURE_SET_VERSION whenever
+# this list or the indicator math changes so stored matrices are rebuilt.
+FEATURE_COLUMNS = [
+    "returns",
+    "log_returns",
+    "sma_7",
+    "sma_14",
+    "sma_30",
+    "ema_7",
+    "ema_14",
+    "rsi",
+    "macd",
+    "macd_signal",
+    "macd_diff",
+    "bb_upper",
+    "bb_lower",
+    "bb_width",
+    "volatility",
+    "volume_ratio",
+    "price_volume_corr",
+    "price_position",
+    "roc_7",
+    "roc_14",
+    "stoch_k",
+    "stoch_d",
+    "cci",
+    "fgi",
+    "fgi_delta",
+    "fgi_zscore",
+]
+FEATURE_SET_VERSION = 5
+
+# Fear & Greed columns (the last FEATURE_COLUMNS). The FGI history can be
+# backfilled after candles were cached, so these are never written to the
+# feature store; they are looked up and attached to the stored view on read.
+FGI_COLUMNS = ["fgi", "fgi_delta", "fgi_zscore"]
+STORED_FEATURE_COLUMNS = [c for c in FEATURE_COLUMNS if c not in FGI_COLUMNS]
+
+# Candles of history recomputed before the first new row when appending to the
+# feature store (covers the longest indicator warm-up: MACD signal, 33 rows)
+FEATURE_LOOKBACK = 120
+
+
+def build_stacking_ensemble(params: Optional[Dict] = None, n_jobs: int = -1):
+    """
+    Build the stacking ensemble used for price prediction.
+
+    Args:
+        params: Optional ``<estimator>__<param>`` overrides (e.g. from the
+            hyperparameter tuner), applied with ``set_params``
+        n_jobs: Parallelism for the random forest (1 inside worker processes)
+
+    Returns:
+        Unfitted StackingRegressor
+    """
+    estimators = [
+        (
+            "rf",
+            RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs),
+        ),
+        (
+            "gb",
+            GradientBoostingRegressor(n_estimators=100, random_state=42),
+        ),
+        (
+            "hgb",
+            HistGradientBoostingRegressor(random_state=42),
+        ),
+    ]
+
+    model = StackingRegressor(estimators=estimators, final_estimator=Ridge())
+    if params:
+        model.set_params(**params)
+    return model
+
 
 class AdvancedPricePredictor:
-    def __init__(self, api_handler):
+    def __init__(
+        self,
+        api_handler,
+        feature_store: Optional[FeatureStore] = None,
+        fgi_store: Optional[FGIStore] = None,
+        n_jobs: int = -1,
+    ):
+        """
+        Args:
+            api_handler: Market data handler providing get_coin_history
+            feature_store: Feature cache (default: FeatureStore())
+            fgi_store: Fear & Greed history (default: FGIStore())
+            n_jobs: Random forest parallelism (1 when several coins are
+                trained in parallel processes)
+        """
         self.api = api_handler
+        self.n_jobs = n_jobs
         self.models = {}
         self.scalers = {}
         self.model_dir = "models"
         os.makedirs(self.model_dir, exist_ok=True)
+        self.feature_store = feature_store if feature_store is not None else FeatureStore()
+        self.fgi_store = fgi_store if fgi_store is not None else FGIStore()
+
+    def get_tuned_params(self, coin_id: str) -> Dict:
+        """Get tuned hyperparameters for a coin (coin-level first, then its bucket)"""
+        path = os.path.join(self.model_dir, TUNED_PARAMS_FILE)
+        try:
+            if not os.path.exists(path):
+                return {}
+            with open(path, "r") as f:
+                tuned = json.load(f)
+        except Exception as e:
+            print(f"Error loading tuned params: {e}")
+            return {}
+
+        coin_entry = tuned.get("coins", {}).get(coin_id)
+        if coin_entry:
+            return coin_entry.get("params", {})
+
+        for bucket_entry in tuned.get("buckets", {}).values():
+            if coin_id in bucket_entry.get("coins", []):
+                return bucket_entry.get("params", {})
+
+        return {}
 
     def calculate_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate technical indicators"""
         df = df.copy()
+        panel = compute_feature_panel(
+            df["close"].values,
+            df["high"].values if "high" in df.columns else None,
+            df["low"].values if "low" in df.columns else None,
+            df["volume"].values if "volume" in df.columns else None,
+        )
+        for name, values in panel.items():
+            df[name] = values[0]
+        for name, values in self._fgi_features(self._timestamps_ns(df)).items():
+            df[name] = values
 
-        # Price features
-        df["returns"] = df["close"].pct_change()
-        df["log_returns"] = np.log(df["close"] / df["close"].shift(1))
-
-        # Moving averages
-        df["sma_7"] = df["close"].rolling(window=7, min_periods=1).mean()
-        df["sma_14"] = df["close"].rolling(window=14, min_periods=1).mean()
-        df["sma_30"] = df["close"].rolling(window=30, min_periods=1).mean()
-        df["ema_7"] = df["close"].ewm(span=7, adjust=False).mean()
-        df["ema_14"] = df["close"].ewm(span=14, adjust=False).mean()
+        # Drop NaN values
+        df = df.dropna()
 
-        if HAS_TA:
-            # Momentum indicators (only if ta library is available)
-            try:
-                df["rsi"] = ta.momentum.RSIIndicator(df["close"], window=14).rsi()
-                macd = ta.trend.MACD(df["close"])
-                df["macd"] = macd.macd()
-                df["macd_signal"] = macd.macd_signal()
-                df["macd_diff"] = macd.macd_diff()
-
-                # Volatility
-                bb = ta.volatility.BollingerBands(df["close"], window=20, window_dev=2)
-                df["bb_upper"] = bb.bollinger_hband()
-                df["bb_lower"] = bb.bollinger_lband()
-                df["bb_width"] = bb.bollinger_wband()
-
-                # Stochastic Oscillator
-                stoch = ta.momentum.StochasticOscillator(
-                    df["high"], df["low"], df["close"], window=14, smooth_window=3
-                )
-                df["stoch_k"] = stoch.stoch()
-                df["stoch_d"] = stoch.stoch_signal()
+        return df
 
-                # CCI
-                df["cci"] = ta.trend.CCIIndicator(
-                    df["high"], df["low"], df["close"], window=20
-                ).cci()
+    def _timestamps_ns(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Candle timestamps as int64 nanoseconds (None without a timestamp column)"""
+        if "timestamp" not in df.columns:
+            return None
+        return df["timestamp"].values.astype("datetime64[ns]").view(np.int64)
 
-            except Exception as e:
-                print(f"Error calculating TA indicators: {e}")
-                # Fill with default values
-                self._fill_default_ta_values(df)
-        else:
-            # Simple alternatives without ta library
-            self._fill_default_ta_values(df)
+    def _fgi_features(self, timestamps_ns: Optional[np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Fear & Greed level/delta/z-score per candle from the local FGI history.
 
-        df["volatility"] = df["close"].rolling(window=20, min_periods=1).std()
+        Never touches the network; the history is kept current by callers
+        running ``fgi_store.refresh()`` (daemon scheduler, GUI, CLI).
+        """
+        if timestamps_ns is None:
+            # Neutral values when candles cannot be aligned
+            return {"fgi": 50.0, "fgi_delta": 0.0, "fgi_zscore": 0.0}
+        return self.fgi_store.features(timestamps_ns)
+
+    def prepare_universe_features(
+        self, histories: Dict[str, pd.DataFrame]
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Build feature matrices for many coins with one vectorized indicator pass.
 
-        # Volume indicators
-        if "volume" in df.columns:
-            df["volume_sma"] = df["volume"].rolling(window=20, min_periods=1).mean()
-            df["volume_ratio"] = df["volume"] / df["volume_sma"]
-            df["price_volume_corr"] = (
-                df["close"].rolling(window=20, min_periods=1).corr(df["volume"])
-            )
-        else:
-            df["volume_sma"] = 0
-            df["volume_ratio"] = 1
-            df["price_volume_corr"] = 0
-
-        # Price position
-        df["high_20"] = (
-            df["high"].rolling(window=20, min_periods=1).max()
-            if "high" in df.columns
-            else df["close"]
-        )
-        df["low_20"] = (
-            df["low"].rolling(window=20, min_periods=1).min()
-            if "low" in df.columns
-            else df["close"]
-        )
-        df["price_position"] = (df["close"] - df["low_20"]) / (
-            df["high_20"] - df["low_20"] + 0.0001
-        )
+        Histories are right-aligned into a (coins x time) panel, shorter ones
+        padded with leading NaNs, so each coin gets the same rows as
+        prepare_features would give it alone.
 
-        # Rate of change
-        df["roc_7"] = (
-            (df["close"] - df["close"].shift(7)) / (df["close"].shift(7) + 0.0001)
-        ) * 100
-        df["roc_14"] = (
-            (df["close"] - df["close"].shift(14)) / (df["close"].shift(14) + 0.0001)
-        ) * 100
+        Coins already in the feature store go through prepare_features, which
+        only computes candles newer than the stored ones. The rest share the
+        vectorized pass and their rows are written to the store, so later
+        training, tuning and inference start from them.
 
-        # Target: future price change (next period)
-        df["target"] = (
-            (df["close"].shift(-1) - df["close"]) / (df["close"] + 0.0001)
-        ) * 100
+        Returns:
+            Dictionary of coin_id -> (X, y)
+        """
+        histories = {c: df for c, df in histories.items() if df is not None and len(df)}
+        result = {}
+        if self.feature_store is not None:
+            for coin_id, df in list(histories.items()):
+                ts = self._timestamps_ns(df)
+                if ts is None or len(ts) == 0:
+                    continue
+                stored = self.feature_store.last_timestamp(
+                    coin_id, infer_interval(ts), FEATURE_SET_VERSION
+                )
+                if stored is not None:
+                    result[coin_id] = self.prepare_features(df, coin_id)
+                    del histories[coin_id]
+        if not histories:
+            return result
+
+        coin_ids = list(histories)
+        length = max(len(df) for df in histories.values())
+        columns = {}
+        for column in ("close", "high", "low", "volume"):
+            if column != "close" and not all(column in df.columns for df in histories.values()):
+                continue
+            panel = np.full((len(coin_ids), length), np.nan)
+            for i, coin_id in enumerate(coin_ids):
+                values = histories[coin_id][column].values
+                panel[i, length - len(values):] = values
+            columns[column] = panel
+
+        features = compute_feature_panel(
+            columns["close"], columns.get("high"), columns.get("low"), columns.get("volume")
+        )
+        timestamps = np.zeros((len(coin_ids), length), dtype=np.int64)
+        for i, coin_id in enumerate(coin_ids):
+            ts = self._timestamps_ns(histories[coin_id])
+            if ts is not None:
+                timestamps[i, length - len(ts):] = ts
+        features.update(self._fgi_features(timestamps))
+        X_all = np.stack([features[name] for name in FEATURE_COLUMNS], axis=-1)
+        y_all = features["target"]
+        keep = ~np.isnan(X_all).any(axis=-1) & ~np.isnan(y_all)
+
+        for i, coin_id in enumerate(coin_ids):
+            start = length - len(histories[coin_id])
+            rows = keep[i, start:]
+            X, y = X_all[i, start:][rows], y_all[i, start:][rows]
+            result[coin_id] = (X, y)
+            if self.feature_store is not None and "timestamp" in histories[coin_id].columns and len(y):
+                self._store_universe_rows(coin_id, X, y, timestamps[i, start:][rows])
+        return result
+
+    def _store_universe_rows(self, coin_id: str, X: np.ndarray, y: np.ndarray, ts: np.ndarray):
+        """Write one coin's rows from the vectorized pass to the feature store"""
+        try:
+            self.feature_store.upsert_tail(
+                coin_id, infer_interval(ts), FEATURE_SET_VERSION,
+                X[:, :len(STORED_FEATURE_COLUMNS)], y, ts, STORED_FEATURE_COLUMNS,
+            )
+        except Exception as e:
+            print(f"Feature store error for {coin_id}: {e}")
 
-        # Drop NaN values
-        df = df.dropna()
+    def prepare_features(
+        self, df: pd.DataFrame, coin_id: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Prepare features and target for training.
 
-        return df
+        With a coin_id the indicator columns come from the feature store: only
+        candles newer than the stored ones are computed and the stored rows are
+        read through a memory-mapped view shared by training, tuning and
+        inference. The FGI columns are looked up from the current history and
+        joined to that view, so X is a fresh array; y is a read-only view.
+        """
+        if coin_id and self.feature_store is not None and "timestamp" in df.columns:
+            try:
+                cached = self._prepare_features_cached(df, coin_id)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                print(f"Feature store error for {coin_id}: {e}")
 
-    def _fill_default_ta_values(self, df):
-        """Fill default values for TA indicators if calculation fails or lib missing"""
-        df["rsi"] = 50  # Neutral RSI
-        df["macd"] = 0
-        df["macd_signal"] = 0
-        df["macd_diff"] = 0
-        df["bb_upper"] = df["close"] * 1.1
-        df["bb_lower"] = df["close"] * 0.9
-        df["bb_width"] = df["close"] * 0.2
-        df["stoch_k"] = 50
-        df["stoch_d"] = 50
-        df["cci"] = 0
-
-    def prepare_features(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
-        """Prepare features and target for training"""
         df = self.calculate_technical_indicators(df)
+        return self._feature_matrix(df)
 
-        # Feature columns (all technical indicators)
-        feature_cols = [
-            "returns",
-            "log_returns",
-            "sma_7",
-            "sma_14",
-            "sma_30",
-            "ema_7",
-            "ema_14",
-            "rsi",
-            "macd",
-            "macd_signal",
-            "macd_diff",
-            "bb_upper",
-            "bb_lower",
-            "bb_width",
-            "volatility",
-            "volume_ratio",
-            "price_volume_corr",
-            "price_position",
-            "roc_7",
-            "roc_14",
-            "stoch_k",
-            "stoch_d",
-            "cci",
-        ]
-
+    def _feature_matrix(
+        self, df: pd.DataFrame, columns=FEATURE_COLUMNS
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Extract the feature matrix and target from an indicator frame"""
         # Ensure all feature columns exist
-        existing_features = [col for col in feature_cols if col in df.columns]
+        existing_features = [col for col in columns if col in df.columns]
 
         X = df[existing_features].values
         y = df["target"].values if "target" in df.columns else None
 
         return X, y
 
+    def _prepare_features_cached(
+        self, df: pd.DataFrame, coin_id: str
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Update the feature store from df and return the rows covering df"""
+        ts = self._timestamps_ns(df)
+        if len(ts) == 0:
+            return None
+        interval = infer_interval(ts)
+        store = self.feature_store
+        stored = store.load(coin_id, interval, FEATURE_SET_VERSION)
+
+        if stored is not None and stored[2][0] > ts[min(FEATURE_LOOKBACK, len(ts) - 1)]:
+            # df reaches further back than the store: rebuild from scratch
+            store.clear(coin_id, interval, FEATURE_SET_VERSION)
+            stored = None
+
+        if stored is None:
+            tail = df
+        else:
+            pos = int(np.searchsorted(ts, stored[2][-1]))
+            tail = df.iloc[max(0, pos - FEATURE_LOOKBACK):]
+
+        indicators = self.calculate_technical_indicators(tail)
+        if len(indicators) and len(
+            [c for c in FEATURE_COLUMNS if c in indicators.columns]
+        ) == len(FEATURE_COLUMNS):
+            X_new, y_new = self._feature_matrix(indicators, STORED_FEATURE_COLUMNS)
+            ts_new = indicators["timestamp"].values.astype("datetime64[ns]").view(np.int64)
+            store.upsert_tail(
+                coin_id, interval, FEATURE_SET_VERSION, X_new, y_new, ts_new,
+                STORED_FEATURE_COLUMNS,
+            )
+
+        stored = store.load(coin_id, interval, FEATURE_SET_VERSION)
+        if stored is None:
+            return None
+        X, y, stored_ts = stored
+        start = int(np.searchsorted(stored_ts, ts[0], side="left"))
+        end = int(np.searchsorted(stored_ts, ts[-1], side="right"))
+        fgi = self._fgi_features(stored_ts[start:end])
+        fgi_block = np.column_stack([fgi[name] for name in FGI_COLUMNS]).astype(np.float32)
+        # One copy: the memory-mapped indicator rows joined with the FGI block
+        X = np.hstack([X[start:end], fgi_block])
+        return X, y[start:end]
+
     def train_ensemble_model(self, coin_id: str, days: int = 90):
         """Train ensemble model for a specific coin using Stacking"""
         try:
@@ -197,14 +359,15 @@ class AdvancedPricePredictor:
                 return False, "Insufficient data"
 
             # Prepare features
-            X, y = self.prepare_features(df)
+            X, y = self.prepare_features(df, coin_id)
 
             if len(X) < 20 or y is None:
                 return False, "Not enough data for training"
 
-            # Split data
+            # Split data chronologically: the held-out tail gives walk-forward
+            # residuals for the conformal prediction bands
             X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
+                X, y, test_size=0.2, shuffle=False
             )
 
             # Scale features
@@ -212,26 +375,9 @@ class AdvancedPricePredictor:
             X_train_scaled = scaler.fit_transform(X_train)
             X_test_scaled = scaler.transform(X_test)
 
-            # Base estimators
-            estimators = [
-                (
-                    "rf",
-                    RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1),
-                ),
-                (
-                    "gb",
-                    GradientBoostingRegressor(n_estimators=100, random_state=42),
-                ),
-                (
-                    "hgb",
-                    HistGradientBoostingRegressor(random_state=42),
-                ),
-            ]
-
-            # Stacking Regressor
-            stacking_regressor = StackingRegressor(
-                estimators=estimators, final_estimator=Ridge()
-            )
+            # Stacking Regressor (uses tuned hyperparameters when available)
+            tuned_params = self.get_tuned_params(coin_id)
+            stacking_regressor = build_stacking_ensemble(tuned_params, n_jobs=self.n_jobs)
 
             stacking_regressor.fit(X_train_scaled, y_train)
 
@@ -242,12 +388,20 @@ class AdvancedPricePredictor:
             mae = mean_absolute_error(y_test, y_pred)
             rmse = np.sqrt(mean_squared_error(y_test, y_pred))
 
-            # Save models and scaler
+            # Sorted walk-forward residuals (actual - predicted) for the bands
+            residuals = np.sort(y_test - y_pred).astype(np.float32)
+
+            # Save models, scaler and calibration data
             model_path = os.path.join(self.model_dir, f"{coin_id}_model.joblib")
             scaler_path = os.path.join(self.model_dir, f"{coin_id}_scaler.joblib")
+            meta_path = os.path.join(self.model_dir, f"{coin_id}_meta.joblib")
 
             joblib.dump(stacking_regressor, model_path)
             joblib.dump(scaler, scaler_path)
+            joblib.dump(
+                {"residuals": residuals, "ensemble_mae": mae, "ensemble_rmse": rmse},
+                meta_path,
+            )
 
             # Update cache
             self.models[coin_id] = {
@@ -257,6 +411,8 @@ class AdvancedPricePredictor:
                 "last_trained": datetime.now(),
                 "days_trained": days,
                 "scaler": scaler,
+                "tuned_params": tuned_params,
+                "residuals": residuals,
             }
 
             return (
@@ -268,9 +424,97 @@ class AdvancedPricePredictor:
             print(f"Training error: {e}")
             return False, f"Training error: {str(e)}"
 
-    def predict_price(self, coin_id: str, current_price: float, time_frame: int = 1):
+    def backtest_model(
+        self,
+        coin_id: str,
+        days: int = 90,
+        n_splits: int = 5,
+        tune: Optional[bool] = None,
+        n_candidates: int = 10,
+    ) -> Optional[Dict]:
+        """
+        Walk-forward backtest of the ensemble on one coin.
+
+        Each of ``n_splits`` expanding-window folds trains on the candles
+        before it and predicts the next block, so no prediction sees its
+        own future. Saved models and tuned params are not touched.
+
+        The saved tuned params were searched on the very candles being
+        scored, so they are never used here. With ``tune`` each fold runs
+        its own search on its training window (nested walk-forward CV);
+        otherwise the ensemble defaults are used.
+
+        Args:
+            tune: Tune per fold (default: only if the coin has tuned
+                params, mirroring how its production model is trained)
+            n_candidates: Candidates per fold search
+
+        Returns:
+            Dict with the error of the predicted % change (MAE/RMSE),
+            directional accuracy, and the compounded return of holding only
+            when a rise is predicted versus buy-and-hold, or None if there is
+            not enough history
+        """
+        df = self.api.get_coin_history(coin_id, days=days)
+        if df is None or len(df) < 30:
+            return None
+        X, y = self.prepare_features(df, coin_id)
+        if y is None or len(X) < n_splits * 10:
+            return None
+
+        tuner = None
+        if tune if tune is not None else bool(self.get_tuned_params(coin_id)):
+            # Imported here: the tuner module imports this one
+            from hyperparameter_tuner import HyperparameterTuner
+
+            tuner = HyperparameterTuner(self, max_workers=1 if self.n_jobs == 1 else None)
+
+        actual, predicted = [], []
+        for fold, (train_idx, test_idx) in enumerate(TimeSeriesSplit(n_splits=n_splits).split(X)):
+            fold_params = {}
+            if tuner is not None:
+                result = tuner.tune_window(
+                    f"backtest_{coin_id}_{os.getpid()}_fold{fold}",
+                    X[train_idx],
+                    y[train_idx],
+                    n_candidates=n_candidates,
+                )
+                if result:
+                    fold_params = result["params"]
+            scaler = StandardScaler()
+            model = build_stacking_ensemble(fold_params, n_jobs=self.n_jobs)
+            model.fit(scaler.fit_transform(X[train_idx]), y[train_idx])
+            predicted.append(model.predict(scaler.transform(X[test_idx])))
+            actual.append(y[test_idx])
+        actual = np.concatenate(actual)
+        predicted = np.concatenate(predicted)
+
+        in_market = predicted > 0
+        strategy_return = np.prod(1 + np.where(in_market, actual, 0) / 100) - 1
+        buy_hold_return = np.prod(1 + actual / 100) - 1
+        return {
+            "samples": int(len(actual)),
+            "folds": n_splits,
+            "tuned": tuner is not None,
+            "mae": float(mean_absolute_error(actual, predicted)),
+            "rmse": float(np.sqrt(mean_squared_error(actual, predicted))),
+            "directional_accuracy": float(np.mean(np.sign(predicted) == np.sign(actual)) * 100),
+            "time_in_market_percent": float(in_market.mean() * 100),
+            "strategy_return_percent": float(strategy_return * 100),
+            "buy_hold_return_percent": float(buy_hold_return * 100),
+        }
+
+    def has_model(self, coin_id: str) -> bool:
+        """A model for the coin is loaded or saved in model_dir"""
+        return coin_id in self.models or os.path.exists(os.path.join(self.model_dir, f"{coin_id}_model.joblib"))
+
+    def predict_price(self, coin_id: str, current_price: float, time_frame: int = 1, train_if_missing: bool = True):
         """
         FIXED prediction method with detailed logging
+
+        With ``train_if_missing=False`` a coin without a usable model gets
+        the fallback prediction instead of being trained on the spot (for
+        callers that train on their own schedule, like the headless service).
         """
         try:
             print(f"\\n{'='*60}")
@@ -280,6 +524,10 @@ class AdvancedPricePredictor:
             print(f"Time Frame: {time_frame} days")
             print(f"{'='*60}")
 
+            if not train_if_missing and not self.has_model(coin_id):
+                print(f"❌ No trained model for {coin_id}")
+                return self._fallback_prediction(current_price, time_frame)
+
             # Get historical data
             days = max(time_frame * 30, 90)
             print(f"→ Fetching {days} days of historical data...")
@@ -298,7 +546,7 @@ class AdvancedPricePredictor:
 
             # Prepare features
             print(f"→ Calculating technical indicators...")
-            X, y = self.prepare_features(df)
+            X, y = self.prepare_features(df, coin_id)
 
             if len(X) == 0:
                 print("❌ prepare_features returned empty array")
@@ -310,7 +558,7 @@ class AdvancedPricePredictor:
             model_path = os.path.join(self.model_dir, f"{coin_id}_model.joblib")
             scaler_path = os.path.join(self.model_dir, f"{coin_id}_scaler.joblib")
 
-            if coin_id not in self.models and not os.path.exists(model_path):
+            if not self.has_model(coin_id):
                 print(f"→ No existing model found, training new model...")
                 success, message = self.train_ensemble_model(coin_id, days=days)
 
@@ -329,11 +577,26 @@ class AdvancedPricePredictor:
                     model = joblib.load(model_path)
                     scaler = joblib.load(scaler_path)
                     self.models[coin_id] = {"model": model, "scaler": scaler}
+                    meta_path = os.path.join(self.model_dir, f"{coin_id}_meta.joblib")
+                    if os.path.exists(meta_path):
+                        self.models[coin_id].update(joblib.load(meta_path))
                     print(f"✓ Model loaded successfully")
                 except Exception as e:
                     print(f"❌ Model loading failed: {e}")
                     return self._fallback_prediction(current_price, time_frame)
 
+            # Models saved with an older feature set must be retrained
+            if getattr(self.models[coin_id]["scaler"], "n_features_in_", X.shape[1]) != X.shape[1]:
+                if not train_if_missing:
+                    print(f"❌ Model uses an older feature set")
+                    return self._fallback_prediction(current_price, time_frame)
+                print(f"→ Model uses an older feature set, retraining...")
+                del self.models[coin_id]
+                success, message = self.train_ensemble_model(coin_id, days=days)
+                if not success:
+                    print(f"❌ Training failed: {message}")
+                    return self._fallback_prediction(current_price, time_frame)
+
             # Make prediction
             print(f"→ Making prediction...")
 
@@ -369,8 +632,18 @@ class AdvancedPricePredictor:
             # Calculate results
             predicted_price = current_price * (1 + predicted_change / 100)
 
-            recent_volatility = df["close"].pct_change().std() * 100
-            confidence = max(0, 100 - recent_volatility * 2 - time_frame * 2)
+            # Prediction bands and confidence from the walk-forward residuals
+            # of this model (no extra model calls)
+            residuals = self.models[coin_id].get("residuals")
+            interval = self._conformal_interval(
+                residuals, predicted_change, current_price, time_frame_adjustment
+            )
+            if interval is not None:
+                confidence = interval["direction_probability"]
+            else:
+                # Legacy models saved without calibration data
+                recent_volatility = df["close"].pct_change().std() * 100
+                confidence = max(0, 100 - recent_volatility * 2 - time_frame * 2)
             confidence = min(confidence, 95)
 
             direction = "bullish" if predicted_change > 0 else "bearish"
@@ -380,13 +653,25 @@ class AdvancedPricePredictor:
                 else "moderate" if abs(predicted_change) > 2 else "weak"
             )
 
-            insights = self._generate_insights(df, predicted_change, time_frame)
+            support_levels, resistance_levels = detect_support_resistance(df["close"].values)
+            alert_levels = support_resistance_alert_levels(
+                current_price, support_levels, resistance_levels
+            )
+
+            insights = self._generate_insights(
+                df, predicted_change, time_frame, current_price, alert_levels
+            )
 
             print(f"✓ PREDICTION COMPLETE")
             print(f"  Predicted Price: ${predicted_price:,.2f}")
             print(f"  Change: {predicted_change:+.2f}%")
             print(f"  Direction: {direction} ({strength})")
             print(f"  Confidence: {confidence:.1f}%")
+            if interval is not None:
+                print(
+                    f"  P10/P50/P90: ${interval['p10']:,.2f} / "
+                    f"${interval['p50']:,.2f} / ${interval['p90']:,.2f}"
+                )
             print(f"{'='*60}\\n")
 
             return {
@@ -399,6 +684,10 @@ class AdvancedPricePredictor:
                 "time_frame": time_frame,
                 "timestamp": datetime.now(),
                 "insights": insights,
+                "interval": interval,
+                "support_levels": [float(level) for level in support_levels],
+                "resistance_levels": [float(level) for level in resistance_levels],
+                "alert_levels": alert_levels,
                 "is_fallback": False,
             }
 
@@ -429,11 +718,59 @@ class AdvancedPricePredictor:
                 f"Prediction for {time_frame} {'day' if time_frame == 1 else 'days'}",
                 "Limited data available for ML prediction",
             ],
+            "interval": None,
+            "support_levels": [],
+            "resistance_levels": [],
+            "alert_levels": {},
             "is_fallback": True,
         }
 
+    def _conformal_interval(
+        self,
+        residuals: Optional[np.ndarray],
+        predicted_change: float,
+        current_price: float,
+        scale: float = 1.0,
+    ) -> Optional[Dict]:
+        """
+        Split-conformal prediction band from held-out residuals.
+
+        Args:
+            residuals: Sorted walk-forward residuals (actual - predicted, in %)
+            predicted_change: Model prediction (in %, already time-frame adjusted)
+            current_price: Current price
+            scale: Time frame adjustment applied to the prediction
+
+        Returns:
+            Dictionary with P10/P50/P90 prices and change percents, plus the
+            empirical probability that the predicted direction is right
+        """
+        if residuals is None or len(residuals) < 10:
+            return None
+
+        residuals = np.asarray(residuals, dtype=np.float64) * scale
+        changes = predicted_change + np.percentile(residuals, INTERVAL_PERCENTILES)
+
+        # Share of historical outcomes that would land on the predicted side
+        n = len(residuals)
+        if predicted_change >= 0:
+            hits = n - np.searchsorted(residuals, -predicted_change, side="right")
+        else:
+            hits = np.searchsorted(residuals, -predicted_change, side="left")
+
+        interval = {"direction_probability": float(hits / n * 100)}
+        for pct, change in zip(INTERVAL_PERCENTILES, changes):
+            interval[f"p{pct}"] = float(current_price * (1 + change / 100))
+            interval[f"p{pct}_change_percent"] = float(change)
+        return interval
+
     def _generate_insights(
-        self, df: pd.DataFrame, predicted_change: float, time_frame: int
+        self,
+        df: pd.DataFrame,
+        predicted_change: float,
+        time_frame: int,
+        current_price: Optional[float] = None,
+        alert_levels: Optional[Dict[float, str]] = None,
     ) -> list:
         """Generate trading insights based on technical analysis and time frame"""
         insights = []
@@ -489,6 +826,19 @@ class AdvancedPricePredictor:
             if not np.isnan(volume_ratio) and volume_ratio > 1.5:
                 insights.append("High volume activity detected")
 
+        # Nearest support/resistance around the current price
+        if current_price and alert_levels:
+            for level, level_type in sorted(alert_levels.items()):
+                name = "support" if level_type == "below" else "resistance"
+                distance = (level / current_price - 1) * 100
+                insights.append(f"Nearest {name} at ${level:,.4f} ({distance:+.1f}%)")
+            predicted_price = current_price * (1 + predicted_change / 100)
+            for level, level_type in alert_levels.items():
+                if level_type == "above" and predicted_price > level:
+                    insights.append("Predicted price breaks above nearest resistance")
+                elif level_type == "below" and predicted_price < level:
+                    insights.append("Predicted price falls below nearest support")
+
         # Add prediction-based insight
         if abs(predicted_change) > 3:
             direction = "increase" if predicted_change > 0 else "decrease"
@@ -3,17 +3,61 @@
 import requests
 import json
 import os
+import tempfile
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import time
 
+import numpy as np
+
+from coin_sentiment import NEUTRAL_SENTIMENT, CoinSentimentAnalyzer
+from market_breadth import MarketBreadth, MarketSnapshot, compute_breadth
+
+# One fixed-width record per sentiment snapshot in data/sentiment_history.bin
+SENTIMENT_HISTORY_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("fgi", "<f4"),
+        ("gainers", "<i4"),
+        ("losers", "<i4"),
+        ("neutral", "<i4"),
+        ("extreme_gainers", "<i4"),
+        ("extreme_losers", "<i4"),
+        ("total", "<i4"),
+        ("momentum_score", "<f4"),
+        ("avg_change", "<f4"),
+    ]
+)
+
+# Days of snapshots kept; older records are dropped when the file is
+# compacted (on startup, then about once a day while appending)
+SENTIMENT_HISTORY_DAYS = 90
+
 
 class SentimentTracker:
     def __init__(self, api_handler):
         self.api = api_handler
         self.cache_file = "data/sentiment_cache.json"
         self.cache_duration = 300  # 5 minutes cache
+        self.history_file = "data/sentiment_history.bin"
+        self.history_min_interval = 60  # seconds between stored snapshots
+        self.history_days = SENTIMENT_HISTORY_DAYS
+        self.market_snapshot = None
+        self.snapshot_time = 0
+        # Breadth covers the top 1000 coins, not only the displayed top 100
+        self.breadth = MarketBreadth(api_handler, universe_size=1000, cache_duration=self.cache_duration)
+        self.coin_analyzer = CoinSentimentAnalyzer(
+            api_handler, getattr(api_handler, "history_cache", None)
+        )
         os.makedirs("data", exist_ok=True)
+        self._compact_history()
+
+    def set_market_snapshot(self, coins: List[Dict]):
+        """Use an already fetched top-coins list for breadth analysis"""
+        if coins:
+            self.market_snapshot = coins
+            self.snapshot_time = time.time()
+            self.breadth.update(coins)
 
     def get_fear_greed_index(self) -> Optional[Dict]:
         """Get Crypto Fear & Greed Index from Alternative.me API"""
@@ -57,8 +101,14 @@ class SentimentTracker:
             print(f"Error fetching Fear & Greed Index: {e}")
             return None
 
-    def get_market_sentiment(self) -> Dict:
-        """Get comprehensive market sentiment analysis"""
+    def get_market_sentiment(self, coins: Optional[List[Dict]] = None) -> Dict:
+        """
+        Get comprehensive market sentiment analysis.
+
+        Args:
+            coins: Optional top-coins list; defaults to the in-memory market
+                snapshot (fetched only if there is none or it is stale)
+        """
         try:
             # Get Fear & Greed Index
             fear_greed = self.get_fear_greed_index() or {
@@ -68,7 +118,12 @@ class SentimentTracker:
             }
 
             # Get market data for analysis
-            market_data = self._analyze_market_data()
+            market_data = self._analyze_market_data(coins)
+
+            # Record this snapshot and add trends over the stored history
+            if market_data:
+                self._append_history(fear_greed.get("value", 50), market_data)
+            market_data.update(self.get_sentiment_trends())
 
             return {
                 "fear_greed": fear_greed,
@@ -98,82 +153,149 @@ class SentimentTracker:
         Returns:
             Dictionary with positive, negative, and neutral sentiment percentages
         """
-        try:
-            # Use the API handler's get_coin_sentiment method
-            sentiment = self.api.get_coin_sentiment(coin_id)
-            return sentiment
+        return self.get_coins_sentiment([coin_id]).get(coin_id, dict(NEUTRAL_SENTIMENT))
+
+    def get_coins_sentiment(self, coin_ids: List[str], days: int = 30) -> Dict[str, Dict]:
+        """
+        Get sentiment for many coins at once from cached hourly history
+        
+        Args:
+            coin_ids: CoinGecko coin IDs
+            days: History window used for the signals
             
+        Returns:
+            Mapping of coin ID to sentiment percentages and signals (momentum,
+            RSI, volatility regime, volume surge)
+        """
+        try:
+            return self.coin_analyzer.analyze(coin_ids, days)
         except Exception as e:
-            print(f"Error getting coin sentiment for {coin_id}: {e}")
+            print(f"Error getting coin sentiment: {e}")
             # Return neutral sentiment on error
-            return {
-                "positive": 33.0,
-                "negative": 33.0,
-                "neutral": 34.0
-            }
+            return {coin_id: dict(NEUTRAL_SENTIMENT) for coin_id in coin_ids}
 
-    def _analyze_market_data(self) -> Dict:
-        """Analyze market data for sentiment indicators"""
+    def _analyze_market_data(self, coins: Optional[List[Dict]] = None) -> Dict:
+        """Analyze market breadth for sentiment indicators"""
         try:
-            # Get top coins data
-            coins = self.api.get_top_coins(limit=100)
+            if coins is not None:
+                return compute_breadth(MarketSnapshot(coins))
 
-            if not coins:
+            market_data = self.breadth.analyze()
+            if market_data:
+                return market_data
+
+            # Universe unavailable: fall back to the top-coins snapshot
+            if not (
+                self.market_snapshot
+                and time.time() - self.snapshot_time < self.cache_duration
+            ):
+                self.set_market_snapshot(self.api.get_top_coins(limit=100))
+            if not self.market_snapshot:
                 return {}
+            return compute_breadth(MarketSnapshot(self.market_snapshot, self.snapshot_time))
 
-            gainers = 0
-            losers = 0
-            neutral = 0
-            extreme_gainers = 0
-            extreme_losers = 0
-
-            for coin in coins:
-                change_24h = coin.get("price_change_percentage_24h", 0) or 0
-
-                if change_24h > 5:
-                    extreme_gainers += 1
-                    gainers += 1
-                elif change_24h > 1:
-                    gainers += 1
-                elif change_24h < -5:
-                    extreme_losers += 1
-                    losers += 1
-                elif change_24h < -1:
-                    losers += 1
-                else:
-                    neutral += 1
-
-            # Calculate market momentum
-            total_coins = len(coins)
-            momentum_score = (gainers - losers) / total_coins if total_coins > 0 else 0
-
-            # Determine sentiment based on momentum
-            if momentum_score > 0.3:
-                market_sentiment = "Strongly Bullish"
-            elif momentum_score > 0.1:
-                market_sentiment = "Bullish"
-            elif momentum_score > -0.1:
-                market_sentiment = "Neutral"
-            elif momentum_score > -0.3:
-                market_sentiment = "Bearish"
-            else:
-                market_sentiment = "Strongly Bearish"
+        except Exception as e:
+            print(f"Error analyzing market data: {e}")
+            return {}
 
-            return {
-                "gainers": gainers,
-                "losers": losers,
-                "neutral": neutral,
-                "extreme_gainers": extreme_gainers,
-                "extreme_losers": extreme_losers,
-                "momentum_score": momentum_score,
-                "market_sentiment": market_sentiment,
-                "total_coins_analyzed": total_coins,
-            }
+    # ==================== SENTIMENT HISTORY ====================
+    def _append_history(self, fgi_value: float, market_data: Dict):
+        """Append one snapshot record (skipped if the last one is too recent)"""
+        try:
+            now = int(time.time())
+            history = self.load_history()
+            if len(history) and now - history["timestamp"][-1] < self.history_min_interval:
+                return
+            # A day of slack, so the file is rewritten about once a day
+            expired = len(history) and history["timestamp"][0] < now - (self.history_days + 1) * 86400
+            del history  # release the memory map before the file is replaced
+            if expired:
+                self._compact_history(now)
 
+            record = np.zeros(1, dtype=SENTIMENT_HISTORY_DTYPE)
+            record["timestamp"] = now
+            record["fgi"] = fgi_value
+            for field in ("gainers", "losers", "neutral", "extreme_gainers", "extreme_losers"):
+                record[field] = market_data.get(field, 0)
+            record["total"] = market_data.get("total_coins_analyzed", 0)
+            record["momentum_score"] = market_data.get("momentum_score", 0)
+            record["avg_change"] = market_data.get("avg_change_24h", 0)
+
+            with open(self.history_file, "ab") as f:
+                f.write(record.tobytes())
         except Exception as e:
-            print(f"Error analyzing market data: {e}")
+            print(f"Error appending sentiment history: {e}")
+
+    def _compact_history(self, now: Optional[float] = None):
+        """Drop snapshots older than history_days (the file is replaced atomically)"""
+        tmp_file = None
+        try:
+            if not os.path.exists(self.history_file):
+                return
+            size = os.path.getsize(self.history_file)
+            rows = size // SENTIMENT_HISTORY_DTYPE.itemsize
+            history = np.fromfile(self.history_file, dtype=SENTIMENT_HISTORY_DTYPE, count=rows)
+            cutoff = (time.time() if now is None else now) - self.history_days * 86400
+            start = int(np.searchsorted(history["timestamp"], cutoff))
+            # Nothing expired and no partial record from an interrupted append
+            if start == 0 and rows * SENTIMENT_HISTORY_DTYPE.itemsize == size:
+                return
+
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(self.history_file) or ".", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(history[start:].tobytes())
+            os.replace(tmp_file, self.history_file)
+        except Exception as e:
+            print(f"Error compacting sentiment history: {e}")
+            if tmp_file and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def load_history(self) -> np.ndarray:
+        """Get all stored snapshots as a read-only structured array (oldest first)"""
+        try:
+            if os.path.exists(self.history_file):
+                rows = os.path.getsize(self.history_file) // SENTIMENT_HISTORY_DTYPE.itemsize
+                if rows:
+                    return np.memmap(
+                        self.history_file, dtype=SENTIMENT_HISTORY_DTYPE, mode="r", shape=(rows,)
+                    )
+        except Exception as e:
+            print(f"Error loading sentiment history: {e}")
+        return np.zeros(0, dtype=SENTIMENT_HISTORY_DTYPE)
+
+    def get_sentiment_trends(self, window_hours: float = 24) -> Dict:
+        """
+        Trend and volatility indicators over the stored history (no API calls).
+
+        Returns:
+            Dictionary with 0-100 'momentum' and 'volatility' scores, FGI
+            change/slope over the window and the number of snapshots used
+        """
+        history = self.load_history()
+        if len(history) == 0:
             return {}
 
+        ts = history["timestamp"]
+        start = int(np.searchsorted(ts, ts[-1] - window_hours * 3600))
+        window = history[start:]
+        fgi = window["fgi"].astype(np.float64)
+        momentum = window["momentum_score"].astype(np.float64)
+        avg_change = window["avg_change"].astype(np.float64)
+
+        trends = {
+            "history_points": int(len(window)),
+            "fgi_change": float(fgi[-1] - fgi[0]),
+            # Breadth momentum (-1..1) mapped to 0-100, smoothed over the window
+            "momentum": float(np.clip(50 + 50 * momentum.mean(), 0, 100)),
+            # Mean absolute market move; a 5% average 24h move scores 50
+            "volatility": float(np.clip(np.abs(avg_change).mean() * 10, 0, 100)),
+            "momentum_std": float(momentum.std()),
+        }
+        if len(window) >= 2 and ts[-1] > window["timestamp"][0]:
+            hours = (window["timestamp"] - window["timestamp"][0]) / 3600.0
+            trends["fgi_slope_per_hour"] = float(np.polyfit(hours, fgi, 1)[0])
+        return trends
+
     def _load_cache(self) -> Optional[Dict]:
         """Load data from cache"""
         try:
@@ -0,0 +1,400 @@
+# src/indicators.py - Pure-NumPy technical indicator kernels over (coins x time) arrays
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+# Every kernel accepts a 1-D series or a 2-D (coins x time) array and works
+# along the last axis. Leading NaNs (coins with shorter history padded on the
+# left) are treated as "not listed yet", so each row gives exactly the values
+# the same kernel would give on that coin alone. Formulas and warm-up lengths
+# follow the `ta` library (see validate_against_ta).
+
+
+def _as_float_2d(values) -> Tuple[np.ndarray, bool]:
+    """Return a float64 2-D view of values and whether the input was 1-D"""
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 1:
+        return arr[np.newaxis, :], True
+    return arr, False
+
+
+def _restore(arr: np.ndarray, squeeze: bool) -> np.ndarray:
+    return arr[0] if squeeze else arr
+
+
+def shift(values, periods: int = 1) -> np.ndarray:
+    """Shift along time, filling the gap with NaN (like pandas.Series.shift)"""
+    x, squeeze = _as_float_2d(values)
+    out = np.full_like(x, np.nan)
+    if periods > 0:
+        out[:, periods:] = x[:, :-periods]
+    elif periods < 0:
+        out[:, :periods] = x[:, -periods:]
+    else:
+        out[:] = x
+    return _restore(out, squeeze)
+
+
+def _rolling_sums(x: np.ndarray, window: int, *arrays: np.ndarray):
+    """Windowed sums of each array (NaN ignored) plus the valid-count window"""
+    valid = ~np.isnan(x)
+    for arr in arrays:
+        valid &= ~np.isnan(arr)
+    count = np.cumsum(valid, axis=-1, dtype=np.float64)
+    count[:, window:] -= count[:, :-window].copy()
+
+    sums = []
+    for arr in (x,) + arrays:
+        csum = np.cumsum(np.where(valid, arr, 0.0), axis=-1)
+        csum[:, window:] -= csum[:, :-window].copy()
+        sums.append(csum)
+    return count, sums
+
+
+def _row_reference(x: np.ndarray) -> np.ndarray:
+    """First valid value of each row, used to centre sums for precision"""
+    valid = ~np.isnan(x)
+    first = np.argmax(valid, axis=-1)
+    ref = x[np.arange(x.shape[0]), first]
+    return np.where(np.isnan(ref), 0.0, ref)[:, np.newaxis]
+
+
+def rolling_mean(values, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    """Simple moving average (pandas rolling().mean() semantics)"""
+    x, squeeze = _as_float_2d(values)
+    min_periods = window if min_periods is None else max(1, min_periods)
+    ref = _row_reference(x)
+    count, (total,) = _rolling_sums(x - ref, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = total / count + ref
+    out[count < min_periods] = np.nan
+    return _restore(out, squeeze)
+
+
+def rolling_std(values, window: int, min_periods: Optional[int] = None, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation (pandas rolling().std(ddof) semantics)"""
+    x, squeeze = _as_float_2d(values)
+    min_periods = window if min_periods is None else max(1, min_periods)
+    centred = x - _row_reference(x)
+    count, (total, total_sq) = _rolling_sums(centred, window, centred * centred)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (total_sq - total * total / count) / (count - ddof)
+    np.maximum(var, 0.0, out=var)
+    out = np.sqrt(var)
+    out[(count < min_periods) | (count - ddof <= 0)] = np.nan
+    return _restore(out, squeeze)
+
+
+def _rolling_extreme(values, window: int, min_periods: Optional[int], ufunc) -> np.ndarray:
+    x, squeeze = _as_float_2d(values)
+    min_periods = window if min_periods is None else max(1, min_periods)
+    out = x.copy()
+    # NaN-ignoring max/min over the window, one lag at a time, in place
+    for lag in range(1, min(window, x.shape[1])):
+        ufunc(out[:, lag:], x[:, :-lag], out=out[:, lag:])
+    count, _ = _rolling_sums(x, window)
+    out[count < min_periods] = np.nan
+    return _restore(out, squeeze)
+
+
+def rolling_max(values, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    """Rolling maximum (NaN ignored)"""
+    return _rolling_extreme(values, window, min_periods, np.fmax)
+
+
+def rolling_min(values, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    """Rolling minimum (NaN ignored)"""
+    return _rolling_extreme(values, window, min_periods, np.fmin)
+
+
+def rolling_corr(values_x, values_y, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+    """Rolling Pearson correlation (pandas rolling().corr() semantics)"""
+    x, squeeze = _as_float_2d(values_x)
+    y, _ = _as_float_2d(values_y)
+    min_periods = window if min_periods is None else max(1, min_periods)
+    x = x - _row_reference(x)
+    y = y - _row_reference(y)
+    count, (sx, sy, sxy, sxx, syy) = _rolling_sums(x, window, y, x * y, x * x, y * y)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / count
+        var_x = sxx - sx * sx / count
+        var_y = syy - sy * sy / count
+        out = cov / np.sqrt(var_x * var_y)
+    out[(count < max(2, min_periods)) | ~(var_x * var_y > 0)] = np.nan
+    return _restore(out, squeeze)
+
+
+def ema(values, span: Optional[float] = None, alpha: Optional[float] = None, min_periods: int = 0) -> np.ndarray:
+    """
+    Exponential moving average with pandas ``ewm(adjust=False)`` semantics.
+
+    The recursion runs in C via scipy.signal.lfilter on all rows at once.
+    Each row starts at its first valid value; interior gaps are forward-filled.
+
+    Args:
+        values: 1-D series or 2-D (coins x time) array
+        span: EMA span (alpha = 2 / (span + 1))
+        alpha: Smoothing factor, used instead of span (e.g. 1/14 for Wilder)
+        min_periods: Valid observations required before a value is emitted
+
+    Returns:
+        Array of EMA values with the input's shape
+    """
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    x, squeeze = _as_float_2d(values)
+    rows, length = x.shape
+    if length == 0:
+        return _restore(x.copy(), squeeze)
+
+    valid = ~np.isnan(x)
+    # Forward-fill gaps and back-fill the leading NaNs with each row's first value
+    idx = np.where(valid, np.arange(length), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    filled = x[np.arange(rows)[:, np.newaxis], idx]
+    first = np.argmax(valid, axis=-1)
+    start = x[np.arange(rows), first]
+    leading = np.arange(length) < first[:, np.newaxis]
+    filled = np.where(leading, start[:, np.newaxis], filled)
+    filled[np.isnan(filled)] = 0.0
+
+    # scipy.signal is slow to import; load it on first use
+    from scipy.signal import lfilter
+
+    zi = ((1.0 - alpha) * np.where(np.isnan(start), 0.0, start))[:, np.newaxis]
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], filled, axis=-1, zi=zi)
+
+    seen = np.cumsum(valid, axis=-1)
+    out[leading | (seen < max(1, min_periods))] = np.nan
+    return _restore(out, squeeze)
+
+
+# ==================== INDICATORS ====================
+
+def rsi(close, window: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder smoothing (alpha = 1/window)"""
+    x, squeeze = _as_float_2d(close)
+    diff = x - shift(x, 1)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    # Like `ta`, the first candle counts as a zero move; only missing candles are NaN
+    up[np.isnan(x)] = np.nan
+    down[np.isnan(x)] = np.nan
+
+    avg_up = ema(up, alpha=1.0 / window, min_periods=window)
+    avg_down = ema(down, alpha=1.0 / window, min_periods=window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(avg_down == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_down))
+    out[np.isnan(avg_up) | np.isnan(avg_down)] = np.nan
+    return _restore(out, squeeze)
+
+
+def macd(
+    close, fast: int = 12, slow: int = 26, signal: int = 9, min_periods: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD line, signal line and histogram.
+
+    Args:
+        min_periods: Warm-up override; None uses each EMA's span like `ta`,
+            0 emits values from the first candle
+
+    Returns:
+        Tuple of (macd, signal_line, histogram)
+    """
+    x, squeeze = _as_float_2d(close)
+    ema_fast = ema(x, span=fast, min_periods=fast if min_periods is None else min_periods)
+    ema_slow = ema(x, span=slow, min_periods=slow if min_periods is None else min_periods)
+    line = ema_fast - ema_slow
+    signal_line = ema(line, span=signal, min_periods=signal if min_periods is None else min_periods)
+    histogram = line - signal_line
+    return _restore(line, squeeze), _restore(signal_line, squeeze), _restore(histogram, squeeze)
+
+
+def bollinger(
+    close, window: int = 20, num_std: float = 2
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bollinger Bands (population std, as in `ta`).
+
+    Returns:
+        Tuple of (upper, middle, lower, width) where width is
+        (upper - lower) / middle * 100
+    """
+    middle = rolling_mean(close, window)
+    std = rolling_std(close, window, ddof=0)
+    upper = middle + num_std * std
+    lower = middle - num_std * std
+    with np.errstate(invalid="ignore", divide="ignore"):
+        width = (upper - lower) / middle * 100
+    return upper, middle, lower, width
+
+
+def stochastic(high, low, close, window: int = 14, smooth_window: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stochastic oscillator.
+
+    Returns:
+        Tuple of (%K, %D) where %D is the smooth_window mean of %K
+    """
+    lowest = rolling_min(low, window)
+    highest = rolling_max(high, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k = 100 * (np.asarray(close, dtype=np.float64) - lowest) / (highest - lowest)
+    k[~np.isfinite(k)] = np.nan
+    d = rolling_mean(k, smooth_window)
+    return k, d
+
+
+def cci(high, low, close, window: int = 20, constant: float = 0.015) -> np.ndarray:
+    """Commodity Channel Index using the mean absolute deviation"""
+    h, squeeze = _as_float_2d(high)
+    l, _ = _as_float_2d(low)
+    c, _ = _as_float_2d(close)
+    typical = (h + l + c) / 3.0
+    mean = rolling_mean(typical, window)
+
+    # Mean absolute deviation from each window's own mean, one lag at a time
+    mad = np.zeros_like(typical)
+    tmp = np.empty_like(typical)
+    for lag in range(window):
+        if lag >= typical.shape[1]:
+            break
+        np.subtract(typical[:, : typical.shape[1] - lag], mean[:, lag:], out=tmp[:, lag:])
+        np.abs(tmp[:, lag:], out=tmp[:, lag:])
+        mad[:, lag:] += tmp[:, lag:]
+    mad /= window
+    mad[:, : window - 1] = np.nan
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (typical - mean) / (constant * mad)
+    return _restore(out, squeeze)
+
+
+# ==================== FEATURE PANEL ====================
+
+def compute_feature_panel(
+    close, high=None, low=None, volume=None
+) -> Dict[str, np.ndarray]:
+    """
+    Compute every predictor feature for a whole universe in one call.
+
+    Args:
+        close: 2-D (coins x time) close prices; shorter histories are padded
+            with leading NaNs
+        high, low: Optional arrays of the same shape (close is used if missing)
+        volume: Optional volume array of the same shape
+
+    Returns:
+        Dictionary of feature name -> (coins x time) array, including 'target'
+        (next-candle change in percent)
+    """
+    close, _ = _as_float_2d(close)
+    high = close if high is None else _as_float_2d(high)[0]
+    low = close if low is None else _as_float_2d(low)[0]
+
+    prev = shift(close, 1)
+    f = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f["returns"] = close / prev - 1
+        f["log_returns"] = np.log(close / prev)
+
+        f["sma_7"] = rolling_mean(close, 7, min_periods=1)
+        f["sma_14"] = rolling_mean(close, 14, min_periods=1)
+        f["sma_30"] = rolling_mean(close, 30, min_periods=1)
+        f["ema_7"] = ema(close, span=7)
+        f["ema_14"] = ema(close, span=14)
+
+        f["rsi"] = rsi(close, 14)
+        f["macd"], f["macd_signal"], f["macd_diff"] = macd(close)
+        f["bb_upper"], _, f["bb_lower"], f["bb_width"] = bollinger(close, 20, 2)
+        f["stoch_k"], f["stoch_d"] = stochastic(high, low, close, 14, 3)
+        f["cci"] = cci(high, low, close, 20)
+
+        f["volatility"] = rolling_std(close, 20, min_periods=1)
+
+        if volume is not None:
+            volume, _ = _as_float_2d(volume)
+            f["volume_sma"] = rolling_mean(volume, 20, min_periods=1)
+            f["volume_ratio"] = volume / f["volume_sma"]
+            f["price_volume_corr"] = rolling_corr(close, volume, 20, min_periods=1)
+        else:
+            f["volume_sma"] = np.zeros_like(close)
+            f["volume_ratio"] = np.ones_like(close)
+            f["price_volume_corr"] = np.zeros_like(close)
+
+        f["high_20"] = rolling_max(high, 20, min_periods=1)
+        f["low_20"] = rolling_min(low, 20, min_periods=1)
+        f["price_position"] = (close - f["low_20"]) / (f["high_20"] - f["low_20"] + 0.0001)
+
+        close_7 = shift(close, 7)
+        close_14 = shift(close, 14)
+        f["roc_7"] = (close - close_7) / (close_7 + 0.0001) * 100
+        f["roc_14"] = (close - close_14) / (close_14 + 0.0001) * 100
+
+        f["target"] = (shift(close, -1) - close) / (close + 0.0001) * 100
+
+    return f
+
+
+def validate_against_ta(close, high, low, rtol: float = 1e-6) -> Dict[str, float]:
+    """
+    Compare the kernels with the `ta` library on one series.
+
+    Returns:
+        Dictionary of indicator name -> max relative difference (over rows
+        where both are defined). Raises ImportError if `ta` is not installed.
+    """
+    import pandas as pd
+    import ta
+
+    close_s, high_s, low_s = pd.Series(close), pd.Series(high), pd.Series(low)
+    macd_ta = ta.trend.MACD(close_s)
+    bb_ta = ta.volatility.BollingerBands(close_s, window=20, window_dev=2)
+    stoch_ta = ta.momentum.StochasticOscillator(high_s, low_s, close_s, window=14, smooth_window=3)
+
+    line, signal_line, hist = macd(close)
+    upper, _, lower, width = bollinger(close, 20, 2)
+    k, d = stochastic(high, low, close, 14, 3)
+
+    pairs = {
+        "rsi": (rsi(close, 14), ta.momentum.RSIIndicator(close_s, window=14).rsi()),
+        "macd": (line, macd_ta.macd()),
+        "macd_signal": (signal_line, macd_ta.macd_signal()),
+        "macd_diff": (hist, macd_ta.macd_diff()),
+        "bb_upper": (upper, bb_ta.bollinger_hband()),
+        "bb_lower": (lower, bb_ta.bollinger_lband()),
+        "bb_width": (width, bb_ta.bollinger_wband()),
+        "stoch_k": (k, stoch_ta.stoch()),
+        "stoch_d": (d, stoch_ta.stoch_signal()),
+        "cci": (cci(high, low, close, 20), ta.trend.CCIIndicator(high_s, low_s, close_s, window=20).cci()),
+    }
+
+    report = {}
+    for name, (ours, theirs) in pairs.items():
+        theirs = theirs.to_numpy(dtype=np.float64)
+        if not np.array_equal(np.isnan(ours), np.isnan(theirs)):
+            report[name] = float("inf")
+            continue
+        mask = ~np.isnan(ours)
+        denom = np.maximum(np.abs(theirs[mask]), 1.0)
+        report[name] = float(np.max(np.abs(ours[mask] - theirs[mask]) / denom)) if mask.any() else 0.0
+        if report[name] > rtol:
+            print(f"Indicator mismatch vs ta: {name} (max rel diff {report[name]:.2e})")
+    return report
+
+
+# Example usage
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(100, 2000)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.01, size=close.shape))
+    low = close * (1 - rng.uniform(0, 0.01, size=close.shape))
+    volume = rng.uniform(1e6, 5e6, size=close.shape)
+
+    panel = compute_feature_panel(close, high, low, volume)
+    print(f"Computed {len(panel)} features for {close.shape[0]} coins x {close.shape[1]} candles")
+
+    report = validate_against_ta(close[0], high[0], low[0])
+    for name, diff in report.items():
+        print(f"{name:12s} max rel diff vs ta: {diff:.2e}")
@@ -0,0 +1,326 @@
+# src/live_charts.py - Persistent matplotlib canvases updated in place with blitting
+
+from typing import Dict, List, Optional, Sequence
+
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+
+from downsampling import ResolutionPyramid, minmax_decimate
+
+
+class LiveChart(FigureCanvas):
+    """
+    Qt canvas whose figure and artists are created once and then updated.
+
+    Artists registered with ``add_animated`` are left out of normal draws.
+    After every full draw the static background (axes, grid, ticks) is
+    cached, so a data update only restores that background, redraws the
+    animated artists and blits the axes area. A full redraw is only needed
+    when the axis limits change.
+    """
+
+    def __init__(self, figsize=(4, 2), dpi: int = 100, parent=None):
+        super().__init__(Figure(figsize=figsize, dpi=dpi))
+        if parent is not None:
+            self.setParent(parent)
+        self.ax = self.figure.add_subplot(111)
+        self._animated = []
+        self._background = None
+        self.mpl_connect("draw_event", self._on_draw)
+
+    def add_animated(self, artist):
+        """Register an artist that is redrawn on every update"""
+        artist.set_animated(True)
+        self._animated.append(artist)
+        return artist
+
+    def remove_animated(self, artist):
+        """Stop redrawing an artist and remove it from the figure"""
+        if artist in self._animated:
+            self._animated.remove(artist)
+        artist.remove()
+
+    def _on_draw(self, event):
+        self._background = self.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self._animated:
+            self.figure.draw_artist(artist)
+
+    def refresh(self, full: bool = False):
+        """Show the updated artists; blit unless a full redraw is requested"""
+        if full or self._background is None:
+            self.draw_idle()
+            return
+        self.restore_region(self._background)
+        self._draw_animated()
+        self.blit(self.figure.bbox)
+
+
+class LiveBarChart(LiveChart):
+    """Bar chart with fixed categories whose heights and labels update in place"""
+
+    def __init__(
+        self,
+        categories: Sequence[str],
+        colors: Optional[Sequence[str]] = None,
+        figsize=(4, 2),
+        dpi: int = 100,
+        parent=None,
+    ):
+        super().__init__(figsize=figsize, dpi=dpi, parent=parent)
+        values = [0] * len(categories)
+        self.bars = self.ax.bar(categories, values, color=colors, alpha=0.8)
+        self.labels: List = []
+        for bar in self.bars:
+            self.add_animated(bar)
+            label = self.ax.text(
+                bar.get_x() + bar.get_width() / 2.0,
+                0,
+                "",
+                ha="center",
+                va="bottom",
+                fontsize=10,
+                fontweight="bold",
+            )
+            self.labels.append(self.add_animated(label))
+
+        self.ax.grid(True, alpha=0.3, linestyle="--", axis="y")
+        self.ax.spines["top"].set_visible(False)
+        self.ax.spines["right"].set_visible(False)
+        self.ax.set_ylim(0, 1)
+        self.figure.tight_layout()
+
+    def set_values(self, values: Sequence[float], fmt: str = "{}"):
+        """Update bar heights and value labels"""
+        for bar, label, value in zip(self.bars, self.labels, values):
+            bar.set_height(value)
+            label.set_y(value)
+            label.set_text(fmt.format(value))
+
+        # Rescale only when the bars outgrow the axis or shrink far below it,
+        # keeping headroom for the labels
+        peak = max(max(values, default=0), 1)
+        top = self.ax.get_ylim()[1]
+        rescale = peak * 1.15 > top or peak * 3 < top
+        if rescale:
+            self.ax.set_ylim(0, peak * 1.3)
+        self.refresh(full=rescale)
+
+
+class HistoryChart(LiveChart):
+    """
+    Zoomable line/candlestick chart for long price histories.
+
+    Each series is stored as a ResolutionPyramid of OHLC aggregates. On every
+    zoom or pan the finest level that fits the visible range is sliced;
+    lines are further min/max decimated to about one bucket per pixel and
+    candles are limited to one per few pixels, so the number of drawn
+    points depends on the widget width, not on the length of the history.
+    Mouse wheel zooms around the cursor, left-drag pans.
+
+    While zooming or panning only the series are blitted over the cached
+    axes; ticks and labels are redrawn once the interaction pauses for
+    ``settle_ms``, since a full axis redraw costs far more than the data.
+    """
+
+    def __init__(
+        self, mode: str = "line", figsize=(8, 3), dpi: int = 100, settle_ms: int = 150, parent=None
+    ):
+        super().__init__(figsize=figsize, dpi=dpi, parent=parent)
+        self.mode = mode
+        self.series: Dict[str, Dict] = {}
+        self._drag = None
+        self._interacting = False
+        self._settle_timer = self.new_timer(interval=settle_ms)
+        self._settle_timer.single_shot = True
+        self._settle_timer.add_callback(self.refresh, True)
+
+        locator = mdates.AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.ax.grid(True, alpha=0.3, linestyle="--")
+        self.ax.set_ylabel("Price (USD)", fontsize=10)
+        self.figure.tight_layout()
+
+        self.ax.callbacks.connect("xlim_changed", lambda ax: self._update_view())
+        self.mpl_connect("resize_event", lambda event: self._update_view())
+        self.mpl_connect("scroll_event", self._on_scroll)
+        self.mpl_connect("button_press_event", self._on_press)
+        self.mpl_connect("motion_notify_event", self._on_motion)
+        self.mpl_connect("button_release_event", self._on_release)
+
+    # ==================== SERIES ====================
+    def set_series(
+        self,
+        name: str,
+        timestamps,
+        close,
+        open_=None,
+        high=None,
+        low=None,
+        color: Optional[str] = None,
+    ):
+        """
+        Add or replace a series.
+
+        Args:
+            name: Series label (e.g. coin ID)
+            timestamps: datetime64 values in increasing order
+            close: Closing prices
+            open_, high, low: OHLC columns; without all three the series is
+                always drawn as a line (candles of closes alone are flat)
+            color: Line color
+        """
+        self.remove_series(name)
+        x = mdates.date2num(np.asarray(timestamps, dtype="datetime64[ns]"))
+        line = self.add_animated(self.ax.plot([], [], color=color, linewidth=1.2, label=name)[0])
+        wicks = self.add_animated(LineCollection([], colors="#555555", linewidths=0.8))
+        bodies = self.add_animated(PolyCollection([], edgecolors="none"))
+        self.ax.add_collection(wicks, autolim=False)
+        self.ax.add_collection(bodies, autolim=False)
+        self.series[name] = {
+            "pyramid": ResolutionPyramid(x, close, open_, high, low),
+            "ohlc": open_ is not None and high is not None and low is not None,
+            "line": line,
+            "wicks": wicks,
+            "bodies": bodies,
+        }
+        self._apply_mode()
+        self.reset_view()
+
+    def remove_series(self, name: str):
+        """Remove one series and its artists"""
+        series = self.series.pop(name, None)
+        if series:
+            for key in ("line", "wicks", "bodies"):
+                self.remove_animated(series[key])
+
+    def clear_series(self):
+        """Remove all series"""
+        for name in list(self.series):
+            self.remove_series(name)
+        self.refresh(full=True)
+
+    def set_mode(self, mode: str):
+        """Switch between 'line' and 'candles' (close-only series stay lines)"""
+        self.mode = mode
+        self._apply_mode()
+        self._update_view()
+
+    def _apply_mode(self):
+        for series in self.series.values():
+            candles = self.mode == "candles" and series["ohlc"]
+            series["line"].set_visible(not candles)
+            series["wicks"].set_visible(candles)
+            series["bodies"].set_visible(candles)
+
+    def reset_view(self):
+        """Zoom out to the full history"""
+        if not self.series:
+            return
+        ranges = [series["pyramid"].x_range for series in self.series.values()]
+        x0 = min(r[0] for r in ranges)
+        x1 = max(r[1] for r in ranges)
+        if x1 <= x0:
+            x1 = x0 + 1
+        self.ax.set_xlim(x0, x1)
+
+    # ==================== LEVEL OF DETAIL ====================
+    def _update_view(self):
+        if not self.series:
+            return
+        x0, x1 = self.ax.get_xlim()
+        width = max(int(self.ax.bbox.width), 100)
+        lows, highs = [], []
+
+        for series in self.series.values():
+            pyramid = series["pyramid"]
+            if self.mode == "candles" and series["ohlc"]:
+                # At least 3 pixels per candle
+                _, view = pyramid.select(x0, x1, max(width // 3, 10))
+                self._set_candles(series, view)
+                visible_low, visible_high = view["low"], view["high"]
+            else:
+                _, view = pyramid.select(x0, x1, 4 * width)
+                dx, dy = minmax_decimate(view["x"], view["close"], width)
+                series["line"].set_data(dx, dy)
+                visible_low = visible_high = dy
+            if len(visible_low):
+                lows.append(np.nanmin(visible_low))
+                highs.append(np.nanmax(visible_high))
+
+        if lows:
+            low, high = min(lows), max(highs)
+            margin = (high - low) * 0.05 or abs(high) * 0.01 or 1.0
+            self.ax.set_ylim(low - margin, high + margin)
+
+        if self._interacting:
+            self.refresh()
+            self._settle_timer.start()
+        else:
+            self.refresh(full=True)
+
+    def _set_xlim_interactive(self, x0: float, x1: float):
+        self._interacting = True
+        try:
+            self.ax.set_xlim(x0, x1)
+        finally:
+            self._interacting = False
+
+    @staticmethod
+    def _set_candles(series: Dict, view: Dict[str, np.ndarray]):
+        x = view["x"]
+        if len(x) == 0:
+            series["wicks"].set_segments([])
+            series["bodies"].set_verts([])
+            return
+        step = float(np.median(np.diff(x))) if len(x) > 1 else 1 / 24
+        half = step * 0.35
+        opens, closes = view["open"], view["close"]
+
+        wicks = np.empty((len(x), 2, 2))
+        wicks[:, 0, 0] = wicks[:, 1, 0] = x
+        wicks[:, 0, 1] = view["low"]
+        wicks[:, 1, 1] = view["high"]
+
+        bodies = np.empty((len(x), 4, 2))
+        bodies[:, [0, 1], 0] = (x - half)[:, None]
+        bodies[:, [2, 3], 0] = (x + half)[:, None]
+        bodies[:, [0, 3], 1] = opens[:, None]
+        bodies[:, [1, 2], 1] = closes[:, None]
+
+        series["wicks"].set_segments(wicks)
+        series["bodies"].set_verts(bodies)
+        series["bodies"].set_facecolors(np.where(closes >= opens, "#27ae60", "#e74c3c"))
+
+    # ==================== INTERACTION ====================
+    def _on_scroll(self, event):
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        scale = 1 / 1.25 if event.button == "up" else 1.25
+        x0, x1 = self.ax.get_xlim()
+        # Do not zoom in past a couple of hours
+        if scale < 1 and (x1 - x0) * scale < 2 / 24:
+            return
+        self._set_xlim_interactive(
+            event.xdata - (event.xdata - x0) * scale, event.xdata + (x1 - event.xdata) * scale
+        )
+
+    def _on_press(self, event):
+        if event.inaxes is self.ax and event.button == 1:
+            self._drag = (event.x, self.ax.get_xlim())
+
+    def _on_motion(self, event):
+        if self._drag is None or event.x is None:
+            return
+        start_x, (x0, x1) = self._drag
+        shift = (start_x - event.x) * (x1 - x0) / max(self.ax.bbox.width, 1)
+        self._set_xlim_interactive(x0 + shift, x1 + shift)
+
+    def _on_release(self, event):
+        self._drag = None
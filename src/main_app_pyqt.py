@@ -1,7 +1,6 @@
 # src/main_app_pyqt.py
 
 import sys
-import pandas as pd
 import numpy as np
 import time
 from pycoingecko import CoinGeckoAPI
@@ -15,6 +14,7 @@ from PyQt5.QtWidgets import (
     QVBoxLayout,
     QPushButton,
     QComboBox,
+    QCheckBox,
     QHBoxLayout,
     QLabel,
     QHeaderView,
@@ -34,25 +34,71 @@ from PyQt5.QtWidgets import (
     QGridLayout,
     QScrollArea,  # ADD THIS
     QFrame,       # ADD THIS
-    QListWidget,  # ADD THIS
-    QListWidgetItem,  # ADD THIS
+    QListView,
     QMenu,        # ADD THIS
 )
 from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
-from PyQt5.QtGui import QBrush, QColor, QFont, QPalette, QPixmap  # ADD QPixmap
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib
+from PyQt5.QtGui import QBrush, QColor, QFont, QPalette, QStandardItem, QStandardItemModel
 import requests
-from io import BytesIO
 
-matplotlib.use("Qt5Agg")
-
-
-from improved_price_predictor import AdvancedPricePredictor
+from startup import BackgroundLoader, LazyTab, StartupTimer
+from api_handler import EnhancedCryptoAPIHandler as MarketDataHandler
 from improved_portfolio_tracker import PortfolioTracker
 from improved_sentiment_tracker import SentimentTracker
+from improved_notification_manager import ImprovedNotificationManager
+from alert_engine import AlertEngine
+from coin_catalog import CoinCatalog
+from coin_filter import SEARCH_ROLE, CoinFilterProxyModel, debounced
+from warm_snapshot import WarmSnapshot, describe_age
+from tick_stream import TickPipeline, apply_deltas
+
+# Seconds a coin's chart history is reused before it is downloaded again
+CHART_HISTORY_MAX_AGE = 3600
+
+# Line colors of compared coins in the price history chart
+CHART_COLORS = ["#9b59b6", "#3498db", "#e67e22", "#16a085", "#c0392b", "#2c3e50"]
+
+# How often the warm-start snapshot is rewritten while data is fresh
+SNAPSHOT_INTERVAL_MS = 5 * 60 * 1000
+
+# While auto-refresh streams live prices, their changes are applied this often
+DELTA_INTERVAL_MS = 500
+
+# Seconds closing the window waits for queued emails before dropping them
+EMAIL_STOP_TIMEOUT = 1.0
+
+# How often the predictor's Fear & Greed history is checked for new days (the
+# store itself only fetches every few hours)
+FGI_REFRESH_INTERVAL_MS = 60 * 60 * 1000
+
+# ...and the full listing (ranks, market caps, 1h/7d changes) is refetched this often
+LISTING_INTERVAL_S = 5 * 60
+
+# Plotting (matplotlib) and ML (pandas, scikit-learn) take most of the import
+# time; they are loaded when the first tab that needs them is opened
+Figure = FigureCanvas = HistoryChart = LiveBarChart = None
+AdvancedPricePredictor = CoinHistoryCache = None
+
+
+def load_plotting_stack():
+    """Import matplotlib and the chart widgets on first use"""
+    global Figure, FigureCanvas, HistoryChart, LiveBarChart
+    if Figure is None:
+        import matplotlib
+
+        matplotlib.use("Qt5Agg")
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from live_charts import HistoryChart, LiveBarChart
+        from matplotlib.figure import Figure
+
+
+def load_ml_stack():
+    """Import the price predictor and history cache on first use"""
+    global AdvancedPricePredictor, CoinHistoryCache
+    if AdvancedPricePredictor is None:
+        from coin_sentiment import CoinHistoryCache
+        from improved_price_predictor import AdvancedPricePredictor
+
 
 class EnhancedCryptoAPIHandler:
     """Enhanced API handler with rate limiting and search functionality"""
@@ -120,13 +166,15 @@ class PredictionWorker(QThread):
 
 
 
-class EnhancedCryptoAPIHandler:
+class EnhancedCryptoAPIHandler(MarketDataHandler):
     """Enhanced API handler with rate limiting and search functionality"""
 
     def __init__(self):
+        super().__init__()
         self.cg = CoinGeckoAPI()
         self.last_request_time = time.time()
         self.min_request_interval = 1.2
+        self.catalog = CoinCatalog()
 
     def _rate_limit(self):
         current_time = time.time()
@@ -136,15 +184,15 @@ class EnhancedCryptoAPIHandler:
         self.last_request_time = time.time()
 
     def get_coin_price(self, coin_ids, vs_currency="usd"):
-        self._rate_limit()
-        try:
-            return self.cg.get_price(ids=",".join(coin_ids), vs_currencies=vs_currency)
-        except Exception as e:
-            print(f"Price Error: {e}")
-            return {}
+        # Routed over the market-data providers (errors are handled there)
+        return self.get_price(coin_ids, vs_currency)
 
     def search_coins(self, query):
         """Search for coins by name or symbol"""
+        # Served from the local catalog (refreshed in the background at
+        # startup); the search endpoint is only a fallback
+        if len(self.catalog):
+            return self.catalog.search(query, limit=20)
         self._rate_limit()
         try:
             search_results = self.cg.search(query)
@@ -220,6 +268,61 @@ class AddTransactionDialog(QDialog):
             )
 
 
+class PriceAlertDialog(QDialog):
+    """Set a one-shot price alert for a coin"""
+
+    def __init__(self, coin_name, current_price, alerts=(), parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Price Alert - {coin_name}")
+        self.setModal(True)
+        self.current_price = current_price
+        self.init_ui(alerts)
+
+    def init_ui(self, alerts):
+        layout = QGridLayout()
+
+        layout.addWidget(QLabel("Current Price:"), 0, 0)
+        layout.addWidget(QLabel(f"${self.current_price:,.4f}"), 0, 1)
+        # Alert type
+        layout.addWidget(QLabel("Alert When Price Is:"), 1, 0)
+        self.type_combo = QComboBox()
+        self.type_combo.addItems(["Above", "Below"])
+        layout.addWidget(self.type_combo, 1, 1)
+        # Level (the type follows the side of the current price)
+        layout.addWidget(QLabel("Level:"), 2, 0)
+        self.level_input = QDoubleSpinBox()
+        self.level_input.setRange(0.00000001, 10000000)
+        self.level_input.setDecimals(8)
+        self.level_input.setPrefix("$")
+        self.level_input.setValue(self.current_price)
+        self.level_input.valueChanged.connect(self.update_type)
+        layout.addWidget(self.level_input, 2, 1)
+        # Alerts already set for the coin
+        active = ", ".join(f"{alert['type']} ${alert['level']:,.4f}" for alert in alerts) or "none"
+        active_label = QLabel(f"Active alerts: {active}")
+        active_label.setWordWrap(True)
+        layout.addWidget(active_label, 3, 0, 1, 2)
+        # Buttons
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel, Qt.Horizontal, self
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons, 4, 0, 1, 2)
+        self.setLayout(layout)
+        self.resize(320, 160)
+
+    def update_type(self, level):
+        if self.current_price:
+            self.type_combo.setCurrentText("Below" if level < self.current_price else "Above")
+
+    def get_data(self):
+        return {
+            "type": self.type_combo.currentText().lower(),
+            "level": self.level_input.value(),
+        }
+
+
 class EnhancedPredictionTab(QWidget):
     """Simple prediction tab to get started"""
     def __init__(self, api_handler, predictor):
@@ -537,6 +640,7 @@ class CryptoTrackerApp(QMainWindow):
 
         # Initialize components
         self.api = EnhancedCryptoAPIHandler()
+        load_ml_stack()
         self.predictor = AdvancedPricePredictor(self.api)  # Your existing predictor
         self.portfolio = PortfolioTracker()
         self.sentiment = SentimentTracker(self.api)
@@ -588,10 +692,21 @@ class CryptoTrackerApp(QMainWindow):
 class EnhancedPredictionTab(QWidget):
     """Enhanced predictions with multiple timeframes"""
 
-    def __init__(self, api_handler, predictor):
+    def __init__(self, api_handler, predictor, alert_engine=None):
         super().__init__()
+        load_plotting_stack()
+        load_ml_stack()
         self.api = api_handler
         self.predictor = predictor
+        # Receives the support/resistance levels of each prediction
+        self.alert_engine = alert_engine
+        # Share the handler's cache so each coin is downloaded once per process
+        self.history_cache = getattr(api_handler, "history_cache", None) or CoinHistoryCache(api_handler)
+        # History loads still running (kept alive until they finish)
+        self._history_loaders = []
+        self._history_coin = None
+        # coin_id -> (fetched_at, chart history)
+        self._chart_histories = {}
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -758,7 +873,31 @@ class EnhancedPredictionTab(QWidget):
         charts_layout.addWidget(self.chart_7d)
         charts_group.setLayout(charts_layout)
         splitter.addWidget(charts_group)
-        splitter.setSizes([150, 150, 400])
+        # Price history (zoom with the mouse wheel, drag to pan)
+        history_group = QGroupBox("Price History")
+        history_layout = QVBoxLayout()
+        history_controls = QHBoxLayout()
+        history_controls.addWidget(QLabel("Style:"))
+        self.history_style_combo = QComboBox()
+        self.history_style_combo.addItems(["Line", "Candles"])
+        self.history_style_combo.currentTextChanged.connect(
+            lambda text: self.history_chart.set_mode(text.lower())
+        )
+        history_controls.addWidget(self.history_style_combo)
+        # Overlay several coins, each indexed to 100 at its latest close
+        self.history_compare_check = QCheckBox("Compare coins")
+        self.history_compare_check.toggled.connect(self.on_history_compare_toggled)
+        history_controls.addWidget(self.history_compare_check)
+        reset_zoom_button = QPushButton("Reset Zoom")
+        reset_zoom_button.clicked.connect(lambda: self.history_chart.reset_view())
+        history_controls.addWidget(reset_zoom_button)
+        history_controls.addStretch()
+        history_layout.addLayout(history_controls)
+        self.history_chart = HistoryChart(figsize=(8, 3))
+        history_layout.addWidget(self.history_chart)
+        history_group.setLayout(history_layout)
+        splitter.addWidget(history_group)
+        splitter.setSizes([150, 150, 400, 300])
         layout.addWidget(splitter)
         self.setLayout(layout)
         # Load coins
@@ -831,6 +970,7 @@ class EnhancedPredictionTab(QWidget):
             QMessageBox.warning(self, "Warning", "Please select a coin first")
             return
         timeframe = self.timeframe_combo.currentText()
+        self.load_price_history(coin_id)
         # Get current price
         try:
             price_data = self.api.get_coin_price([coin_id], "usd")
@@ -861,6 +1001,70 @@ class EnhancedPredictionTab(QWidget):
             QMessageBox.critical(self, "Error", f"Prediction failed: {str(e)}")
             self.reset_ui()
 
+    def load_price_history(self, coin_id):
+        """Load a coin's chart history off the UI thread (it may need a download), then show it"""
+        self._history_coin = coin_id
+        loader = BackgroundLoader(self.fetch_chart_history, coin_id)
+        loader.loaded.connect(lambda history: self.show_price_history(coin_id, history))
+        loader.failed.connect(lambda error: print(f"Error loading price history: {error}"))
+        loader.finished.connect(lambda: self._history_loaders.remove(loader))
+        self._history_loaders.append(loader)
+        loader.start()
+
+    def fetch_chart_history(self, coin_id):
+        """
+        Full-history OHLC candles of a coin (runs on a background thread).
+
+        Falls back to the cached hourly closes (drawn as a line only) when
+        the OHLC endpoint has nothing for the coin.
+        """
+        cached = self._chart_histories.get(coin_id)
+        if cached is not None and time.time() - cached[0] < CHART_HISTORY_MAX_AGE:
+            return cached[1]
+        history = self.api.get_ohlc_history(coin_id) if hasattr(self.api, "get_ohlc_history") else None
+        if history is None or len(history) == 0:
+            hourly = self.history_cache.get(coin_id, days=90)
+            history = None if hourly is None or len(hourly) == 0 else {
+                "timestamp": hourly["timestamp"].astype("datetime64[ns]"),
+                "close": hourly["close"],
+            }
+        if history is not None:
+            self._chart_histories[coin_id] = (time.time(), history)
+        return history
+
+    def on_history_compare_toggled(self, checked):
+        """Redraw the selected coin alone, indexed to 100 when comparing"""
+        self.history_chart.clear_series()
+        if self._history_coin:
+            self.load_price_history(self._history_coin)
+
+    def show_price_history(self, coin_id, history):
+        """Draw a loaded history (replacing the chart unless comparing coins)"""
+        compare = self.history_compare_check.isChecked()
+        if coin_id != self._history_coin and not compare:
+            return
+        try:
+            if history is None or len(history) == 0:
+                return
+            if not compare:
+                self.history_chart.clear_series()
+            # Compared coins share one axis: index each to 100 at its latest close
+            close = np.asarray(history["close"], dtype=np.float64)
+            scale = 100.0 / close[-1] if compare and close[-1] else 1.0
+            has_ohlc = "open" in history
+            color = CHART_COLORS[len(self.history_chart.series) % len(CHART_COLORS)]
+            self.history_chart.set_series(
+                coin_id,
+                np.asarray(history["timestamp"], dtype="datetime64[ns]"),
+                close * scale,
+                open_=np.asarray(history["open"]) * scale if has_ohlc else None,
+                high=np.asarray(history["high"]) * scale if has_ohlc else None,
+                low=np.asarray(history["low"]) * scale if has_ohlc else None,
+                color=color,
+            )
+        except Exception as e:
+            print(f"Error loading price history: {e}")
+
     def predict_24h(self, coin_id, current_price):
         """Predict 24-hour price"""
         try:
@@ -869,6 +1073,7 @@ class EnhancedPredictionTab(QWidget):
             result_24h = self.predictor.predict_price(coin_id, current_price)
             self.progress_bar.setValue(100)
             self.display_24h_prediction(result_24h, current_price)
+            self.watch_levels(coin_id, result_24h)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"24h prediction failed: {str(e)}")
         finally:
@@ -954,6 +1159,7 @@ class EnhancedPredictionTab(QWidget):
                     }
             self.progress_bar.setValue(100)
             self.display_both_predictions(result_24h, result_7d, current_price)
+            self.watch_levels(coin_id, result_24h)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Prediction failed: {str(e)}")
         finally:
@@ -985,6 +1191,8 @@ class EnhancedPredictionTab(QWidget):
             f"24-hour trend: {'Bullish' if pred_change > 0 else 'Bearish'}",
             f"Confidence level: {'High' if confidence >= 70 else 'Moderate' if confidence >= 50 else 'Low'}",
             f"Expected movement: {abs(pred_change):.2f}%",
+            self.format_interval(result),
+            self.format_levels(result),
             "Trading suggestion: Consider "
             + (
                 "buying opportunities"
@@ -999,7 +1207,7 @@ class EnhancedPredictionTab(QWidget):
         if result.get("is_fallback", False):
             insights.append("⚠️ Using statistical fallback model")
         self.insights_text.setPlainText(
-            "\n".join([f"• {insight}" for insight in insights])
+            "\n".join([f"• {insight}" for insight in insights if insight])
         )
         # Update chart
         self.update_24h_chart(result)
@@ -1126,11 +1334,15 @@ class EnhancedPredictionTab(QWidget):
             insights.append(
                 f"Confidence: 24h={result_24h['confidence_score']:.1f}%, 7d={result_7d['confidence_score']:.1f}%"
             )
+            insights.append(self.format_interval(result_24h))
+            insights.append(self.format_levels(result_24h))
         elif result_24h:
             insights.append(
                 f"24h prediction: {result_24h['direction'].upper()} ({result_24h['predicted_change_percent']:+.2f}%)"
             )
             insights.append(f"Confidence: {result_24h['confidence_score']:.1f}%")
+            insights.append(self.format_interval(result_24h))
+            insights.append(self.format_levels(result_24h))
             insights.append("7-day data unavailable")
         elif result_7d:
             insights.append(
@@ -1139,7 +1351,7 @@ class EnhancedPredictionTab(QWidget):
             insights.append(f"Confidence: {result_7d['confidence_score']:.1f}%")
             insights.append("24-hour data unavailable")
         self.insights_text.setPlainText(
-            "\n".join([f"• {insight}" for insight in insights])
+            "\n".join([f"• {insight}" for insight in insights if insight])
         )
         # Update charts
         if result_24h:
@@ -1147,6 +1359,36 @@ class EnhancedPredictionTab(QWidget):
         if result_7d:
             self.update_7d_chart(result_7d)
 
+    def format_interval(self, result):
+        """Format the P10/P50/P90 band of a prediction result"""
+        interval = result.get("interval") if result else None
+        if not interval:
+            return ""
+        return (
+            f"P10/P50/P90: ${interval['p10']:,.4f} / ${interval['p50']:,.4f} / "
+            f"${interval['p90']:,.4f}"
+        )
+
+    def watch_levels(self, coin_id, result):
+        """Alert when the price crosses the prediction's support/resistance levels"""
+        if self.alert_engine is None or not result or result.get("is_fallback"):
+            return
+        alert_levels = result.get("alert_levels")
+        if alert_levels:
+            self.alert_engine.add_alert_levels(coin_id, alert_levels)
+            self.alert_engine.save_alerts()
+
+    def format_levels(self, result):
+        """Format the nearest support/resistance levels of a prediction result"""
+        alert_levels = result.get("alert_levels") if result else None
+        if not alert_levels:
+            return ""
+        parts = []
+        for level, level_type in sorted(alert_levels.items()):
+            name = "Support" if level_type == "below" else "Resistance"
+            parts.append(f"{name} ${level:,.4f}")
+        return "Key levels: " + " | ".join(parts)
+
     def update_24h_chart(self, result):
         """Update 24-hour prediction chart"""
         self.ax_24h.clear()
@@ -1157,6 +1399,18 @@ class EnhancedPredictionTab(QWidget):
             "#27ae60" if result["predicted_change_percent"] > 0 else "#e74c3c",
         ]
         bars = self.ax_24h.bar(labels, prices, color=colors, alpha=0.8, width=0.6)
+        # P10-P90 band on the predicted bar
+        interval = result.get("interval")
+        if interval:
+            self.ax_24h.errorbar(
+                1,
+                interval["p50"],
+                yerr=[[interval["p50"] - interval["p10"]], [interval["p90"] - interval["p50"]]],
+                fmt="none",
+                ecolor="#2c3e50",
+                capsize=8,
+                linewidth=1.5,
+            )
         # Add value labels
         for bar, price in zip(bars, prices):
             height = bar.get_height()
@@ -1235,7 +1489,9 @@ class EnhancedPredictionTab(QWidget):
         self.ax_7d.set_title("7-Day Price Projection", fontsize=12, fontweight="bold")
         self.ax_7d.grid(True, alpha=0.3, linestyle="--")
         # Rotate x-axis labels
-        plt.setp(self.ax_7d.get_xticklabels(), rotation=45, ha="right")
+        for label in self.ax_7d.get_xticklabels():
+            label.set_rotation(45)
+            label.set_ha("right")
         self.figure_7d.tight_layout()
         self.canvas_7d.draw()
 
@@ -1245,8 +1501,10 @@ class EnhancedSentimentTab(QWidget):
 
     def __init__(self, api_handler):
         super().__init__()
+        load_plotting_stack()
         self.api = api_handler
         self.sentiment = SentimentTracker(api_handler)
+        self._coin_loader = None
         self.init_ui()
         self.load_sentiment_data()
         # Auto-refresh every 5 minutes
@@ -1368,7 +1626,11 @@ class EnhancedSentimentTab(QWidget):
         panel = QGroupBox("Market Overview")
         layout = QGridLayout()
         # Gainers vs Losers
-        self.gainers_losers_chart = QLabel()
+        self.gainers_losers_chart = LiveBarChart(
+            ["Gainers", "Losers", "Neutral"],
+            colors=["#27ae60", "#e74c3c", "#95a5a6"],
+            figsize=(4, 2),
+        )
         self.gainers_losers_chart.setMinimumHeight(150)
         self.gainers_losers_chart.setStyleSheet(
             "border: 1px solid #ddd; background-color: white;"
@@ -1536,9 +1798,10 @@ class EnhancedSentimentTab(QWidget):
                 losers_text += f"{i}. {coin.get('symbol', '').upper()}: {coin.get('change_24h', 0):.1f}%\n"
             self.top_gainers.setText(gainers_text)
             self.top_losers.setText(losers_text)
-            # Update analysis
+            # Update analysis; coin signals follow from a background load
             analysis = self.generate_market_analysis(sentiment_data)
             self.analysis_text.setPlainText(analysis)
+            self.load_coin_analysis(sentiment_data)
             # Draw simple chart for gainers vs losers
             self.draw_gainers_losers_chart(gainers, losers, neutral)
         except Exception as e:
@@ -1604,56 +1867,42 @@ class EnhancedSentimentTab(QWidget):
         label.setStyleSheet(f"font-weight: bold; color: {color};")
 
     def draw_gainers_losers_chart(self, gainers, losers, neutral):
-        """Draw simple gainers vs losers chart"""
+        """Update the gainers vs losers bars in place"""
         try:
-            # Create matplotlib figure
-            fig, ax = plt.subplots(figsize=(4, 2))
-            # Data
-            categories = ["Gainers", "Losers", "Neutral"]
-            values = [gainers, losers, neutral]
-            colors = ["#27ae60", "#e74c3c", "#95a5a6"]
-            # Create bar chart
-            bars = ax.bar(categories, values, color=colors, alpha=0.8)
-            # Add value labels
-            bars = ax.bar(categories, values, color=colors, alpha=0.8)
-
-            # Add value labels
-            for bar, value in zip(bars, values):
-                height = bar.get_height()
-                ax.text(
-                    bar.get_x() + bar.get_width() / 2.0,
-                    height,
-                    f"{value}",
-                    ha="center",
-                    va="bottom",
-                    fontsize=10,
-                    fontweight="bold",
-                )
-
-            # All these MUST line up with the 'for' and 'bars' above
-            ax.grid(True, alpha=0.3, linestyle="--", axis="y")
-            ax.spines["top"].set_visible(False)
-            ax.spines["right"].set_visible(False)
-            fig.tight_layout()
-
-            from io import BytesIO
-
-            buf = BytesIO()
-            fig.savefig(buf, format="png", dpi=100, bbox_inches="tight")
-            buf.seek(0)
-
-            pixmap = QPixmap()
-            pixmap.loadFromData(buf.getvalue())
-            # Set pixmap to label
-            self.gainers_losers_chart.setPixmap(pixmap)
-            self.gainers_losers_chart.setScaledContents(True)
-            # Clean up
-            plt.close(fig)
+            self.gainers_losers_chart.set_values([gainers, losers, neutral])
         except Exception as e:
             print(f"Error drawing chart: {e}")
 
-    def generate_market_analysis(self, sentiment_data):
-        """Generate comprehensive market analysis"""
+    def analysis_coins(self):
+        """Coin IDs and symbols covered by the coin analysis (the largest coins)"""
+        snapshot = self.sentiment.breadth.snapshot
+        if snapshot is not None and len(snapshot):
+            return list(snapshot.ids[:8]), dict(zip(snapshot.ids[:8], snapshot.symbols[:8]))
+        return ["bitcoin", "ethereum"], {"bitcoin": "BTC", "ethereum": "ETH"}
+
+    def load_coin_analysis(self, sentiment_data):
+        """Compute coin signals off the UI thread, then redraw the analysis with them"""
+        if self._coin_loader is not None and self._coin_loader.isRunning():
+            return
+        coin_ids, _ = self.analysis_coins()
+        self._coin_loader = BackgroundLoader(self.sentiment.get_coins_sentiment, coin_ids)
+        self._coin_loader.loaded.connect(
+            lambda coin_sentiment: self.analysis_text.setPlainText(
+                self.generate_market_analysis(sentiment_data, coin_sentiment)
+            )
+        )
+        self._coin_loader.failed.connect(lambda error: print(f"Error loading coin analysis: {error}"))
+        self._coin_loader.start()
+
+    def generate_market_analysis(self, sentiment_data, coin_sentiment=None):
+        """
+        Generate comprehensive market analysis
+
+        Args:
+            sentiment_data: get_market_sentiment result
+            coin_sentiment: get_coins_sentiment result for analysis_coins(),
+                or None while it is still loading
+        """
         fgi = sentiment_data.get("fear_greed", {})
         market_analysis = sentiment_data.get("market_analysis", {})
         fgi_value = fgi.get("value", 50)
@@ -1703,6 +1952,20 @@ class EnhancedSentimentTab(QWidget):
             analysis += "• Market Breadth: NEGATIVE\n"
         else:
             analysis += "• Market Breadth: MIXED\n"
+        # Signals for the largest coins, one batch over cached history
+        _, symbols = self.analysis_coins()
+        analysis += "\n🪙 COIN ANALYSIS:\n"
+        if coin_sentiment is None:
+            analysis += "• Loading coin signals...\n"
+        for coin_id, coin in (coin_sentiment or {}).items():
+            if "score" not in coin:
+                continue
+            analysis += (
+                f"• {symbols.get(coin_id, coin_id)}: {coin['positive']:.0f}% positive / "
+                f"{coin['negative']:.0f}% negative, 7d {coin['momentum_7d']:+.1f}%, "
+                f"RSI {coin['rsi']:.0f}, volatility {coin['volatility_regime']}, "
+                f"volume x{coin['volume_surge']:.1f}\n"
+            )
         analysis += "\n🎯 TRADING RECOMMENDATIONS:\n"
         # Generate recommendations based on FGI and market breadth
         if fgi_value >= 75 and gainer_percentage > 60:
@@ -1912,13 +2175,18 @@ class EnhancedPortfolioTab(QWidget):
         search_label = QLabel("Search:")
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search coins...")
-        self.search_input.textChanged.connect(self.search_coins)
+        debounced(self.search_input.textChanged, self.search_coins, parent=dialog)
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
         layout.addLayout(search_layout)
-        # Coin list
-        self.coin_list = QListWidget()
-        self.coin_list.itemDoubleClicked.connect(self.select_coin)
+        # Coin list; the proxy filters by name/symbol without rebuilding the list
+        self.coin_model = QStandardItemModel(dialog)
+        self.coin_proxy = CoinFilterProxyModel(key_role=SEARCH_ROLE, parent=dialog)
+        self.coin_proxy.setSourceModel(self.coin_model)
+        self.coin_list = QListView()
+        self.coin_list.setModel(self.coin_proxy)
+        self.coin_list.setEditTriggers(QListView.NoEditTriggers)
+        self.coin_list.doubleClicked.connect(self.select_coin)
         layout.addWidget(self.coin_list)
         # Load top coins
         self.load_market_coins()
@@ -1929,39 +2197,31 @@ class EnhancedPortfolioTab(QWidget):
         """Load market coins into list"""
         try:
             self.coins_data = self.api.get_top_coins(limit=100)
-            self.coin_list.clear()
+            self.coin_proxy.begin_update()
+            self.coin_model.clear()
             for coin in self.coins_data:
                 name = coin.get("name", "Unknown")
                 symbol = coin.get("symbol", "").upper()
                 price = coin.get("current_price", 0)
                 item_text = f"{name} ({symbol}) - ${price:,.4f}"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, coin["id"])
-                self.coin_list.addItem(item)
+                item = QStandardItem(item_text)
+                item.setData(coin["id"], Qt.UserRole)
+                item.setData(f"{name} {symbol}", SEARCH_ROLE)
+                self.coin_model.appendRow(item)
         except Exception as e:
             QMessageBox.critical(
                 self, "Error", f"Failed to load market coins: {str(e)}"
             )
+        finally:
+            self.coin_proxy.end_update()
 
     def search_coins(self):
         """Filter coins based on search"""
-        search_text = self.search_input.text().lower()
-        if not search_text:
-            self.load_market_coins()
-            return
-        self.coin_list.clear()
-        for coin in self.coins_data:
-            name = coin.get("name", "").lower()
-            symbol = coin.get("symbol", "").lower()
-            if search_text in name or search_text in symbol:
-                item_text = f"{coin['name']} ({coin['symbol'].upper()}) - ${coin['current_price']:,.4f}"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, coin["id"])
-                self.coin_list.addItem(item)
-
-    def select_coin(self, item):
+        self.coin_proxy.set_query(self.search_input.text())
+
+    def select_coin(self, index):
         """Select coin from list and open transaction dialog"""
-        coin_id = item.data(Qt.UserRole)
+        coin_id = index.data(Qt.UserRole)
         # Find coin data
         coin_data = None
         for coin in self.coins_data:
@@ -2047,7 +2307,7 @@ class EnhancedCryptoTrackerApp(QMainWindow):
         self.setGeometry(100, 100, 1600, 900)
         # Initialize components
         self.api = EnhancedCryptoAPIHandler()
-        self.predictor = AdvancedPricePredictor(self.api)
+        self._predictor = None
         self.portfolio = PortfolioTracker()
         self.init_ui()
         # Load initial data
@@ -2079,31 +2339,80 @@ class EnhancedCryptoTrackerApp(QMainWindow):
         # Data will be loaded by individual tabs
         self.status_bar.showMessage("Ready - Data loading in background")
 
-    def __init__(self):
+    def __init__(self, startup: StartupTimer = None):
         super().__init__()
+        self.startup = startup or StartupTimer()
         self.setWindowTitle("CoinSentinel AI - Advanced Cryptocurrency Tracker")
         self.setGeometry(100, 100, 1400, 850)
         # Initialize components
         self.api = EnhancedCryptoAPIHandler()
-        self.predictor = AdvancedPricePredictor(self.api)
+        self._predictor = None
         self.portfolio = PortfolioTracker()
         self.sentiment = SentimentTracker(self.api)
+        self.notifier = ImprovedNotificationManager()
+        self.alert_engine = AlertEngine(self.notifier)
+        self.alert_engine.load_alerts()
         self.current_currency = "usd"
         self.top_coins = []
+        self._initial_loads = {}
+        # Last session's state, shown until fresh data arrives
+        self.snapshot = WarmSnapshot()
+        self.snapshot_dirty = False
+        self.latest_prices = {}
+        self.last_portfolio = None
+        self.last_sentiment = None
+        self.market_updated_at = None
+        self.listing_updated_at = None
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.timeout.connect(self.save_snapshot)
+        # Live prices from exchange feeds, started by auto-refresh
+        self.tick_pipeline = None
+        self.delta_timer = QTimer(self)
+        self.delta_timer.timeout.connect(self.apply_price_deltas)
+        # Started with the predictor; feature lookups never fetch FGI themselves
+        self.fgi_timer = QTimer(self)
+        self.fgi_timer.timeout.connect(self.refresh_fgi_history)
+        self._fgi_loader = None
+        self.startup.mark("services_ready")
         self.init_ui()
+        self.startup.mark("window_built")
+
+    @property
+    def predictor(self):
+        """Price predictor, created (with the ML stack) on first use"""
+        if self._predictor is None:
+            load_ml_stack()
+            self._predictor = AdvancedPricePredictor(self.api)
+            self.refresh_fgi_history()
+            self.fgi_timer.start(FGI_REFRESH_INTERVAL_MS)
+        return self._predictor
+
+    def refresh_fgi_history(self):
+        """Update the predictor's Fear & Greed history off the UI thread"""
+        if self._fgi_loader is not None and self._fgi_loader.isRunning():
+            return
+        self._fgi_loader = BackgroundLoader(self._predictor.fgi_store.refresh)
+        self._fgi_loader.start()
 
     def init_ui(self):
         # Create central widget
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
+        # Shown while the tabs display the previous session's data
+        self.stale_banner = QLabel()
+        self.stale_banner.setStyleSheet(
+            "background-color: #fff3cd; color: #856404; padding: 4px; border-radius: 3px;"
+        )
+        self.stale_banner.hide()
+        main_layout.addWidget(self.stale_banner)
         # Create tab widget
         self.tabs = QTabWidget()
         # Add tabs
         self.tabs.addTab(self.create_market_tab(), "Market Overview")
-        self.tabs.addTab(
-            EnhancedPredictionTab(self.api, self.predictor), "AI Predictions"
-        )
+        # Built on first open, together with the plotting and ML stacks
+        self.prediction_tab = LazyTab(lambda: EnhancedPredictionTab(self.api, self.predictor, self.alert_engine))
+        self.tabs.addTab(self.prediction_tab, "AI Predictions")
         self.tabs.addTab(self.create_portfolio_tab(), "Portfolio")
         self.tabs.addTab(self.create_sentiment_tab(), "Market Sentiment")
         main_layout.addWidget(self.tabs)
@@ -2111,22 +2420,49 @@ class EnhancedCryptoTrackerApp(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Application ready")
-        # Initialize data
-        self.load_initial_data()
+        # Initialize data once the window is on screen
+        QTimer.singleShot(0, self.load_initial_data)
 
     def show_market_context_menu(self, position):
+        row = self.market_table.rowAt(position.y())
+        name_item = self.market_table.item(row, 1) if row >= 0 else None
+        coin_id = name_item.data(Qt.UserRole) if name_item else None
+        if not coin_id:
+            return
+        alerts = self.alert_engine.get_alerts(coin_id)
+
         menu = QMenu()
         predict_action = menu.addAction("Predict Price")
+        alert_action = menu.addAction("Set Price Alert...")
+        clear_action = menu.addAction(f"Clear Price Alerts ({len(alerts)})") if alerts else None
         action = menu.exec_(self.market_table.viewport().mapToGlobal(position))
 
+        if action is None:
+            return
         if action == predict_action:
-            row = self.market_table.rowAt(position.y())
-            if row >= 0:
-                name_item = self.market_table.item(row, 1)
-                if name_item:
-                    coin_id = name_item.data(Qt.UserRole)
-                    if coin_id:
-                        self.open_prediction_tab(coin_id)
+            self.open_prediction_tab(coin_id)
+        elif action == alert_action:
+            self.set_price_alert(coin_id)
+        elif action == clear_action:
+            self.alert_engine.clear_coin(coin_id)
+            self.alert_engine.save_alerts()
+            self.status_bar.showMessage(f"Price alerts cleared for {coin_id}")
+
+    def set_price_alert(self, coin_id):
+        """Ask for a level and register a one-shot alert on the coin's USD price"""
+        coin = next((coin for coin in self.top_coins if coin.get("id") == coin_id), {})
+        price = self.latest_prices.get(coin_id) or coin.get("current_price") or 0
+        dialog = PriceAlertDialog(
+            coin.get("name", coin_id), price, self.alert_engine.get_alerts(coin_id), self
+        )
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        data = dialog.get_data()
+        self.alert_engine.add_alert(coin_id, data["type"], data["level"], coin.get("symbol"))
+        self.alert_engine.save_alerts()
+        self.status_bar.showMessage(
+            f"Alert set: {coin.get('symbol', coin_id).upper()} {data['type']} ${data['level']:,.4f}"
+        )
 
     def open_prediction_tab(self, coin_id):
         """Switch to prediction tab and select coin"""
@@ -2134,6 +2470,8 @@ class EnhancedCryptoTrackerApp(QMainWindow):
         self.tabs.setCurrentIndex(1)
         # Get the prediction tab widget
         prediction_tab = self.tabs.currentWidget()
+        if isinstance(prediction_tab, LazyTab):
+            prediction_tab = prediction_tab.widget()
         if hasattr(prediction_tab, 'set_current_coin'):
             prediction_tab.set_current_coin(coin_id)
 
@@ -2329,16 +2667,101 @@ class EnhancedCryptoTrackerApp(QMainWindow):
         layout.addWidget(stats_panel)
         return widget
 
+    def closeEvent(self, event):
+        """Persist alerts and the warm-start snapshot, flush queued emails on exit"""
+        self.save_snapshot()
+        self.alert_engine.save_alerts()
+        # Don't hold the window open on a slow SMTP server
+        self.notifier.close(timeout=EMAIL_STOP_TIMEOUT)
+        self.delta_timer.stop()
+        self.fgi_timer.stop()
+        self.api.catalog.save_ranks()
+        self.api.market_data.close()
+        super().closeEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        self.startup.mark("first_paint")
+
     def load_initial_data(self):
-        """Load initial data"""
+        """Show the last snapshot, then load market and sentiment data in parallel in the background"""
         self.status_bar.showMessage("Loading initial data...")
-        # Load market data
-        self.refresh_market_data()
-        # Load sentiment data
-        self.refresh_sentiment()
-        # Load portfolio if exists
-        self.refresh_portfolio()
-        self.status_bar.showMessage("Ready")
+        restored = self.restore_snapshot()
+        if not restored or restored.get("portfolio") is None:
+            # Portfolio comes from the local transaction file
+            self.refresh_portfolio()
+        self.startup.mark("portfolio_loaded")
+        # Market and sentiment need the network; fetch both at once off the UI thread
+        self.refresh_button.setEnabled(False)
+        self._initial_loads = {
+            "market": BackgroundLoader(
+                self.api.get_top_coins, limit=100, vs_currency=self.current_currency
+            ),
+            "sentiment": BackgroundLoader(self.sentiment.get_market_sentiment),
+        }
+        for name, loader in self._initial_loads.items():
+            loader.loaded.connect(lambda result, name=name: self.on_initial_load(name, result))
+            loader.failed.connect(lambda error, name=name: self.on_initial_load(name, None, error))
+            loader.start()
+        # Download (first run) or revalidate the coin list for offline search
+        self._catalog_loader = BackgroundLoader(self.api.catalog.refresh)
+        self._catalog_loader.start()
+        self.snapshot_timer.start(SNAPSHOT_INTERVAL_MS)
+
+    def on_initial_load(self, name, result, error=None):
+        """Show one background result; report startup timings after the last"""
+        self.startup.mark(f"{name}_loaded")
+        if error:
+            self.status_bar.showMessage(f"Error loading {name} data: {error}")
+            if name == "market":
+                self.refresh_button.setEnabled(True)
+        elif name == "market":
+            self.show_market_data(result)
+        else:
+            self.show_sentiment(result)
+
+        if all(f"{other}_loaded" in self.startup.marks for other in self._initial_loads):
+            self.status_bar.showMessage("Ready")
+            if self.stale_banner.isVisible():
+                age = describe_age(time.time() - self.market_updated_at)
+                self.stale_banner.setText(f"Market data could not be refreshed - showing data from {age}")
+            self.startup.report()
+
+    # ==================== WARM START ====================
+    def restore_snapshot(self):
+        """Show the state saved by the previous session, marked as stale"""
+        snapshot = self.snapshot.load()
+        if not snapshot or snapshot.get("currency") != self.current_currency:
+            return None
+        self.market_updated_at = snapshot["saved_at"]
+        age = describe_age(WarmSnapshot.age(snapshot))
+        if snapshot["coins"]:
+            self.show_market_data(snapshot["coins"], stale=True)
+        if snapshot.get("portfolio") is not None:
+            self.show_portfolio(snapshot["portfolio"])
+            self.last_portfolio = snapshot["portfolio"]
+        if snapshot.get("sentiment"):
+            saved_at = datetime.fromtimestamp(snapshot["saved_at"])
+            self.show_sentiment(snapshot["sentiment"], updated_at=saved_at)
+            self.last_sentiment = snapshot["sentiment"]
+        self.stale_banner.setText(f"Showing data from {age} - refreshing...")
+        self.stale_banner.show()
+        self.startup.mark("snapshot_shown")
+        return snapshot
+
+    def save_snapshot(self):
+        """Save the current market, portfolio and sentiment state for the next launch"""
+        # Nothing fresh arrived: keep the existing snapshot and its timestamp
+        if not self.snapshot_dirty or not self.top_coins:
+            return
+        if self.snapshot.save(
+            self.top_coins,
+            portfolio=self.last_portfolio,
+            sentiment=self.last_sentiment,
+            currency=self.current_currency,
+            saved_at=self.market_updated_at,
+        ):
+            self.snapshot_dirty = False
 
     def change_currency(self, currency):
         """Change display currency"""
@@ -2347,12 +2770,36 @@ class EnhancedCryptoTrackerApp(QMainWindow):
 
     def refresh_market_data(self):
         """Refresh market data with ML predictions"""
+        self.status_bar.showMessage("Fetching market data...")
+        self.refresh_button.setEnabled(False)
         try:
-            self.status_bar.showMessage("Fetching market data...")
-            self.refresh_button.setEnabled(False)
             # Get top coins
             coins = self.api.get_top_coins(limit=100, vs_currency=self.current_currency)
+        except Exception as e:
+            self.refresh_button.setEnabled(True)
+            self.status_bar.showMessage(f"Error: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to load market data: {str(e)}")
+            return
+        self.show_market_data(coins)
+
+    def show_market_data(self, coins, stale=False):
+        """
+        Fill the market table and statistics from a top-coins listing
+
+        Args:
+            coins: get_top_coins result
+            stale: Listing comes from the warm-start snapshot; it is displayed
+                but not fed to the sentiment tracker or the price alerts
+        """
+        try:
             self.top_coins = coins
+            if coins and not stale:
+                if hasattr(self.api, "catalog"):
+                    # Market-cap ranks decide between coins sharing a ticker
+                    self.api.catalog.update_ranks(coins)
+                if self.current_currency == "usd":
+                    # Sentiment breadth reuses this snapshot instead of refetching
+                    self.sentiment.set_market_snapshot(coins)
             if not coins:
                 self.status_bar.showMessage("No market data available")
                 return
@@ -2411,9 +2858,24 @@ class EnhancedCryptoTrackerApp(QMainWindow):
                 #         r, cid, p
                 #     ),
                 # )
+            if self.current_currency == "usd":
+                # Portfolio values are in USD
+                self.latest_prices = {coin.get("id"): coin.get("current_price") for coin in coins}
+                if not stale:
+                    # Check price alerts against the fresh prices
+                    triggered = self.alert_engine.on_prices(self.latest_prices)
+                    if triggered:
+                        self.alert_engine.save_alerts()
+                    self.refresh_portfolio()
             # Update statistics
             self.update_market_statistics(total_market_cap, total_volume, coins)
-            self.status_bar.showMessage(f"Market data updated: {len(coins)} coins")
+            if stale:
+                self.status_bar.showMessage(f"Showing last session's market data: {len(coins)} coins")
+            else:
+                self.market_updated_at = self.listing_updated_at = time.time()
+                self.snapshot_dirty = True
+                self.stale_banner.hide()
+                self.status_bar.showMessage(f"Market data updated: {len(coins)} coins")
         except Exception as e:
             self.status_bar.showMessage(f"Error: {str(e)}")
             QMessageBox.critical(self, "Error", f"Failed to load market data: {str(e)}")
@@ -2429,13 +2891,27 @@ class EnhancedCryptoTrackerApp(QMainWindow):
                     pred_price = prediction["predicted_price"]
                     confidence = prediction["confidence_score"]
                     pred_change = ((pred_price - current_price) / current_price) * 100
-                    # Prediction cell
-                    pred_item = QTableWidgetItem(f"{pred_price:,.2f}")
+                    interval = prediction.get("interval")
+                    # Prediction cell (P50 with the P10-P90 band when calibrated)
+                    if interval:
+                        pred_item = QTableWidgetItem(
+                            f"{interval['p50']:,.2f} "
+                            f"[{interval['p10']:,.2f} – {interval['p90']:,.2f}]"
+                        )
+                    else:
+                        pred_item = QTableWidgetItem(f"{pred_price:,.2f}")
                     if pred_change > 0:
                         pred_item.setForeground(QBrush(QColor("#00aa00")))
                     elif pred_change < 0:
                         pred_item.setForeground(QBrush(QColor("#aa0000")))
-                    pred_item.setToolTip(f"Predicted change: {pred_change:+.2f}%")
+                    tooltip = f"Predicted change: {pred_change:+.2f}%"
+                    if interval:
+                        tooltip += (
+                            f"\nP10: {interval['p10_change_percent']:+.2f}%"
+                            f"\nP50: {interval['p50_change_percent']:+.2f}%"
+                            f"\nP90: {interval['p90_change_percent']:+.2f}%"
+                        )
+                    pred_item.setToolTip(tooltip)
                     self.market_table.setItem(row, 9, pred_item)
                     # Confidence cell
                     conf_item = QTableWidgetItem(f"{confidence:.1f}%")
@@ -2515,10 +2991,15 @@ class EnhancedCryptoTrackerApp(QMainWindow):
                             "predicted_change_percent", 0
                         ),
                         "confidence_score": prediction.get("confidence_score", 0),
+                        "predicted_p10": (prediction.get("interval") or {}).get("p10", ""),
+                        "predicted_p50": (prediction.get("interval") or {}).get("p50", ""),
+                        "predicted_p90": (prediction.get("interval") or {}).get("p90", ""),
                         "direction": prediction.get("direction", "neutral"),
                         "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     }
                     df_data.append(row_data)
+                import pandas as pd
+
                 df = pd.DataFrame(df_data)
                 df.to_csv(filename, index=False)
                 self.status_bar.showMessage(f"Market data exported to {filename}")
@@ -2533,7 +3014,14 @@ class EnhancedCryptoTrackerApp(QMainWindow):
             )
 
     def toggle_auto_refresh(self, option):
-        """Toggle auto-refresh timer"""
+        """
+        Toggle auto-refresh
+
+        Prices stream in from the exchange feeds and are applied every
+        DELTA_INTERVAL_MS. The chosen interval only drives full listing
+        refreshes while no feed is live (and every LISTING_INTERVAL_S
+        otherwise, for ranks and market caps).
+        """
         if hasattr(self, "auto_refresh_timer"):
             self.auto_refresh_timer.stop()
         intervals = {
@@ -2544,13 +3032,73 @@ class EnhancedCryptoTrackerApp(QMainWindow):
         }
         interval = intervals.get(option, 0)
         if interval > 0:
+            if self.tick_pipeline is None:
+                self.tick_pipeline = TickPipeline.from_router(self.api.market_data)
+            self.tick_pipeline.start()
+            self.delta_timer.start(DELTA_INTERVAL_MS)
             self.auto_refresh_timer = QTimer()
-            self.auto_refresh_timer.timeout.connect(self.refresh_market_data)
+            self.auto_refresh_timer.timeout.connect(self.poll_market_data)
             self.auto_refresh_timer.start(interval)
-            self.status_bar.showMessage(f"Auto-refresh enabled: {option}")
+            self.status_bar.showMessage(f"Auto-refresh enabled: live prices, polling every {option} without a feed")
         else:
+            self.delta_timer.stop()
+            if self.tick_pipeline is not None:
+                self.tick_pipeline.stop()
             self.status_bar.showMessage("Auto-refresh disabled")
 
+    def poll_market_data(self):
+        """Auto-refresh timer: refetch the listing unless live prices cover it"""
+        streaming = self.tick_pipeline is not None and self.tick_pipeline.live
+        if (
+            streaming
+            and self.listing_updated_at
+            and time.time() - self.listing_updated_at < LISTING_INTERVAL_S
+        ):
+            return
+        self.refresh_market_data()
+
+    def apply_price_deltas(self):
+        """Apply streamed price changes to the market table, portfolio and alerts"""
+        deltas = self.tick_pipeline.drain() if self.tick_pipeline else {}
+        if not deltas:
+            return
+        # Streamed prices are USD, like the portfolio and the alerts
+        prices = {coin_id: delta["price"] for coin_id, delta in deltas.items()}
+        self.latest_prices.update(prices)
+        triggered = self.alert_engine.on_prices(prices)
+        if triggered:
+            self.alert_engine.save_alerts()
+        if self.portfolio.holdings.keys() & prices.keys():
+            self.refresh_portfolio()
+        if self.current_currency == "usd" and apply_deltas(self.top_coins, deltas):
+            self.update_market_rows(deltas)
+            self.market_updated_at = time.time()
+            self.snapshot_dirty = True
+
+    def update_market_rows(self, deltas):
+        """Update the price and 24h cells of the streamed coins in place"""
+        table = self.market_table
+        sorting = table.isSortingEnabled()
+        # Sorting would move rows while they are edited
+        table.setSortingEnabled(False)
+        for row in range(table.rowCount()):
+            name_item = table.item(row, 1)
+            delta = deltas.get(name_item.data(Qt.UserRole)) if name_item else None
+            if delta is None:
+                continue
+            table.item(row, 3).setText(f"{delta['price']:,.2f}")
+            change = delta.get("change_24h")
+            if change is not None:
+                item = table.item(row, 5)
+                item.setText(f"{change:+.2f}%")
+                if change > 0:
+                    item.setForeground(QBrush(QColor("#00aa00")))
+                elif change < 0:
+                    item.setForeground(QBrush(QColor("#aa0000")))
+                else:
+                    item.setData(Qt.ForegroundRole, None)
+        table.setSortingEnabled(sorting)
+
     def add_transaction(self):
         """Open dialog to add transaction"""
         dialog = AddTransactionDialog(self)
@@ -2587,9 +3135,19 @@ class EnhancedCryptoTrackerApp(QMainWindow):
                 )
 
     def refresh_portfolio(self):
-        """Refresh portfolio display"""
+        """Revalue the portfolio at the latest market prices"""
+        try:
+            portfolio_data = self.portfolio.get_portfolio_summary(self.latest_prices)
+        except Exception as e:
+            self.status_bar.showMessage(f"Error updating portfolio: {str(e)}")
+            return
+        self.last_portfolio = portfolio_data
+        self.snapshot_dirty = True
+        self.show_portfolio(portfolio_data)
+
+    def show_portfolio(self, portfolio_data):
+        """Show a portfolio summary"""
         try:
-            portfolio_data = self.portfolio.get_portfolio_summary()
             if not portfolio_data["holdings"]:
                 self.portfolio_table.setRowCount(0)
                 self.total_value_label.setText("Total Value: $0.00")
@@ -2730,6 +3288,8 @@ class EnhancedCryptoTrackerApp(QMainWindow):
                         "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     }
                 )
+                import pandas as pd
+
                 df = pd.DataFrame(export_data)
                 df.to_csv(filename, index=False)
                 self.status_bar.showMessage(f"Portfolio exported to {filename}")
@@ -2745,12 +3305,31 @@ class EnhancedCryptoTrackerApp(QMainWindow):
 
     def refresh_sentiment(self):
         """Refresh market sentiment data"""
+        self.status_bar.showMessage("Fetching market sentiment...")
         try:
-            self.status_bar.showMessage("Fetching market sentiment...")
             sentiment_data = self.sentiment.get_market_sentiment()
+        except Exception as e:
+            self.status_bar.showMessage(f"Error loading sentiment: {str(e)}")
+            QMessageBox.warning(self, "Error", f"Failed to load sentiment data: {str(e)}")
+            return
+        self.show_sentiment(sentiment_data)
+
+    def show_sentiment(self, sentiment_data, updated_at=None):
+        """
+        Show a market sentiment result
+
+        Args:
+            sentiment_data: get_market_sentiment result
+            updated_at: When the result was computed, if it comes from the
+                warm-start snapshot (default: now)
+        """
+        try:
             if not sentiment_data:
                 self.status_bar.showMessage("No sentiment data available")
                 return
+            if updated_at is None:
+                self.last_sentiment = sentiment_data
+                self.snapshot_dirty = True
             # Update Fear & Greed Index
             fgi_value = sentiment_data.get("fear_greed", {}).get("value", 0)
             fgi_class = sentiment_data.get("fear_greed", {}).get("classification", "")
@@ -2791,12 +3370,17 @@ Market Analysis:
 • Gainers (24h): {gainers} cryptocurrencies
 • Losers (24h): {losers} cryptocurrencies
 • Neutral: {neutral} cryptocurrencies
+• Fear & Greed change (24h): {market_analysis.get("fgi_change", 0):+.0f} over {market_analysis.get("history_points", 0)} snapshots
+• Breadth momentum score: {market_analysis.get("momentum", 50):.0f}/100
+• Advance/Decline: {market_analysis.get("advancers", 0)}/{market_analysis.get("decliners", 0)} ({market_analysis.get("breadth_pct", 0):.0f}% advancing of {market_analysis.get("total_coins_analyzed", 0)} coins)
+• Cap-weighted change: 1h {market_analysis.get("cap_weighted_change_1h", 0):+.2f}%, 24h {market_analysis.get("cap_weighted_change_24h", 0):+.2f}%, 7d {market_analysis.get("cap_weighted_change_7d", 0):+.2f}%
+• Dispersion (24h): {market_analysis.get("dispersion_24h", 0):.2f}% std, {market_analysis.get("iqr_24h", 0):.2f}% IQR
 Market Conditions: {description}
 Trading Implications:
 {fgi_value >= 75 and "Extreme greed suggests caution - consider taking profits or setting stop losses." or ""}
 {fgi_value <= 25 and "Extreme fear may present buying opportunities for long-term investors." or ""}
 {45 <= fgi_value <= 55 and "Neutral market conditions suggest balanced risk-reward." or ""}
-Last Updated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+Last Updated: {(updated_at or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")}{updated_at and " (last session)" or ""}
 """
             self.sentiment_text.setPlainText(sentiment_text)
             # Update statistics
@@ -2825,6 +3409,8 @@ Last Updated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
             )
 def main():
     """Main application entry point"""
+    startup = StartupTimer()
+    startup.mark("imports_done")
     app = QApplication(sys.argv)
     
     # Set application style
@@ -2832,7 +3418,7 @@ def main():
 
     # Create the main window - NO parameters needed!
     # CryptoTrackerApp creates everything inside itself
-    window = EnhancedCryptoTrackerApp()  # <-- NO PARAMETERS!
+    window = EnhancedCryptoTrackerApp(startup)
     window.show()
     
     # Start event loop
@@ -0,0 +1,259 @@
+# src/market_breadth.py - Vectorized market-breadth analytics over the top-N coin universe
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# CoinGecko's maximum page size for /coins/markets
+MAX_PER_PAGE = 250
+
+# 24h change (%) bucket edges for the breadth histogram
+HISTOGRAM_EDGES = np.array([-20.0, -10.0, -5.0, -1.0, 1.0, 5.0, 10.0, 20.0])
+HISTOGRAM_LABELS = [
+    "< -20%", "-20% to -10%", "-10% to -5%", "-5% to -1%", "-1% to 1%",
+    "1% to 5%", "5% to 10%", "10% to 20%", "> 20%",
+]
+
+# Numeric snapshot columns and the coin dict keys they are read from
+SNAPSHOT_COLUMNS = {
+    "price": ("current_price",),
+    "market_cap": ("market_cap",),
+    "volume": ("total_volume",),
+    "change_1h": ("price_change_percentage_1h_in_currency",),
+    "change_24h": ("price_change_percentage_24h_in_currency", "price_change_percentage_24h"),
+    "change_7d": ("price_change_percentage_7d_in_currency",),
+}
+
+
+def _column(coins: List[Dict], keys) -> np.ndarray:
+    """Float column from coin dicts; missing values become NaN"""
+    values = np.full(len(coins), np.nan)
+    for i, coin in enumerate(coins):
+        for key in keys:
+            value = coin.get(key)
+            if value is not None:
+                values[i] = value
+                break
+    return values
+
+
+class MarketSnapshot:
+    """
+    Columnar view of a market listing: one NumPy array per field, rows in
+    market-cap order. Missing numbers are NaN.
+    """
+
+    def __init__(self, coins: List[Dict], timestamp: Optional[float] = None):
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.ids = np.array([coin.get("id", "") for coin in coins], dtype=object)
+        self.symbols = np.array([(coin.get("symbol") or "").upper() for coin in coins], dtype=object)
+        for name, keys in SNAPSHOT_COLUMNS.items():
+            setattr(self, name, _column(coins, keys))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def age(self) -> float:
+        """Seconds since the snapshot was taken"""
+        return time.time() - self.timestamp
+
+    def update(self, coins: List[Dict]):
+        """Overwrite the rows of coins that are already in the snapshot"""
+        index = {coin_id: row for row, coin_id in enumerate(self.ids)}
+        rows = np.array([index.get(coin.get("id"), -1) for coin in coins], dtype=np.int64)
+        known = rows >= 0
+        if not known.any():
+            return
+        known_coins = [coin for coin, ok in zip(coins, known) if ok]
+        for name, keys in SNAPSHOT_COLUMNS.items():
+            fresh = _column(known_coins, keys)
+            column = getattr(self, name)
+            # Keep the old value where the fresh listing has none
+            column[rows[known]] = np.where(np.isnan(fresh), column[rows[known]], fresh)
+        self.timestamp = time.time()
+
+
+def compute_breadth(snapshot: MarketSnapshot, top_n: int = 100) -> Dict:
+    """
+    Breadth statistics for a market snapshot.
+
+    Args:
+        snapshot: Columnar market snapshot
+        top_n: Size of the large-cap subset reported separately
+
+    Returns:
+        Dictionary with gainer/loser buckets, advance/decline figures,
+        equal- and cap-weighted momentum, dispersion and a 24h histogram
+    """
+    total = len(snapshot)
+    if total == 0:
+        return {}
+
+    # Missing 24h changes count as flat, like the per-coin loop did
+    change = np.nan_to_num(snapshot.change_24h)
+    gainers = int(np.count_nonzero(change > 1))
+    losers = int(np.count_nonzero(change < -1))
+    advancers = int(np.count_nonzero(change > 0))
+    decliners = int(np.count_nonzero(change < 0))
+    momentum_score = (gainers - losers) / total
+
+    if momentum_score > 0.3:
+        market_sentiment = "Strongly Bullish"
+    elif momentum_score > 0.1:
+        market_sentiment = "Bullish"
+    elif momentum_score > -0.1:
+        market_sentiment = "Neutral"
+    elif momentum_score > -0.3:
+        market_sentiment = "Bearish"
+    else:
+        market_sentiment = "Strongly Bearish"
+
+    # Cap-weighted figures use only coins with both a cap and a change
+    caps = np.nan_to_num(snapshot.market_cap)
+    cap_weighted = {}
+    for name in ("change_1h", "change_24h", "change_7d"):
+        values = getattr(snapshot, name)
+        valid = ~np.isnan(values) & (caps > 0)
+        weight = caps[valid].sum()
+        cap_weighted[name] = float(values[valid] @ caps[valid] / weight) if weight > 0 else 0.0
+
+    valid = ~np.isnan(snapshot.change_24h) & (caps > 0)
+    weights = caps[valid] / caps[valid].sum() if valid.any() else np.zeros(0)
+    cap_dispersion = float(
+        np.sqrt(weights @ (snapshot.change_24h[valid] - cap_weighted["change_24h"]) ** 2)
+    ) if valid.any() else 0.0
+
+    q25, median, q75 = np.percentile(change, [25, 50, 75])
+    counts = np.bincount(np.digitize(change, HISTOGRAM_EDGES), minlength=len(HISTOGRAM_EDGES) + 1)
+
+    top = change[:top_n]
+    return {
+        "gainers": gainers,
+        "losers": losers,
+        "neutral": total - gainers - losers,
+        "extreme_gainers": int(np.count_nonzero(change > 5)),
+        "extreme_losers": int(np.count_nonzero(change < -5)),
+        "momentum_score": momentum_score,
+        "avg_change_24h": float(change.mean()),
+        "median_change_24h": float(median),
+        "market_sentiment": market_sentiment,
+        "total_coins_analyzed": total,
+        "advancers": advancers,
+        "decliners": decliners,
+        "unchanged": total - advancers - decliners,
+        "advance_decline_ratio": advancers / decliners if decliners else float(advancers),
+        "advance_decline_line": advancers - decliners,
+        "breadth_pct": advancers / total * 100,
+        "top_breadth_pct": float(np.count_nonzero(top > 0)) / len(top) * 100,
+        "cap_weighted_change_1h": cap_weighted["change_1h"],
+        "cap_weighted_change_24h": cap_weighted["change_24h"],
+        "cap_weighted_change_7d": cap_weighted["change_7d"],
+        "dispersion_24h": float(change.std()),
+        "cap_weighted_dispersion_24h": cap_dispersion,
+        "iqr_24h": float(q75 - q25),
+        "histogram": dict(zip(HISTOGRAM_LABELS, counts.tolist())),
+    }
+
+
+class MarketBreadth:
+    """
+    Keeps a columnar snapshot of the top ``universe_size`` coins, fetched in
+    pages of up to 250 and refreshed at most every ``cache_duration`` seconds.
+    """
+
+    def __init__(
+        self,
+        api_handler,
+        universe_size: int = 1000,
+        per_page: int = MAX_PER_PAGE,
+        cache_duration: float = 300,
+        vs_currency: str = "usd",
+    ):
+        """
+        Args:
+            api_handler: Handler providing get_top_coins(limit, vs_currency, page)
+            universe_size: Number of coins analysed (500-5000 is typical)
+            per_page: Coins requested per page (at most 250)
+            cache_duration: Seconds before the snapshot is fetched again
+            vs_currency: Quote currency of the snapshot
+        """
+        self.api = api_handler
+        self.universe_size = universe_size
+        self.per_page = min(per_page, MAX_PER_PAGE)
+        self.cache_duration = cache_duration
+        self.vs_currency = vs_currency
+        self.snapshot = None
+
+    def fetch_snapshot(self) -> Optional[MarketSnapshot]:
+        """Page through the universe and build a new snapshot"""
+        coins = []
+        pages = -(-self.universe_size // self.per_page)
+        for page in range(1, pages + 1):
+            try:
+                batch = self.api.get_top_coins(
+                    limit=self.per_page, vs_currency=self.vs_currency, page=page
+                )
+            except Exception as e:
+                print(f"Error fetching market page {page}: {e}")
+                batch = None
+            if not batch:
+                break
+            coins.extend(batch)
+            if len(batch) < self.per_page:
+                break
+
+        if not coins:
+            return None
+        self.snapshot = MarketSnapshot(coins[:self.universe_size])
+        return self.snapshot
+
+    def get_snapshot(self) -> Optional[MarketSnapshot]:
+        """Cached snapshot, fetched again once it is older than cache_duration"""
+        if self.snapshot is None or self.snapshot.age() >= self.cache_duration:
+            if self.fetch_snapshot() is None:
+                # Serve the stale snapshot rather than nothing
+                return self.snapshot
+        return self.snapshot
+
+    def update(self, coins: List[Dict]):
+        """Fold a fresher partial listing (e.g. the market tab's top 100) into the snapshot"""
+        if self.snapshot is not None and coins:
+            self.snapshot.update(coins)
+
+    def analyze(self, top_n: int = 100) -> Dict:
+        """Breadth statistics over the whole universe"""
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return {}
+        return compute_breadth(snapshot, top_n=top_n)
+
+
+# Example usage
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 5000
+    caps = np.sort(rng.pareto(1.2, n) * 1e7)[::-1]
+    coins = [
+        {
+            "id": f"coin-{i}",
+            "symbol": f"c{i}",
+            "current_price": 1.0,
+            "market_cap": caps[i],
+            "total_volume": caps[i] * 0.05,
+            "price_change_percentage_1h_in_currency": rng.normal(0, 0.5),
+            "price_change_percentage_24h_in_currency": rng.normal(0.5, 4),
+            "price_change_percentage_7d_in_currency": rng.normal(1, 10),
+        }
+        for i in range(n)
+    ]
+
+    start = time.perf_counter()
+    snapshot = MarketSnapshot(coins)
+    built = time.perf_counter()
+    breadth = compute_breadth(snapshot)
+    done = time.perf_counter()
+    print(f"Snapshot of {n} coins in {(built - start) * 1000:.1f} ms, breadth in {(done - built) * 1000:.2f} ms")
+    print(f"{breadth['market_sentiment']}: A/D {breadth['advancers']}/{breadth['decliners']}, "
+          f"cap-weighted 24h {breadth['cap_weighted_change_24h']:+.2f}%, dispersion {breadth['dispersion_24h']:.2f}")
+    print(breadth["histogram"])
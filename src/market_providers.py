@@ -0,0 +1,775 @@
+# src/market_providers.py - Pluggable market-data providers with latency-based routing and failover
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import requests
+from pycoingecko import CoinGeckoAPI
+
+from ws_protocol import WebSocketClient, WebSocketClosed
+
+# Exchange base assets of common coins (others are learned from the market listing)
+DEFAULT_SYMBOLS = {
+    "bitcoin": "BTC",
+    "ethereum": "ETH",
+    "binancecoin": "BNB",
+    "solana": "SOL",
+    "ripple": "XRP",
+    "cardano": "ADA",
+    "dogecoin": "DOGE",
+    "tron": "TRX",
+    "polkadot": "DOT",
+    "chainlink": "LINK",
+    "avalanche-2": "AVAX",
+    "litecoin": "LTC",
+    "bitcoin-cash": "BCH",
+    "stellar": "XLM",
+    "uniswap": "UNI",
+    "near": "NEAR",
+    "cosmos": "ATOM",
+    "matic-network": "MATIC",
+}
+
+# Providers used when no configuration is given
+DEFAULT_PROVIDERS = [{"type": "coingecko"}]
+
+
+class ProviderError(Exception):
+    """A provider could not answer (unreachable, throttled, unsupported)"""
+
+
+def _quote(price, change_24h=None, volume_24h=None, market_cap=None, updated_at=None, source="") -> Dict:
+    """Provider-neutral quote; ``updated_at`` is when the source priced it (epoch seconds)"""
+    return {
+        "price": float(price),
+        "change_24h": change_24h,
+        "volume_24h": volume_24h,
+        "market_cap": market_cap,
+        "updated_at": updated_at or time.time(),
+        "source": source,
+    }
+
+
+def _epoch(iso_time: Optional[str]) -> float:
+    """Epoch seconds of a CoinGecko ISO timestamp (0 if missing)"""
+    if not iso_time:
+        return 0.0
+    try:
+        return datetime.fromisoformat(iso_time.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+# ==================== PROVIDERS ====================
+class MarketDataProvider:
+    """
+    Base class of market-data sources.
+
+    ``capabilities`` names what a provider can answer: 'price' (quotes
+    for coin IDs) and 'listing' (the top-coins market table). Providers
+    raise ``ProviderError`` (or any exception) when they cannot answer;
+    the router records the failure and moves to the next source.
+    Streaming providers (``streaming = True``) answer from memory.
+    """
+
+    name = "provider"
+    capabilities = frozenset({"price"})
+    streaming = False
+
+    def get_price(self, coin_ids: List[str], vs_currency: str = "usd") -> Dict[str, Dict]:
+        """
+        Returns:
+            {coin_id: quote} for the coins the provider knows; see ``_quote``
+        """
+        raise NotImplementedError
+
+    def get_top_coins(self, limit: int = 100, vs_currency: str = "usd", page: int = 1) -> List[Dict]:
+        raise NotImplementedError
+
+    def learn_symbols(self, coins: List[Dict]):
+        """Market listing rows seen by the router (to map coin IDs to tickers)"""
+
+    def close(self):
+        pass
+
+
+class CoinGeckoProvider(MarketDataProvider):
+    """CoinGecko REST API through pycoingecko (quotes and the market listing)"""
+
+    capabilities = frozenset({"price", "listing"})
+
+    def __init__(
+        self,
+        name: str = "coingecko",
+        base_url: Optional[str] = None,
+        api_key: str = "",
+        timeout: float = 10.0,
+        rate_limit: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            name: Name in routing statistics
+            base_url: API root (e.g. a mock server's http://127.0.0.1:port/api/v3/)
+            api_key: CoinGecko Pro key
+            timeout: Request timeout in seconds
+            rate_limit: Called before each request (the handler's throttle)
+        """
+        self.name = name
+        self.cg = CoinGeckoAPI(api_key=api_key, retries=1)
+        if base_url:
+            self.cg.api_base_url = base_url.rstrip("/") + "/"
+        self.cg.request_timeout = timeout
+        self.rate_limit = rate_limit
+
+    def get_price(self, coin_ids, vs_currency="usd"):
+        if self.rate_limit:
+            self.rate_limit()
+        result = self.cg.get_price(
+            ids=",".join(coin_ids),
+            vs_currencies=vs_currency,
+            include_market_cap=True,
+            include_24hr_vol=True,
+            include_24hr_change=True,
+            include_last_updated_at=True,
+        )
+        quotes = {}
+        for coin_id, data in (result or {}).items():
+            if data.get(vs_currency) is None:
+                continue
+            quotes[coin_id] = _quote(
+                data[vs_currency],
+                change_24h=data.get(f"{vs_currency}_24h_change"),
+                volume_24h=data.get(f"{vs_currency}_24h_vol"),
+                market_cap=data.get(f"{vs_currency}_market_cap"),
+                updated_at=data.get("last_updated_at"),
+                source=self.name,
+            )
+        return quotes
+
+    def get_top_coins(self, limit=100, vs_currency="usd", page=1):
+        if self.rate_limit:
+            self.rate_limit()
+        return self.cg.get_coins_markets(
+            vs_currency=vs_currency,
+            order="market_cap_desc",
+            per_page=limit,
+            page=page,
+            sparkline=False,
+            price_change_percentage="1h,24h,7d",
+        )
+
+
+class _ExchangeSymbols:
+    """Coin ID <-> exchange pair mapping shared by the exchange adapters"""
+
+    def __init__(self, symbols: Optional[Dict[str, str]], quote_asset: str):
+        self.quote_asset = quote_asset
+        self.symbols = dict(DEFAULT_SYMBOLS)
+        self.symbols.update(symbols or {})
+        # Pairs the exchange rejected as unknown
+        self.invalid = set()
+        self._coins_by_pair = None
+
+    def learn_symbols(self, coins):
+        for coin in coins or []:
+            if coin.get("id") and coin.get("symbol") and coin["id"] not in self.symbols:
+                self.symbols[coin["id"]] = coin["symbol"].upper()
+                self._coins_by_pair = None
+
+    def coin_for_pair(self, pair: str) -> Optional[str]:
+        coins_by_pair = self._coins_by_pair
+        if coins_by_pair is None:
+            # The first mapping of a ticker wins (defaults, then by market cap)
+            coins_by_pair = {
+                f"{base}{self.quote_asset}": coin_id for coin_id, base in reversed(list(self.symbols.items()))
+            }
+            self._coins_by_pair = coins_by_pair
+        return coins_by_pair.get(pair)
+
+    def pair(self, coin_id: str) -> Optional[str]:
+        base = self.symbols.get(coin_id)
+        pair = f"{base}{self.quote_asset}" if base else None
+        return None if pair in self.invalid else pair
+
+    def check_currency(self, vs_currency: str):
+        # Stablecoin pairs stand in for USD
+        if vs_currency.lower() != "usd":
+            raise ProviderError(f"{vs_currency} not supported")
+
+
+class ExchangeRestProvider(_ExchangeSymbols, MarketDataProvider):
+    """
+    Exchange 24h tickers over REST (Binance-compatible ``/api/v3/ticker/24hr``).
+
+    Only USD quotes are answered, priced from the ``quote_asset`` pairs.
+    """
+
+    def __init__(
+        self,
+        name: str = "binance",
+        base_url: str = "https://api.binance.com",
+        quote_asset: str = "USDT",
+        symbols: Optional[Dict[str, str]] = None,
+        timeout: float = 5.0,
+    ):
+        """
+        Args:
+            name: Name in routing statistics
+            base_url: Exchange REST root
+            quote_asset: Quote currency of the pairs used for USD prices
+            symbols: Extra coin ID -> base asset mappings
+            timeout: Request timeout in seconds
+        """
+        _ExchangeSymbols.__init__(self, symbols, quote_asset)
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _tickers(self, pairs: List[str]) -> List[Dict]:
+        response = self.session.get(
+            f"{self.base_url}/api/v3/ticker/24hr",
+            params={"symbols": json.dumps(pairs, separators=(",", ":"))},
+            timeout=self.timeout,
+        )
+        if response.status_code == 400 and len(pairs) > 1:
+            # One unknown pair fails the whole batch: find it and remember it
+            tickers = []
+            for pair in pairs:
+                try:
+                    tickers.extend(self._tickers([pair]))
+                except ProviderError:
+                    self.invalid.add(pair)
+            return tickers
+        if response.status_code == 400:
+            raise ProviderError(f"unknown pair {pairs[0]}")
+        if response.status_code != 200:
+            raise ProviderError(f"HTTP {response.status_code}")
+        return response.json()
+
+    def get_price(self, coin_ids, vs_currency="usd"):
+        self.check_currency(vs_currency)
+        pairs = {self.pair(coin_id): coin_id for coin_id in coin_ids if self.pair(coin_id)}
+        if not pairs:
+            return {}
+        quotes = {}
+        for ticker in self._tickers(list(pairs)):
+            coin_id = pairs.get(ticker.get("symbol"))
+            if coin_id is None:
+                continue
+            quotes[coin_id] = _quote(
+                ticker["lastPrice"],
+                change_24h=float(ticker.get("priceChangePercent") or 0),
+                volume_24h=float(ticker.get("quoteVolume") or 0),
+                updated_at=ticker.get("closeTime", time.time() * 1000) / 1000,
+                source=self.name,
+            )
+        return quotes
+
+
+class ExchangeStreamProvider(_ExchangeSymbols, MarketDataProvider):
+    """
+    Exchange ticker/trade stream over WebSocket (Binance-compatible
+    ``!miniTicker@arr``, ``<pair>@ticker``, ``<pair>@trade`` and combined
+    ``/stream?streams=...`` feeds).
+
+    A reader thread keeps the latest ticker of every pair in memory and
+    reconnects with backoff when the stream drops or goes silent, so
+    quotes cost no request. The provider fails (and the router moves on)
+    while the stream has been silent longer than ``stale_after``.
+
+    Listeners added with ``add_listener`` receive each message's ticks as
+    a list of ``(coin_id, ts, price, volume, change_24h)`` tuples on the
+    reader thread (``ts`` in epoch seconds, ``volume`` in quote currency
+    since the previous tick). With ``record_file`` every raw message is
+    appended as a JSON line for later replay.
+    """
+
+    streaming = True
+
+    def __init__(
+        self,
+        name: str = "binance-stream",
+        url: str = "wss://stream.binance.com:9443/ws/!miniTicker@arr",
+        quote_asset: str = "USDT",
+        symbols: Optional[Dict[str, str]] = None,
+        stale_after: float = 30.0,
+        record_file: Optional[str] = None,
+    ):
+        """
+        Args:
+            name: Name in routing statistics
+            url: Stream endpoint
+            quote_asset: Quote currency of the pairs used for USD prices
+            symbols: Extra coin ID -> base asset mappings
+            stale_after: Seconds without a message before the stream is unhealthy
+            record_file: JSON-lines file receiving every raw message
+        """
+        _ExchangeSymbols.__init__(self, symbols, quote_asset)
+        self.name = name
+        self.url = url
+        self.stale_after = stale_after
+        self.record_file = record_file
+        self.listeners: List[Callable[[List[tuple]], None]] = []
+        self.tickers: Dict[str, Dict] = {}
+        self.connected = False
+        self.last_message_at = 0.0
+        self.reconnects = 0
+        self._client = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._recording = None
+
+    @property
+    def live(self) -> bool:
+        """Connected and heard from within ``stale_after``"""
+        return self.connected and time.time() - self.last_message_at <= self.stale_after
+
+    def add_listener(self, callback: Callable[[List[tuple]], None]):
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[List[tuple]], None]):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-reader", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._client = WebSocketClient(self.url, timeout=self.stale_after).connect()
+                self.connected = True
+                backoff = 1.0
+                while not self._stop.is_set():
+                    self._on_message(self._client.recv())
+            except (OSError, WebSocketClosed, ValueError) as e:
+                if not self._stop.is_set():
+                    print(f"Stream {self.name} disconnected: {e}")
+            finally:
+                self.connected = False
+                if self._client is not None:
+                    self._client.close()
+                    self._client = None
+            if self._stop.wait(backoff):
+                break
+            self.reconnects += 1
+            backoff = min(backoff * 2, 60.0)
+
+    def _on_message(self, message):
+        now = time.time()
+        if self.record_file:
+            if self._recording is None:
+                self._recording = open(self.record_file, "a")
+            self._recording.write(json.dumps({"t": now, "message": message}) + "\n")
+        events = json.loads(message)
+        if isinstance(events, dict) and "data" in events:
+            # Combined streams wrap each event
+            events = events["data"]
+        ticks = []
+        with self._lock:
+            for event in events if isinstance(events, list) else [events]:
+                pair = event.get("s")
+                previous = self.tickers.get(pair) or {}
+                if event.get("e") == "trade":
+                    price = float(event["p"])
+                    volume = price * float(event["q"])
+                    ts = event.get("T", now * 1000)
+                    # A trade moves the last price; the 24h fields stay from the last ticker
+                    ticker = dict(previous, s=pair, c=event["p"], E=ts)
+                elif pair and "c" in event:
+                    price = float(event["c"])
+                    ts = event.get("E", now * 1000)
+                    # Tickers carry the rolling 24h quote volume; its growth is this tick's volume
+                    volume = max(0.0, float(event.get("q") or 0) - float(previous.get("q") or event.get("q") or 0))
+                    ticker = event
+                else:
+                    continue
+                self.tickers[pair] = ticker
+                coin_id = self.coin_for_pair(pair)
+                if coin_id:
+                    ticks.append((coin_id, ts / 1000, price, volume, self._change(ticker)))
+            self.last_message_at = now
+        for listener in list(self.listeners):
+            try:
+                listener(ticks)
+            except Exception as e:
+                print(f"Error in {self.name} tick listener: {e}")
+
+    @staticmethod
+    def _change(ticker: Dict) -> Optional[float]:
+        """24h change in percent (from the open price on mini tickers)"""
+        if "P" in ticker:
+            return float(ticker["P"])
+        open_price = float(ticker.get("o") or 0)
+        return (float(ticker["c"]) / open_price - 1) * 100 if open_price else None
+
+    def get_price(self, coin_ids, vs_currency="usd"):
+        self.check_currency(vs_currency)
+        self.start()
+        if not self.live:
+            raise ProviderError("stream not live")
+        quotes = {}
+        with self._lock:
+            for coin_id in coin_ids:
+                ticker = self.tickers.get(self.pair(coin_id) or "")
+                if ticker is None:
+                    continue
+                quotes[coin_id] = _quote(
+                    ticker["c"],
+                    change_24h=self._change(ticker),
+                    volume_24h=float(ticker.get("q") or 0),
+                    updated_at=ticker.get("E", self.last_message_at * 1000) / 1000,
+                    source=self.name,
+                )
+        return quotes
+
+    def close(self):
+        self._stop.set()
+        client = self._client
+        if client is not None and client.sock is not None:
+            # Unblocks the reader thread's recv
+            try:
+                client.sock.shutdown(2)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._recording is not None:
+            self._recording.close()
+            self._recording = None
+
+
+PROVIDER_TYPES = {
+    "coingecko": CoinGeckoProvider,
+    "exchange_rest": ExchangeRestProvider,
+    "exchange_stream": ExchangeStreamProvider,
+}
+
+
+# ==================== ROUTING ====================
+class ProviderHealth:
+    """Latency and failure statistics of one provider"""
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.last_error: Optional[str] = None
+        self.last_success_at: Optional[float] = None
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def to_dict(self) -> Dict:
+        return {
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "successes": self.successes,
+            "failures": self.failures,
+            "down_for": round(max(0.0, self.down_until - time.time()), 1),
+            "last_error": self.last_error,
+            "last_success_at": self.last_success_at,
+        }
+
+
+class MarketDataRouter:
+    """
+    Routes market-data requests over several providers.
+
+    - Quotes: streaming providers answer first (from memory); coins still
+      missing a quote younger than ``max_age`` go to the request-based
+      providers, fastest healthy one first (by moving average latency),
+      and whatever a provider could not answer falls through to the next.
+      When several sources price a coin, the most recently priced quote
+      wins. Every quote carries its ``source`` and ``updated_at``; if no
+      provider answers, the last merged quote is returned marked ``stale``.
+    - Listing: served by the fastest healthy 'listing' provider, with
+      newer exchange quotes merged into its rows. If every listing
+      provider fails, the previous listing is re-priced from the quote
+      providers instead.
+
+    After ``failure_threshold`` consecutive failures a provider is
+    skipped for ``cooldown`` seconds (doubling while it keeps failing),
+    then tried again.
+    """
+
+    def __init__(
+        self,
+        providers: List[MarketDataProvider],
+        max_age: float = 120.0,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+    ):
+        """
+        Args:
+            providers: Sources in order of preference (ties in latency)
+            max_age: Seconds a quote counts as fresh
+            failure_threshold: Consecutive failures before a cooldown
+            cooldown: First cooldown in seconds
+        """
+        self.providers = list(providers)
+        self.max_age = max_age
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.health: Dict[str, ProviderHealth] = {provider.name: ProviderHealth() for provider in self.providers}
+        # (vs_currency, coin_id) -> last merged quote
+        self.quotes: Dict[tuple, Dict] = {}
+        # (limit, vs_currency, page) -> last listing
+        self.listings: Dict[tuple, List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def add_provider(self, provider: MarketDataProvider):
+        self.providers.append(provider)
+        self.health[provider.name] = ProviderHealth()
+
+    def streams(self) -> List[MarketDataProvider]:
+        """Configured streaming providers"""
+        return [provider for provider in self.providers if provider.streaming]
+
+    def _ranked(self, capability: str, streaming: bool = False) -> List[MarketDataProvider]:
+        """Healthy providers by latency (untried ones first), then those cooling down"""
+        now = time.time()
+        candidates = [
+            provider
+            for provider in self.providers
+            if capability in provider.capabilities and provider.streaming == streaming
+        ]
+        if streaming:
+            # Checking a stream is free, so streams never cool down
+            return candidates
+        healthy = [provider for provider in candidates if self.health[provider.name].healthy(now)]
+        healthy.sort(key=lambda provider: self.health[provider.name].latency or 0.0)
+        cooling = [provider for provider in candidates if provider not in healthy]
+        cooling.sort(key=lambda provider: self.health[provider.name].down_until)
+        return healthy + cooling
+
+    def _call(self, provider: MarketDataProvider, method: str, *args):
+        health = self.health[provider.name]
+        start = time.perf_counter()
+        try:
+            result = getattr(provider, method)(*args)
+        except Exception as e:
+            with self._lock:
+                health.failures += 1
+                health.consecutive_failures += 1
+                health.last_error = str(e)[:200]
+                excess = health.consecutive_failures - self.failure_threshold
+                if excess >= 0 and not provider.streaming:
+                    health.down_until = time.time() + self.cooldown * 2 ** min(excess, 5)
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.down_until = 0.0
+            health.last_success_at = time.time()
+            if not provider.streaming:
+                health.latency = elapsed if health.latency is None else 0.7 * health.latency + 0.3 * elapsed
+        return result
+
+    @staticmethod
+    def _merge(quotes: Dict[str, Dict], new_quotes: Dict[str, Dict]):
+        """Keep the most recently priced quote of each coin"""
+        for coin_id, quote in (new_quotes or {}).items():
+            current = quotes.get(coin_id)
+            if current is None or quote["updated_at"] > current["updated_at"]:
+                quotes[coin_id] = quote
+
+    # ==================== QUOTES ====================
+    def get_price(self, coin_ids: List[str], vs_currency: str = "usd") -> Dict[str, Dict]:
+        """
+        Merged quotes for ``coin_ids``.
+
+        Returns:
+            {coin_id: quote} with 'price', 'change_24h', 'volume_24h',
+            'market_cap', 'updated_at', 'source' and 'stale'; coins no
+            source has ever priced are missing
+        """
+        coin_ids = list(dict.fromkeys(coin_ids))
+        quotes: Dict[str, Dict] = {}
+        for provider in self._ranked("price", streaming=True):
+            try:
+                self._merge(quotes, self._call(provider, "get_price", coin_ids, vs_currency))
+            except Exception:
+                pass
+
+        def missing():
+            cutoff = time.time() - self.max_age
+            return [coin_id for coin_id in coin_ids if coin_id not in quotes or quotes[coin_id]["updated_at"] < cutoff]
+
+        for provider in self._ranked("price"):
+            wanted = missing()
+            if not wanted:
+                break
+            try:
+                self._merge(quotes, self._call(provider, "get_price", wanted, vs_currency))
+            except Exception as e:
+                print(f"Price provider {provider.name} failed: {e}")
+
+        for coin_id in coin_ids:
+            key = (vs_currency, coin_id)
+            if coin_id in quotes:
+                self.quotes[key] = dict(quotes[coin_id], stale=False)
+            if key in self.quotes:
+                quotes[coin_id] = dict(self.quotes[key], stale=coin_id not in quotes)
+        return quotes
+
+    # ==================== LISTING ====================
+    def get_top_coins(self, limit: int = 100, vs_currency: str = "usd", page: int = 1) -> List[Dict]:
+        """
+        Market listing in the CoinGecko ``coins/markets`` format.
+
+        Rows re-priced from another source carry 'price_source'.
+        """
+        key = (limit, vs_currency, page)
+        for provider in self._ranked("listing"):
+            try:
+                coins = self._call(provider, "get_top_coins", limit, vs_currency, page)
+            except Exception as e:
+                print(f"Listing provider {provider.name} failed: {e}")
+                continue
+            if not coins:
+                continue
+            for other in self.providers:
+                other.learn_symbols(coins)
+            self.listings[key] = coins
+            # Streams answer from memory, so merging them costs nothing
+            streamed = {}
+            for stream in self._ranked("price", streaming=True):
+                try:
+                    self._merge(streamed, self._call(stream, "get_price", [coin["id"] for coin in coins], vs_currency))
+                except Exception:
+                    pass
+            return self._reprice(coins, streamed)
+
+        previous = self.listings.get(key)
+        if not previous:
+            return []
+        print("All listing providers failed; re-pricing the previous listing")
+        return self._reprice(previous, self.get_price([coin["id"] for coin in previous], vs_currency))
+
+    @staticmethod
+    def _reprice(coins: List[Dict], quotes: Dict[str, Dict]) -> List[Dict]:
+        """Copy of the listing with quotes newer than each row applied"""
+        repriced = []
+        for coin in coins:
+            quote = quotes.get(coin.get("id"))
+            if quote and quote["updated_at"] > _epoch(coin.get("last_updated")):
+                coin = dict(coin)
+                coin["current_price"] = quote["price"]
+                if quote.get("change_24h") is not None:
+                    coin["price_change_percentage_24h"] = quote["change_24h"]
+                    coin["price_change_percentage_24h_in_currency"] = quote["change_24h"]
+                coin["last_updated"] = (
+                    datetime.fromtimestamp(quote["updated_at"], timezone.utc).isoformat().replace("+00:00", "Z")
+                )
+                coin["price_source"] = quote["source"]
+            repriced.append(coin)
+        return repriced
+
+    def status(self) -> Dict[str, Dict]:
+        """Per-provider routing statistics"""
+        return {name: health.to_dict() for name, health in self.health.items()}
+
+    def close(self):
+        for provider in self.providers:
+            provider.close()
+
+
+def build_router(
+    configs: Optional[List[Dict]] = None,
+    config_file: str = "data/market_providers.json",
+    rate_limit: Optional[Callable[[], None]] = None,
+) -> MarketDataRouter:
+    """
+    Router from provider settings.
+
+    Args:
+        configs: Provider settings, e.g. ``[{"type": "coingecko"},
+            {"type": "exchange_rest", "base_url": "..."}]``; every other key is
+            passed to the provider class. Entries with ``"enabled": false``
+            are skipped. Default: ``config_file`` if it exists, else CoinGecko only
+        config_file: JSON file with ``{"providers": [...], "router": {...}}``
+        rate_limit: Throttle for the CoinGecko providers
+    """
+    router_options = {}
+    if configs is None:
+        configs = DEFAULT_PROVIDERS
+        if os.path.exists(config_file):
+            try:
+                with open(config_file, "r") as f:
+                    settings = json.load(f)
+                configs = settings.get("providers") or DEFAULT_PROVIDERS
+                router_options = settings.get("router", {})
+            except Exception as e:
+                print(f"Error loading market providers: {e}")
+
+    providers = []
+    for config in configs:
+        options = {key: value for key, value in config.items() if key not in ("type", "enabled")}
+        if not config.get("enabled", True):
+            continue
+        provider_class = PROVIDER_TYPES.get(config.get("type"))
+        if provider_class is None:
+            print(f"Unknown market provider type: {config.get('type')}")
+            continue
+        if provider_class is CoinGeckoProvider and rate_limit is not None:
+            options.setdefault("rate_limit", rate_limit)
+        providers.append(provider_class(**options))
+    return MarketDataRouter(providers, **router_options)
+
+
+# Example usage: routing and failover against local mock servers
+if __name__ == "__main__":
+    from mock_market_server import MockMarketServer
+
+    coins = ["bitcoin", "ethereum", "solana", "dogecoin"]
+    slow = MockMarketServer(delay=0.25).start()
+    fast = MockMarketServer(delay=0.02).start()
+    router = MarketDataRouter(
+        [
+            CoinGeckoProvider(base_url=slow.url + "/api/v3"),
+            ExchangeRestProvider(base_url=fast.url),
+        ],
+        failure_threshold=1,
+        cooldown=2,
+    )
+
+    def show(label):
+        start = time.perf_counter()
+        quotes = router.get_price(coins)
+        elapsed = (time.perf_counter() - start) * 1000
+        sources = ", ".join(f"{coin_id}={quote['source']}{'(stale)' if quote['stale'] else ''}" for coin_id, quote in quotes.items())
+        print(f"{label:<28} {elapsed:7.1f} ms  {sources}")
+
+    for i in range(3):
+        show(f"request {i + 1}")
+    fast.fail = True
+    show("exchange down")
+    show("exchange cooling down")
+    slow.fail = True
+    show("every source down")
+    fast.fail = slow.fail = False
+    time.sleep(router.health["binance"].down_until - time.time() + 0.1)
+    show("exchange back after cooldown")
+    print(json.dumps(router.status(), indent=2))
+
+    stream = ExchangeStreamProvider(url=fast.ws_url, stale_after=5).start()
+    router = MarketDataRouter([stream, CoinGeckoProvider(base_url=slow.url + "/api/v3")])
+    time.sleep(0.5)
+    show("with exchange stream")
+    router.close()
+    slow.stop()
+    fast.stop()
@@ -0,0 +1,280 @@
+# src/mock_market_server.py - Local CoinGecko/exchange mock server for exercising the market-data providers
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ws_protocol import OP_TEXT, encode_frame, server_handshake
+
+# coin_id -> (symbol, starting USD price)
+MOCK_COINS = {
+    "bitcoin": ("btc", 65000.0),
+    "ethereum": ("eth", 3200.0),
+    "solana": ("sol", 150.0),
+    "ripple": ("xrp", 0.55),
+    "cardano": ("ada", 0.45),
+    "dogecoin": ("doge", 0.12),
+}
+
+
+class MockMarketServer:
+    """
+    HTTP server imitating the market-data APIs the providers talk to.
+
+    - CoinGecko: ``/api/v3/simple/price`` and ``/api/v3/coins/markets``
+    - Exchange REST: ``/api/v3/ticker/24hr?symbols=[...]`` (USDT pairs)
+    - Exchange stream: any ``/ws/...`` path upgrades to a WebSocket that
+      sends a ``!miniTicker@arr``-style array every ``interval`` seconds
+
+    Prices follow a random walk. ``delay`` adds latency to every HTTP
+    response and ``fail`` makes the server answer 503 (and drop streams),
+    so routing and failover can be exercised without network access.
+    """
+
+    def __init__(
+        self,
+        coins: Optional[Dict[str, tuple]] = None,
+        delay: float = 0.0,
+        interval: float = 0.2,
+        port: int = 0,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            coins: coin_id -> (symbol, starting price); default MOCK_COINS
+            delay: Seconds added to each HTTP response
+            interval: Seconds between stream messages
+            port: TCP port (0 picks a free one)
+            seed: Random walk seed
+        """
+        self.coins = dict(coins or MOCK_COINS)
+        self.prices = {coin_id: price for coin_id, (_, price) in self.coins.items()}
+        self.opens = dict(self.prices)
+        self.delay = delay
+        self.interval = interval
+        self.fail = False
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/ws/!miniTicker@arr"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-market-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # ==================== DATA ====================
+    def tick(self):
+        """Move every price one random-walk step"""
+        with self._lock:
+            for coin_id, price in self.prices.items():
+                self.prices[coin_id] = price * (1 + self._random.gauss(0, 0.001))
+
+    def _change(self, coin_id: str) -> float:
+        return (self.prices[coin_id] / self.opens[coin_id] - 1) * 100
+
+    def simple_price(self, ids, vs_currency: str) -> Dict:
+        now = int(time.time())
+        return {
+            coin_id: {
+                vs_currency: self.prices[coin_id],
+                f"{vs_currency}_market_cap": self.prices[coin_id] * 1e7,
+                f"{vs_currency}_24h_vol": self.prices[coin_id] * 1e5,
+                f"{vs_currency}_24h_change": self._change(coin_id),
+                "last_updated_at": now,
+            }
+            for coin_id in ids
+            if coin_id in self.prices
+        }
+
+    def markets(self, limit: int, page: int):
+        now = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+        ranked = sorted(self.prices, key=lambda coin_id: -self.prices[coin_id])
+        rows = []
+        for rank, coin_id in enumerate(ranked, 1):
+            change = self._change(coin_id)
+            rows.append(
+                {
+                    "id": coin_id,
+                    "symbol": self.coins[coin_id][0],
+                    "name": coin_id.title(),
+                    "current_price": self.prices[coin_id],
+                    "market_cap": self.prices[coin_id] * 1e7,
+                    "market_cap_rank": rank,
+                    "total_volume": self.prices[coin_id] * 1e5,
+                    "price_change_percentage_24h": change,
+                    "price_change_percentage_1h_in_currency": change / 24,
+                    "price_change_percentage_24h_in_currency": change,
+                    "price_change_percentage_7d_in_currency": change * 2,
+                    "last_updated": now,
+                }
+            )
+        return rows[(page - 1) * limit: page * limit]
+
+    def exchange_tickers(self, pairs):
+        by_pair = {f"{symbol.upper()}USDT": coin_id for coin_id, (symbol, _) in self.coins.items()}
+        if any(pair not in by_pair for pair in pairs):
+            return None
+        now = int(time.time() * 1000)
+        return [
+            {
+                "symbol": pair,
+                "lastPrice": f"{self.prices[by_pair[pair]]:.8f}",
+                "priceChangePercent": f"{self._change(by_pair[pair]):.3f}",
+                "quoteVolume": f"{self.prices[by_pair[pair]] * 1e5:.2f}",
+                "closeTime": now,
+            }
+            for pair in pairs
+        ]
+
+    def stream_messages(self) -> Iterator[Tuple[float, str]]:
+        """(seconds to wait, message) pairs sent to each stream client"""
+        while True:
+            self.tick()
+            yield self.interval, json.dumps(self.mini_tickers())
+
+    def mini_tickers(self):
+        now = int(time.time() * 1000)
+        return [
+            {
+                "e": "24hrMiniTicker",
+                "E": now,
+                "s": f"{symbol.upper()}USDT",
+                "c": f"{self.prices[coin_id]:.8f}",
+                "o": f"{self.opens[coin_id]:.8f}",
+                "q": f"{self.prices[coin_id] * 1e5:.2f}",
+            }
+            for coin_id, (symbol, _) in self.coins.items()
+        ]
+
+    # ==================== HTTP ====================
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                server.requests += 1
+                url = urlsplit(self.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                if url.path.startswith("/ws/"):
+                    return self._stream()
+                time.sleep(server.delay)
+                if server.fail:
+                    return self._json(503, {"error": "service unavailable"})
+                server.tick()
+
+                if url.path == "/api/v3/simple/price":
+                    ids = query.get("ids", "").split(",")
+                    return self._json(200, server.simple_price(ids, query.get("vs_currencies", "usd")))
+                if url.path == "/api/v3/coins/markets":
+                    limit, page = int(query.get("per_page", 100)), int(query.get("page", 1))
+                    return self._json(200, server.markets(limit, page))
+                if url.path == "/api/v3/ticker/24hr":
+                    tickers = server.exchange_tickers(json.loads(query.get("symbols", "[]")))
+                    if tickers is None:
+                        return self._json(400, {"code": -1121, "msg": "Invalid symbol."})
+                    return self._json(200, tickers)
+                return self._json(404, {"error": "not found"})
+
+            def _stream(self):
+                if server.fail or not server_handshake(dict(self.headers), self.wfile):
+                    return self._json(503 if server.fail else 400, {"error": "no stream"})
+                self.close_connection = True
+                try:
+                    for wait, message in server.stream_messages():
+                        if wait > 0:
+                            time.sleep(wait)
+                        if server.fail or server._stopped.is_set():
+                            break
+                        self.wfile.write(encode_frame(OP_TEXT, message.encode("utf-8"), mask=False))
+                except OSError:
+                    pass
+
+        return Handler
+
+
+class ReplayServer(MockMarketServer):
+    """
+    Replays recorded stream messages to every WebSocket client.
+
+    Recordings are JSON lines of ``{"t": receive time, "message": raw
+    message}`` as written by ``ExchangeStreamProvider(record_file=...)``
+    (or built with ``record_line``). Messages keep their recorded spacing
+    divided by ``speed``; ``speed=0`` sends them back to back. The REST
+    endpoints of ``MockMarketServer`` stay available.
+    """
+
+    def __init__(self, recording, speed: float = 1.0, loop: bool = False, **kwargs):
+        """
+        Args:
+            recording: Path of a JSON-lines recording, or a list of its entries
+            speed: Replay speed factor (0 = as fast as possible)
+            loop: Start over at the end instead of closing the stream
+        """
+        super().__init__(**kwargs)
+        if isinstance(recording, str):
+            with open(recording, "r") as f:
+                recording = [json.loads(line) for line in f if line.strip()]
+        self.recording: List[Dict] = list(recording)
+        self.speed = speed
+        self.loop = loop
+
+    def stream_messages(self):
+        while True:
+            previous = None
+            for entry in self.recording:
+                gap = 0.0 if previous is None or not self.speed else (entry["t"] - previous) / self.speed
+                previous = entry["t"]
+                yield max(0.0, gap), entry["message"]
+            if not self.loop:
+                return
+
+
+def record_line(t: float, events) -> Dict:
+    """Recording entry for a synthetic stream message"""
+    return {"t": t, "message": json.dumps(events)}
+
+
+# Example usage
+if __name__ == "__main__":
+    import requests
+
+    mock = MockMarketServer().start()
+    print(f"Mock market server on {mock.url}")
+    print(requests.get(f"{mock.url}/api/v3/simple/price", params={"ids": "bitcoin", "vs_currencies": "usd"}).json())
+    print(requests.get(f"{mock.url}/api/v3/ticker/24hr", params={"symbols": '["ETHUSDT"]'}).json())
+    mock.stop()
@@ -0,0 +1,261 @@
+# src/notification_history.py - Append-only notification log backed by SQLite
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class NotificationHistory:
+    """
+    Append-only notification log with indexed queries.
+
+    Entries are buffered in memory and written in one transaction when the
+    buffer reaches ``flush_size`` entries, or by a timer ``flush_interval``
+    seconds after the first buffered entry, so an alert storm costs O(1) work
+    per notification and one fsync per batch instead of a full file rewrite
+    per alert. Queries by type, coin and time range use indexes and stay fast
+    with millions of rows. The whole history is kept unless ``max_entries``
+    is set, in which case older rows are deleted.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/notification_history.db",
+        flush_size: int = 100,
+        flush_interval: float = 2.0,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Args:
+            db_path: SQLite database file
+            flush_size: Buffered entries that trigger a write
+            flush_interval: Seconds after which buffered entries are written
+            max_entries: Optional cap; older entries are deleted on flush
+                (default: keep everything)
+        """
+        self.db_path = db_path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self._pending = []
+        self._flush_timer = None
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only fsyncs at checkpoints; batches stay durable
+        # against application crashes
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS notifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                type TEXT NOT NULL,
+                coin TEXT,
+                title TEXT,
+                message TEXT,
+                recipient TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_notifications_ts ON notifications (ts);
+            CREATE INDEX IF NOT EXISTS idx_notifications_type_ts ON notifications (type, ts);
+            CREATE INDEX IF NOT EXISTS idx_notifications_coin_ts ON notifications (coin, ts);
+            """
+        )
+        self._conn.commit()
+
+    def append(
+        self,
+        notification_type: str,
+        title: str,
+        message: str,
+        recipient=None,
+        coin: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ):
+        """Buffer one notification; written with the next batch"""
+        if recipient is not None and not isinstance(recipient, str):
+            recipient = ", ".join(recipient)
+        row = (
+            timestamp if timestamp is not None else time.time(),
+            notification_type,
+            coin.upper() if coin else None,
+            title,
+            message,
+            recipient,
+        )
+        with self._lock:
+            self._pending.append(row)
+            due = len(self._pending) >= self.flush_size
+            if not due and self._flush_timer is None:
+                # Write a quiet period's entries without waiting for the next append
+                self._flush_timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if due:
+            self.flush()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+        self.flush()
+
+    def flush(self):
+        """Write buffered entries in a single transaction"""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO notifications (ts, type, coin, title, message, recipient) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    if self.max_entries:
+                        self._conn.execute(
+                            "DELETE FROM notifications WHERE id <= "
+                            "(SELECT MAX(id) FROM notifications) - ?",
+                            (self.max_entries,),
+                        )
+            except Exception as e:
+                print(f"Error writing notification history: {e}")
+
+    def query(
+        self,
+        notification_type: Optional[str] = None,
+        coin: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = 20,
+    ) -> List[Dict]:
+        """
+        Get notifications matching the filters.
+
+        Args:
+            notification_type: e.g. 'desktop' or 'email'
+            coin: Coin symbol
+            start: Only entries at or after this time
+            end: Only entries before this time
+            limit: Most recent N matches (None for all)
+
+        Returns:
+            List of notifications, oldest first
+        """
+        self.flush()
+        clauses, params = [], []
+        if notification_type:
+            clauses.append("type = ?")
+            params.append(notification_type)
+        if coin:
+            clauses.append("coin = ?")
+            params.append(coin.upper())
+        if start:
+            clauses.append("ts >= ?")
+            params.append(start.timestamp())
+        if end:
+            clauses.append("ts < ?")
+            params.append(end.timestamp())
+
+        sql = "SELECT ts, type, coin, title, message, recipient FROM notifications"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(ts).isoformat(),
+                "type": notification_type,
+                "coin": coin,
+                "title": title,
+                "message": message,
+                "recipient": recipient,
+            }
+            for ts, notification_type, coin, title, message, recipient in reversed(rows)
+        ]
+
+    def count(self) -> int:
+        """Total number of stored notifications"""
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM notifications").fetchone()[0]
+
+    def prune(self, before: datetime) -> int:
+        """Delete entries older than a point in time; returns rows removed"""
+        self.flush()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM notifications WHERE ts < ?", (before.timestamp(),)
+            )
+        return cursor.rowcount
+
+    def clear(self):
+        """Delete all entries"""
+        with self._lock:
+            self._pending = []
+            with self._conn:
+                self._conn.execute("DELETE FROM notifications")
+
+    def import_json(self, json_file: str) -> int:
+        """Import a legacy notification_history.json list; returns entries imported"""
+        try:
+            with open(json_file, "r") as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"Error reading legacy notification history: {e}")
+            return 0
+
+        for entry in entries:
+            try:
+                ts = datetime.fromisoformat(entry["timestamp"]).timestamp()
+            except Exception:
+                ts = time.time()
+            self.append(
+                entry.get("type", "unknown"),
+                entry.get("title", ""),
+                entry.get("message", ""),
+                entry.get("recipient"),
+                timestamp=ts,
+            )
+        self.flush()
+        return len(entries)
+
+    def close(self):
+        """Flush and close the database"""
+        self.flush()
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._conn.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    from datetime import timedelta
+
+    history = NotificationHistory("data/notification_history_example.db")
+
+    start = time.perf_counter()
+    for i in range(100000):
+        history.append("desktop", f"BTC alert {i}", "Price crossed", coin="btc")
+    history.flush()
+    elapsed = time.perf_counter() - start
+    print(f"Appended 100k notifications in {elapsed:.2f}s")
+
+    recent = history.query(coin="BTC", start=datetime.now() - timedelta(hours=1), limit=5)
+    print(f"Total stored: {history.count()}, latest: {recent[-1]['title']}")
+
+    history.close()
+    os.remove("data/notification_history_example.db")
@@ -76,7 +76,7 @@ def get_coin_history_FIXED(self, coin_id: str, days: int = 90):
         
         hourly = df.groupby('hour').agg({
             'close': ['first', 'max', 'min', 'last'],
-            'volume': 'sum',
+            'volume': 'last',  # total_volumes are rolling 24h totals
             'timestamp': 'first'
         }).reset_index()
         
@@ -0,0 +1,146 @@
+# src/startup.py - Startup timing, deferred tab construction and background loaders
+
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Taken when this module is first imported; run.py imports it before anything heavy
+PROCESS_START = time.perf_counter()
+
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+
+class StartupTimer:
+    """
+    Named startup milestones, in seconds since process start.
+
+    ``report`` prints the milestones together with the median of earlier
+    launches and appends them to ``log_file`` (one JSON object per line),
+    so time-to-first-paint can be tracked across versions.
+    """
+
+    def __init__(self, start: Optional[float] = None, log_file: str = "data/startup_times.jsonl"):
+        """
+        Args:
+            start: perf_counter() value of time zero (default: process start)
+            log_file: JSON-lines file collecting one report per launch
+        """
+        self.start = PROCESS_START if start is None else start
+        self.log_file = log_file
+        self.marks: Dict[str, float] = {}
+        self.reported = False
+
+    def mark(self, name: str):
+        """Record a milestone (only its first occurrence counts)"""
+        self.marks.setdefault(name, time.perf_counter() - self.start)
+
+    def history(self, limit: int = 20) -> List[Dict]:
+        """Most recent earlier reports"""
+        try:
+            if not os.path.exists(self.log_file):
+                return []
+            with open(self.log_file, "r") as f:
+                lines = f.readlines()[-limit:]
+            return [json.loads(line) for line in lines if line.strip()]
+        except Exception as e:
+            print(f"Error reading startup history: {e}")
+            return []
+
+    def report(self) -> str:
+        """Print and persist the milestones of this launch"""
+        if self.reported:
+            return ""
+        self.reported = True
+        previous = self.history()
+
+        lines = ["Startup timings (s since process start):"]
+        for name, seconds in sorted(self.marks.items(), key=lambda item: item[1]):
+            earlier = [entry["marks"][name] for entry in previous if name in entry.get("marks", {})]
+            median = f"  (median of last {len(earlier)}: {statistics.median(earlier):.3f})" if earlier else ""
+            lines.append(f"  {name:<20} {seconds:7.3f}{median}")
+        text = "\n".join(lines)
+        print(text)
+
+        try:
+            os.makedirs(os.path.dirname(self.log_file) or ".", exist_ok=True)
+            with open(self.log_file, "a") as f:
+                entry = {"timestamp": datetime.now().isoformat(), "marks": self.marks}
+                f.write(json.dumps(entry) + "\n")
+        except Exception as e:
+            print(f"Error saving startup timings: {e}")
+        return text
+
+
+class LazyTab(QWidget):
+    """
+    Tab placeholder that builds the real widget the first time it is shown.
+
+    Tabs whose imports or setup are expensive (plotting, ML) then cost
+    nothing until the user opens them.
+    """
+
+    def __init__(self, factory, parent=None):
+        """
+        Args:
+            factory: Callable returning the real tab widget
+        """
+        super().__init__(parent)
+        self.factory = factory
+        self._widget = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._placeholder = QLabel("Loading...")
+        self._placeholder.setAlignment(Qt.AlignCenter)
+        self._layout.addWidget(self._placeholder)
+
+    def widget(self) -> QWidget:
+        """The real tab, built now if it does not exist yet"""
+        if self._widget is None:
+            self._widget = self.factory()
+            self._layout.removeWidget(self._placeholder)
+            self._placeholder.deleteLater()
+            self._layout.addWidget(self._widget)
+        return self._widget
+
+    def is_loaded(self) -> bool:
+        return self._widget is not None
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._widget is None:
+            # Let the placeholder paint before the heavy construction starts
+            QTimer.singleShot(0, self.widget)
+
+
+class BackgroundLoader(QThread):
+    """Runs one callable off the UI thread and emits its result"""
+
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            self.loaded.emit(self.func(*self.args, **self.kwargs))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+# Example usage
+if __name__ == "__main__":
+    timer = StartupTimer(log_file="data/startup_times_example.jsonl")
+    time.sleep(0.05)
+    timer.mark("imports")
+    time.sleep(0.02)
+    timer.mark("first_paint")
+    timer.report()
+    os.remove("data/startup_times_example.jsonl")
@@ -0,0 +1,196 @@
+# src/tick_stream.py - Streaming tick ingestion: exchange feeds -> candle rings -> coalesced price deltas
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from candles import INTERVALS, CandleRing, CandleStore
+from market_providers import ExchangeStreamProvider
+
+# Candles kept per coin: a day of minutes, a month of hours
+DEFAULT_CAPACITIES = {"1m": 24 * 60, "1h": 30 * 24}
+
+
+class TickPipeline:
+    """
+    Live prices from exchange WebSocket feeds.
+
+    Subscribes to one or more ``ExchangeStreamProvider`` feeds (ticker or
+    trade streams). Every tick is folded into the coin's ring in a 1m and
+    a 1h ``CandleStore`` and recorded as the coin's pending delta. Consumers
+    call ``drain()`` on their own schedule (a GUI timer, an asyncio loop)
+    and get only the coins that changed since their last call, one entry
+    per coin however many ticks arrived, so a busy feed costs them at
+    most one update per coin per drain.
+    """
+
+    def __init__(self, streams: List[ExchangeStreamProvider], capacities: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            streams: Stream providers to subscribe to (shared with the router)
+            capacities: Candles kept per interval name (see candles.INTERVALS)
+        """
+        self.streams = list(streams)
+        self.capacities = dict(capacities or DEFAULT_CAPACITIES)
+        self.candles: Dict[str, CandleStore] = {
+            name: CandleStore(INTERVALS[name], capacity) for name, capacity in self.capacities.items()
+        }
+        self.prices: Dict[str, float] = {}
+        self.ticks = 0
+        self.last_tick_at: Optional[float] = None
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_router(cls, router, capacities: Optional[Dict[str, int]] = None) -> "TickPipeline":
+        """
+        Pipeline over the router's streaming providers.
+
+        When none is configured the default exchange ticker stream is
+        added to the router, so quotes benefit from it too.
+        """
+        streams = router.streams()
+        if not streams:
+            stream = ExchangeStreamProvider()
+            router.add_provider(stream)
+            streams = [stream]
+        return cls(streams, capacities)
+
+    # ==================== LIFECYCLE ====================
+    def start(self):
+        for stream in self.streams:
+            stream.add_listener(self.on_ticks)
+            stream.start()
+        return self
+
+    def stop(self):
+        """Unsubscribe (the streams keep serving the router)"""
+        for stream in self.streams:
+            stream.remove_listener(self.on_ticks)
+
+    @property
+    def live(self) -> bool:
+        """At least one feed is connected and current"""
+        return any(stream.live for stream in self.streams)
+
+    # ==================== INGESTION ====================
+    def on_ticks(self, ticks: List[tuple]):
+        """Stream listener: (coin_id, ts, price, volume, change_24h) tuples"""
+        if not ticks:
+            return
+        stores = list(self.candles.values())
+        with self._lock:
+            for coin_id, ts, price, volume, change_24h in ticks:
+                for store in stores:
+                    store.ring(coin_id).add_tick(ts, price, volume)
+                self.prices[coin_id] = price
+                delta = self._pending.get(coin_id)
+                if delta is None or ts >= delta["updated_at"]:
+                    self._pending[coin_id] = {
+                        "price": price,
+                        "change_24h": change_24h if change_24h is not None else (delta or {}).get("change_24h"),
+                        "updated_at": ts,
+                    }
+            self.ticks += len(ticks)
+            self.last_tick_at = time.time()
+
+    def drain(self) -> Dict[str, Dict]:
+        """
+        Coins that changed since the last call.
+
+        Returns:
+            {coin_id: {'price', 'change_24h', 'updated_at'}}
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    # ==================== CANDLES ====================
+    def get_candles(self, coin_id: str, interval: str = "1m") -> Optional[CandleRing]:
+        store = self.candles.get(interval)
+        return store.get(coin_id) if store is not None else None
+
+    def candle_arrays(self, coin_id: str, interval: str = "1m"):
+        """(start times, (5, n) OHLCV block) copied under the lock, or None if the coin has no candles"""
+        with self._lock:
+            ring = self.get_candles(coin_id, interval)
+            if ring is None or not len(ring):
+                return None
+            times, values = ring.arrays()
+            return times.copy(), values.copy()
+
+    def get_candle_frame(self, coin_id: str, interval: str = "1m"):
+        """Candles as a DataFrame in the get_coin_history format (None if none yet)"""
+        with self._lock:
+            ring = self.get_candles(coin_id, interval)
+            return ring.to_dataframe().copy() if ring is not None and len(ring) else None
+
+
+def apply_deltas(coins: List[Dict], deltas: Dict[str, Dict]) -> List[int]:
+    """
+    Apply price deltas to a top-coins listing in place.
+
+    Returns:
+        Indexes of the rows that changed
+    """
+    changed = []
+    for index, coin in enumerate(coins):
+        delta = deltas.get(coin.get("id"))
+        if delta is None:
+            continue
+        coin["current_price"] = delta["price"]
+        if delta.get("change_24h") is not None:
+            coin["price_change_percentage_24h"] = delta["change_24h"]
+            coin["price_change_percentage_24h_in_currency"] = delta["change_24h"]
+        changed.append(index)
+    return changed
+
+
+# Example usage: replay two hours of synthetic trades through the pipeline
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+
+    from mock_market_server import MOCK_COINS, ReplayServer, record_line
+
+    rng = random.Random(1)
+    prices = {coin_id: price for coin_id, (_, price) in MOCK_COINS.items()}
+    start = (time.time() // 3600 - 2) * 3600
+    recording = []
+    for second in range(0, 2 * 3600, 2):
+        events = []
+        for coin_id, (symbol, _) in MOCK_COINS.items():
+            prices[coin_id] *= 1 + rng.gauss(0, 0.0005)
+            events.append(
+                {
+                    "e": "trade",
+                    "s": f"{symbol.upper()}USDT",
+                    "p": f"{prices[coin_id]:.8f}",
+                    "q": f"{rng.uniform(0.01, 2):.4f}",
+                    "T": int((start + second) * 1000),
+                }
+            )
+        recording.append(record_line(start + second, events))
+
+    record_file = os.path.join(tempfile.mkdtemp(), "trades.jsonl")
+    server = ReplayServer(recording, speed=0).start()
+    stream = ExchangeStreamProvider(url=server.ws_url, record_file=record_file)
+    pipeline = TickPipeline([stream]).start()
+
+    began = time.perf_counter()
+    while pipeline.ticks < len(recording) * len(MOCK_COINS) and time.perf_counter() - began < 30:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - began
+    print(f"Ingested {pipeline.ticks:,} ticks in {elapsed:.2f} s ({pipeline.ticks / elapsed:,.0f} ticks/s)")
+    print(f"Pending deltas: {len(pipeline.drain())} coins (one per coin)")
+    for interval in ("1m", "1h"):
+        ring = pipeline.get_candles("bitcoin", interval)
+        print(f"bitcoin {interval}: {len(ring)} candles, latest {ring.latest()}")
+    print(pipeline.get_candle_frame("bitcoin", "1h"))
+    print(f"Candle memory: {sum(store.nbytes for store in pipeline.candles.values()) / 1024:,.0f} KiB")
+
+    pipeline.stop()
+    stream.close()
+    server.stop()
+    print(f"Recorded {sum(1 for _ in open(record_file))} messages to {record_file}")
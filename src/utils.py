@@ -3,13 +3,11 @@ Utility functions for CoinSentinel crypto tracking application.
 """
 
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
 import json
 from datetime import datetime, timedelta
 
+import indicators
+
 
 def create_price_predictor_model():
     """
@@ -18,6 +16,9 @@ def create_price_predictor_model():
     Returns:
         Tuple of (model, scaler)
     """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import StandardScaler
+
     model = LinearRegression()
     scaler = StandardScaler()
     return model, scaler
@@ -30,6 +31,9 @@ def create_advanced_predictor_model():
     Returns:
         Dictionary of models and scaler
     """
+    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+    from sklearn.preprocessing import StandardScaler
+
     models = {
         'rf': RandomForestRegressor(
             n_estimators=100,
@@ -58,27 +62,9 @@ def calculate_rsi(prices, period=14):
         period: RSI period (default 14)
         
     Returns:
-        Array of RSI values
+        Array of RSI values (Wilder smoothing, NaN during warm-up)
     """
-    prices = np.array(prices)
-    deltas = np.diff(prices)
-    
-    gains = np.where(deltas > 0, deltas, 0)
-    losses = np.where(deltas < 0, -deltas, 0)
-    
-    avg_gains = np.convolve(gains, np.ones(period), 'valid') / period
-    avg_losses = np.convolve(losses, np.ones(period), 'valid') / period
-    
-    # Avoid division by zero
-    avg_losses = np.where(avg_losses == 0, 1e-10, avg_losses)
-    
-    rs = avg_gains / avg_losses
-    rsi = 100 - (100 / (1 + rs))
-    
-    # Pad the beginning with NaN
-    rsi = np.concatenate([np.full(len(prices) - len(rsi), np.nan), rsi])
-    
-    return rsi
+    return indicators.rsi(prices, window=period)
 
 
 def calculate_macd(prices, fast=12, slow=26, signal=9):
@@ -94,16 +80,7 @@ def calculate_macd(prices, fast=12, slow=26, signal=9):
     Returns:
         Tuple of (macd, signal_line, histogram)
     """
-    prices = pd.Series(prices)
-    
-    ema_fast = prices.ewm(span=fast, adjust=False).mean()
-    ema_slow = prices.ewm(span=slow, adjust=False).mean()
-    
-    macd = ema_fast - ema_slow
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
-    histogram = macd - signal_line
-    
-    return macd.values, signal_line.values, histogram.values
+    return indicators.macd(prices, fast, slow, signal, min_periods=0)
 
 
 def calculate_bollinger_bands(prices, period=20, num_std=2):
@@ -118,15 +95,13 @@ def calculate_bollinger_bands(prices, period=20, num_std=2):
     Returns:
         Tuple of (upper_band, middle_band, lower_band)
     """
-    prices = pd.Series(prices)
-    
-    middle_band = prices.rolling(window=period, min_periods=1).mean()
-    std = prices.rolling(window=period, min_periods=1).std()
+    middle_band = indicators.rolling_mean(prices, period, min_periods=1)
+    std = indicators.rolling_std(prices, period, min_periods=1)
     
     upper_band = middle_band + (std * num_std)
     lower_band = middle_band - (std * num_std)
     
-    return upper_band.values, middle_band.values, lower_band.values
+    return upper_band, middle_band, lower_band
 
 
 def calculate_moving_averages(prices, windows=[7, 14, 30, 50, 200]):
@@ -140,6 +115,8 @@ def calculate_moving_averages(prices, windows=[7, 14, 30, 50, 200]):
     Returns:
         Dictionary of moving averages
     """
+    import pandas as pd
+
     prices = pd.Series(prices)
     mas = {}
     
@@ -163,6 +140,8 @@ def calculate_ema(prices, span=12):
     Returns:
         Array of EMA values
     """
+    import pandas as pd
+
     prices = pd.Series(prices)
     return prices.ewm(span=span, adjust=False).mean().values
 
@@ -178,6 +157,8 @@ def calculate_volatility(prices, window=14):
     Returns:
         Array of volatility values
     """
+    import pandas as pd
+
     prices = pd.Series(prices)
     return prices.rolling(window=window, min_periods=1).std().values
 
@@ -198,56 +179,83 @@ def calculate_returns(prices):
     return returns
 
 
+def _cluster_levels(levels, threshold):
+    """
+    Merge sorted candidate levels whose gap to the previous level is within
+    threshold (relative) and return the mean of each cluster.
+    """
+    if len(levels) == 0:
+        return []
+    levels = np.sort(levels)
+    gaps = np.abs(np.diff(levels)) / levels[:-1]
+    cluster_ids = np.concatenate([[0], np.cumsum(gaps > threshold)])
+    sums = np.bincount(cluster_ids, weights=levels)
+    counts = np.bincount(cluster_ids)
+    return list(sums / counts)
+
+
 def detect_support_resistance(prices, window=20, threshold=0.02):
     """
     Detect support and resistance levels.
     
+    A price is a support (resistance) candidate when it is the minimum
+    (maximum) of the centred 2*window+1 candle window. Accepts a 2-D
+    (coins x time) array to process many coins at once; shorter histories can
+    be padded with leading NaNs.
+    
     Args:
-        prices: Array or list of prices
+        prices: Array or list of prices, or 2-D array of price rows
         window: Window size for local extrema
         threshold: Threshold for level clustering
         
     Returns:
-        Tuple of (support_levels, resistance_levels)
+        Tuple of (support_levels, resistance_levels), or a list of such
+        tuples (one per row) for 2-D input
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    rows = prices[np.newaxis, :] if prices.ndim == 1 else prices
+    
+    # Centred sliding extrema; NaN wherever the full window is not available
+    span = 2 * window + 1
+    lows = indicators.shift(indicators.rolling_min(rows, span), -window)
+    highs = indicators.shift(indicators.rolling_max(rows, span), -window)
+    is_support = rows == lows
+    is_resistance = rows == highs
+    
+    levels = [
+        (
+            _cluster_levels(row[support_mask], threshold),
+            _cluster_levels(row[resistance_mask], threshold),
+        )
+        for row, support_mask, resistance_mask in zip(rows, is_support, is_resistance)
+    ]
+    return levels[0] if prices.ndim == 1 else levels
+
+
+def support_resistance_alert_levels(reference_price, support_levels, resistance_levels):
     """
-    prices = np.array(prices)
+    Build alert levels around a reference price.
     
-    # Find local minima (support) and maxima (resistance)
-    support_candidates = []
-    resistance_candidates = []
+    The nearest resistance above the reference becomes an 'above' alert
+    (breakout) and the nearest support below becomes a 'below' alert
+    (breakdown), in the format expected by generate_price_alerts.
     
-    for i in range(window, len(prices) - window):
-        # Check if local minimum
-        if prices[i] == min(prices[i-window:i+window+1]):
-            support_candidates.append(prices[i])
-        
-        # Check if local maximum
-        if prices[i] == max(prices[i-window:i+window+1]):
-            resistance_candidates.append(prices[i])
-    
-    # Cluster nearby levels
-    def cluster_levels(levels, threshold):
-        if not levels:
-            return []
-        
-        levels = sorted(levels)
-        clustered = []
-        current_cluster = [levels[0]]
-        
-        for level in levels[1:]:
-            if abs(level - current_cluster[-1]) / current_cluster[-1] <= threshold:
-                current_cluster.append(level)
-            else:
-                clustered.append(np.mean(current_cluster))
-                current_cluster = [level]
+    Args:
+        reference_price: Price the levels were detected against
+        support_levels: Support levels from detect_support_resistance
+        resistance_levels: Resistance levels from detect_support_resistance
         
-        clustered.append(np.mean(current_cluster))
-        return clustered
-    
-    support_levels = cluster_levels(support_candidates, threshold)
-    resistance_levels = cluster_levels(resistance_candidates, threshold)
-    
-    return support_levels, resistance_levels
+    Returns:
+        Dictionary of alert levels and types
+    """
+    alert_levels = {}
+    below = [level for level in support_levels if level < reference_price]
+    above = [level for level in resistance_levels if level > reference_price]
+    if below:
+        alert_levels[float(max(below))] = 'below'
+    if above:
+        alert_levels[float(min(above))] = 'above'
+    return alert_levels
 
 
 def calculate_sharpe_ratio(returns, risk_free_rate=0.0):
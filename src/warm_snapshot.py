@@ -0,0 +1,260 @@
+# src/warm_snapshot.py - Binary snapshot of the last market, portfolio and sentiment state
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Magic, JSON metadata length, market rows, holding rows
+HEADER = struct.Struct("<8sIII")
+MAGIC = b"CSNAP\x00\x00\x01"
+
+MARKET_DTYPE = np.dtype(
+    [
+        ("id", "S48"),
+        ("name", "S48"),
+        ("symbol", "S16"),
+        ("rank", "<i4"),
+        ("current_price", "<f8"),
+        ("change_1h", "<f8"),
+        ("change_24h", "<f8"),
+        ("change_7d", "<f8"),
+        ("market_cap", "<f8"),
+        ("total_volume", "<f8"),
+    ]
+)
+
+HOLDING_DTYPE = np.dtype(
+    [
+        ("coin_id", "S48"),
+        ("name", "S48"),
+        ("symbol", "S16"),
+        ("amount", "<f8"),
+        ("avg_cost", "<f8"),
+        ("current_price", "<f8"),
+        ("current_value", "<f8"),
+        ("cost_basis", "<f8"),
+        ("pnl_amount", "<f8"),
+        ("pnl_percent", "<f8"),
+        ("allocation", "<f8"),
+    ]
+)
+
+# Market fields stored under a different name than in the CoinGecko listing
+MARKET_KEYS = {
+    "rank": "market_cap_rank",
+    "change_1h": "price_change_percentage_1h_in_currency",
+    "change_24h": "price_change_percentage_24h",
+    "change_7d": "price_change_percentage_7d_in_currency",
+}
+
+
+def _text(value, size: int) -> bytes:
+    """UTF-8 encode and cut at a character boundary to fit a fixed-width field"""
+    data = str(value or "").encode("utf-8")
+    if len(data) <= size:
+        return data
+    return data[:size].decode("utf-8", "ignore").encode("utf-8")
+
+
+def _json_default(value):
+    # NumPy scalars from the sentiment calculations
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class WarmSnapshot:
+    """
+    Last-known market table, portfolio valuation and sentiment on disk.
+
+    The file is a small header, a JSON block (market data time, currency,
+    sentiment and portfolio totals) and two fixed-width record arrays for
+    the market rows and holdings. Loading memory-maps the file and reads
+    the records in place with ``np.frombuffer``, so there is nothing to
+    parse but the short JSON block and a launch can show the previous
+    session's data before any request has returned. Writes go to a
+    temporary file that replaces the snapshot, so a crash mid-save
+    leaves the previous snapshot intact.
+    """
+
+    def __init__(self, snapshot_file: str = "data/warm_snapshot.bin"):
+        """
+        Args:
+            snapshot_file: Path of the binary snapshot
+        """
+        self.snapshot_file = snapshot_file
+        os.makedirs(os.path.dirname(snapshot_file) or ".", exist_ok=True)
+
+    # ==================== SAVE ====================
+    def save(
+        self,
+        coins: List[Dict],
+        portfolio: Optional[Dict] = None,
+        sentiment: Optional[Dict] = None,
+        currency: str = "usd",
+        saved_at: Optional[float] = None,
+    ) -> bool:
+        """
+        Write a snapshot atomically.
+
+        Args:
+            coins: Top-coins listing as returned by get_top_coins
+            portfolio: get_portfolio_summary result
+            sentiment: get_market_sentiment result
+            currency: Currency of the market prices
+            saved_at: When the market data was fetched (default: now); the
+                snapshot's age is measured from it
+
+        Returns:
+            True if the snapshot was written
+        """
+        tmp_file = None
+        try:
+            market = np.zeros(len(coins or []), dtype=MARKET_DTYPE)
+            for row, coin in zip(market, coins or []):
+                row["id"] = _text(coin.get("id"), 48)
+                row["name"] = _text(coin.get("name"), 48)
+                row["symbol"] = _text(coin.get("symbol"), 16)
+                for field in MARKET_DTYPE.names[3:]:
+                    row[field] = coin.get(MARKET_KEYS.get(field, field)) or 0
+
+            portfolio = dict(portfolio or {})
+            holdings = portfolio.pop("holdings", [])
+            holding_rows = np.zeros(len(holdings), dtype=HOLDING_DTYPE)
+            for row, holding in zip(holding_rows, holdings):
+                row["coin_id"] = _text(holding.get("coin_id"), 48)
+                row["name"] = _text(holding.get("name"), 48)
+                row["symbol"] = _text(holding.get("symbol"), 16)
+                for field in HOLDING_DTYPE.names[3:]:
+                    row[field] = holding.get(field) or 0
+
+            meta = json.dumps(
+                {
+                    "saved_at": time.time() if saved_at is None else saved_at,
+                    "currency": currency,
+                    "portfolio": portfolio if holdings or portfolio else None,
+                    "sentiment": sentiment,
+                },
+                default=_json_default,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            # Pad so the record arrays start 8-byte aligned
+            meta += b" " * (-(HEADER.size + len(meta)) % 8)
+
+            # Unique temp file: the GUI and the daemon may save at the same time
+            fd, tmp_file = tempfile.mkstemp(
+                dir=os.path.dirname(self.snapshot_file) or ".", suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(MAGIC, len(meta), len(market), len(holding_rows)))
+                f.write(meta)
+                f.write(market.tobytes())
+                f.write(holding_rows.tobytes())
+            os.replace(tmp_file, self.snapshot_file)
+            return True
+        except Exception as e:
+            print(f"Error saving warm snapshot: {e}")
+            if tmp_file and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            return False
+
+    # ==================== LOAD ====================
+    def load(self) -> Optional[Dict]:
+        """
+        Read the snapshot.
+
+        Returns:
+            Dict with 'saved_at' (epoch seconds), 'currency', 'coins' (in the
+            get_top_coins format), 'portfolio' and 'sentiment', or None if
+            there is no usable snapshot
+        """
+        try:
+            if not os.path.exists(self.snapshot_file) or os.path.getsize(self.snapshot_file) < HEADER.size:
+                return None
+            with open(self.snapshot_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, meta_len, market_rows, holding_rows = HEADER.unpack_from(mm)
+                if magic != MAGIC:
+                    return None
+                offset = HEADER.size
+                snapshot = json.loads(bytes(mm[offset:offset + meta_len]))
+                offset += meta_len
+                market = np.frombuffer(mm, MARKET_DTYPE, market_rows, offset)
+                offset += market.nbytes
+                holdings = np.frombuffer(mm, HOLDING_DTYPE, holding_rows, offset)
+
+                snapshot["coins"] = self._coins(market)
+                if snapshot.get("portfolio") is not None:
+                    snapshot["portfolio"]["holdings"] = self._records(holdings)
+                # The views must be released before the map is closed
+                del market, holdings
+            return snapshot
+        except Exception as e:
+            print(f"Error loading warm snapshot: {e}")
+            return None
+
+    @staticmethod
+    def _records(rows: np.ndarray) -> List[Dict]:
+        names = rows.dtype.names
+        return [
+            {
+                name: value.decode("utf-8", "ignore") if isinstance(value, bytes) else value
+                for name, value in zip(names, record)
+            }
+            for record in rows.tolist()
+        ]
+
+    def _coins(self, rows: np.ndarray) -> List[Dict]:
+        coins = []
+        for record in self._records(rows):
+            coin = {MARKET_KEYS.get(name, name): value for name, value in record.items()}
+            if not coin["market_cap_rank"]:
+                del coin["market_cap_rank"]
+            coins.append(coin)
+        return coins
+
+    @staticmethod
+    def age(snapshot: Dict) -> float:
+        """Seconds since the snapshot was saved"""
+        return max(0.0, time.time() - snapshot.get("saved_at", 0))
+
+
+def describe_age(seconds: float) -> str:
+    """Short human-readable age, e.g. '5 min ago'"""
+    if seconds < 90:
+        return "just now"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f} min ago"
+    if seconds < 36 * 3600:
+        return f"{seconds / 3600:.0f} h ago"
+    return f"{seconds / 86400:.0f} days ago"
+
+
+# Example usage
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    coins = [
+        {
+            "id": f"coin-{i}",
+            "name": f"Coin {i}",
+            "symbol": f"c{i}",
+            "market_cap_rank": i + 1,
+            "current_price": float(rng.uniform(0.01, 50000)),
+            "price_change_percentage_24h": float(rng.normal(0, 5)),
+            "market_cap": float(rng.uniform(1e6, 1e12)),
+            "total_volume": float(rng.uniform(1e5, 1e10)),
+        }
+        for i in range(100)
+    ]
+    snapshot = WarmSnapshot("data/warm_snapshot_example.bin")
+    snapshot.save(coins, sentiment={"fear_greed": {"value": 55, "classification": "Greed"}})
+    print(f"Snapshot: {os.path.getsize(snapshot.snapshot_file)} bytes")
+
+    start = time.perf_counter()
+    loaded = snapshot.load()
+    print(f"Loaded {len(loaded['coins'])} coins in {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(loaded["coins"][0])
+    os.remove(snapshot.snapshot_file)
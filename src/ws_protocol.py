@@ -0,0 +1,236 @@
+# src/ws_protocol.py - Minimal RFC 6455 WebSocket client and server framing (standard library only)
+
+import base64
+import hashlib
+import os
+import socket
+import ssl
+import struct
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# Largest message accepted from a peer
+MAX_MESSAGE = 16 * 1024 * 1024
+
+
+class WebSocketClosed(ConnectionError):
+    """The peer closed the connection (or it dropped)"""
+
+
+def accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + GUID).digest()).decode("ascii")
+
+
+def _read_exact(rfile, size: int) -> bytes:
+    data = rfile.read(size)
+    if data is None or len(data) < size:
+        raise WebSocketClosed("connection closed")
+    return data
+
+
+def read_frame(rfile) -> Tuple[bool, int, bytes]:
+    """
+    Read one frame from a buffered binary file (``socket.makefile('rb')``).
+
+    Returns:
+        (fin, opcode, payload), with masked payloads unmasked
+    """
+    first, second = _read_exact(rfile, 2)
+    fin, opcode = bool(first & 0x80), first & 0x0F
+    masked, length = bool(second & 0x80), second & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", _read_exact(rfile, 2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", _read_exact(rfile, 8))[0]
+    if length > MAX_MESSAGE:
+        raise WebSocketClosed(f"frame of {length} bytes exceeds the limit")
+    mask = _read_exact(rfile, 4) if masked else None
+    payload = _read_exact(rfile, length) if length else b""
+    if mask:
+        payload = _unmask(payload, mask)
+    return fin, opcode, payload
+
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    # XOR as one big integer (much faster than a per-byte loop)
+    repeated = (mask * (len(payload) // 4 + 1))[: len(payload)]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(payload), "big")
+
+
+def encode_frame(opcode: int, payload: bytes, mask: bool) -> bytes:
+    """One final frame; clients must mask, servers must not"""
+    head = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        head += bytes([mask_bit | length])
+    elif length < 1 << 16:
+        head += bytes([mask_bit | 126]) + struct.pack(">H", length)
+    else:
+        head += bytes([mask_bit | 127]) + struct.pack(">Q", length)
+    if mask:
+        key = os.urandom(4)
+        return head + key + _unmask(payload, key)
+    return head + payload
+
+
+def read_message(rfile, send) -> Union[str, bytes]:
+    """
+    Read the next complete message, answering pings and close frames.
+
+    Args:
+        rfile: Buffered binary file over the socket
+        send: Callable(opcode, payload) writing a frame back to the peer
+
+    Returns:
+        Text messages as str, binary messages as bytes
+    """
+    parts, message_opcode = [], None
+    while True:
+        fin, opcode, payload = read_frame(rfile)
+        if opcode == OP_PING:
+            send(OP_PONG, payload)
+            continue
+        if opcode == OP_PONG:
+            continue
+        if opcode == OP_CLOSE:
+            try:
+                send(OP_CLOSE, payload[:2])
+            except OSError:
+                pass
+            raise WebSocketClosed("closed by peer")
+        if opcode != OP_CONTINUATION:
+            message_opcode, parts = opcode, []
+        parts.append(payload)
+        if sum(len(part) for part in parts) > MAX_MESSAGE:
+            raise WebSocketClosed("message exceeds the limit")
+        if fin:
+            data = b"".join(parts)
+            return data.decode("utf-8") if message_opcode == OP_TEXT else data
+
+
+def _read_headers(rfile) -> Tuple[str, Dict[str, str]]:
+    """First line and lowercased headers of an HTTP head"""
+    start = rfile.readline(8192).decode("latin-1").strip()
+    headers = {}
+    while True:
+        line = rfile.readline(8192)
+        if not line:
+            raise WebSocketClosed("connection closed during handshake")
+        if line in (b"\r\n", b"\n"):
+            return start, headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+class WebSocketClient:
+    """
+    Blocking WebSocket client for ws:// and wss:// URLs.
+
+    Meant to be driven from one reader thread: ``recv`` blocks until the
+    next message (answering pings on the way) and raises
+    ``WebSocketClosed`` when the connection ends or the read times out.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0, headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            url: ws:// or wss:// endpoint
+            timeout: Seconds for connecting and for each read; a silent
+                connection is treated as dead after this long
+            headers: Extra handshake headers
+        """
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.sock = None
+        self._rfile = None
+
+    def connect(self):
+        parts = urlsplit(self.url)
+        secure = parts.scheme == "wss"
+        port = parts.port or (443 if secure else 80)
+        sock = socket.create_connection((parts.hostname, port), timeout=self.timeout)
+        if secure:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parts.hostname)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        request = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {parts.hostname}:{port}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key}",
+            "Sec-WebSocket-Version: 13",
+        ] + [f"{name}: {value}" for name, value in self.headers.items()]
+        sock.sendall(("\r\n".join(request) + "\r\n\r\n").encode("latin-1"))
+
+        self.sock, self._rfile = sock, sock.makefile("rb")
+        status, headers = _read_headers(self._rfile)
+        if " 101 " not in f"{status} " or headers.get("sec-websocket-accept") != accept_key(key):
+            self.close()
+            raise WebSocketClosed(f"handshake rejected: {status}")
+        return self
+
+    def send(self, message: Union[str, bytes]):
+        opcode = OP_TEXT if isinstance(message, str) else OP_BINARY
+        self._send(opcode, message.encode("utf-8") if isinstance(message, str) else message)
+
+    def _send(self, opcode: int, payload: bytes):
+        self.sock.sendall(encode_frame(opcode, payload, mask=True))
+
+    def recv(self) -> Union[str, bytes]:
+        try:
+            return read_message(self._rfile, self._send)
+        except (OSError, ValueError) as e:
+            raise WebSocketClosed(str(e)) from e
+
+    def close(self):
+        if self.sock is None:
+            return
+        try:
+            self._send(OP_CLOSE, struct.pack(">H", 1000))
+        except OSError:
+            pass
+        try:
+            self._rfile.close()
+            self.sock.close()
+        except OSError:
+            pass
+        self.sock = self._rfile = None
+
+
+def server_handshake(headers: Dict[str, str], wfile) -> bool:
+    """
+    Answer a client's upgrade request on the server side.
+
+    Args:
+        headers: Request headers (any case)
+        wfile: Binary file to write the response to
+
+    Returns:
+        True if the connection was upgraded
+    """
+    headers = {name.lower(): value for name, value in headers.items()}
+    key = headers.get("sec-websocket-key")
+    if headers.get("upgrade", "").lower() != "websocket" or not key:
+        return False
+    wfile.write(
+        (
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n"
+        ).encode("latin-1")
+    )
+    wfile.flush()
+    return True
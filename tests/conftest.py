@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules live flat in src/ (the apps add it to sys.path the same way)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
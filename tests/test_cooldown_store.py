@@ -0,0 +1,66 @@
+from cooldown_store import CooldownStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _store(tmp_path, **kwargs):
+    clock = FakeClock()
+    store = CooldownStore(persist_file=str(tmp_path / "cooldowns.json"), clock=clock, **kwargs)
+    return store, clock
+
+
+def test_shortened_policy_expires_new_keys_before_older_ones(tmp_path):
+    store, clock = _store(tmp_path, policies={"price_alert": 100})
+    assert store.allow("old")
+    store.set_policy("price_alert", 5)
+    assert store.allow("new")
+
+    clock.now = 6
+    assert store.allow("other")
+
+    # "new" expired behind the still-cooling "old" and is no longer tracked
+    assert len(store) == 2
+    assert store.allow("new")
+    assert not store.allow("old")
+    assert store.remaining("old") == 94
+
+
+def test_eviction_drops_the_key_closest_to_expiry_across_classes(tmp_path):
+    store, _ = _store(tmp_path, policies={"long": 100, "short": 10}, max_keys=2)
+    store.allow("a", "long")
+    store.allow("b", "short")
+    store.allow("c", "long")
+
+    assert store.remaining("b") == 0
+    assert store.remaining("a") == 100 and store.remaining("c") == 100
+
+
+def test_rearmed_and_reset_keys_do_not_grow_the_expiry_queue(tmp_path):
+    store, clock = _store(tmp_path, policies={"price_alert": 1})
+    for step in range(10000):
+        clock.now = step * 0.5
+        store.allow(f"coin{step % 50}")
+        if step % 7 == 0:
+            store.reset(f"coin{step % 50}")
+
+    assert len(store) <= 50
+    assert len(store._expiry) <= 2 * len(store) + 64
+
+
+def test_cooldowns_survive_a_restart(tmp_path):
+    store, clock = _store(tmp_path, policies={"price_alert": 300, "level_alert": 900})
+    store.allow("btc_above", "price_alert")
+    store.allow("btc_level", "level_alert")
+    store.save()
+
+    restored, _ = _store(tmp_path)
+    restored.load()
+
+    assert not restored.allow("btc_above") and not restored.allow("btc_level", "level_alert")
+    assert 899 < restored.remaining("btc_level") <= 900
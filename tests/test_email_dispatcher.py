@@ -0,0 +1,143 @@
+import email
+import socket
+import threading
+import time
+
+import pytest
+
+from email_dispatcher import EmailDispatcher
+
+
+class SmtpStub:
+    """
+    Minimal SMTP server on a local socket.
+
+    Speaks just enough of RFC 5321 for smtplib (EHLO without AUTH or
+    STARTTLS, MAIL, RCPT, DATA, RSET, NOOP, QUIT). ``delay`` holds every
+    DATA reply back to simulate a slow relay.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.messages = []
+        self.sessions = 0
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.sessions += 1
+            threading.Thread(target=self._session, args=(conn,), daemon=True).start()
+
+    def _session(self, conn):
+        stream = conn.makefile("rb")
+        send = lambda line: conn.sendall(line.encode() + b"\r\n")
+        try:
+            send("220 stub ready")
+            for raw in stream:
+                command = raw.decode().strip().upper()
+                if command.startswith("EHLO"):
+                    send("250-stub")
+                    send("250 8BITMIME")
+                elif command.startswith("DATA"):
+                    send("354 end with .")
+                    lines = []
+                    for line in stream:
+                        if line in (b".\r\n", b".\n"):
+                            break
+                        lines.append(line[1:] if line.startswith(b"..") else line)
+                    time.sleep(self.delay)
+                    self.messages.append(email.message_from_bytes(b"".join(lines)))
+                    send("250 queued")
+                elif command.startswith("QUIT"):
+                    send("221 bye")
+                    return
+                else:
+                    send("250 ok")
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def close(self):
+        self._sock.close()
+
+
+def _config(port):
+    return {
+        "smtp_server": "127.0.0.1",
+        "port": port,
+        "sender_email": "alerts@example.com",
+        "password": "unused",
+        "use_tls": False,
+    }
+
+
+def _parts(message):
+    return {part.get_content_type(): part.get_payload(decode=True).decode() for part in message.walk()
+            if not part.is_multipart()}
+
+
+@pytest.fixture
+def smtp():
+    server = SmtpStub()
+    yield server
+    server.close()
+
+
+def test_burst_is_merged_into_one_digest_over_one_session(smtp):
+    dispatcher = EmailDispatcher(_config(smtp.port), batch_window=0.2)
+    for i in range(3):
+        dispatcher.submit("me@example.com", f"BTC alert {i}", f"Level {i} crossed", digest=True)
+    dispatcher.submit("me@example.com", "Portfolio summary", "Total value: $50,000")
+    dispatcher.stop(timeout=5)
+
+    assert dispatcher.sent_count == 2
+    assert dispatcher.failed_count == 0
+    assert smtp.sessions == 1
+    subjects = sorted(message["Subject"] for message in smtp.messages)
+    assert subjects == ["CoinSentinel: 3 alerts", "Portfolio summary"]
+
+
+def test_digest_html_escapes_plain_bodies(smtp):
+    dispatcher = EmailDispatcher(_config(smtp.port), batch_window=0.2)
+    dispatcher.submit("me@example.com", "Alert 1", "<script>x()</script> & more", digest=True)
+    dispatcher.submit("me@example.com", "Alert 2", "price < 5", digest=True)
+    dispatcher.stop(timeout=5)
+
+    parts = _parts(smtp.messages[0])
+    assert "<script>" not in parts["text/html"]
+    assert "&lt;script&gt;x()&lt;/script&gt; &amp; more" in parts["text/html"]
+    assert "price &lt; 5" in parts["text/html"]
+    assert "<script>x()</script> & more" in parts["text/plain"]
+
+
+def test_stop_timeout_keeps_busy_worker_and_restarts_after_it_exits():
+    smtp = SmtpStub(delay=0.6)
+    try:
+        dispatcher = EmailDispatcher(_config(smtp.port), batch_window=0.0)
+        dispatcher.submit("me@example.com", "Slow", "first")
+        time.sleep(0.2)
+        dispatcher.stop(timeout=0.1)
+        worker = dispatcher._thread
+        assert worker.is_alive()
+
+        # No second worker (and SMTP session) while the first is still sending
+        dispatcher.submit("me@example.com", "Queued", "second")
+        assert dispatcher._thread is worker
+        worker.join(5)
+
+        dispatcher.submit("me@example.com", "Later", "third")
+        assert dispatcher._thread is not worker
+        dispatcher.stop(timeout=5)
+        assert not dispatcher._thread.is_alive()
+        assert {message["Subject"] for message in smtp.messages} == {"Slow", "Queued", "Later"}
+    finally:
+        smtp.close()
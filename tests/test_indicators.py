@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+ta = pytest.importorskip("ta")
+
+
+@pytest.fixture(scope="module")
+def series():
+    """Fixed random-walk candles (same seed every run)"""
+    rng = np.random.default_rng(42)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1500)))
+    high = close * (1 + rng.uniform(0, 0.01, close.shape))
+    low = close * (1 - rng.uniform(0, 0.01, close.shape))
+    volume = rng.uniform(1e6, 5e6, close.shape)
+    return close, high, low, volume
+
+
+def _reference(close, high, low):
+    close_s, high_s, low_s = pd.Series(close), pd.Series(high), pd.Series(low)
+    macd_ta = ta.trend.MACD(close_s)
+    bb_ta = ta.volatility.BollingerBands(close_s, window=20, window_dev=2)
+    stoch_ta = ta.momentum.StochasticOscillator(high_s, low_s, close_s, window=14, smooth_window=3)
+    return {
+        "rsi": ta.momentum.RSIIndicator(close_s, window=14).rsi(),
+        "macd": macd_ta.macd(),
+        "macd_signal": macd_ta.macd_signal(),
+        "macd_diff": macd_ta.macd_diff(),
+        "bb_upper": bb_ta.bollinger_hband(),
+        "bb_lower": bb_ta.bollinger_lband(),
+        "bb_width": bb_ta.bollinger_wband(),
+        "stoch_k": stoch_ta.stoch(),
+        "stoch_d": stoch_ta.stoch_signal(),
+        "cci": ta.trend.CCIIndicator(high_s, low_s, close_s, window=20).cci(),
+        "ema_7": ta.trend.EMAIndicator(close_s, window=7).ema_indicator(),
+        "ema_14": ta.trend.EMAIndicator(close_s, window=14).ema_indicator(),
+    }
+
+
+def _ours(close, high, low):
+    line, signal_line, hist = indicators.macd(close)
+    upper, _, lower, width = indicators.bollinger(close, 20, 2)
+    k, d = indicators.stochastic(high, low, close, 14, 3)
+    return {
+        "rsi": indicators.rsi(close, 14),
+        "macd": line,
+        "macd_signal": signal_line,
+        "macd_diff": hist,
+        "bb_upper": upper,
+        "bb_lower": lower,
+        "bb_width": width,
+        "stoch_k": k,
+        "stoch_d": d,
+        "cci": indicators.cci(high, low, close, 20),
+        # ta's EMA waits a full window; the predictor's features start at once
+        "ema_7": indicators.ema(close, span=7, min_periods=7),
+        "ema_14": indicators.ema(close, span=14, min_periods=14),
+    }
+
+
+def _assert_matches(ours, theirs):
+    theirs = np.asarray(theirs, dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(ours), np.isnan(theirs))
+    np.testing.assert_allclose(ours, theirs, rtol=1e-7, atol=1e-9)
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["rsi", "macd", "macd_signal", "macd_diff", "bb_upper", "bb_lower", "bb_width",
+     "stoch_k", "stoch_d", "cci", "ema_7", "ema_14"],
+)
+def test_indicator_matches_ta(series, name):
+    close, high, low, _ = series
+    _assert_matches(_ours(close, high, low)[name], _reference(close, high, low)[name])
+
+
+def test_rolling_kernels_match_pandas(series):
+    close, _, _, volume = series
+    close_s, volume_s = pd.Series(close), pd.Series(volume)
+    _assert_matches(indicators.rolling_mean(close, 7, min_periods=1), close_s.rolling(7, min_periods=1).mean())
+    _assert_matches(indicators.rolling_std(close, 20, min_periods=1), close_s.rolling(20, min_periods=1).std())
+    _assert_matches(indicators.rolling_max(close, 20, min_periods=1), close_s.rolling(20, min_periods=1).max())
+    _assert_matches(indicators.rolling_min(close, 20, min_periods=1), close_s.rolling(20, min_periods=1).min())
+    np.testing.assert_allclose(
+        indicators.rolling_corr(close, volume, 20, min_periods=2)[20:],
+        close_s.rolling(20, min_periods=2).corr(volume_s).to_numpy()[20:],
+        rtol=1e-6,
+        atol=1e-9,
+    )
+
+
+def test_panel_rows_match_single_series(series):
+    """A NaN-padded (coins x time) panel gives each coin its standalone values"""
+    close = series[0]
+    short = slice(500, None)
+    panel = np.full((2, len(close)), np.nan)
+    panel[0] = close
+    panel[1, 500:] = close[short]
+
+    features = indicators.compute_feature_panel(panel)
+    alone = indicators.compute_feature_panel(close[short][np.newaxis])
+    for name in ("rsi", "macd", "bb_width", "cci", "ema_14", "sma_30", "volatility", "roc_14"):
+        np.testing.assert_allclose(features[name][1, 500:], alone[name][0], rtol=1e-7, atol=1e-9, err_msg=name)
+    np.testing.assert_allclose(features["rsi"][0], indicators.rsi(close, 14), rtol=1e-12, equal_nan=True)
@@ -0,0 +1,148 @@
+import time
+
+import pytest
+
+pytest.importorskip("pycoingecko")
+pytest.importorskip("requests")
+
+from market_providers import (  # noqa: E402
+    CoinGeckoProvider,
+    ExchangeRestProvider,
+    ExchangeStreamProvider,
+    MarketDataProvider,
+    MarketDataRouter,
+    ProviderError,
+    _quote,
+)
+from mock_market_server import MockMarketServer  # noqa: E402
+
+
+class FakeProvider(MarketDataProvider):
+    """Quote source with a fixed price table, a delay and a failure switch"""
+
+    def __init__(self, name, prices, delay=0.0):
+        self.name = name
+        self.prices = prices
+        self.delay = delay
+        self.fail = False
+        self.calls = []
+
+    def get_price(self, coin_ids, vs_currency="usd"):
+        self.calls.append(list(coin_ids))
+        time.sleep(self.delay)
+        if self.fail:
+            raise ProviderError(f"{self.name} down")
+        return {coin_id: _quote(self.prices[coin_id], source=self.name) for coin_id in coin_ids if coin_id in self.prices}
+
+
+def test_untried_then_fastest_provider_is_asked_first():
+    slow = FakeProvider("slow", {"bitcoin": 1.0}, delay=0.05)
+    fast = FakeProvider("fast", {"bitcoin": 2.0})
+    router = MarketDataRouter([slow, fast])
+
+    assert router.get_price(["bitcoin"])["bitcoin"]["source"] == "slow"
+    # fast has never been tried, so it ranks ahead of slow's measured latency
+    assert router.get_price(["bitcoin"])["bitcoin"]["source"] == "fast"
+    assert router.get_price(["bitcoin"])["bitcoin"]["source"] == "fast"
+    assert len(slow.calls) == 1
+    assert router.health["fast"].latency < router.health["slow"].latency
+
+
+def test_coins_a_provider_cannot_price_fall_through_to_the_next():
+    first = FakeProvider("first", {"bitcoin": 1.0})
+    second = FakeProvider("second", {"bitcoin": 5.0, "ethereum": 2.0})
+    router = MarketDataRouter([first, second])
+
+    quotes = router.get_price(["bitcoin", "ethereum", "unknown"])
+
+    assert {coin_id: quote["source"] for coin_id, quote in quotes.items()} == {"bitcoin": "first", "ethereum": "second"}
+    assert second.calls == [["ethereum", "unknown"]]
+
+
+def test_failing_provider_cools_down_with_doubling_backoff():
+    primary = FakeProvider("primary", {"bitcoin": 1.0})
+    backup = FakeProvider("backup", {"bitcoin": 2.0}, delay=0.01)
+    router = MarketDataRouter([primary, backup], failure_threshold=2, cooldown=0.3)
+    primary.fail = True
+
+    # Below the threshold the primary keeps being tried first
+    for _ in range(2):
+        assert router.get_price(["bitcoin"])["bitcoin"]["source"] == "backup"
+    assert len(primary.calls) == 2
+    health = router.health["primary"]
+    assert 0.2 < health.down_until - time.time() <= 0.3
+
+    # Cooling down: skipped while the backup answers
+    assert router.get_price(["bitcoin"])["bitcoin"]["source"] == "backup"
+    assert len(primary.calls) == 2
+
+    # Retried after the cooldown; another failure doubles it
+    time.sleep(0.35)
+    router.get_price(["bitcoin"])
+    assert len(primary.calls) == 3
+    assert 0.5 < health.down_until - time.time() <= 0.6
+
+    # Back in rotation after a success, with its failure streak reset
+    primary.fail = False
+    time.sleep(0.65)
+    assert router.get_price(["bitcoin"])["bitcoin"]["source"] == "primary"
+    assert health.consecutive_failures == 0 and health.down_until == 0.0
+    assert health.failures == 3 and router.status()["primary"]["down_for"] == 0.0
+
+
+def test_last_quote_is_served_stale_when_every_provider_fails():
+    primary = FakeProvider("primary", {"bitcoin": 1.0})
+    router = MarketDataRouter([primary])
+    router.get_price(["bitcoin"])
+    primary.fail = True
+
+    quote = router.get_price(["bitcoin"])["bitcoin"]
+
+    assert quote["stale"] and quote["price"] == 1.0 and quote["source"] == "primary"
+
+
+@pytest.fixture
+def mocks():
+    slow = MockMarketServer(delay=0.1).start()
+    fast = MockMarketServer(delay=0.0, interval=0.05).start()
+    yield slow, fast
+    slow.stop()
+    fast.stop()
+
+
+def test_failover_between_real_providers_on_mock_servers(mocks):
+    slow, fast = mocks
+    router = MarketDataRouter(
+        [CoinGeckoProvider(base_url=slow.url + "/api/v3"), ExchangeRestProvider(base_url=fast.url)],
+        failure_threshold=1,
+        cooldown=60,
+    )
+    coins = ["bitcoin", "ethereum"]
+    router.get_price(coins)
+    router.get_price(coins)
+    assert {quote["source"] for quote in router.get_price(coins).values()} == {"binance"}
+
+    fast.fail = True
+    assert {quote["source"] for quote in router.get_price(coins).values()} == {"coingecko"}
+    assert router.health["binance"].down_until > time.time() + 50
+
+    listing = router.get_top_coins(limit=3)
+    assert [coin["market_cap_rank"] for coin in listing] == [1, 2, 3]
+
+
+def test_stream_answers_first_and_router_falls_back_when_it_drops(mocks):
+    slow, fast = mocks
+    stream = ExchangeStreamProvider(url=fast.ws_url, stale_after=0.5).start()
+    router = MarketDataRouter([stream, CoinGeckoProvider(base_url=slow.url + "/api/v3")])
+    try:
+        deadline = time.time() + 5
+        while not stream.live and time.time() < deadline:
+            time.sleep(0.02)
+        assert router.get_price(["bitcoin"])["bitcoin"]["source"] == "binance-stream"
+
+        fast.fail = True
+        time.sleep(0.8)
+        assert not stream.live
+        assert router.get_price(["bitcoin"])["bitcoin"]["source"] == "coingecko"
+    finally:
+        router.close()
@@ -0,0 +1,57 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("requests")
+
+from improved_sentiment_tracker import SENTIMENT_HISTORY_DTYPE, SentimentTracker  # noqa: E402
+
+MARKET = {"gainers": 60, "losers": 40, "total_coins_analyzed": 100, "momentum_score": 0.2, "avg_change_24h": 1.5}
+
+
+def _write_history(path, timestamps, partial=b""):
+    records = np.zeros(len(timestamps), dtype=SENTIMENT_HISTORY_DTYPE)
+    records["timestamp"] = timestamps
+    records["fgi"] = 50
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(records.tobytes() + partial)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_expired_snapshots_are_dropped_on_startup(workdir):
+    now = int(time.time())
+    hour = 3600
+    _write_history("data/sentiment_history.bin", np.arange(now - 120 * 86400, now, hour), partial=b"\x01\x02")
+
+    tracker = SentimentTracker(api_handler=None)
+    history = tracker.load_history()
+
+    assert history["timestamp"][0] >= now - tracker.history_days * 86400
+    assert history["timestamp"][-1] == now - hour
+    assert os.path.getsize(tracker.history_file) == len(history) * SENTIMENT_HISTORY_DTYPE.itemsize
+
+
+def test_appending_compacts_once_a_day_of_records_expired(workdir):
+    now = int(time.time())
+    tracker = SentimentTracker(api_handler=None)
+    cutoff = now - tracker.history_days * 86400
+
+    # Only a few hours past retention: appended without a rewrite
+    _write_history(tracker.history_file, [cutoff - 3 * 3600, now - 3600])
+    tracker._append_history(40, MARKET)
+    assert len(tracker.load_history()) == 3
+
+    # More than a day past retention: expired records go, the new one is kept
+    _write_history(tracker.history_file, [cutoff - 2 * 86400, cutoff + 60, now - 3600])
+    tracker._append_history(40, MARKET)
+    history = tracker.load_history()
+    assert history["timestamp"].tolist()[:2] == [cutoff + 60, now - 3600]
+    assert len(history) == 3 and history["fgi"][-1] == 40 and history["gainers"][-1] == 60
@@ -0,0 +1,112 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pycoingecko")
+pytest.importorskip("requests")
+
+from market_providers import ExchangeStreamProvider  # noqa: E402
+from mock_market_server import ReplayServer, record_line  # noqa: E402
+from tick_stream import TickPipeline  # noqa: E402
+
+# Three minutes before an hour boundary, so candles cross both intervals
+T0 = 1_700_000_000 // 3600 * 3600 + 3600 - 180
+
+
+def _recording():
+    """
+    Seven minutes of bitcoin trades and ethereum mini tickers, one message
+    every 20 s, plus one late bitcoin trade.
+
+    Returns:
+        (recording entries, ticks as (coin_id, ts, price, volume) in arrival order)
+    """
+    entries, ticks = [], []
+    eth_volume = 1_000_000.0
+    for step in range(21):
+        ts = T0 + step * 20
+        btc_price = 60000 + 37 * ((step * 7) % 11) - 150
+        btc_qty = 0.5 + step % 3
+        eth_price = 3000 + 5 * ((step * 5) % 7)
+        events = [
+            {"e": "trade", "s": "BTCUSDT", "p": f"{btc_price:.2f}", "q": f"{btc_qty}", "T": ts * 1000},
+            {"e": "24hrMiniTicker", "s": "ETHUSDT", "c": f"{eth_price:.2f}", "o": "2900.00",
+             "q": f"{eth_volume + 250 * step:.2f}", "E": ts * 1000},
+        ]
+        entries.append(record_line(ts, events))
+        ticks.append(("bitcoin", ts, float(btc_price), btc_price * btc_qty))
+        ticks.append(("ethereum", ts, float(eth_price), 250.0 if step else 0.0))
+    # Arrives after newer candles: counted as late and skipped
+    late = T0 + 30
+    entries.append(record_line(T0 + 420, [{"e": "trade", "s": "BTCUSDT", "p": "1.00", "q": "1", "T": late * 1000}]))
+    ticks.append(("bitcoin", late, 1.0, 1.0))
+    return entries, ticks
+
+
+def _expected_candles(ticks, coin_id, interval, capacity):
+    candles = {}
+    for coin, ts, price, volume in ticks:
+        if coin != coin_id:
+            continue
+        start = ts // interval * interval
+        if candles and start < max(candles):
+            continue
+        if start not in candles:
+            candles[start] = [price, price, price, price, 0.0]
+        candle = candles[start]
+        candle[1], candle[2], candle[3] = max(candle[1], price), min(candle[2], price), price
+        candle[4] += volume
+    starts = sorted(candles)[-capacity:]
+    return np.array(starts, dtype=np.int64), np.array([candles[s] for s in starts]).T
+
+
+@pytest.fixture
+def replay(tmp_path):
+    entries, ticks = _recording()
+    server = ReplayServer(entries, speed=0).start()
+    record_file = str(tmp_path / "replayed.jsonl")
+    stream = ExchangeStreamProvider(url=server.ws_url, record_file=record_file)
+    pipeline = TickPipeline([stream], capacities={"1m": 5, "1h": 2}).start()
+    deadline = time.time() + 10
+    while pipeline.ticks < len(ticks) and time.time() < deadline:
+        time.sleep(0.02)
+    # The replay closes the stream at its end; stop before it reconnects
+    # (and replays again) and flush the recording
+    stream.close()
+    yield pipeline, entries, ticks, record_file
+    pipeline.stop()
+    server.stop()
+
+
+def test_replayed_ticks_are_coalesced_to_one_delta_per_coin(replay):
+    pipeline, entries, ticks, record_file = replay
+    assert pipeline.ticks == len(ticks)
+
+    deltas = pipeline.drain()
+
+    last_step = T0 + 20 * 20
+    assert set(deltas) == {"bitcoin", "ethereum"}
+    # The late trade does not replace the newer price
+    assert deltas["bitcoin"]["updated_at"] == last_step
+    assert deltas["bitcoin"]["price"] == [t for t in ticks if t[0] == "bitcoin" and t[1] == last_step][0][2]
+    assert deltas["ethereum"]["price"] == ticks[-2][2]
+    assert deltas["ethereum"]["change_24h"] == pytest.approx((ticks[-2][2] / 2900 - 1) * 100)
+    assert pipeline.drain() == {}
+
+    with open(record_file) as f:
+        assert [json.loads(line)["message"] for line in f] == [entry["message"] for entry in entries]
+
+
+@pytest.mark.parametrize("interval, seconds, capacity", [("1m", 60, 5), ("1h", 3600, 2)])
+@pytest.mark.parametrize("coin_id", ["bitcoin", "ethereum"])
+def test_candle_rings_hold_the_replayed_ohlcv(replay, coin_id, interval, seconds, capacity):
+    pipeline, _, ticks, _ = replay
+
+    times, values = pipeline.candle_arrays(coin_id, interval)
+    expected_times, expected_values = _expected_candles(ticks, coin_id, seconds, capacity)
+
+    np.testing.assert_array_equal(times, expected_times)
+    np.testing.assert_allclose(values, expected_values, rtol=1e-12)
+    assert pipeline.get_candles("bitcoin", interval).late == 1
@@ -0,0 +1,137 @@
+import io
+import socket
+import struct
+import threading
+
+import pytest
+
+from ws_protocol import (
+    OP_BINARY,
+    OP_CLOSE,
+    OP_CONTINUATION,
+    OP_PING,
+    OP_PONG,
+    OP_TEXT,
+    WebSocketClient,
+    WebSocketClosed,
+    _read_headers,
+    encode_frame,
+    read_frame,
+    read_message,
+    server_handshake,
+)
+
+
+def _frame(opcode, payload, fin=True):
+    """Unmasked frame with an explicit FIN bit (encode_frame always sets it)"""
+    frame = encode_frame(opcode, payload, mask=False)
+    return frame if fin else bytes([frame[0] & 0x7F]) + frame[1:]
+
+
+@pytest.mark.parametrize("length, header", [(0, 2), (125, 2), (126, 4), (65535, 4), (65536, 10)])
+def test_masked_client_frames_round_trip(length, header):
+    payload = bytes(range(256)) * (length // 256) + bytes(range(length % 256))
+    frame = encode_frame(OP_BINARY, payload, mask=True)
+
+    assert frame[0] == 0x80 | OP_BINARY
+    assert frame[1] & 0x80
+    assert len(frame) == header + 4 + length
+    if length:
+        assert frame[header + 4:] != payload
+    assert read_frame(io.BytesIO(frame)) == (True, OP_BINARY, payload)
+
+
+@pytest.mark.parametrize("length, header", [(5, 2), (300, 4), (70000, 10)])
+def test_server_frames_are_not_masked(length, header):
+    payload = b"x" * length
+    frame = encode_frame(OP_TEXT, payload, mask=False)
+
+    assert not frame[1] & 0x80
+    assert frame[header:] == payload
+    assert read_frame(io.BytesIO(frame)) == (True, OP_TEXT, payload)
+
+
+def test_fragmented_message_is_reassembled_and_pings_answered():
+    stream = io.BytesIO(
+        _frame(OP_TEXT, b"Hel", fin=False)
+        + _frame(OP_PING, b"are you there")
+        + _frame(OP_CONTINUATION, "lo wö".encode("utf-8"), fin=False)
+        + _frame(OP_PONG, b"")
+        + _frame(OP_CONTINUATION, b"rld")
+        + _frame(OP_BINARY, b"\x00\x01")
+    )
+    sent = []
+
+    assert read_message(stream, lambda opcode, payload: sent.append((opcode, payload))) == "Hello wörld"
+    assert sent == [(OP_PONG, b"are you there")]
+    assert read_message(stream, lambda opcode, payload: sent.append((opcode, payload))) == b"\x00\x01"
+
+
+def test_close_frame_is_echoed_and_ends_the_stream():
+    stream = io.BytesIO(_frame(OP_CLOSE, struct.pack(">H", 1001) + b"going away"))
+    sent = []
+
+    with pytest.raises(WebSocketClosed):
+        read_message(stream, lambda opcode, payload: sent.append((opcode, payload)))
+    assert sent == [(OP_CLOSE, struct.pack(">H", 1001))]
+
+
+def test_oversized_and_truncated_frames_are_rejected():
+    with pytest.raises(WebSocketClosed):
+        read_frame(io.BytesIO(bytes([0x80 | OP_BINARY, 127]) + struct.pack(">Q", 1 << 40)))
+    with pytest.raises(WebSocketClosed):
+        read_frame(io.BytesIO(encode_frame(OP_TEXT, b"hello", mask=False)[:-2]))
+
+
+def test_client_against_a_socket_server():
+    """Handshake, fragmented text, ping/pong, masked client message and close"""
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    received = {}
+
+    def serve():
+        conn, _ = listener.accept()
+        rfile, wfile = conn.makefile("rb"), conn.makefile("wb")
+        _, headers = _read_headers(rfile)
+        received["upgraded"] = server_handshake(headers, wfile)
+        wfile.write(_frame(OP_PING, b"hb") + _frame(OP_TEXT, b'{"a":', fin=False) + _frame(OP_CONTINUATION, b"1}"))
+        wfile.flush()
+        received["pong"] = read_frame(rfile)
+        received["message"] = read_frame(rfile)
+        received["close"] = read_frame(rfile)
+        conn.close()
+
+    server = threading.Thread(target=serve, daemon=True)
+    server.start()
+    client = WebSocketClient(f"ws://127.0.0.1:{port}/ws/test", timeout=5).connect()
+    try:
+        assert client.recv() == '{"a":1}'
+        client.send("hello")
+    finally:
+        client.close()
+    server.join(5)
+    listener.close()
+
+    assert received["upgraded"]
+    assert received["pong"] == (True, OP_PONG, b"hb")
+    assert received["message"] == (True, OP_TEXT, b"hello")
+    assert received["close"] == (True, OP_CLOSE, struct.pack(">H", 1000))
+
+
+def test_handshake_with_a_wrong_accept_key_is_rejected():
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+
+    def serve():
+        conn, _ = listener.accept()
+        _read_headers(conn.makefile("rb"))
+        conn.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: bm90IHRoZSBrZXk=\r\n\r\n"
+        )
+        conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    with pytest.raises(WebSocketClosed):
+        WebSocketClient(f"ws://127.0.0.1:{port}/", timeout=5).connect()
+    listener.close()